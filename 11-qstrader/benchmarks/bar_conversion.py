@@ -0,0 +1,111 @@
+"""
+Benchmark of the daily bar to bid/ask price conversion.
+
+Compares the previous Pandas implementation (transpose/unstack,
+masked Timedelta additions, ffill and sort_index per asset) against
+the vectorised NumPy conversion, both per asset and across the
+whole timestamp by asset panel at once.
+
+Usage:
+    python benchmarks/bar_conversion.py --assets 5000 --years 20
+"""
+import timeit
+
+import click
+import numpy as np
+import pandas as pd
+import pytz
+
+from qstrader.data.bar_conversion import adjust_open_prices, interleave_open_close
+from qstrader.data.daily_bar_csv import CSVDailyBarDataSource
+
+
+def legacy_convert(bar_df):
+    """
+    The previous Pandas implementation of the adjusted conversion.
+    """
+    bar_df = bar_df.sort_index()
+    oc_df = bar_df.loc[:, ['Open', 'Close', 'Adj Close']]
+    oc_df['Adj Open'] = (oc_df['Adj Close'] / oc_df['Close']) * oc_df['Open']
+    oc_df = oc_df.loc[:, ['Adj Open', 'Adj Close']]
+    oc_df.columns = ['Open', 'Close']
+
+    seq_oc_df = oc_df.T.unstack(level=0).reset_index()
+    seq_oc_df.columns = ['Date', 'Market', 'Price']
+    seq_oc_df.loc[seq_oc_df['Market'] == 'Open', 'Date'] += pd.Timedelta(hours=14, minutes=30)
+    seq_oc_df.loc[seq_oc_df['Market'] == 'Close', 'Date'] += pd.Timedelta(hours=21, minutes=00)
+
+    dp_df = seq_oc_df[['Date', 'Price']].copy()
+    dp_df['Bid'] = dp_df['Price']
+    dp_df['Ask'] = dp_df['Price']
+    return dp_df.loc[:, ['Date', 'Bid', 'Ask']].ffill().set_index('Date').sort_index()
+
+
+def vectorised_convert(bar_df):
+    """
+    The vectorised per-asset conversion used by CSVDailyBarDataSource.
+    """
+    return CSVDailyBarDataSource._convert_open_close_into_bid_ask_df(
+        *CSVDailyBarDataSource._adjust_bar_frame(bar_df, True)
+    )
+
+
+def create_panel(num_assets, num_years):
+    """
+    Create random-walk open, close and adjusted close panels.
+    """
+    dates = pd.bdate_range('2000-01-03', periods=252 * num_years, tz=pytz.UTC, name='Date')
+    rng = np.random.default_rng(42)
+    closes = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.01, (len(dates), num_assets)), axis=0))
+    opens = closes * (1.0 + rng.normal(0.0, 0.001, closes.shape))
+    adj_closes = closes * 0.9
+    return dates, opens, closes, adj_closes
+
+
+@click.command()
+@click.option('--assets', 'num_assets', default=500, help='Number of assets')
+@click.option('--years', 'num_years', default=20, help='Years of daily bars')
+@click.option('--legacy-assets', 'num_legacy_assets', default=50, help='Assets to time the legacy conversion on')
+def cli(num_assets, num_years, num_legacy_assets):
+    dates, opens, closes, adj_closes = create_panel(num_assets, num_years)
+    num_legacy_assets = min(num_legacy_assets, num_assets)
+    bar_frames = [
+        pd.DataFrame(
+            {'Open': opens[:, i], 'Close': closes[:, i], 'Adj Close': adj_closes[:, i]},
+            index=dates
+        ) for i in range(num_assets)
+    ]
+    date_ns = dates.as_unit('ns').asi8
+
+    legacy_time = timeit.timeit(
+        lambda: [legacy_convert(bar_df) for bar_df in bar_frames[:num_legacy_assets]], number=1
+    ) * num_assets / num_legacy_assets
+    vectorised_time = timeit.timeit(
+        lambda: [vectorised_convert(bar_df) for bar_df in bar_frames], number=1
+    )
+    panel_time = timeit.timeit(
+        lambda: interleave_open_close(
+            date_ns, adjust_open_prices(opens, closes, adj_closes), adj_closes
+        ), number=1
+    )
+
+    print("Bars: %s (%s assets, %s days)" % (opens.size, num_assets, len(dates)))
+    print(
+        "Legacy Pandas per asset: %0.3fs (extrapolated from %s assets)" % (
+            legacy_time, num_legacy_assets
+        )
+    )
+    print(
+        "Vectorised per asset: %0.3fs (%0.1fx)" % (
+            vectorised_time, legacy_time / vectorised_time
+        )
+    )
+    print(
+        "Vectorised whole panel: %0.3fs (%0.1fx)" % (
+            panel_time, legacy_time / panel_time
+        )
+    )
+
+
+if __name__ == "__main__":
+    cli()
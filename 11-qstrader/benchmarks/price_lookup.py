@@ -0,0 +1,111 @@
+"""
+Micro-benchmark of CSVDailyBarDataSource bid/ask lookups.
+
+Compares the forward price cursor lookup against the previous
+implementation, which used a functools.lru_cache wrapped
+DatetimeIndex.get_indexer(method='pad') lookup, for a simulated
+sequence of daily market open/close queries across many assets.
+
+Usage:
+    python benchmarks/price_lookup.py --assets 100 --years 10
+"""
+import functools
+import tempfile
+import timeit
+
+import click
+import numpy as np
+import pandas as pd
+import pytz
+
+from qstrader.data.daily_bar_csv import CSVDailyBarDataSource
+from qstrader import settings
+
+
+def create_csv_files(csv_dir, num_assets, num_years):
+    """
+    Write random-walk daily bar CSV files into the directory.
+    """
+    dates = pd.bdate_range('2000-01-03', periods=252 * num_years)
+    rng = np.random.default_rng(42)
+    for i in range(num_assets):
+        close = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.01, len(dates))))
+        pd.DataFrame(
+            {
+                'Open': close * (1.0 + rng.normal(0.0, 0.001, len(dates))),
+                'Close': close,
+                'Adj Close': close
+            },
+            index=pd.Index(dates, name='Date')
+        ).to_csv('%s/SYM%04d.csv' % (csv_dir, i))
+    return dates
+
+
+class LegacyLookup(object):
+    """
+    The previous lru_cache/get_indexer bid lookup implementation.
+    """
+
+    def __init__(self, data_source):
+        self.asset_bid_ask_frames = data_source.asset_bid_ask_frames
+
+    @functools.lru_cache(maxsize=1024 * 1024)
+    def get_bid(self, dt, asset):
+        bid_ask_df = self.asset_bid_ask_frames[asset]
+        bid_series = bid_ask_df.iloc[bid_ask_df.index.get_indexer([dt], method='pad')]['Bid']
+        try:
+            bid = bid_series.iloc[0]
+        except KeyError:
+            return np.nan
+        return bid
+
+
+def simulation_timestamps(dates):
+    """
+    The market open/close timestamps visited by a daily simulation.
+    """
+    timestamps = []
+    for date in dates:
+        timestamps.append(pd.Timestamp('%s 14:30:00' % date.date(), tz=pytz.UTC))
+        timestamps.append(pd.Timestamp('%s 21:00:00' % date.date(), tz=pytz.UTC))
+    return timestamps
+
+
+def run_lookups(lookup, timestamps, assets):
+    for dt in timestamps:
+        for asset in assets:
+            lookup.get_bid(dt, asset)
+
+
+@click.command()
+@click.option('--assets', 'num_assets', default=50, help='Number of assets')
+@click.option('--years', 'num_years', default=5, help='Years of daily bars')
+def cli(num_assets, num_years):
+    settings.set_print_events(False)
+    with tempfile.TemporaryDirectory() as csv_dir:
+        dates = create_csv_files(csv_dir, num_assets, num_years)
+        data_source = CSVDailyBarDataSource(csv_dir, None)
+
+    assets = sorted(data_source.asset_bid_ask_frames.keys())
+    timestamps = simulation_timestamps(dates)
+    num_lookups = len(timestamps) * len(assets)
+
+    cursor_time = timeit.timeit(
+        lambda: run_lookups(data_source, timestamps, assets), number=1
+    )
+    legacy_time = timeit.timeit(
+        lambda: run_lookups(LegacyLookup(data_source), timestamps, assets), number=1
+    )
+
+    print("Lookups: %s (%s assets, %s timestamps)" % (num_lookups, len(assets), len(timestamps)))
+    print("Legacy lru_cache/get_indexer: %0.3fs (%0.2fus per lookup)" % (
+        legacy_time, 1e6 * legacy_time / num_lookups)
+    )
+    print("Forward price cursor: %0.3fs (%0.2fus per lookup)" % (
+        cursor_time, 1e6 * cursor_time / num_lookups)
+    )
+    print("Speed-up: %0.1fx" % (legacy_time / cursor_time))
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,102 @@
+"""
+Benchmark of the vectorised backtest against the event-driven backtest.
+
+Runs the same equally-weighted long only strategy over random-walk
+daily bars via BacktestTradingSession.run and run_vectorised,
+checking that the equity curves match to within floating point
+rounding.
+
+Usage:
+    python benchmarks/vectorised_backtest.py --assets 50 --years 15 --rebalance daily
+"""
+import os
+import tempfile
+import timeit
+
+import click
+import numpy as np
+import pandas as pd
+import pytz
+
+from qstrader.alpha_model.fixed_signals import FixedSignalsAlphaModel
+from qstrader.asset.equity import Equity
+from qstrader.asset.universe.static import StaticUniverse
+from qstrader.data.backtest_data_handler import BacktestDataHandler
+from qstrader.data.daily_bar_csv import CSVDailyBarDataSource
+from qstrader.trading.backtest import BacktestTradingSession
+from qstrader import settings
+
+
+def write_csvs(csv_dir, num_assets, num_years):
+    """
+    Write random-walk daily bars for each asset.
+    """
+    dates = pd.bdate_range('2000-01-03', periods=252 * num_years)
+    rng = np.random.default_rng(42)
+    for i in range(num_assets):
+        closes = 100.0 * np.exp(np.cumsum(rng.normal(0.0002, 0.01, len(dates))))
+        opens = closes * (1.0 + rng.normal(0.0, 0.001, len(dates)))
+        pd.DataFrame(
+            {
+                'Date': dates.strftime('%Y-%m-%d'), 'Open': opens,
+                'Close': closes, 'Adj Close': closes
+            }
+        ).to_csv(os.path.join(csv_dir, 'A%04d.csv' % i), index=False)
+    return dates
+
+
+@click.command()
+@click.option('--assets', 'num_assets', default=50, help='Number of assets')
+@click.option('--years', 'num_years', default=15, help='Years of daily bars')
+@click.option('--rebalance', default='end_of_month', help='Rebalance frequency')
+def cli(num_assets, num_years, rebalance):
+    settings.PRINT_EVENTS = False
+    with tempfile.TemporaryDirectory() as csv_dir:
+        dates = write_csvs(csv_dir, num_assets, num_years)
+        data_source = CSVDailyBarDataSource(csv_dir, Equity)
+        assets = ['EQ:A%04d' % i for i in range(num_assets)]
+
+        def create_backtest():
+            universe = StaticUniverse(assets)
+            return BacktestTradingSession(
+                pd.Timestamp(dates[1], tz=pytz.UTC),
+                pd.Timestamp(dates[-1], tz=pytz.UTC),
+                universe,
+                FixedSignalsAlphaModel({asset: 1.0 / num_assets for asset in assets}),
+                rebalance=rebalance,
+                long_only=True,
+                cash_buffer_percentage=0.01,
+                data_handler=BacktestDataHandler(universe, data_sources=[data_source])
+            )
+
+        event_backtest = create_backtest()
+        vectorised_backtest = create_backtest()
+        event_time = timeit.timeit(lambda: event_backtest.run(), number=1)
+        vectorised_time = timeit.timeit(lambda: vectorised_backtest.run_vectorised(), number=1)
+
+    print("Assets: %s, days: %s, rebalance: %s" % (num_assets, len(dates), rebalance))
+    print("Event-driven: %0.3fs" % event_time)
+    print(
+        "Vectorised: %0.3fs (%0.1fx)" % (
+            vectorised_time, event_time / vectorised_time
+        )
+    )
+    vectorised_curve = vectorised_backtest.equity_curve
+    event_curve = event_backtest.equity_curve
+    print(
+        "Matching equity curves: %s (max relative difference %0.1e)" % (
+            [dt for dt, _ in vectorised_curve] == [dt for dt, _ in event_curve] and
+            np.allclose(
+                [equity for _, equity in vectorised_curve],
+                [equity for _, equity in event_curve], rtol=1e-12, atol=0.0
+            ),
+            np.max(np.abs(
+                np.array([equity for _, equity in vectorised_curve]) /
+                np.array([equity for _, equity in event_curve]) - 1.0
+            ))
+        )
+    )
+
+
+if __name__ == "__main__":
+    cli()
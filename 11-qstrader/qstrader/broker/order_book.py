@@ -0,0 +1,257 @@
+import heapq
+
+from qstrader.execution.order import LIMIT
+
+
+class AssetOrderBook(object):
+    """
+    The resting limit and stop orders of a single asset, held within
+    four heaps keyed by trigger price such that the next order to be
+    triggered on each side is always at the top of its heap.
+
+    Buy limits and sell stops are triggered by the price falling to
+    their trigger price, so are held in max-heaps (via negated keys),
+    while sell limits and buy stops are triggered by the price rising
+    to their trigger price, so are held in min-heaps.
+
+    Entries are (key, sequence, order ID) tuples, with the sequence
+    number retaining time priority amongst equal trigger prices.
+    """
+
+    def __init__(self):
+        self.buy_limits = []
+        self.sell_limits = []
+        self.buy_stops = []
+        self.sell_stops = []
+
+    def push(self, seq, order):
+        """
+        Add a limit or stop order to the appropriate heap.
+
+        Parameters
+        ----------
+        seq : `int`
+            The sequence number of the order.
+        order : `Order`
+            The limit or stop order.
+        """
+        price = order.trigger_price
+        if order.order_type == LIMIT:
+            if order.direction > 0:
+                heapq.heappush(self.buy_limits, (-price, seq, order.order_id))
+            else:
+                heapq.heappush(self.sell_limits, (price, seq, order.order_id))
+        else:
+            if order.direction > 0:
+                heapq.heappush(self.buy_stops, (price, seq, order.order_id))
+            else:
+                heapq.heappush(self.sell_stops, (-price, seq, order.order_id))
+
+    def triggered_heaps(self, low, high):
+        """
+        Obtain each heap along with the maximum key triggered
+        by a price range, with the stop orders first.
+
+        Parameters
+        ----------
+        low : `float`
+            The lowest price of the range.
+        high : `float`
+            The highest price of the range.
+
+        Returns
+        -------
+        `list[tuple(list, float)]`
+            The heaps and the maximum triggered key of each.
+        """
+        return [
+            (self.sell_stops, -low),
+            (self.buy_stops, high),
+            (self.buy_limits, -low),
+            (self.sell_limits, high)
+        ]
+
+
+class OrderBook(object):
+    """
+    The resting (limit and stop) orders of every portfolio of a
+    broker, held in a per-asset AssetOrderBook of trigger price keyed
+    heaps.
+
+    Matching an asset against the price range of a bar only examines
+    those orders whose trigger prices fall within the range, rather
+    than every resting order. Cancelled orders are removed from the
+    heaps lazily, when they reach the top.
+
+    Orders sharing a one-cancels-other ID, such as the exit orders of
+    a bracket order, are cancelled together once any one of them is
+    triggered.
+    """
+
+    def __init__(self):
+        self.asset_books = {}
+        self.asset_counts = {}
+        self.orders = {}
+        self.oco_groups = {}
+        self.seq = 0
+
+    def __len__(self):
+        return len(self.orders)
+
+    @property
+    def assets(self):
+        """
+        The assets with resting orders.
+        """
+        return list(self.asset_books)
+
+    def add(self, portfolio_id, order):
+        """
+        Rest a limit or stop order on the book.
+
+        Parameters
+        ----------
+        portfolio_id : `str`
+            The ID of the portfolio that placed the order.
+        order : `Order`
+            The limit or stop order.
+        """
+        if order.trigger_price is None:
+            raise ValueError(
+                "Only limit and stop orders can rest on the order book, "
+                "but order with ID '%s' is a %s order." % (
+                    order.order_id, order.order_type
+                )
+            )
+        if order.order_id in self.orders:
+            raise ValueError(
+                "Order with ID '%s' is already resting on the "
+                "order book." % order.order_id
+            )
+        book = self.asset_books.get(order.asset)
+        if book is None:
+            book = AssetOrderBook()
+            self.asset_books[order.asset] = book
+        book.push(self.seq, order)
+        self.seq += 1
+        self.asset_counts[order.asset] = self.asset_counts.get(order.asset, 0) + 1
+        self.orders[order.order_id] = (portfolio_id, order)
+        if order.oco_id is not None:
+            self.oco_groups.setdefault(order.oco_id, set()).add(order.order_id)
+
+    def _discard(self, order_id):
+        """
+        Remove an order from the resting orders, leaving its heap
+        entry to be discarded lazily, and drop the book of an asset
+        without further resting orders.
+
+        Parameters
+        ----------
+        order_id : `str`
+            The order ID.
+
+        Returns
+        -------
+        `tuple(str, Order)`
+            The portfolio ID and the removed order.
+        """
+        portfolio_id, order = self.orders.pop(order_id)
+        if order.oco_id is not None:
+            group = self.oco_groups[order.oco_id]
+            group.discard(order_id)
+            if len(group) == 0:
+                del self.oco_groups[order.oco_id]
+        self.asset_counts[order.asset] -= 1
+        if self.asset_counts[order.asset] == 0:
+            del self.asset_counts[order.asset]
+            del self.asset_books[order.asset]
+        return portfolio_id, order
+
+    def cancel(self, order_id):
+        """
+        Cancel a resting order.
+
+        Parameters
+        ----------
+        order_id : `str`
+            The order ID.
+
+        Returns
+        -------
+        `Order`
+            The cancelled order.
+        """
+        if order_id not in self.orders:
+            raise KeyError(
+                "Order with ID '%s' is not resting on the "
+                "order book." % order_id
+            )
+        return self._discard(order_id)[1]
+
+    def get_orders(self, portfolio_id=None):
+        """
+        Obtain the resting orders, optionally of a single portfolio.
+
+        Parameters
+        ----------
+        portfolio_id : `str`, optional
+            The portfolio ID.
+
+        Returns
+        -------
+        `list[Order]`
+            The resting orders, in order of placement.
+        """
+        return [
+            order for order_portfolio_id, order in self.orders.values()
+            if portfolio_id is None or order_portfolio_id == portfolio_id
+        ]
+
+    def match(self, asset, low, high):
+        """
+        Remove and return the resting orders of an asset triggered
+        by a range of prices, along with their execution prices.
+
+        Stop orders are matched before limit orders, such that when
+        both exit orders of a bracket order fall within the range the
+        stop loss is (conservatively) executed.
+
+        A triggered order is executed at its trigger price, unless
+        the whole range is beyond the trigger price (such as when the
+        price gaps through it), in which case it is executed at the
+        nearest price of the range.
+
+        Parameters
+        ----------
+        asset : `str`
+            The asset symbol.
+        low : `float`
+            The lowest price of the range.
+        high : `float`
+            The highest price of the range.
+
+        Returns
+        -------
+        `list[tuple(str, Order, float)]`
+            The portfolio ID, order and execution price of each
+            triggered order.
+        """
+        book = self.asset_books.get(asset)
+        if book is None:
+            return []
+
+        matched = []
+        for heap, max_key in book.triggered_heaps(low, high):
+            while len(heap) > 0 and (
+                heap[0][2] not in self.orders or heap[0][0] <= max_key
+            ):
+                order_id = heapq.heappop(heap)[2]
+                if order_id not in self.orders:
+                    continue
+                portfolio_id, order = self._discard(order_id)
+                if order.oco_id is not None:
+                    for other_id in list(self.oco_groups.get(order.oco_id, ())):
+                        self._discard(other_id)
+                price = min(max(order.trigger_price, low), high)
+                matched.append((portfolio_id, order, price))
+        return matched
@@ -0,0 +1,267 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from qstrader.broker.portfolio.portfolio_event import PortfolioEvent
+
+
+# Initial number of entries allocated by a PortfolioJournal
+INITIAL_JOURNAL_CAPACITY = 64
+
+# Type codes of the journal entries, with asset
+# transactions distinguished by their direction
+SUBSCRIPTION = 0
+WITHDRAWAL = 1
+LONG_TRANSACTION = 2
+SHORT_TRANSACTION = 3
+
+# Portfolio event types of each journal entry type code
+EVENT_TYPES = ('subscription', 'withdrawal', 'asset_transaction', 'asset_transaction')
+
+# Typed columns of the journal entries
+JOURNAL_COLUMNS = (
+    ('ts', np.int64),
+    ('type', np.int8),
+    ('asset_id', np.int32),
+    ('quantity', np.float64),
+    ('integral_quantity', bool),
+    ('price', np.float64),
+    ('debit', np.float64),
+    ('credit', np.float64),
+    ('balance', np.float64)
+)
+
+
+class PortfolioJournal(object):
+    """
+    An append-only journal of the cash subscriptions, withdrawals and
+    asset transactions of a portfolio, recorded into typed, growable
+    NumPy columns rather than as formatted PortfolioEvent instances.
+
+    Amounts are stored unrounded, and the human-readable descriptions
+    and rounded amounts of the portfolio events are only formatted
+    when the events are requested. Assets are stored as interned
+    asset IDs and timestamps as int64 nanoseconds, which are returned
+    in the timezone of the first journal entry.
+
+    Parameters
+    ----------
+    capacity : `int`, optional
+        The number of entries initially allocated.
+    """
+
+    def __init__(self, capacity=INITIAL_JOURNAL_CAPACITY):
+        self.assets = []
+        self.asset_ids = {}
+        self.tz = None
+        self.size = 0
+        self.columns = {
+            name: np.zeros(capacity, dtype=dtype) for name, dtype in JOURNAL_COLUMNS
+        }
+
+    def __len__(self):
+        return self.size
+
+    def _grow(self):
+        """
+        Double the capacity of the journal columns.
+        """
+        for name, values in self.columns.items():
+            grown = np.zeros(2 * len(values), dtype=values.dtype)
+            grown[:self.size] = values[:self.size]
+            self.columns[name] = grown
+
+    def _append(
+        self, dt, entry_type, debit, credit, balance,
+        asset=None, quantity=0.0, price=np.nan
+    ):
+        """
+        Append an entry to the journal.
+
+        Parameters
+        ----------
+        dt : `pd.Timestamp`
+            The time of the entry.
+        entry_type : `int`
+            The type code of the entry.
+        debit : `float`
+            The unrounded debit to the cash balance.
+        credit : `float`
+            The unrounded credit to the cash balance.
+        balance : `float`
+            The unrounded cash balance after the entry.
+        asset : `str`, optional
+            The asset symbol of an asset transaction.
+        quantity : `int` or `float`, optional
+            The quantity of an asset transaction.
+        price : `float`, optional
+            The price of an asset transaction.
+        """
+        if self.size == len(self.columns['ts']):
+            self._grow()
+        if self.size == 0:
+            self.tz = getattr(dt, 'tzinfo', None)
+
+        if asset is None:
+            asset_id = -1
+        else:
+            asset_id = self.asset_ids.get(asset)
+            if asset_id is None:
+                asset_id = len(self.assets)
+                self.assets.append(asset)
+                self.asset_ids[asset] = asset_id
+
+        row = self.size
+        columns = self.columns
+        columns['ts'][row] = dt.value if isinstance(dt, pd.Timestamp) else pd.Timestamp(dt).value
+        columns['type'][row] = entry_type
+        columns['asset_id'][row] = asset_id
+        columns['quantity'][row] = quantity
+        columns['integral_quantity'][row] = isinstance(quantity, (int, np.integer))
+        columns['price'][row] = price
+        columns['debit'][row] = debit
+        columns['credit'][row] = credit
+        columns['balance'][row] = balance
+        self.size += 1
+
+    def record_subscription(self, dt, credit, balance):
+        """
+        Record a subscription of funds.
+
+        Parameters
+        ----------
+        dt : `pd.Timestamp`
+            The time of the subscription.
+        credit : `float`
+            The amount subscribed.
+        balance : `float`
+            The cash balance after the subscription.
+        """
+        self._append(dt, SUBSCRIPTION, 0.0, credit, balance)
+
+    def record_withdrawal(self, dt, debit, balance):
+        """
+        Record a withdrawal of funds.
+
+        Parameters
+        ----------
+        dt : `pd.Timestamp`
+            The time of the withdrawal.
+        debit : `float`
+            The amount withdrawn.
+        balance : `float`
+            The cash balance after the withdrawal.
+        """
+        self._append(dt, WITHDRAWAL, debit, 0.0, balance)
+
+    def record_transaction(self, dt, asset, quantity, price, total_cost, balance, long):
+        """
+        Record an asset transaction.
+
+        Parameters
+        ----------
+        dt : `pd.Timestamp`
+            The time of the transaction.
+        asset : `str`
+            The asset symbol.
+        quantity : `int` or `float`
+            The quantity transacted.
+        price : `float`
+            The price of the transaction.
+        total_cost : `float`
+            The cost of the transaction, including commission.
+        balance : `float`
+            The cash balance after the transaction.
+        long : `Boolean`
+            Whether the transaction is a purchase, debiting its cost,
+            rather than a sale, crediting its proceeds.
+        """
+        if long:
+            self._append(
+                dt, LONG_TRANSACTION, total_cost, 0.0, balance,
+                asset=asset, quantity=quantity, price=price
+            )
+        else:
+            self._append(
+                dt, SHORT_TRANSACTION, 0.0, -1.0 * total_cost, balance,
+                asset=asset, quantity=quantity, price=price
+            )
+
+    def _timestamps(self):
+        """
+        Obtain the timestamps of the entries in the timezone
+        of the first entry.
+
+        Returns
+        -------
+        `pd.DatetimeIndex`
+            The timestamps.
+        """
+        timestamps = pd.DatetimeIndex(self.columns['ts'][:self.size].astype('datetime64[ns]'))
+        if self.tz is not None:
+            timestamps = timestamps.tz_localize('UTC').tz_convert(self.tz)
+        return timestamps
+
+    def to_events(self):
+        """
+        Format the journal entries into portfolio events, with
+        human-readable descriptions and amounts rounded to cents.
+
+        Returns
+        -------
+        `list[PortfolioEvent]`
+            The portfolio events, in order.
+        """
+        columns = {name: values[:self.size].tolist() for name, values in self.columns.items()}
+        events = []
+        for row, dt in enumerate(self._timestamps()):
+            entry_type = columns['type'][row]
+            if entry_type == SUBSCRIPTION:
+                description = 'SUBSCRIPTION'
+            elif entry_type == WITHDRAWAL:
+                description = 'WITHDRAWAL'
+            else:
+                quantity = columns['quantity'][row]
+                if columns['integral_quantity'][row]:
+                    quantity = int(quantity)
+                description = "%s %s %s %0.2f %s" % (
+                    'LONG' if entry_type == LONG_TRANSACTION else 'SHORT',
+                    quantity, self.assets[columns['asset_id'][row]].upper(),
+                    columns['price'][row], datetime.datetime.strftime(dt, "%d/%m/%Y")
+                )
+            events.append(
+                PortfolioEvent(
+                    dt=dt, type=EVENT_TYPES[entry_type], description=description,
+                    debit=round(columns['debit'][row], 2),
+                    credit=round(columns['credit'][row], 2),
+                    balance=round(columns['balance'][row], 2)
+                )
+            )
+        return events
+
+    def to_df(self):
+        """
+        Obtain the unformatted journal entries as a DataFrame.
+
+        Returns
+        -------
+        `pd.DataFrame`
+            The timestamp-indexed entries, with the event type, asset
+            symbol (None for cash events), quantity, price and the
+            unrounded debit, credit and cash balance.
+        """
+        asset_ids = self.columns['asset_id'][:self.size]
+        assets = np.array(self.assets + [None], dtype=object)[asset_ids]
+        return pd.DataFrame(
+            {
+                'type': np.array(EVENT_TYPES, dtype=object)[self.columns['type'][:self.size]],
+                'asset': assets,
+                'quantity': self.columns['quantity'][:self.size],
+                'price': self.columns['price'][:self.size],
+                'debit': self.columns['debit'][:self.size],
+                'credit': self.columns['credit'][:self.size],
+                'balance': self.columns['balance'][:self.size]
+            },
+            index=self._timestamps().rename('date')
+        )
@@ -1,11 +1,10 @@
 import copy
-import datetime
 import logging
 
 import pandas as pd
 
 from qstrader import settings
-from qstrader.broker.portfolio.portfolio_event import PortfolioEvent
+from qstrader.broker.portfolio.journal import PortfolioJournal
 from qstrader.broker.portfolio.position_handler import PositionHandler
 
 
@@ -28,6 +27,10 @@ class Portfolio(object):
         An identifier for the portfolio.
     name: str, optional
         The human-readable name of the portfolio.
+    journal: bool, optional
+        Whether to record the portfolio history of subscriptions,
+        withdrawals and transactions. Disabling the journal avoids its
+        overhead for backtests whose history is never read.
     """
 
     def __init__(
@@ -36,11 +39,12 @@ class Portfolio(object):
         starting_cash=0.0,
         currency="USD",
         portfolio_id=None,
-        name=None
+        name=None,
+        journal=True
     ):
         """
         Initialise the Portfolio object with a PositionHandler,
-        an event history, along with cash balance. Make sure
+        an event journal, along with cash balance. Make sure
         the portfolio denomination currency is also set.
         """
         self.start_dt = start_dt
@@ -51,16 +55,15 @@ class Portfolio(object):
         self.name = name
 
         self.pos_handler = PositionHandler()
-        self.history = []
+        self.journal = PortfolioJournal() if journal else None
 
         self.logger = logging.getLogger('Portfolio')
-        self.logger.setLevel(logging.DEBUG)
-        self.logger.info(
-            '(%s) Portfolio "%s" instance initialised' % (
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(
+                '(%s) Portfolio "%s" instance initialised',
                 self.current_dt.strftime(settings.LOGGING["DATE_FORMAT"]),
                 self.portfolio_id
             )
-        )
 
         self._initialise_portfolio_with_cash()
 
@@ -71,21 +74,40 @@ class Portfolio(object):
         """
         self.cash = copy.copy(self.starting_cash)
 
-        if self.starting_cash > 0.0:
-            self.history.append(
-                PortfolioEvent.create_subscription(
-                    self.current_dt, self.starting_cash, self.starting_cash
-                )
+        if self.starting_cash > 0.0 and self.journal is not None:
+            self.journal.record_subscription(
+                self.current_dt, self.starting_cash, self.starting_cash
             )
 
-        self.logger.info(
-            '(%s) Funds subscribed to portfolio "%s" '
-            '- Credit: %0.2f, Balance: %0.2f' % (
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(
+                '(%s) Funds subscribed to portfolio "%s" '
+                '- Credit: %0.2f, Balance: %0.2f',
                 self.current_dt.strftime(settings.LOGGING["DATE_FORMAT"]),
                 self.portfolio_id,
                 round(self.starting_cash, 2),
                 round(self.starting_cash, 2)
             )
+
+    @property
+    def history(self):
+        """
+        Obtain the portfolio events of the journal, with
+        human-readable descriptions and rounded amounts.
+
+        The history is read-only. A new list is created on each
+        access, such that modifying it does not alter the journal.
+        """
+        if self.journal is None:
+            return []
+        return self.journal.to_events()
+
+    @history.setter
+    def history(self, history):
+        raise AttributeError(
+            "Portfolio history is read-only, as it is formatted from the "
+            "portfolio journal. Record subscriptions, withdrawals and "
+            "transactions via the Portfolio methods instead."
         )
 
     @property
@@ -143,18 +165,17 @@ class Portfolio(object):
 
         self.cash += amount
 
-        self.history.append(
-            PortfolioEvent.create_subscription(self.current_dt, amount, self.cash)
-        )
+        if self.journal is not None:
+            self.journal.record_subscription(self.current_dt, amount, self.cash)
 
-        self.logger.info(
-            '(%s) Funds subscribed to portfolio "%s" '
-            '- Credit: %0.2f, Balance: %0.2f' % (
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(
+                '(%s) Funds subscribed to portfolio "%s" '
+                '- Credit: %0.2f, Balance: %0.2f',
                 self.current_dt.strftime(settings.LOGGING["DATE_FORMAT"]),
                 self.portfolio_id, round(amount, 2),
                 round(self.cash, 2)
             )
-        )
 
     def withdraw_funds(self, dt, amount):
         """
@@ -188,18 +209,17 @@ class Portfolio(object):
 
         self.cash -= amount
 
-        self.history.append(
-            PortfolioEvent.create_withdrawal(self.current_dt, amount, self.cash)
-        )
+        if self.journal is not None:
+            self.journal.record_withdrawal(self.current_dt, amount, self.cash)
 
-        self.logger.info(
-            '(%s) Funds withdrawn from portfolio "%s" '
-            '- Debit: %0.2f, Balance: %0.2f' % (
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(
+                '(%s) Funds withdrawn from portfolio "%s" '
+                '- Debit: %0.2f, Balance: %0.2f',
                 self.current_dt.strftime(settings.LOGGING["DATE_FORMAT"]),
                 self.portfolio_id, round(amount, 2),
                 round(self.cash, 2)
             )
-        )
 
     def transact_asset(self, txn):
         """
@@ -231,43 +251,32 @@ class Portfolio(object):
 
         self.cash -= txn_total_cost
 
-        # Form Portfolio history details
-        direction = "LONG" if txn.direction > 0 else "SHORT"
-        description = "%s %s %s %0.2f %s" % (
-            direction, txn.quantity, txn.asset.upper(),
-            txn.price, datetime.datetime.strftime(txn.dt, "%d/%m/%Y")
-        )
-        if direction == "LONG":
-            pe = PortfolioEvent(
-                dt=txn.dt, type='asset_transaction',
-                description=description,
-                debit=round(txn_total_cost, 2), credit=0.0,
-                balance=round(self.cash, 2)
+        # Record the transaction within the journal, deferring
+        # the formatting of its description until requested
+        long = txn.direction > 0
+        if self.journal is not None:
+            self.journal.record_transaction(
+                txn.dt, txn.asset, txn.quantity, txn.price,
+                txn_total_cost, self.cash, long
             )
-            self.logger.info(
-                '(%s) Asset "%s" transacted LONG in portfolio "%s" '
-                '- Debit: %0.2f, Balance: %0.2f' % (
+
+        if self.logger.isEnabledFor(logging.INFO):
+            if long:
+                self.logger.info(
+                    '(%s) Asset "%s" transacted LONG in portfolio "%s" '
+                    '- Debit: %0.2f, Balance: %0.2f',
                     txn.dt.strftime(settings.LOGGING["DATE_FORMAT"]),
                     txn.asset, self.portfolio_id,
                     round(txn_total_cost, 2), round(self.cash, 2)
                 )
-            )
-        else:
-            pe = PortfolioEvent(
-                dt=txn.dt, type='asset_transaction',
-                description=description,
-                debit=0.0, credit=-1.0 * round(txn_total_cost, 2),
-                balance=round(self.cash, 2)
-            )
-            self.logger.info(
-                '(%s) Asset "%s" transacted SHORT in portfolio "%s" '
-                '- Credit: %0.2f, Balance: %0.2f' % (
+            else:
+                self.logger.info(
+                    '(%s) Asset "%s" transacted SHORT in portfolio "%s" '
+                    '- Credit: %0.2f, Balance: %0.2f',
                     txn.dt.strftime(settings.LOGGING["DATE_FORMAT"]),
                     txn.asset, self.portfolio_id,
                     -1.0 * round(txn_total_cost, 2), round(self.cash, 2)
                 )
-            )
-        self.history.append(pe)
 
     def portfolio_to_dict(self):
         """
@@ -322,6 +331,20 @@ class Portfolio(object):
                 current_price, current_dt
             )
 
+    def update_market_values(self, current_prices, current_dt):
+        """
+        Update the market values of all positions at once to the
+        current trade prices, provided in the order of the positions,
+        and date.
+        """
+        if current_dt < self.current_dt:
+            raise ValueError(
+                'Current trade date of %s is earlier than '
+                'current date %s of the portfolio. Cannot update '
+                'positions.' % (current_dt, self.current_dt)
+            )
+        self.pos_handler.update_current_prices(current_prices, current_dt)
+
     def history_to_df(self):
         """
         Creates a Pandas DataFrame of the Portfolio history.
@@ -1,12 +1,143 @@
 from collections import OrderedDict
+import math
+
+import numpy as np
 
 from qstrader.broker.portfolio.position import Position
 
 
+# Initial number of assets allocated within the position arrays
+INITIAL_POSITION_CAPACITY = 16
+
+# Fields of a Position held as float64 arrays by the PositionHandler
+PRICE_FIELDS = (
+    'current_price', 'avg_bought', 'avg_sold', 'buy_commission', 'sell_commission'
+)
+
+# Quantity fields of a Position, which are also held as float64 arrays
+# but retain whether they are integral, as for a Position
+QUANTITY_FIELDS = ('buy_quantity', 'sell_quantity')
+
+# Number of delta updates of the running totals after which they are
+# re-summed exactly, bounding any accumulated floating point error
+TOTALS_RESUM_INTERVAL = 1000
+
+
+def _price_field(name):
+    """
+    Create the property of a PositionView reading and writing
+    a price field within the PositionHandler arrays.
+    """
+    def fget(self):
+        return float(self.handler.arrays[name][self.asset_id])
+
+    def fset(self, value):
+        before = self.handler.position_totals(self)
+        self.handler.arrays[name][self.asset_id] = value
+        self.handler.update_totals(self, before)
+
+    return property(fget, fset)
+
+
+def _current_price_field():
+    """
+    Create the property of a PositionView reading and writing the
+    current price within the PositionHandler arrays, which only
+    changes the market value and unrealised P&L of the position.
+    """
+    def fget(self):
+        return float(self.handler.arrays['current_price'][self.asset_id])
+
+    def fset(self, value):
+        self.handler.update_price_totals(self, value)
+        self.handler.arrays['current_price'][self.asset_id] = value
+
+    return property(fget, fset)
+
+
+def _quantity_field(name):
+    """
+    Create the property of a PositionView reading and writing a
+    quantity field within the PositionHandler arrays, such that
+    integral quantities are returned as integers.
+    """
+    def fget(self):
+        value = self.handler.arrays[name][self.asset_id]
+        if self.handler.integral[name][self.asset_id]:
+            return int(value)
+        return float(value)
+
+    def fset(self, value):
+        before = self.handler.position_totals(self)
+        self.handler.arrays[name][self.asset_id] = value
+        self.handler.integral[name][self.asset_id] = isinstance(value, (int, np.integer))
+        self.handler.update_totals(self, before)
+
+    return property(fget, fset)
+
+
+class PositionView(Position):
+    """
+    A Position whose quantities, average prices, commissions, current
+    price and current time are held within the arrays of a
+    PositionHandler, at the index of the interned asset ID, rather
+    than as attributes of the instance.
+
+    All Position accounting is carried out unchanged via the view,
+    while the handler is able to update and aggregate every position
+    at once.
+
+    Parameters
+    ----------
+    handler : `PositionHandler`
+        The position handler holding the position arrays.
+    asset_id : `int`
+        The interned ID of the asset within the handler.
+    asset : `str`
+        The Asset symbol string.
+    """
+
+    def __init__(self, handler, asset_id, asset):
+        self.handler = handler
+        self.asset_id = asset_id
+        self.asset = asset
+
+    current_price = _current_price_field()
+    avg_bought = _price_field('avg_bought')
+    avg_sold = _price_field('avg_sold')
+    buy_commission = _price_field('buy_commission')
+    sell_commission = _price_field('sell_commission')
+    buy_quantity = _quantity_field('buy_quantity')
+    sell_quantity = _quantity_field('sell_quantity')
+
+    @property
+    def current_dt(self):
+        return self.handler.current_dts[self.asset_id]
+
+    @current_dt.setter
+    def current_dt(self, dt):
+        self.handler.current_dts[self.asset_id] = dt
+
+
 class PositionHandler(object):
     """
     A class that keeps track of, and updates, the current
     list of Position instances stored in a Portfolio entity.
+
+    The state of every position is held within NumPy arrays indexed by
+    an interned asset ID, with the positions themselves being
+    PositionView instances of those arrays. This allows all of the
+    positions to be marked to market, and their market value summed,
+    with single vectorised operations.
+
+    The total market value and P&Ls are held as running totals, such
+    that obtaining them is O(1) in the number of positions. Changes to
+    the prices or quantities of an open position, and marking every
+    position to market at once, update the totals by the change in
+    value. The totals are only re-summed over the positions when a
+    position is opened or closed, or after TOTALS_RESUM_INTERVAL delta
+    updates to bound their floating point drift from the sum of the
+    individual positions.
     """
 
     def __init__(self):
@@ -15,6 +146,224 @@ class PositionHandler(object):
         an ordered dictionary containing the current positions.
         """
         self.positions = OrderedDict()
+        self.assets = []
+        self.asset_ids = {}
+        self._open_asset_ids = None
+        self._totals = None
+        self._num_updates = 0
+        self._transacting = None
+        self._allocate(INITIAL_POSITION_CAPACITY)
+
+    def _allocate(self, capacity):
+        """
+        Allocate (or grow) the position arrays, retaining the
+        state of every previously interned asset.
+
+        Parameters
+        ----------
+        capacity : `int`
+            The number of assets to allocate the arrays for.
+        """
+        arrays = {
+            name: np.zeros(capacity) for name in PRICE_FIELDS + QUANTITY_FIELDS
+        }
+        integral = {name: np.zeros(capacity, dtype=bool) for name in QUANTITY_FIELDS}
+        current_dts = np.full(capacity, None, dtype=object)
+        num_assets = len(self.assets)
+        if num_assets > 0:
+            for name, values in arrays.items():
+                values[:num_assets] = self.arrays[name][:num_assets]
+            for name, values in integral.items():
+                values[:num_assets] = self.integral[name][:num_assets]
+            current_dts[:num_assets] = self.current_dts[:num_assets]
+        self.arrays = arrays
+        self.integral = integral
+        self.current_dts = current_dts
+
+    def _intern_asset(self, asset):
+        """
+        Obtain the asset ID of an asset, assigning the next
+        ID to a previously unseen asset.
+
+        Parameters
+        ----------
+        asset : `str`
+            The Asset symbol string.
+
+        Returns
+        -------
+        `int`
+            The asset ID.
+        """
+        asset_id = self.asset_ids.get(asset)
+        if asset_id is None:
+            asset_id = len(self.assets)
+            capacity = len(self.current_dts)
+            if asset_id >= capacity:
+                self._allocate(2 * capacity)
+            self.assets.append(asset)
+            self.asset_ids[asset] = asset_id
+        return asset_id
+
+    def _open_position(self, transaction):
+        """
+        Open a new position from a transaction, held within
+        the position arrays.
+
+        Parameters
+        ----------
+        transaction : `Transaction`
+            The transaction with which to open the position.
+
+        Returns
+        -------
+        `PositionView`
+            The opened position.
+        """
+        opened = Position.open_from_transaction(transaction)
+        position = PositionView(
+            self, self._intern_asset(transaction.asset), transaction.asset
+        )
+        for name in PRICE_FIELDS + QUANTITY_FIELDS + ('current_dt',):
+            setattr(position, name, getattr(opened, name))
+        return position
+
+    @property
+    def open_asset_ids(self):
+        """
+        The asset IDs of the current positions, in the
+        order of the positions.
+
+        Returns
+        -------
+        `np.ndarray`
+            The asset IDs.
+        """
+        if self._open_asset_ids is None:
+            self._open_asset_ids = np.fromiter(
+                (position.asset_id for position in self.positions.values()),
+                dtype=np.intp, count=len(self.positions)
+            )
+        return self._open_asset_ids
+
+    def invalidate_totals(self):
+        """
+        Invalidate the running totals of the positions, such that
+        they are re-summed when next obtained.
+        """
+        self._totals = None
+
+    def _is_tracked(self, position):
+        """
+        Determine whether changes to a position update the running
+        totals, which requires the totals to be currently held and the
+        position to be open and not being transacted (in which case the
+        totals are updated once the whole transaction is carried out).
+
+        Parameters
+        ----------
+        position : `PositionView`
+            The position.
+
+        Returns
+        -------
+        `Boolean`
+            Whether the position is tracked by the running totals.
+        """
+        return (
+            self._totals is not None and position is not self._transacting and
+            self.positions.get(position.asset) is position
+        )
+
+    def position_totals(self, position):
+        """
+        Obtain the contribution of an open position to the running
+        totals, prior to a change of one of its fields.
+
+        Parameters
+        ----------
+        position : `PositionView`
+            The position.
+
+        Returns
+        -------
+        `tuple(float, float, float)` or None
+            The market value, unrealised and realised P&L of the
+            position, or None if the position is not tracked by the
+            running totals.
+        """
+        if not self._is_tracked(position):
+            return None
+        return position.market_value, position.unrealised_pnl, position.realised_pnl
+
+    def _add_deltas(self, market_value, unrealised_pnl, realised_pnl):
+        """
+        Add changes in value to the running totals. Non-finite changes,
+        such as those to or from a NaN price, cannot be reversed by later
+        changes and instead invalidate the totals, such that they are
+        re-summed when next obtained.
+
+        Parameters
+        ----------
+        market_value : `float`
+            The change in the total market value.
+        unrealised_pnl : `float`
+            The change in the total unrealised P&L.
+        realised_pnl : `float`
+            The change in the total realised P&L.
+        """
+        if not (
+            math.isfinite(market_value) and math.isfinite(unrealised_pnl) and
+            math.isfinite(realised_pnl)
+        ):
+            self.invalidate_totals()
+            return
+        self._totals['market_value'] += market_value
+        self._totals['unrealised_pnl'] += unrealised_pnl
+        self._totals['realised_pnl'] += realised_pnl
+        self._num_updates += 1
+
+    def update_totals(self, position, before):
+        """
+        Update the running totals by the change in the contribution
+        of an open position, following a change of one of its fields.
+
+        Parameters
+        ----------
+        position : `PositionView`
+            The position.
+        before : `tuple(float, float, float)` or None
+            The contribution of the position prior to the change, as
+            obtained from position_totals.
+        """
+        if before is None or self._totals is None:
+            return
+        after = self.position_totals(position)
+        self._add_deltas(
+            after[0] - before[0], after[1] - before[1], after[2] - before[2]
+        )
+
+    def update_price_totals(self, position, price):
+        """
+        Update the running totals by the change in the market value
+        (and equally the unrealised P&L) of an open position, prior to
+        a change of its current price.
+
+        Parameters
+        ----------
+        position : `PositionView`
+            The position.
+        price : `float`
+            The new current price of the position.
+        """
+        if not self._is_tracked(position):
+            return
+        asset_id = position.asset_id
+        arrays = self.arrays
+        delta = (price - float(arrays['current_price'][asset_id])) * (
+            float(arrays['buy_quantity'][asset_id]) - float(arrays['sell_quantity'][asset_id])
+        )
+        self._add_deltas(delta, delta, 0.0)
 
     def transact_position(self, transaction):
         """
@@ -23,47 +372,167 @@ class PositionHandler(object):
         """
         asset = transaction.asset
         if asset in self.positions:
-            self.positions[asset].transact(transaction)
+            position = self.positions[asset]
+            before = self.position_totals(position)
+            self._transacting = position
+            try:
+                position.transact(transaction)
+            finally:
+                self._transacting = None
+            self.update_totals(position, before)
         else:
-            position = Position.open_from_transaction(transaction)
-            self.positions[asset] = position
+            self.positions[asset] = self._open_position(transaction)
+            self._open_asset_ids = None
 
         # If the position has zero quantity remove it
         if self.positions[asset].net_quantity == 0:
             del self.positions[asset]
+            self._open_asset_ids = None
+
+        # Positions were opened or closed
+        if self._open_asset_ids is None:
+            self.invalidate_totals()
+
+    def update_current_prices(self, market_prices, dt=None):
+        """
+        Updates the current market prices of all positions at once,
+        with an optional timestamp.
+
+        Parameters
+        ----------
+        market_prices : `np.ndarray`
+            The current market prices, in the order of the positions.
+        dt : `pd.Timestamp`, optional
+            The optional timestamp of the current market prices.
+        """
+        asset_ids = self.open_asset_ids
+        if len(asset_ids) == 0:
+            return
+        market_prices = np.asarray(market_prices, dtype=np.float64)
+
+        if dt is not None:
+            current_dt = self.current_dts[asset_ids].max()
+            if dt < current_dt:
+                raise ValueError(
+                    'Supplied update time of "%s" is earlier than '
+                    'the current time of "%s".' % (dt, current_dt)
+                )
+            self.current_dts[asset_ids] = dt
+
+        non_positive = np.flatnonzero(market_prices <= 0.0)
+        if len(non_positive) > 0:
+            raise ValueError(
+                'Market price "%s" of asset "%s" must be positive to '
+                'update the position.' % (
+                    market_prices[non_positive[0]],
+                    self.assets[asset_ids[non_positive[0]]]
+                )
+            )
+        # Only the market value and unrealised P&L depend upon the prices
+        if self._totals is not None:
+            net_quantities = (
+                self.arrays['buy_quantity'][asset_ids] -
+                self.arrays['sell_quantity'][asset_ids]
+            )
+            delta = float(
+                np.dot(market_prices - self.arrays['current_price'][asset_ids], net_quantities)
+            )
+            self._add_deltas(delta, delta, 0.0)
+        self.arrays['current_price'][asset_ids] = market_prices
+
+    def market_values(self):
+        """
+        Calculate the market value of every position at once.
+
+        Returns
+        -------
+        `np.ndarray`
+            The market values, in the order of the positions.
+        """
+        asset_ids = self.open_asset_ids
+        net_quantities = (
+            self.arrays['buy_quantity'][asset_ids] -
+            self.arrays['sell_quantity'][asset_ids]
+        )
+        return self.arrays['current_price'][asset_ids] * net_quantities
+
+    def unrealised_pnls(self):
+        """
+        Calculate the unrealised P&L of every position at once.
+
+        Returns
+        -------
+        `np.ndarray`
+            The unrealised P&Ls, in the order of the positions.
+        """
+        asset_ids = self.open_asset_ids
+        buy_quantities = self.arrays['buy_quantity'][asset_ids]
+        sell_quantities = self.arrays['sell_quantity'][asset_ids]
+        net_quantities = buy_quantities - sell_quantities
+        with np.errstate(divide='ignore', invalid='ignore'):
+            avg_prices = np.where(
+                net_quantities > 0,
+                (
+                    self.arrays['avg_bought'][asset_ids] * buy_quantities +
+                    self.arrays['buy_commission'][asset_ids]
+                ) / buy_quantities,
+                np.where(
+                    net_quantities < 0,
+                    (
+                        self.arrays['avg_sold'][asset_ids] * sell_quantities -
+                        self.arrays['sell_commission'][asset_ids]
+                    ) / sell_quantities,
+                    0.0
+                )
+            )
+        return (self.arrays['current_price'][asset_ids] - avg_prices) * net_quantities
+
+    def _get_totals(self):
+        """
+        Obtain the running totals, re-summing them over the positions
+        if they have been invalidated or have been updated by deltas
+        TOTALS_RESUM_INTERVAL times.
+
+        Totals are re-summed sequentially in position order,
+        as for the sum of the individual positions.
+
+        Returns
+        -------
+        `dict{str: float}`
+            The total market value, unrealised and realised P&L.
+        """
+        if self._totals is None or self._num_updates >= TOTALS_RESUM_INTERVAL:
+            self._totals = {
+                'market_value': sum(self.market_values().tolist()),
+                'unrealised_pnl': sum(self.unrealised_pnls().tolist()),
+                'realised_pnl': sum(
+                    pos.realised_pnl for pos in self.positions.values()
+                )
+            }
+            self._num_updates = 0
+        return self._totals
 
     def total_market_value(self):
         """
         Calculate the sum of all the positions' market values.
         """
-        return sum(
-            pos.market_value
-            for asset, pos in self.positions.items()
-        )
+        return self._get_totals()['market_value']
 
     def total_unrealised_pnl(self):
         """
         Calculate the sum of all the positions' unrealised P&Ls.
         """
-        return sum(
-            pos.unrealised_pnl
-            for asset, pos in self.positions.items()
-        )
+        return self._get_totals()['unrealised_pnl']
 
     def total_realised_pnl(self):
         """
         Calculate the sum of all the positions' realised P&Ls.
         """
-        return sum(
-            pos.realised_pnl
-            for asset, pos in self.positions.items()
-        )
+        return self._get_totals()['realised_pnl']
 
     def total_pnl(self):
         """
         Calculate the sum of all the positions' P&Ls.
         """
-        return sum(
-            pos.total_pnl
-            for asset, pos in self.positions.items()
-        )
+        totals = self._get_totals()
+        return totals['realised_pnl'] + totals['unrealised_pnl']
@@ -1,13 +1,16 @@
-import queue
+from collections import deque
 
 import numpy as np
 
 from qstrader import settings
 from qstrader.broker.broker import Broker
 from qstrader.broker.fee_model.fee_model import FeeModel
+from qstrader.broker.order_book import OrderBook
 from qstrader.broker.portfolio.portfolio import Portfolio
+from qstrader.broker.slippage_model.slippage_model import SlippageModel
 from qstrader.broker.transaction.transaction import Transaction
 from qstrader.broker.fee_model.zero_fee_model import ZeroFeeModel
+from qstrader.execution.order import MARKET, STOP
 
 
 class SimulatedBroker(Broker):
@@ -19,6 +22,13 @@ class SimulatedBroker(Broker):
     The default commission/fee model is a ZeroFeeModel
     that charges no commission or tax (such as stamp duty).
 
+    Market orders are executed at the latest prices once the exchange
+    is open. Limit and stop orders instead rest on a per-asset order
+    book until triggered, being matched against the low/high range of
+    prices traded since the previous update where the data handler
+    provides it, or otherwise against the latest prices. The exit
+    orders of executed bracket orders are placed on the order book.
+
     Parameters
     ----------
     start_dt : `pd.Timestamp`
@@ -39,8 +49,9 @@ class SimulatedBroker(Broker):
         Defaults to the ZeroFeeModel.
     slippage_model : `SlippageModel`, optional
         The model used to simulate trade slippage.
-    market_impact_model : `MarketImpactModel`, optional
-        The model used to simulate market impact of trading.
+    market_impact_model : `SlippageModel`, optional
+        The model used to simulate market impact of trading,
+        such as the SquareRootImpactModel.
     """
 
     def __init__(
@@ -64,12 +75,14 @@ class SimulatedBroker(Broker):
         self.base_currency = self._set_base_currency(base_currency)
         self.initial_funds = self._set_initial_funds(initial_funds)
         self.fee_model = self._set_fee_model(fee_model)
-        self.slippage_model = None  # TODO: Implement
-        self.market_impact_model = None  # TODO: Implement
+        self.slippage_model = self._set_slippage_model(slippage_model)
+        self.market_impact_model = self._set_slippage_model(market_impact_model)
 
         self.cash_balances = self._set_cash_balances()
         self.portfolios = self._set_initial_portfolios()
         self.open_orders = self._set_initial_open_orders()
+        self.order_book = OrderBook()
+        self._matched_dt = None
 
         if settings.PRINT_EVENTS:
             print('Initialising simulated broker "%s"...' % self.account_id)
@@ -148,6 +161,31 @@ class SimulatedBroker(Broker):
                 "Broker entity." % fee_model.__class__
             )
 
+    def _set_slippage_model(self, slippage_model):
+        """
+        Check and set a SlippageModel instance, for either the
+        slippage or the market impact, for the broker. The class
+        default is no slippage (None).
+
+        Parameters
+        ----------
+        slippage_model : `SlippageModel` (class)
+            The slippage model class provided to the Broker.
+
+        Returns
+        -------
+        `SlippageModel` (instance)
+            The instantiated SlippageModel class.
+        """
+        if slippage_model is None or issubclass(slippage_model.__class__, SlippageModel):
+            return slippage_model
+        else:
+            raise TypeError(
+                "Provided slippage model '%s' in SimulatedBroker is not a "
+                "SlippageModel subclass, so could not create the "
+                "Broker entity." % slippage_model.__class__
+            )
+
     def _set_cash_balances(self):
         """
         Set the appropriate cash balances in the various
@@ -310,7 +348,7 @@ class SimulatedBroker(Broker):
         equity_dict["master"] = master_equity
         return equity_dict
 
-    def create_portfolio(self, portfolio_id, name=None):
+    def create_portfolio(self, portfolio_id, name=None, journal=True):
         """
         Create a new sub-portfolio with ID 'portfolio_id' and
         an optional name given by 'name'.
@@ -321,6 +359,9 @@ class SimulatedBroker(Broker):
             The portfolio ID string.
         name : `str`, optional
             The optional name string of the portfolio.
+        journal : `Boolean`, optional
+            Whether the portfolio records its history of
+            subscriptions, withdrawals and transactions.
         """
         portfolio_id_str = str(portfolio_id)
         if portfolio_id_str in self.portfolios.keys():
@@ -333,10 +374,11 @@ class SimulatedBroker(Broker):
                 self.current_dt,
                 currency=self.base_currency,
                 portfolio_id=portfolio_id_str,
-                name=name
+                name=name,
+                journal=journal
             )
             self.portfolios[portfolio_id_str] = p
-            self.open_orders[portfolio_id_str] = queue.Queue()
+            self.open_orders[portfolio_id_str] = deque()
             if settings.PRINT_EVENTS:
                 print(
                     '(%s) - portfolio creation: Portfolio "%s" created at broker "%s"' % (
@@ -540,7 +582,45 @@ class SimulatedBroker(Broker):
             )
         return self.portfolios[portfolio_id].portfolio_to_dict()
 
-    def _execute_order(self, dt, portfolio_id, order):
+    def calc_execution_bid_ask(self, dt, assets, quantities, bids, asks):
+        """
+        Adjust the bid and ask prices of a batch of orders executed
+        at the same time by their slippage and market impact, with a
+        single call of each model.
+
+        Parameters
+        ----------
+        dt : `pd.Timestamp`
+            The time of execution.
+        assets : `list[str]`
+            The asset symbols of the orders.
+        quantities : `np.ndarray`
+            The quantities of the orders.
+        bids : `np.ndarray`
+            The bid prices of the assets.
+        asks : `np.ndarray`
+            The ask prices of the assets.
+
+        Returns
+        -------
+        `tuple(np.ndarray, np.ndarray)`
+            The bid prices lowered, and the ask prices raised,
+            by the slippage and market impact of each order.
+        """
+        if self.slippage_model is None and self.market_impact_model is None:
+            return (bids, asks)
+        quantities = np.asarray(quantities, dtype=np.float64)
+        bids = np.asarray(bids, dtype=np.float64)
+        asks = np.asarray(asks, dtype=np.float64)
+        slippage = np.zeros(len(assets))
+        for model in (self.slippage_model, self.market_impact_model):
+            if model is not None:
+                slippage = slippage + model.calc_slippage(
+                    dt, assets, quantities, bids, asks, broker=self
+                )
+        return (bids - slippage, asks + slippage)
+
+    def _execute_order(self, dt, portfolio_id, order, bid_ask=None):
         """
         For a given portfolio ID string, create a Transaction instance from
         the provided Order and ensure the Portfolio is appropriately updated
@@ -554,6 +634,8 @@ class SimulatedBroker(Broker):
             The portfolio ID string.
         order : `Order`
             The Order instance to create the Transaction for.
+        bid_ask : `tuple(float, float)`, optional
+            The latest bid/ask prices of the asset, if already known.
         """
         # Obtain a price for the asset, if no price then
         # raise a ValueError
@@ -564,10 +646,11 @@ class SimulatedBroker(Broker):
                 order.asset, order.order_id
             )
         )
-        bid_ask = self.data_handler.get_asset_latest_bid_ask_price(
-            dt, order.asset
-        )
-        if bid_ask == (np.nan, np.nan):
+        if bid_ask is None:
+            bid_ask = self.data_handler.get_asset_latest_bid_ask_price(
+                dt, order.asset
+            )
+        if np.isnan(bid_ask[0]) and np.isnan(bid_ask[1]):
             raise ValueError(price_err_msg)
 
         # Calculate the consideration and total commission
@@ -639,7 +722,7 @@ class SimulatedBroker(Broker):
                     portfolio_id, order.order_id
                 )
             )
-        self.open_orders[portfolio_id].put(order)
+        self.open_orders[portfolio_id].append(order)
         if settings.PRINT_EVENTS:
             print(
                 "(%s) - submitted order: %s, qty: %s" % (
@@ -647,6 +730,130 @@ class SimulatedBroker(Broker):
                 )
             )
 
+    def cancel_order(self, portfolio_id, order_id):
+        """
+        Cancel a limit or stop order of the sub-portfolio with
+        ID 'portfolio_id' that is resting on the order book.
+
+        Parameters
+        ----------
+        portfolio_id : `str`
+            The portfolio ID string.
+        order_id : `str`
+            The order ID of the resting order.
+
+        Returns
+        -------
+        `Order`
+            The cancelled order.
+        """
+        resting = self.order_book.orders.get(order_id)
+        if resting is None or resting[0] != portfolio_id:
+            raise KeyError(
+                "Order with ID '%s' of portfolio with ID '%s' is not "
+                "resting on the order book." % (order_id, portfolio_id)
+            )
+        order = self.order_book.cancel(order_id)
+        if settings.PRINT_EVENTS:
+            print(
+                "(%s) - cancelled order: %s, qty: %s" % (
+                    self.current_dt, order.asset, order.quantity
+                )
+            )
+        return order
+
+    def get_resting_orders(self, portfolio_id):
+        """
+        Obtain the limit and stop orders of the sub-portfolio with
+        ID 'portfolio_id' resting on the order book.
+
+        Parameters
+        ----------
+        portfolio_id : `str`
+            The portfolio ID string.
+
+        Returns
+        -------
+        `list[Order]`
+            The resting orders, in order of placement.
+        """
+        return self.order_book.get_orders(portfolio_id)
+
+    def _place_exit_orders(self, dt, portfolio_id, order, assets):
+        """
+        Place the exit orders of an executed bracket order on the
+        order book.
+
+        Parameters
+        ----------
+        dt : `pd.Timestamp`
+            The current timestamp.
+        portfolio_id : `str`
+            The portfolio ID string.
+        order : `Order`
+            The executed entry order of the bracket.
+        assets : `dict`
+            The assets of newly placed orders, updated in place.
+        """
+        for exit_order in order.create_exit_orders(dt):
+            self.order_book.add(portfolio_id, exit_order)
+            assets.setdefault(exit_order.asset)
+
+    def _match_resting_orders(self, dt, assets, ranges=False):
+        """
+        Execute the resting orders of the provided assets that are
+        triggered by their current prices, or optionally by the range
+        of prices traded since the previous update, and place the exit
+        orders of any executed bracket orders.
+
+        Parameters
+        ----------
+        dt : `pd.Timestamp`
+            The current timestamp.
+        assets : `list[str]`
+            The assets whose resting orders are matched.
+        ranges : `Boolean`, optional
+            Whether to match against the range of prices traded since
+            the previous update, where available.
+        """
+        bids, asks = self.data_handler.get_assets_latest_bid_ask_prices(dt, assets)
+        lows = np.fmin(bids, asks)
+        highs = np.fmax(bids, asks)
+        if ranges and hasattr(self.data_handler, 'get_assets_bar_ranges'):
+            bar_lows, bar_highs = self.data_handler.get_assets_bar_ranges(dt, assets)
+            lows = np.fmin(lows, bar_lows)
+            highs = np.fmax(highs, bar_highs)
+
+        matched = []
+        for asset, low, high in zip(assets, lows.tolist(), highs.tolist()):
+            if not np.isnan(low):
+                matched.extend(self.order_book.match(asset, low, high))
+
+        # Triggered stop orders are executed as market orders, so are
+        # subject to slippage, whereas limit orders guarantee their price
+        matched = sorted(matched, key=lambda x: x[1].direction)
+        stops = [i for i, (_, order, _) in enumerate(matched) if order.order_type == STOP]
+        if len(stops) > 0:
+            stop_prices = np.array([matched[i][2] for i in stops])
+            stop_bids, stop_asks = self.calc_execution_bid_ask(
+                dt, [matched[i][1].asset for i in stops],
+                [matched[i][1].quantity for i in stops], stop_prices, stop_prices
+            )
+            for i, bid, ask in zip(stops, stop_bids.tolist(), stop_asks.tolist()):
+                portfolio, order, _ = matched[i]
+                matched[i] = (portfolio, order, ask if order.direction > 0 else bid)
+
+        exit_assets = {}
+        for portfolio, order, price in matched:
+            self._execute_order(dt, portfolio, order, bid_ask=(price, price))
+            if order.is_bracket:
+                self._place_exit_orders(dt, portfolio, order, exit_assets)
+
+        # Exit orders placed within the update are only
+        # matched against the current prices
+        if len(exit_assets) > 0:
+            self._match_resting_orders(dt, list(exit_assets))
+
     def update(self, dt):
         """
         Updates the current SimulatedBroker timestamp.
@@ -658,25 +865,68 @@ class SimulatedBroker(Broker):
         """
         self.current_dt = dt
 
-        # Update portfolio asset values
-        for portfolio in self.portfolios:
-            for asset in self.portfolios[portfolio].pos_handler.positions:
-                mid_price = self.data_handler.get_asset_latest_mid_price(
-                    dt, asset
-                )
-                self.portfolios[portfolio].update_market_value_of_asset(
-                    asset, mid_price, self.current_dt
-                )
+        # Update portfolio asset values, obtaining the mid prices of
+        # the assets held by every portfolio at once
+        held_assets = {}
+        for portfolio in self.portfolios.values():
+            for asset in portfolio.pos_handler.positions:
+                held_assets.setdefault(asset, len(held_assets))
+        if len(held_assets) > 0:
+            mid_prices = np.asarray(
+                self.data_handler.get_assets_latest_mid_prices(
+                    dt, list(held_assets)
+                ),
+                dtype=np.float64
+            )
+            for portfolio in self.portfolios.values():
+                positions = portfolio.pos_handler.positions
+                if len(positions) == 0:
+                    continue
+                if len(self.portfolios) == 1:
+                    portfolio_prices = mid_prices
+                else:
+                    portfolio_prices = mid_prices[
+                        [held_assets[asset] for asset in positions]
+                    ]
+                portfolio.update_market_values(portfolio_prices, self.current_dt)
 
         # Try to execute orders
-        if self.exchange.is_open_at_datetime(self.current_dt):
-            orders = []
-            for portfolio in self.portfolios:
-                while not self.open_orders[portfolio].empty():
-                    orders.append(
-                        (portfolio, self.open_orders[portfolio].get())
-                    )
-
+        if not self.exchange.is_open_at_datetime(self.current_dt):
+            return
+
+        # Match the resting orders against the prices traded since the
+        # previous update, only once per timestamp such that orders
+        # placed at this timestamp never see its earlier prices
+        if len(self.order_book) > 0 and dt != self._matched_dt:
+            self._match_resting_orders(dt, self.order_book.assets, ranges=True)
+        self._matched_dt = dt
+
+        orders = []
+        placed_assets = {}
+        for portfolio, open_orders in self.open_orders.items():
+            while open_orders:
+                order = open_orders.popleft()
+                if order.order_type == MARKET:
+                    orders.append((portfolio, order))
+                else:
+                    self.order_book.add(portfolio, order)
+                    placed_assets.setdefault(order.asset)
+
+        if len(orders) > 0:
+            # Obtain the prices of all ordered assets at once
             sorted_orders = sorted(orders, key=lambda x: x[1].direction)
-            for portfolio, order in sorted_orders:
-                self._execute_order(dt, portfolio, order)
+            assets = [order.asset for _, order in sorted_orders]
+            bids, asks = self.calc_execution_bid_ask(
+                dt, assets, [order.quantity for _, order in sorted_orders],
+                *self.data_handler.get_assets_latest_bid_ask_prices(dt, assets)
+            )
+            for i, (portfolio, order) in enumerate(sorted_orders):
+                self._execute_order(
+                    dt, portfolio, order, bid_ask=(bids[i], asks[i])
+                )
+                if order.is_bracket:
+                    self._place_exit_orders(dt, portfolio, order, placed_assets)
+
+        # Newly placed orders are matched against the current prices
+        if len(placed_assets) > 0:
+            self._match_resting_orders(dt, list(placed_assets))
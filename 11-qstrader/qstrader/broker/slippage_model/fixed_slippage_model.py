@@ -0,0 +1,46 @@
+import numpy as np
+
+from qstrader.broker.slippage_model.slippage_model import SlippageModel
+
+
+class FixedSlippageModel(SlippageModel):
+    """
+    A SlippageModel subclass that produces a fixed slippage, in basis
+    points of the ask (buys) or bid (sells) price, for every order.
+
+    Parameters
+    ----------
+    slippage_bps : `float`, optional
+        The slippage in basis points. Hence, e.g. 0.05% is 5.0
+    """
+
+    def __init__(self, slippage_bps=0.0):
+        super().__init__()
+        self.slippage_bps = slippage_bps
+
+    def calc_slippage(self, dt, assets, quantities, bids, asks, broker=None):
+        """
+        Calculate the fixed slippage of a batch of orders.
+
+        Parameters
+        ----------
+        dt : `pd.Timestamp`
+            The time of execution.
+        assets : `list[str]`
+            The asset symbols of the orders.
+        quantities : `np.ndarray`
+            The quantities of the orders.
+        bids : `np.ndarray`
+            The bid prices of the assets.
+        asks : `np.ndarray`
+            The ask prices of the assets.
+        broker : `Broker`, optional
+            An optional Broker reference.
+
+        Returns
+        -------
+        `np.ndarray`
+            The slippage per unit of each order.
+        """
+        prices = np.where(quantities > 0, asks, bids)
+        return prices * (self.slippage_bps / 10000.0)
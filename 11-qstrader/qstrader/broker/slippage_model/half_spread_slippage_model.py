@@ -0,0 +1,55 @@
+import numpy as np
+
+from qstrader.broker.slippage_model.slippage_model import SlippageModel
+
+
+class HalfSpreadSlippageModel(SlippageModel):
+    """
+    A SlippageModel subclass that executes orders at least half of
+    an assumed bid/ask spread, in basis points of the mid price,
+    away from the mid price.
+
+    Daily bar data provides a single price per timestamp, such that
+    the bid and ask prices are equal and crossing the quoted spread
+    is free. Where the quoted spread is narrower than the assumed
+    spread, the slippage is the difference of their halves, otherwise
+    the quoted spread is already paid and there is no slippage.
+
+    Parameters
+    ----------
+    spread_bps : `float`, optional
+        The assumed bid/ask spread in basis points. Hence, e.g. 0.1% is 10.0
+    """
+
+    def __init__(self, spread_bps=0.0):
+        super().__init__()
+        self.spread_bps = spread_bps
+
+    def calc_slippage(self, dt, assets, quantities, bids, asks, broker=None):
+        """
+        Calculate the half-spread slippage of a batch of orders.
+
+        Parameters
+        ----------
+        dt : `pd.Timestamp`
+            The time of execution.
+        assets : `list[str]`
+            The asset symbols of the orders.
+        quantities : `np.ndarray`
+            The quantities of the orders.
+        bids : `np.ndarray`
+            The bid prices of the assets.
+        asks : `np.ndarray`
+            The ask prices of the assets.
+        broker : `Broker`, optional
+            An optional Broker reference.
+
+        Returns
+        -------
+        `np.ndarray`
+            The slippage per unit of each order.
+        """
+        mids = (bids + asks) / 2.0
+        return np.maximum(
+            mids * (self.spread_bps / 20000.0) - (asks - bids) / 2.0, 0.0
+        )
@@ -0,0 +1,20 @@
+from abc import ABCMeta, abstractmethod
+
+
+class SlippageModel(object):
+    """
+    Abstract class to handle the calculation of the slippage (or
+    market impact) of the execution prices of a batch of orders.
+
+    The slippage of each order is the adverse movement per unit of
+    its execution price beyond the ask (buys) or bid (sells) price,
+    calculated for all of the orders executed at a timestamp at once.
+    """
+
+    __metaclass__ = ABCMeta
+
+    @abstractmethod
+    def calc_slippage(self, dt, assets, quantities, bids, asks, broker=None):
+        raise NotImplementedError(
+            "Should implement calc_slippage()"
+        )
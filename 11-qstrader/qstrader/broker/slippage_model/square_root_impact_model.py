@@ -0,0 +1,143 @@
+import numpy as np
+import pandas as pd
+
+from qstrader.broker.slippage_model.slippage_model import SlippageModel
+from qstrader.data.price_cursor import timestamp_to_ns
+from qstrader.data.price_panel import PricePanel
+
+
+class SquareRootImpactModel(SlippageModel):
+    """
+    A SlippageModel subclass estimating the market impact of each
+    order via the square-root law, as a fraction of the ask (buys) or
+    bid (sells) price:
+
+        impact = impact_coef * volatility * sqrt(|quantity| / ADV)
+
+    where the volatility is the standard deviation of the daily close
+    to close returns and the ADV the average daily volume, both over
+    the trailing window of bars.
+
+    The volatility and ADV of every asset and bar are precomputed once,
+    from the closing price and 'Volume' bar panels of the data sources,
+    using only the bars prior to that of the order date. Orders of
+    assets lacking either (such as those without volume data) have no
+    impact.
+
+    Parameters
+    ----------
+    impact_coef : `float`, optional
+        The coefficient of the square-root law, of order one.
+    window : `int`, optional
+        The number of trailing bars of the volatility and ADV.
+    data_sources : `list`, optional
+        The data sources providing bar panels, in order of priority.
+        Defaults to those of the data handler of the broker, once the
+        first orders are executed.
+    """
+
+    def __init__(self, impact_coef=1.0, window=20, data_sources=None):
+        super().__init__()
+        if window < 2:
+            raise ValueError(
+                "Square-root impact window must be at least two bars, "
+                "but %s was provided." % window
+            )
+        self.impact_coef = impact_coef
+        self.window = window
+        self.panels = None
+        if data_sources is not None:
+            self.panels = self._create_panels(data_sources)
+
+    def _create_panels(self, data_sources):
+        """
+        Precompute the trailing volatility and ADV of every asset and
+        bar of those data sources providing bar panels.
+
+        Parameters
+        ----------
+        data_sources : `list`
+            The data sources.
+
+        Returns
+        -------
+        `list[tuple(PricePanel, PricePanel)]`
+            The forward-filled volatility and ADV panels of each data source.
+        """
+        panels = []
+        for ds in data_sources:
+            if not hasattr(ds, 'get_bar_panel'):
+                continue
+            close_column = 'Close'
+            if (
+                getattr(ds, 'adjust_prices', False) and
+                'Adj Close' in getattr(ds, 'close_panels', {})
+            ):
+                close_column = 'Adj Close'
+            closes = ds.get_bar_panel(close_column)
+            volumes = ds.get_bar_panel('Volume')
+            if len(volumes.assets) == 0:
+                continue
+
+            # Statistics of each bar are of the bars prior to it
+            volatility = pd.DataFrame(closes.values[:, :-1]).pct_change(
+                fill_method=None
+            ).rolling(self.window, min_periods=2).std().shift(1)
+            adv = pd.DataFrame(volumes.values[:, :-1]).rolling(
+                self.window, min_periods=1
+            ).mean().shift(1)
+            panels.append(
+                tuple(
+                    PricePanel(
+                        panel.timestamps, panel.assets,
+                        np.column_stack([values.to_numpy(), np.full(len(values), np.nan)])
+                    ).forward_filled()
+                    for panel, values in ((closes, volatility), (volumes, adv))
+                )
+            )
+        return panels
+
+    def calc_slippage(self, dt, assets, quantities, bids, asks, broker=None):
+        """
+        Calculate the square-root market impact of a batch of orders.
+
+        Parameters
+        ----------
+        dt : `pd.Timestamp`
+            The time of execution.
+        assets : `list[str]`
+            The asset symbols of the orders.
+        quantities : `np.ndarray`
+            The quantities of the orders.
+        bids : `np.ndarray`
+            The bid prices of the assets.
+        asks : `np.ndarray`
+            The ask prices of the assets.
+        broker : `Broker`, optional
+            An optional Broker reference, whose data handler provides
+            the data sources if none were provided.
+
+        Returns
+        -------
+        `np.ndarray`
+            The market impact per unit of each order.
+        """
+        if self.panels is None:
+            self.panels = self._create_panels(
+                getattr(getattr(broker, 'data_handler', None), 'data_sources', [])
+            )
+
+        ts = timestamp_to_ns(dt)
+        volatility = np.full(len(assets), np.nan)
+        adv = np.full(len(assets), np.nan)
+        for volatility_panel, adv_panel in self.panels:
+            missing = np.isnan(volatility) | np.isnan(adv)
+            if not missing.any():
+                break
+            volatility = np.where(missing, volatility_panel.gather(ts, assets), volatility)
+            adv = np.where(missing, adv_panel.gather(ts, assets), adv)
+
+        prices = np.where(quantities > 0, asks, bids)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            impact = self.impact_coef * volatility * np.sqrt(np.abs(quantities) / adv) * prices
+        return np.where(np.isfinite(impact), impact, 0.0)
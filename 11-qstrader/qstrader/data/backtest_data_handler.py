@@ -1,8 +1,32 @@
 import numpy as np
+import pandas as pd
+
+from qstrader.data.price_cursor import timestamp_to_ns
+
+
+# Coverage start of an asset without any prices, which
+# is never reached by a lookup time
+NO_COVERAGE_NS = np.iinfo(np.int64).max
 
 
 class BacktestDataHandler(object):
     """
+    Provides the latest and historical prices of assets across
+    multiple data sources.
+
+    Data sources implementing get_assets_coverage are indexed in a
+    routing table, mapping each asset symbol to the data sources that
+    own it along with their price coverage, such that lookups are sent
+    directly to the owning data source. Lookups for any other asset
+    symbol are routing misses, which fall back to querying each data
+    source lacking a coverage method in turn.
+
+    Parameters
+    ----------
+    universe : `Universe`
+        The Asset Universe.
+    data_sources : `list`, optional
+        The data sources, in order of priority.
     """
 
     def __init__(
@@ -11,35 +35,127 @@ class BacktestDataHandler(object):
         data_sources=None
     ):
         self.universe = universe
-        self.data_sources = data_sources
+        self.data_sources = data_sources if data_sources is not None else []
+        self.routing_misses = 0
+        self.reload_routes()
 
-    def get_asset_latest_bid_price(self, dt, asset_symbol):
+    def reload_routes(self):
         """
+        (Re)build the routing table from the coverage of the data
+        sources. Should be called whenever a data source adds assets.
         """
-        # TODO: Check for asset in Universe
-        bid = np.nan
+        self.source_coverage = []
+        self.unrouted_sources = []
+        self.routes = {}
         for ds in self.data_sources:
+            if not hasattr(ds, 'get_assets_coverage'):
+                self.unrouted_sources.append(ds)
+                continue
+            coverage = {}
+            for asset_symbol, (start_dt, end_dt) in ds.get_assets_coverage().items():
+                if start_dt is None:
+                    coverage[asset_symbol] = (NO_COVERAGE_NS, NO_COVERAGE_NS)
+                else:
+                    coverage[asset_symbol] = (
+                        timestamp_to_ns(start_dt), timestamp_to_ns(end_dt)
+                    )
+                self.routes.setdefault(asset_symbol, []).append(
+                    (ds,) + coverage[asset_symbol]
+                )
+            self.source_coverage.append((ds, coverage))
+
+        # Data sources providing the price ranges traded within bars
+        self.bar_range_coverage = [
+            (ds, coverage) for ds, coverage in self.source_coverage
+            if self._has_bar_ranges(ds)
+        ]
+        self.bar_range_unrouted_sources = [
+            ds for ds in self.unrouted_sources if self._has_bar_ranges(ds)
+        ]
+
+    @staticmethod
+    def _has_bar_ranges(ds):
+        """
+        Determine whether a data source provides the lowest and
+        highest prices traded within its bars.
+
+        Parameters
+        ----------
+        ds : `object`
+            The data source.
+
+        Returns
+        -------
+        `Boolean`
+            Whether the data source provides bar price ranges.
+        """
+        return hasattr(ds, 'get_bar_lows') and hasattr(ds, 'get_bar_highs')
+
+    def register_data_source(self, data_source):
+        """
+        Add a data source with the lowest priority and rebuild
+        the routing table.
+
+        Parameters
+        ----------
+        data_source : `object`
+            The data source to add.
+        """
+        self.data_sources.append(data_source)
+        self.reload_routes()
+
+    def _get_asset_latest_price(self, dt, asset_symbol, method):
+        """
+        Obtain the latest price of an asset from the data sources
+        routed to it, or for a routing miss from each data source
+        lacking a coverage method in turn.
+
+        Parameters
+        ----------
+        dt : `pd.Timestamp`
+            The time at which to obtain the price.
+        asset_symbol : `str`
+            The asset symbol to obtain the price for.
+        method : `str`
+            The name of the single asset data source method.
+
+        Returns
+        -------
+        `float`
+            The price, or NaN if no data source provides a price.
+        """
+        price = np.nan
+        route = self.routes.get(asset_symbol)
+        if route is not None:
+            ts = timestamp_to_ns(dt)
+            for ds, start_ns, _ in route:
+                if ts >= start_ns:
+                    price = getattr(ds, method)(dt, asset_symbol)
+                    if not np.isnan(price):
+                        return price
+            return price
+
+        self.routing_misses += 1
+        for ds in self.unrouted_sources:
             try:
-                bid = ds.get_bid(dt, asset_symbol)
-                if not np.isnan(bid):
-                    return bid
+                price = getattr(ds, method)(dt, asset_symbol)
+                if not np.isnan(price):
+                    return price
             except Exception:
-                bid = np.nan
-        return bid
+                price = np.nan
+        return price
+
+    def get_asset_latest_bid_price(self, dt, asset_symbol):
+        """
+        """
+        # TODO: Check for asset in Universe
+        return self._get_asset_latest_price(dt, asset_symbol, 'get_bid')
 
     def get_asset_latest_ask_price(self, dt, asset_symbol):
         """
         """
         # TODO: Check for asset in Universe
-        ask = np.nan
-        for ds in self.data_sources:
-            try:
-                ask = ds.get_ask(dt, asset_symbol)
-                if not np.isnan(ask):
-                    return ask
-            except Exception:
-                ask = np.nan
-        return ask
+        return self._get_asset_latest_price(dt, asset_symbol, 'get_ask')
 
     def get_asset_latest_bid_ask_price(self, dt, asset_symbol):
         """
@@ -64,6 +180,404 @@ class BacktestDataHandler(object):
             mid = np.nan
         return mid
 
+    @staticmethod
+    def _query_data_source(ds, dt, symbols, batch_method, method):
+        """
+        Query a single data source for the prices of multiple assets.
+
+        Data sources implementing the multi-asset 'batch_method'
+        answer with a single call, otherwise each asset is queried
+        individually via 'method'.
+
+        Parameters
+        ----------
+        ds : `object`
+            The data source.
+        dt : `pd.Timestamp`
+            The time at which to obtain the prices.
+        symbols : `list[str]`
+            The asset symbols to obtain prices for.
+        batch_method : `str`
+            The name of the multi-asset data source method.
+        method : `str`
+            The name of the single asset data source method.
+
+        Returns
+        -------
+        `np.ndarray`
+            The prices aligned to the asset symbols.
+        """
+        if hasattr(ds, batch_method):
+            return np.asarray(getattr(ds, batch_method)(dt, symbols), dtype=np.float64)
+
+        ds_prices = np.full(len(symbols), np.nan)
+        for i, symbol in enumerate(symbols):
+            try:
+                ds_prices[i] = getattr(ds, method)(dt, symbol)
+            except Exception:
+                pass
+        return ds_prices
+
+    def _get_assets_latest_prices(
+        self, dt, asset_symbols, batch_method, method,
+        source_coverage=None, unrouted_sources=None
+    ):
+        """
+        Obtain the latest prices of multiple assets.
+
+        Routed assets are requested only from the data sources that own
+        them and whose coverage has started. Routing misses are requested
+        from each data source lacking a coverage method in turn, for
+        those assets still lacking a price.
+
+        Parameters
+        ----------
+        dt : `pd.Timestamp`
+            The time at which to obtain the prices.
+        asset_symbols : `list[str]`
+            The asset symbols to obtain prices for.
+        batch_method : `str`
+            The name of the multi-asset data source method.
+        method : `str`
+            The name of the single asset data source method.
+        source_coverage : `list[tuple(object, dict)]`, optional
+            The routed data sources to query along with their coverage,
+            defaulting to all routed data sources.
+        unrouted_sources : `list`, optional
+            The data sources to query for routing misses, defaulting
+            to all data sources lacking a coverage method.
+
+        Returns
+        -------
+        `np.ndarray`
+            The prices aligned to the asset symbols, NaN where no
+            data source provides a price.
+        """
+        if source_coverage is None:
+            source_coverage = self.source_coverage
+        if unrouted_sources is None:
+            unrouted_sources = self.unrouted_sources
+
+        prices = np.full(len(asset_symbols), np.nan)
+        routed = []
+        unrouted = []
+        for i, asset_symbol in enumerate(asset_symbols):
+            if asset_symbol in self.routes:
+                routed.append(i)
+            else:
+                unrouted.append(i)
+        self.routing_misses += len(unrouted)
+
+        if len(routed) > 0:
+            ts = timestamp_to_ns(dt)
+            for ds, coverage in source_coverage:
+                positions = [
+                    i for i in routed
+                    if ts >= coverage.get(asset_symbols[i], (NO_COVERAGE_NS,))[0]
+                ]
+                if len(positions) == 0:
+                    continue
+                if len(positions) == len(asset_symbols):
+                    symbols = asset_symbols
+                else:
+                    symbols = [asset_symbols[i] for i in positions]
+                prices[positions] = self._query_data_source(
+                    ds, dt, symbols, batch_method, method
+                )
+                routed = [i for i in routed if np.isnan(prices[i])]
+                if len(routed) == 0:
+                    break
+
+        missing = np.array(unrouted, dtype=np.intp)
+        for ds in unrouted_sources:
+            if len(missing) == 0:
+                break
+            if len(missing) == len(asset_symbols):
+                symbols = asset_symbols
+            else:
+                symbols = [asset_symbols[i] for i in missing]
+            ds_prices = self._query_data_source(ds, dt, symbols, batch_method, method)
+            prices[missing] = ds_prices
+            missing = missing[np.isnan(ds_prices)]
+        return prices
+
+    def get_assets_latest_bid_prices(self, dt, asset_symbols):
+        """
+        Obtain the latest bid prices of multiple assets.
+
+        Parameters
+        ----------
+        dt : `pd.Timestamp`
+            The time at which to obtain the prices.
+        asset_symbols : `list[str]`
+            The asset symbols to obtain prices for.
+
+        Returns
+        -------
+        `np.ndarray`
+            The bid prices aligned to the asset symbols.
+        """
+        return self._get_assets_latest_prices(
+            dt, asset_symbols, 'get_bids', 'get_bid'
+        )
+
+    def get_assets_latest_ask_prices(self, dt, asset_symbols):
+        """
+        Obtain the latest ask prices of multiple assets.
+
+        Parameters
+        ----------
+        dt : `pd.Timestamp`
+            The time at which to obtain the prices.
+        asset_symbols : `list[str]`
+            The asset symbols to obtain prices for.
+
+        Returns
+        -------
+        `np.ndarray`
+            The ask prices aligned to the asset symbols.
+        """
+        return self._get_assets_latest_prices(
+            dt, asset_symbols, 'get_asks', 'get_ask'
+        )
+
+    def get_assets_latest_bid_ask_prices(self, dt, asset_symbols):
+        """
+        Obtain the latest bid and ask prices of multiple assets.
+
+        As with get_asset_latest_bid_ask_price the bid price is
+        currently used for both sides, since OHLCV data usually
+        only provides mid prices.
+
+        Parameters
+        ----------
+        dt : `pd.Timestamp`
+            The time at which to obtain the prices.
+        asset_symbols : `list[str]`
+            The asset symbols to obtain prices for.
+
+        Returns
+        -------
+        `tuple(np.ndarray, np.ndarray)`
+            The bid and ask prices aligned to the asset symbols.
+        """
+        bids = self.get_assets_latest_bid_prices(dt, asset_symbols)
+        return (bids, bids)
+
+    def get_assets_latest_mid_prices(self, dt, asset_symbols):
+        """
+        Obtain the latest mid prices of multiple assets.
+
+        Parameters
+        ----------
+        dt : `pd.Timestamp`
+            The time at which to obtain the prices.
+        asset_symbols : `list[str]`
+            The asset symbols to obtain prices for.
+
+        Returns
+        -------
+        `np.ndarray`
+            The mid prices aligned to the asset symbols.
+        """
+        bids, asks = self.get_assets_latest_bid_ask_prices(dt, asset_symbols)
+        return (bids + asks) / 2.0
+
+    def get_assets_bar_ranges(self, dt, asset_symbols):
+        """
+        Obtain the lowest and highest prices of multiple assets traded
+        since their previous price update, for those assets whose data
+        source provides price ranges and that update at exactly the
+        provided time. Data sources without price ranges, as determined
+        when the routing table is built, are not queried.
+
+        Parameters
+        ----------
+        dt : `pd.Timestamp`
+            The time of the price update.
+        asset_symbols : `list[str]`
+            The asset symbols to obtain price ranges for.
+
+        Returns
+        -------
+        `tuple(np.ndarray, np.ndarray)`
+            The lowest and highest prices aligned to the asset symbols,
+            NaN where no price range is available.
+        """
+        lows = self._get_assets_latest_prices(
+            dt, asset_symbols, 'get_bar_lows', 'get_bar_low',
+            self.bar_range_coverage, self.bar_range_unrouted_sources
+        )
+        highs = self._get_assets_latest_prices(
+            dt, asset_symbols, 'get_bar_highs', 'get_bar_high',
+            self.bar_range_coverage, self.bar_range_unrouted_sources
+        )
+        return (lows, highs)
+
+    def _query_data_source_at(self, ds, dts, symbols, matrix_method, batch_method, method):
+        """
+        Query a single data source for the prices of multiple assets
+        at multiple times.
+
+        Data sources implementing the multi-time 'matrix_method' answer
+        with a single call, otherwise each time is queried in turn.
+
+        Parameters
+        ----------
+        ds : `object`
+            The data source.
+        dts : `pd.DatetimeIndex`
+            The times at which to obtain the prices.
+        symbols : `list[str]`
+            The asset symbols to obtain prices for.
+        matrix_method : `str`
+            The name of the multi-time data source method.
+        batch_method : `str`
+            The name of the multi-asset data source method.
+        method : `str`
+            The name of the single asset data source method.
+
+        Returns
+        -------
+        `np.ndarray`
+            The prices with a row per time and a column per asset.
+        """
+        if hasattr(ds, matrix_method):
+            return np.asarray(
+                getattr(ds, matrix_method)(dts.as_unit('ns').asi8, symbols),
+                dtype=np.float64
+            )
+        ds_prices = np.full((len(dts), len(symbols)), np.nan)
+        for i, dt in enumerate(dts):
+            ds_prices[i] = self._query_data_source(ds, dt, symbols, batch_method, method)
+        return ds_prices
+
+    def _get_assets_prices_at(self, dts, asset_symbols, matrix_method, batch_method, method):
+        """
+        Obtain the latest prices of multiple assets at multiple times,
+        as obtained by _get_assets_latest_prices at each time, but
+        querying each data source once for all of the times.
+
+        Parameters
+        ----------
+        dts : `list[pd.Timestamp]`
+            The times at which to obtain the prices.
+        asset_symbols : `list[str]`
+            The asset symbols to obtain prices for.
+        matrix_method : `str`
+            The name of the multi-time data source method.
+        batch_method : `str`
+            The name of the multi-asset data source method.
+        method : `str`
+            The name of the single asset data source method.
+
+        Returns
+        -------
+        `np.ndarray`
+            The prices with a row per time and a column per asset,
+            NaN where no data source provides a price.
+        """
+        dts = pd.DatetimeIndex(dts)
+        prices = np.full((len(dts), len(asset_symbols)), np.nan)
+        routed = [i for i, symbol in enumerate(asset_symbols) if symbol in self.routes]
+        unrouted = [i for i, symbol in enumerate(asset_symbols) if symbol not in self.routes]
+        self.routing_misses += len(unrouted) * len(dts)
+
+        if len(routed) > 0:
+            timestamps = dts.as_unit('ns').asi8
+            for ds, coverage in self.source_coverage:
+                starts = np.array([
+                    coverage.get(asset_symbols[i], (NO_COVERAGE_NS,))[0] for i in routed
+                ], dtype=np.int64)
+                queried = (timestamps[:, np.newaxis] >= starts) & np.isnan(prices[:, routed])
+                if not queried.any():
+                    continue
+                positions = [i for i, q in zip(routed, queried.any(axis=0)) if q]
+                ds_prices = self._query_data_source_at(
+                    ds, dts, [asset_symbols[i] for i in positions],
+                    matrix_method, batch_method, method
+                )
+                queried = queried[:, queried.any(axis=0)]
+                prices[:, positions] = np.where(queried, ds_prices, prices[:, positions])
+
+        missing = list(unrouted)
+        for ds in self.unrouted_sources:
+            if len(missing) == 0:
+                break
+            ds_prices = self._query_data_source_at(
+                ds, dts, [asset_symbols[i] for i in missing],
+                matrix_method, batch_method, method
+            )
+            prices[:, missing] = np.where(
+                np.isnan(prices[:, missing]), ds_prices, prices[:, missing]
+            )
+            missing = [i for i in missing if np.isnan(prices[:, i]).any()]
+        return prices
+
+    def get_assets_bid_prices_at(self, dts, asset_symbols):
+        """
+        Obtain the latest bid prices of multiple assets at each of
+        multiple times.
+
+        Parameters
+        ----------
+        dts : `list[pd.Timestamp]`
+            The times at which to obtain the prices.
+        asset_symbols : `list[str]`
+            The asset symbols to obtain prices for.
+
+        Returns
+        -------
+        `np.ndarray`
+            The bid prices with a row per time and a column per asset.
+        """
+        return self._get_assets_prices_at(
+            dts, asset_symbols, 'get_bids_at', 'get_bids', 'get_bid'
+        )
+
+    def get_assets_ask_prices_at(self, dts, asset_symbols):
+        """
+        Obtain the latest ask prices of multiple assets at each of
+        multiple times.
+
+        Parameters
+        ----------
+        dts : `list[pd.Timestamp]`
+            The times at which to obtain the prices.
+        asset_symbols : `list[str]`
+            The asset symbols to obtain prices for.
+
+        Returns
+        -------
+        `np.ndarray`
+            The ask prices with a row per time and a column per asset.
+        """
+        return self._get_assets_prices_at(
+            dts, asset_symbols, 'get_asks_at', 'get_asks', 'get_ask'
+        )
+
+    def get_assets_bid_ask_prices_at(self, dts, asset_symbols):
+        """
+        Obtain the latest bid and ask prices of multiple assets at each
+        of multiple times, as obtained by get_assets_latest_bid_ask_prices
+        at each time.
+
+        Parameters
+        ----------
+        dts : `list[pd.Timestamp]`
+            The times at which to obtain the prices.
+        asset_symbols : `list[str]`
+            The asset symbols to obtain prices for.
+
+        Returns
+        -------
+        `tuple(np.ndarray, np.ndarray)`
+            The bid and ask prices with a row per time and a column
+            per asset.
+        """
+        bids = self.get_assets_bid_prices_at(dts, asset_symbols)
+        return (bids, bids)
+
     def get_assets_historical_range_close_price(
         self, start_dt, end_dt, asset_symbols, adjusted=False
     ):
@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+
+
+# Offsets from midnight UTC of the market open and close
+# timestamps at which daily bar prices become available
+MARKET_OPEN_OFFSET_NS = pd.Timedelta(hours=14, minutes=30).value
+MARKET_CLOSE_OFFSET_NS = pd.Timedelta(hours=21, minutes=0).value
+
+
+def ffill_columns(values):
+    """
+    Forward-fill NaN values down each column of a 1D or 2D array.
+    Values prior to the first non-NaN value of a column remain NaN.
+
+    Parameters
+    ----------
+    values : `np.ndarray`
+        The array to forward-fill.
+
+    Returns
+    -------
+    `np.ndarray`
+        The forward-filled array.
+    """
+    missing = np.isnan(values)
+    if not missing.any():
+        return values
+
+    if values.ndim == 2:
+        # Only fill those columns containing missing values
+        cols = np.flatnonzero(missing.any(axis=0))
+        if len(cols) < values.shape[1]:
+            filled = values.copy()
+            filled[:, cols] = ffill_columns(values[:, cols])
+            return filled
+        rows = np.arange(values.shape[0])[:, np.newaxis]
+    else:
+        rows = np.arange(values.shape[0])
+    valid_rows = np.where(missing, 0, rows)
+    np.maximum.accumulate(valid_rows, axis=0, out=valid_rows)
+    return np.take_along_axis(values, valid_rows, axis=0)
+
+
+def adjust_open_prices(opens, closes, adj_closes):
+    """
+    Adjust opening prices for corporate actions using the ratio of
+    the adjusted closing price to the closing price of each bar.
+
+    Parameters
+    ----------
+    opens : `np.ndarray`
+        The opening prices.
+    closes : `np.ndarray`
+        The closing prices.
+    adj_closes : `np.ndarray`
+        The adjusted closing prices.
+
+    Returns
+    -------
+    `np.ndarray`
+        The adjusted opening prices.
+    """
+    return (adj_closes / closes) * opens
+
+
+def interleave_open_close(
+    dates,
+    opens,
+    closes,
+    open_offset=MARKET_OPEN_OFFSET_NS,
+    close_offset=MARKET_CLOSE_OFFSET_NS
+):
+    """
+    Interleave the opening and closing prices of bars into a single
+    sequence of open and close timestamped prices, forward-filling
+    any missing prices. By default the timestamps are the market open
+    and market close of daily bars.
+
+    The prices may either be 1D arrays for a single asset, or 2D
+    arrays with one column per asset sharing the same dates, in
+    which case the whole panel is converted at once.
+
+    Parameters
+    ----------
+    dates : `np.ndarray`
+        The int64 nanosecond timestamps of the bars, e.g. the bar
+        dates (midnight UTC) of daily bars.
+    opens : `np.ndarray`
+        The opening prices, aligned to the dates.
+    closes : `np.ndarray`
+        The closing prices, aligned to the dates.
+    open_offset : `int`, optional
+        The nanosecond offset from each bar timestamp of its opening price.
+    close_offset : `int`, optional
+        The nanosecond offset from each bar timestamp of its closing price.
+
+    Returns
+    -------
+    `tuple(np.ndarray, np.ndarray)`
+        The int64 nanosecond timestamps, sorted by time, and the
+        aligned forward-filled prices.
+    """
+    num_bars = len(dates)
+    timestamps = np.empty(2 * num_bars, dtype=np.int64)
+    timestamps[0::2] = dates + open_offset
+    timestamps[1::2] = dates + close_offset
+
+    prices = np.empty((2 * num_bars,) + opens.shape[1:], dtype=np.float64)
+    prices[0::2] = opens
+    prices[1::2] = closes
+    prices = ffill_columns(prices)
+
+    # Sorted, non-overlapping bars produce sorted timestamps directly
+    if num_bars > 1 and np.any(timestamps[1:] < timestamps[:-1]):
+        order = np.argsort(timestamps, kind='stable')
+        timestamps = timestamps[order]
+        prices = prices[order]
+    return timestamps, prices
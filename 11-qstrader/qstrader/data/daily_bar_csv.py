@@ -1,10 +1,21 @@
-import functools
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+from itertools import repeat
 import os
+import time
 
 import numpy as np
 import pandas as pd
 import pytz
 from qstrader import settings
+from qstrader.data.bar_conversion import adjust_open_prices, interleave_open_close
+from qstrader.data.price_cache import BinaryPriceCache
+from qstrader.data.price_cursor import AssetPriceCursor, timestamp_to_ns
+from qstrader.data.price_panel import PricePanel
+
+
+# The phases of loading the CSV files that are individually timed
+LOAD_PHASES = ('listing', 'parsing', 'adjusting', 'converting', 'caching')
 
 
 class CSVDailyBarDataSource(object):
@@ -16,6 +27,11 @@ class CSVDailyBarDataSource(object):
     Optionally utilises adjusted closing prices (if available) to
     adjust both the close and open.
 
+    The time spent in each phase of loading is recorded in the
+    load_timings dictionary. When loading with multiple workers the
+    parsing, adjusting and converting timings are summed across the
+    worker processes, while 'total' is the elapsed time of the load.
+
     Parameters
     ----------
     csv_dir : `str`
@@ -30,16 +46,124 @@ class CSVDailyBarDataSource(object):
         An optional list of CSV symbols to restrict the data source to.
         The alternative is to convert all CSVs found within the
         provided directory.
+    cache_dir : `str`, optional
+        An optional directory in which to store compiled binary
+        versions of the CSV files. If provided, subsequent loads
+        memory-map the binary arrays rather than re-parsing and
+        re-converting the CSV files. Entries are rebuilt whenever
+        the modification time and contents of a CSV file change.
+    workers : `int`, optional
+        The number of worker processes used to parse and convert the
+        CSV files. Defaults to 1, which loads the files in-process.
+    start_dt : `pd.Timestamp`, optional
+        The optional starting datetime (UTC) of the window of daily bars
+        to load. Should include any warmup period required by the
+        strategy lookbacks. Defaults to the start of each CSV file.
+    end_dt : `pd.Timestamp`, optional
+        The optional ending datetime (UTC) of the window of daily bars
+        to load. Defaults to the end of each CSV file.
     """
 
-    def __init__(self, csv_dir, asset_type, adjust_prices=True, csv_symbols=None):
+    def __init__(
+        self,
+        csv_dir,
+        asset_type,
+        adjust_prices=True,
+        csv_symbols=None,
+        cache_dir=None,
+        workers=1,
+        start_dt=None,
+        end_dt=None
+    ):
+        if workers < 1:
+            raise ValueError(
+                "Number of CSV loading workers must be at least one, "
+                "but %s was provided." % workers
+            )
         self.csv_dir = csv_dir
         self.asset_type = asset_type
         self.adjust_prices = adjust_prices
         self.csv_symbols = csv_symbols
+        self.workers = workers
+        self.load_window = self._create_load_window(start_dt, end_dt)
+        self.cache = self._create_price_cache(cache_dir)
+        self.load_timings = {phase: 0.0 for phase in LOAD_PHASES}
+
+        start = time.perf_counter()
+        if self.cache is None and self.workers == 1:
+            self.asset_bar_frames = self._load_csvs_into_dfs()
+            self.asset_bid_ask_frames = self._convert_bars_into_bid_ask_dfs()
+        else:
+            self.asset_bar_frames, self.asset_bid_ask_frames = \
+                self._load_compiled_dfs()
+        self.load_timings['total'] = time.perf_counter() - start
+        if settings.PRINT_EVENTS:
+            print(
+                "CSV load timings: %s" % ", ".join(
+                    "%s %0.3fs" % (phase, secs)
+                    for phase, secs in self.load_timings.items()
+                )
+            )
+
+        self.asset_price_cursors = self._create_asset_price_cursors()
+        self.bid_panel, self.ask_panel = self._create_bid_ask_panels()
+        self.close_panels = self._create_close_panels()
+        self.bar_range_panels = None
+
+    @staticmethod
+    def _create_load_window(start_dt, end_dt):
+        """
+        Create the half-open range of nanosecond timestamps of the daily
+        bars to load. The range includes the entire day of the ending
+        datetime so that both its open and closing prices are loaded.
+
+        Parameters
+        ----------
+        start_dt : `pd.Timestamp` or None
+            The starting datetime of the window.
+        end_dt : `pd.Timestamp` or None
+            The ending datetime of the window.
+
+        Returns
+        -------
+        `tuple(int, int)` or None
+            The inclusive start and exclusive end of the window, if
+            either datetime was provided.
+        """
+        if start_dt is None and end_dt is None:
+            return None
+        if start_dt is None:
+            start_ns = np.iinfo(np.int64).min
+        else:
+            start_ns = pd.Timestamp(start_dt).floor('D').value
+        if end_dt is None:
+            end_ns = np.iinfo(np.int64).max
+        else:
+            end_ns = (pd.Timestamp(end_dt).floor('D') + pd.Timedelta(days=1)).value
+        if end_ns <= start_ns:
+            raise ValueError(
+                "Load window ending datetime '%s' is prior to the starting "
+                "datetime '%s'." % (end_dt, start_dt)
+            )
+        return start_ns, end_ns
+
+    def _create_price_cache(self, cache_dir):
+        """
+        Create the optional binary price cache.
+
+        Parameters
+        ----------
+        cache_dir : `str` or None
+            The directory in which to store the cache.
 
-        self.asset_bar_frames = self._load_csvs_into_dfs()
-        self.asset_bid_ask_frames = self._convert_bars_into_bid_ask_dfs()
+        Returns
+        -------
+        `BinaryPriceCache` or None
+            The binary price cache, if a directory was provided.
+        """
+        if cache_dir is None:
+            return None
+        return BinaryPriceCache(cache_dir)
 
     def _obtain_asset_csv_files(self):
         """
@@ -73,15 +197,36 @@ class CSVDailyBarDataSource(object):
         """
         return 'EQ:%s' % csv_file.replace('.csv', '')
 
-    def _load_csv_into_df(self, csv_file):
+    def _obtain_csv_files_to_load(self):
         """
-        Loads the CSV file into a Pandas DataFrame with dates parsed,
+        Obtain the list of CSV filenames to load, either from the
+        restricted list of CSV symbols or the full CSV directory.
+
+        Returns
+        -------
+        `list[str]`
+            The list of CSV filenames to load.
+        """
+        start = time.perf_counter()
+        if self.csv_symbols is not None:
+            # TODO/NOTE: This assumes existence of CSV symbols
+            # within the provided directory.
+            csv_files = ['%s.csv' % symbol for symbol in self.csv_symbols]
+        else:
+            csv_files = self._obtain_asset_csv_files()
+        self.load_timings['listing'] += time.perf_counter() - start
+        return csv_files
+
+    @staticmethod
+    def _read_csv_file(csv_path):
+        """
+        Reads a CSV file into a Pandas DataFrame with dates parsed,
         sorted on datetime localised to UTC.
 
         Parameters
         ----------
-        csv_file : `str`
-            The name of the CSV file.
+        csv_path : `str`
+            The full path to the CSV file.
 
         Returns
         -------
@@ -89,7 +234,7 @@ class CSVDailyBarDataSource(object):
             DataFrame of the CSV file with timestamps localised to UTC.
         """
         csv_df = pd.read_csv(
-            os.path.join(self.csv_dir, csv_file),
+            csv_path,
             index_col='Date',
             parse_dates=True
         ).sort_index()
@@ -98,6 +243,78 @@ class CSVDailyBarDataSource(object):
         csv_df = csv_df.set_index(csv_df.index.tz_localize(pytz.UTC))
         return csv_df
 
+    @staticmethod
+    def _slice_bar_frame(bar_df, load_window):
+        """
+        Restrict a date-sorted DataFrame of daily bars to the load window,
+        via a binary search of its timestamps.
+
+        Parameters
+        ----------
+        bar_df : `pd.DataFrame`
+            The daily 'bar' OHLCV DataFrame, sorted by date.
+        load_window : `tuple(int, int)` or None
+            The nanosecond timestamp window to restrict to.
+
+        Returns
+        -------
+        `pd.DataFrame`
+            The daily bars within the load window.
+        """
+        if load_window is None:
+            return bar_df
+        bar_ts = bar_df.index.as_unit('ns').asi8
+        start = np.searchsorted(bar_ts, load_window[0], side='left')
+        end = np.searchsorted(bar_ts, load_window[1], side='left')
+        return bar_df.iloc[start:end]
+
+    @staticmethod
+    def _slice_cache_arrays(arrays, load_window):
+        """
+        Restrict the compiled bar and bid/ask arrays of an asset to the
+        load window. Slicing memory-mapped arrays does not read them, so
+        only the pages within the window are ever loaded from disk.
+
+        Parameters
+        ----------
+        arrays : `dict{str: np.ndarray}`
+            The compiled (or memory-mapped) arrays of the asset.
+        load_window : `tuple(int, int)` or None
+            The nanosecond timestamp window to restrict to.
+
+        Returns
+        -------
+        `dict{str: np.ndarray}`
+            The arrays restricted to the load window.
+        """
+        if load_window is None:
+            return arrays
+        sliced = {}
+        for prefix in ('bar', 'bid_ask'):
+            timestamps = arrays['%s_ts' % prefix]
+            start = np.searchsorted(timestamps, load_window[0], side='left')
+            end = np.searchsorted(timestamps, load_window[1], side='left')
+            sliced['%s_ts' % prefix] = timestamps[start:end]
+            sliced['%s_values' % prefix] = arrays['%s_values' % prefix][start:end]
+        return sliced
+
+    def _load_csv_into_df(self, csv_file):
+        """
+        Loads the CSV file into a Pandas DataFrame with dates parsed,
+        sorted on datetime localised to UTC.
+
+        Parameters
+        ----------
+        csv_file : `str`
+            The name of the CSV file.
+
+        Returns
+        -------
+        `pd.DataFrame`
+            DataFrame of the CSV file with timestamps localised to UTC.
+        """
+        return self._read_csv_file(os.path.join(self.csv_dir, csv_file))
+
     def _load_csvs_into_dfs(self):
         """
         Load all CSVs in the CSV directory into Pandas DataFrames.
@@ -110,72 +327,111 @@ class CSVDailyBarDataSource(object):
         """
         if settings.PRINT_EVENTS:
             print("Loading CSV files into DataFrames...")
-        if self.csv_symbols is not None:
-            # TODO/NOTE: This assumes existence of CSV symbols
-            # within the provided directory.
-            csv_files = ['%s.csv' % symbol for symbol in self.csv_symbols]
-        else:
-            csv_files = self._obtain_asset_csv_files()
+        csv_files = self._obtain_csv_files_to_load()
 
         asset_frames = {}
         for csv_file in csv_files:
             asset_symbol = self._obtain_asset_symbol_from_filename(csv_file)
             if settings.PRINT_EVENTS:
                 print("Loading CSV file for symbol '%s'..." % asset_symbol)
-            csv_df = self._load_csv_into_df(csv_file)
+            start = time.perf_counter()
+            csv_df = self._slice_bar_frame(
+                self._load_csv_into_df(csv_file), self.load_window
+            )
+            self.load_timings['parsing'] += time.perf_counter() - start
             asset_frames[asset_symbol] = csv_df
         return asset_frames
 
-    def _convert_bar_frame_into_bid_ask_df(self, bar_df):
+    @staticmethod
+    def _adjust_bar_frame(bar_df, adjust_prices):
         """
-        Converts the DataFrame from daily OHLCV 'bars' into a DataFrame
-        of open and closing price timestamps.
-
-        Optionally adjusts the open/close prices for corporate actions
+        Restricts the daily OHLCV 'bars' to arrays of the opening and
+        closing prices, optionally adjusting both for corporate actions
         using any provided 'Adjusted Close' column.
 
         Parameters
         ----------
-        `pd.DataFrame`
-            The daily 'bar' OHLCV DataFrame.
+        bar_df : `pd.DataFrame`
+            The daily 'bar' OHLCV DataFrame, sorted by date.
+        adjust_prices : `Boolean`
+            Whether to adjust the open/close prices.
 
         Returns
         -------
-        `pd.DataFrame`
-            The individually-timestamped open/closing prices, optionally
-            adjusted for corporate actions.
+        `tuple(np.ndarray, np.ndarray, np.ndarray)`
+            The int64 nanosecond bar dates and the (optionally adjusted)
+            float64 opening and closing prices.
         """
-        bar_df = bar_df.sort_index()
-        if self.adjust_prices:
+        dates = bar_df.index.as_unit('ns').asi8
+        opens = bar_df['Open'].to_numpy(dtype=np.float64)
+        if adjust_prices:
             if 'Adj Close' not in bar_df.columns:
                 raise ValueError(
                     "Unable to locate Adjusted Close pricing column in CSV data file. "
                     "Prices cannot be adjusted. Exiting."
                 )
+            closes = bar_df['Adj Close'].to_numpy(dtype=np.float64)
+            opens = adjust_open_prices(
+                opens, bar_df['Close'].to_numpy(dtype=np.float64), closes
+            )
+        else:
+            closes = bar_df['Close'].to_numpy(dtype=np.float64)
+        return dates, opens, closes
 
-            # Restrict solely to the open/closing prices
-            oc_df = bar_df.loc[:, ['Open', 'Close', 'Adj Close']]
+    @staticmethod
+    def _convert_open_close_into_bid_ask_df(dates, opens, closes):
+        """
+        Converts arrays of daily open and closing prices into a
+        DataFrame of individually-timestamped bid/ask prices.
 
-            # Adjust opening prices
-            oc_df['Adj Open'] = (oc_df['Adj Close'] / oc_df['Close']) * oc_df['Open']
-            oc_df = oc_df.loc[:, ['Adj Open', 'Adj Close']]
-            oc_df.columns = ['Open', 'Close']
-        else:
-            oc_df = bar_df.loc[:, ['Open', 'Close']]
+        Parameters
+        ----------
+        dates : `np.ndarray`
+            The int64 nanosecond bar dates.
+        opens : `np.ndarray`
+            The opening prices.
+        closes : `np.ndarray`
+            The closing prices.
 
-        # Convert bars into separate rows for open/close prices
-        # appropriately timestamped
-        seq_oc_df = oc_df.T.unstack(level=0).reset_index()
-        seq_oc_df.columns = ['Date', 'Market', 'Price']
-        seq_oc_df.loc[seq_oc_df['Market'] == 'Open', 'Date'] += pd.Timedelta(hours=14, minutes=30)
-        seq_oc_df.loc[seq_oc_df['Market'] == 'Close', 'Date'] += pd.Timedelta(hours=21, minutes=00)
+        Returns
+        -------
+        `pd.DataFrame`
+            The individually-timestamped open/closing prices.
+        """
+        timestamps, prices = interleave_open_close(dates, opens, closes)
 
         # TODO: Unable to distinguish between Bid/Ask, implement later
-        dp_df = seq_oc_df[['Date', 'Price']]
-        dp_df['Bid'] = dp_df['Price']
-        dp_df['Ask'] = dp_df['Price']
-        dp_df = dp_df.loc[:, ['Date', 'Bid', 'Ask']].ffill().set_index('Date').sort_index()
-        return dp_df
+        return pd.DataFrame(
+            np.column_stack([prices, prices]),
+            index=pd.DatetimeIndex(
+                pd.to_datetime(timestamps, unit='ns', utc=True), name='Date'
+            ),
+            columns=['Bid', 'Ask'],
+            copy=False
+        )
+
+    def _convert_bar_frame_into_bid_ask_df(self, bar_df):
+        """
+        Converts the DataFrame from daily OHLCV 'bars' into a DataFrame
+        of open and closing price timestamps.
+
+        Optionally adjusts the open/close prices for corporate actions
+        using any provided 'Adjusted Close' column.
+
+        Parameters
+        ----------
+        `pd.DataFrame`
+            The daily 'bar' OHLCV DataFrame.
+
+        Returns
+        -------
+        `pd.DataFrame`
+            The individually-timestamped open/closing prices, optionally
+            adjusted for corporate actions.
+        """
+        return self._convert_open_close_into_bid_ask_df(
+            *self._adjust_bar_frame(bar_df.sort_index(), self.adjust_prices)
+        )
 
     def _convert_bars_into_bid_ask_dfs(self):
         """
@@ -193,11 +449,528 @@ class CSVDailyBarDataSource(object):
         for asset_symbol, bar_df in self.asset_bar_frames.items():
             if settings.PRINT_EVENTS:
                 print("Adjusting CSV file for symbol '%s'..." % asset_symbol)
+            start = time.perf_counter()
+            oc_arrays = self._adjust_bar_frame(bar_df.sort_index(), self.adjust_prices)
+            adjusted = time.perf_counter()
             asset_bid_ask_frames[asset_symbol] = \
-                self._convert_bar_frame_into_bid_ask_df(bar_df)
+                self._convert_open_close_into_bid_ask_df(*oc_arrays)
+            self.load_timings['adjusting'] += adjusted - start
+            self.load_timings['converting'] += time.perf_counter() - adjusted
         return asset_bid_ask_frames
 
-    @functools.lru_cache(maxsize=1024 * 1024)
+    def _cache_key(self, csv_file):
+        """
+        Determine the binary price cache key for a CSV file, which
+        depends upon its resolved path and whether prices are adjusted.
+
+        The path is included (as a digest) such that same-named CSV
+        files of different directories sharing a cache directory
+        do not share a cache entry.
+
+        Parameters
+        ----------
+        csv_file : `str`
+            The name of the CSV file.
+
+        Returns
+        -------
+        `str`
+            The cache key.
+        """
+        csv_path = os.path.realpath(os.path.join(self.csv_dir, csv_file))
+        return '%s.%s.%s' % (
+            csv_file.replace('.csv', ''),
+            hashlib.blake2b(csv_path.encode('utf-8'), digest_size=8).hexdigest(),
+            'adj' if self.adjust_prices else 'raw'
+        )
+
+    @staticmethod
+    def _frames_to_cache_arrays(bar_df, bid_ask_df):
+        """
+        Convert the bar and bid/ask DataFrames of an asset into
+        int64 nanosecond timestamp and float64 value arrays.
+
+        Parameters
+        ----------
+        bar_df : `pd.DataFrame`
+            The daily 'bar' OHLCV DataFrame.
+        bid_ask_df : `pd.DataFrame`
+            The individually-timestamped bid/ask DataFrame.
+
+        Returns
+        -------
+        `tuple(dict{str: np.ndarray}, dict)`
+            The arrays to cache and the bar column names.
+        """
+        bar_values = bar_df.select_dtypes(include=[np.number])
+        arrays = {
+            'bar_ts': bar_values.index.as_unit('ns').asi8,
+            'bar_values': bar_values.to_numpy(dtype=np.float64),
+            'bid_ask_ts': bid_ask_df.index.as_unit('ns').asi8,
+            'bid_ask_values': bid_ask_df[['Bid', 'Ask']].to_numpy(dtype=np.float64)
+        }
+        return arrays, {'bar_columns': list(bar_values.columns)}
+
+    @staticmethod
+    def _cache_arrays_to_frames(arrays, info):
+        """
+        Wrap the memory-mapped cache arrays of an asset as the bar
+        and bid/ask DataFrames, without copying the values.
+
+        Parameters
+        ----------
+        arrays : `dict{str: np.memmap}`
+            The memory-mapped arrays of the cache entry.
+        info : `dict`
+            The stored information of the cache entry.
+
+        Returns
+        -------
+        `tuple(pd.DataFrame, pd.DataFrame)`
+            The bar and bid/ask DataFrames.
+        """
+        bar_index = pd.DatetimeIndex(
+            pd.to_datetime(arrays['bar_ts'], unit='ns', utc=True), name='Date'
+        )
+        bar_df = pd.DataFrame(
+            arrays['bar_values'], index=bar_index,
+            columns=info['bar_columns'], copy=False
+        )
+        bid_ask_index = pd.DatetimeIndex(
+            pd.to_datetime(arrays['bid_ask_ts'], unit='ns', utc=True), name='Date'
+        )
+        bid_ask_df = pd.DataFrame(
+            arrays['bid_ask_values'], index=bid_ask_index,
+            columns=['Bid', 'Ask'], copy=False
+        )
+        return bar_df, bid_ask_df
+
+    @staticmethod
+    def _compile_csv_file(csv_path, adjust_prices, load_window=None):
+        """
+        Parse, adjust and convert a single CSV file into the int64
+        timestamp and float64 value arrays of its bar and bid/ask data.
+
+        This is a static method so that it can be executed within a
+        worker process, returning only NumPy arrays (which are cheaply
+        transferred back to the parent process) rather than DataFrames.
+
+        Parameters
+        ----------
+        csv_path : `str`
+            The full path to the CSV file.
+        adjust_prices : `Boolean`
+            Whether to adjust the open/close prices.
+        load_window : `tuple(int, int)`, optional
+            The nanosecond timestamp window of daily bars to compile.
+
+        Returns
+        -------
+        `tuple(dict{str: np.ndarray}, dict, dict{str: float})`
+            The compiled arrays, the bar column names and the time
+            spent parsing, adjusting and converting the file.
+        """
+        start = time.perf_counter()
+        bar_df = CSVDailyBarDataSource._slice_bar_frame(
+            CSVDailyBarDataSource._read_csv_file(csv_path), load_window
+        )
+        parsed = time.perf_counter()
+        oc_arrays = CSVDailyBarDataSource._adjust_bar_frame(bar_df, adjust_prices)
+        adjusted = time.perf_counter()
+        bid_ask_df = CSVDailyBarDataSource._convert_open_close_into_bid_ask_df(*oc_arrays)
+        arrays, info = CSVDailyBarDataSource._frames_to_cache_arrays(bar_df, bid_ask_df)
+        timings = {
+            'parsing': parsed - start,
+            'adjusting': adjusted - parsed,
+            'converting': time.perf_counter() - adjusted
+        }
+        return arrays, info, timings
+
+    def _compile_csv_files(self, csv_files, load_window):
+        """
+        Compile the provided CSV files into arrays, either in-process
+        or across a pool of worker processes.
+
+        Parameters
+        ----------
+        csv_files : `list[str]`
+            The names of the CSV files to compile.
+        load_window : `tuple(int, int)` or None
+            The nanosecond timestamp window of daily bars to compile.
+
+        Returns
+        -------
+        `generator`
+            The compiled (arrays, info, timings) of each CSV file,
+            in the order of the provided CSV files.
+        """
+        csv_paths = [os.path.join(self.csv_dir, csv_file) for csv_file in csv_files]
+        if self.workers == 1 or len(csv_paths) <= 1:
+            for csv_path in csv_paths:
+                yield self._compile_csv_file(csv_path, self.adjust_prices, load_window)
+            return
+
+        workers = min(self.workers, len(csv_paths))
+        chunksize = max(1, len(csv_paths) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            yield from executor.map(
+                CSVDailyBarDataSource._compile_csv_file,
+                csv_paths, repeat(self.adjust_prices), repeat(load_window),
+                chunksize=chunksize
+            )
+
+    def _load_compiled_dfs(self):
+        """
+        Load all CSVs by compiling them into arrays, optionally in
+        parallel and optionally via the binary price cache. When the
+        cache is used only those CSV files that are not yet cached or
+        have changed since they were cached are compiled. The cache always
+        stores the full history of each CSV file, which is restricted to
+        the load window as it is memory-mapped.
+
+        Returns
+        -------
+        `tuple(dict{pd.DataFrame}, dict{pd.DataFrame})`
+            The asset-symbol keyed dictionaries of bar DataFrames
+            and bid/ask DataFrames.
+        """
+        if settings.PRINT_EVENTS:
+            print(
+                "Loading CSV files with %s worker(s)%s..." % (
+                    self.workers,
+                    '' if self.cache is None else ' via binary price cache'
+                )
+            )
+        csv_files = self._obtain_csv_files_to_load()
+
+        # Obtain any valid entries from the cache
+        start = time.perf_counter()
+        entries = {}
+        if self.cache is not None:
+            for csv_file in csv_files:
+                entry = self.cache.get(
+                    self._cache_key(csv_file), os.path.join(self.csv_dir, csv_file)
+                )
+                if entry is not None:
+                    entries[csv_file] = entry
+        self.load_timings['caching'] += time.perf_counter() - start
+
+        # Compile the remaining CSV files, storing them in the cache.
+        # Only restrict them to the load window during compilation if
+        # they are not being cached.
+        to_compile = [csv_file for csv_file in csv_files if csv_file not in entries]
+        compiled = self._compile_csv_files(
+            to_compile, self.load_window if self.cache is None else None
+        )
+        for csv_file, (arrays, info, timings) in zip(to_compile, compiled):
+            if settings.PRINT_EVENTS:
+                print(
+                    "Compiled CSV file for symbol '%s'..." %
+                    self._obtain_asset_symbol_from_filename(csv_file)
+                )
+            for phase, secs in timings.items():
+                self.load_timings[phase] += secs
+            if self.cache is not None:
+                start = time.perf_counter()
+                self.cache.put(
+                    self._cache_key(csv_file), os.path.join(self.csv_dir, csv_file),
+                    arrays, info=info
+                )
+                self.load_timings['caching'] += time.perf_counter() - start
+            entries[csv_file] = (arrays, info)
+
+        asset_bar_frames = {}
+        asset_bid_ask_frames = {}
+        for csv_file in csv_files:
+            asset_symbol = self._obtain_asset_symbol_from_filename(csv_file)
+            arrays, info = entries[csv_file]
+            frames = self._cache_arrays_to_frames(
+                self._slice_cache_arrays(arrays, self.load_window), info
+            )
+            asset_bar_frames[asset_symbol], asset_bid_ask_frames[asset_symbol] = frames
+
+        if settings.PRINT_EVENTS and self.cache is not None:
+            print(
+                "Binary price cache: %s hits, %s misses" % (
+                    self.cache.hits, self.cache.misses
+                )
+            )
+        return asset_bar_frames, asset_bid_ask_frames
+
+    def _create_asset_price_cursors(self):
+        """
+        Create a forward-moving price cursor over the timestamps
+        of each asset's bid/ask DataFrame.
+
+        Returns
+        -------
+        `dict{str: AssetPriceCursor}`
+            The asset-symbol keyed dictionary of price cursors.
+        """
+        return {
+            asset_symbol: AssetPriceCursor(
+                bid_ask_df.index.as_unit('ns').asi8,
+                bid_ask_df['Bid'].to_numpy(dtype=np.float64),
+                bid_ask_df['Ask'].to_numpy(dtype=np.float64)
+            )
+            for asset_symbol, bid_ask_df in self.asset_bid_ask_frames.items()
+        }
+
+    def _create_bid_ask_panels(self):
+        """
+        Create forward-filled timestamp by asset panels of the bid
+        and ask prices, used for multi-asset price queries.
+
+        As the bid and ask prices of daily bars are both taken from
+        the same open/close column, a single panel is shared between
+        them unless any asset's bid and ask prices differ.
+
+        Returns
+        -------
+        `tuple(PricePanel, PricePanel)`
+            The bid and ask price panels.
+        """
+        bid_panel = PricePanel.from_series(
+            {
+                asset_symbol: (cursor.timestamps, cursor.bids)
+                for asset_symbol, cursor in self.asset_price_cursors.items()
+            }, ffill=True
+        )
+        if all(
+            np.array_equal(cursor.bids, cursor.asks, equal_nan=True)
+            for cursor in self.asset_price_cursors.values()
+        ):
+            return bid_panel, bid_panel
+        ask_panel = PricePanel.from_series(
+            {
+                asset_symbol: (cursor.timestamps, cursor.asks)
+                for asset_symbol, cursor in self.asset_price_cursors.items()
+            }, ffill=True
+        )
+        return bid_panel, ask_panel
+
+    def _create_close_panels(self):
+        """
+        Create timestamp by asset panels of the daily closing prices,
+        and adjusted closing prices if available, used for historical
+        range queries. Values are NaN where an asset is not listed.
+
+        Returns
+        -------
+        `dict{str: PricePanel}`
+            The closing price panels keyed by bar column name.
+        """
+        close_panels = {}
+        for column in ('Close', 'Adj Close'):
+            panel = self.get_bar_panel(column)
+            if len(panel.assets) > 0:
+                close_panels[column] = panel
+        return close_panels
+
+    def get_bar_panel(self, column):
+        """
+        Create a timestamp by asset panel of a column of the daily
+        bars, such as the closing prices or volumes, for those assets
+        whose bars contain the column. Values are NaN where an asset
+        is not listed.
+
+        Parameters
+        ----------
+        column : `str`
+            The bar column name.
+
+        Returns
+        -------
+        `PricePanel`
+            The bar date indexed panel of the column values.
+        """
+        return PricePanel.from_series(
+            {
+                asset_symbol: (
+                    bar_df.index.as_unit('ns').asi8,
+                    bar_df[column].to_numpy(dtype=np.float64)
+                )
+                for asset_symbol, bar_df in sorted(self.asset_bar_frames.items())
+                if column in bar_df.columns
+            }
+        )
+
+    def _create_bar_range_panels(self):
+        """
+        Create timestamp by asset panels of the lowest and highest
+        prices traded up to each bid/ask timestamp since the previous
+        one, being the opening price at the market open and the daily
+        low and high at the market close. Prices are adjusted for
+        corporate actions as for the opening price. Assets lacking a
+        'Low' or 'High' column are omitted.
+
+        Returns
+        -------
+        `tuple(PricePanel, PricePanel)`
+            The low and high price panels.
+        """
+        low_series = {}
+        high_series = {}
+        for asset_symbol, bar_df in self.asset_bar_frames.items():
+            if 'Low' not in bar_df.columns or 'High' not in bar_df.columns:
+                continue
+            bar_df = bar_df.sort_index()
+            dates, opens, closes = self._adjust_bar_frame(bar_df, self.adjust_prices)
+            lows = bar_df['Low'].to_numpy(dtype=np.float64)
+            highs = bar_df['High'].to_numpy(dtype=np.float64)
+            if self.adjust_prices:
+                raw_closes = bar_df['Close'].to_numpy(dtype=np.float64)
+                lows = adjust_open_prices(lows, raw_closes, closes)
+                highs = adjust_open_prices(highs, raw_closes, closes)
+            low_series[asset_symbol] = interleave_open_close(dates, opens, lows)
+            high_series[asset_symbol] = interleave_open_close(dates, opens, highs)
+        return PricePanel.from_series(low_series), PricePanel.from_series(high_series)
+
+    def _get_bar_range_prices(self, dt, assets, side):
+        """
+        Obtain the lowest or highest prices of multiple assets traded
+        since their previous bid/ask timestamp, at exactly the provided
+        timestamp. The range panels are created upon the first query.
+
+        Parameters
+        ----------
+        dt : `pd.Timestamp`
+            The timestamp of the prices.
+        assets : `list[str]`
+            The asset symbols to obtain the prices for.
+        side : `int`
+            Zero for the lowest prices and one for the highest prices.
+
+        Returns
+        -------
+        `np.ndarray`
+            The prices aligned to the assets, with NaN for any asset
+            without a new price at the timestamp.
+        """
+        if self.bar_range_panels is None:
+            self.bar_range_panels = self._create_bar_range_panels()
+        panel = self.bar_range_panels[side]
+        ts = timestamp_to_ns(dt)
+        pos = panel.row_position(ts)
+        if pos < 0 or panel.timestamps[pos] != ts:
+            return np.full(len(assets), np.nan)
+        return panel.values[pos, panel.columns(assets)]
+
+    def get_bar_low(self, dt, asset):
+        """
+        Obtain the lowest price of an asset traded since its previous
+        bid/ask timestamp, at exactly the provided timestamp.
+
+        Parameters
+        ----------
+        dt : `pd.Timestamp`
+            The timestamp of the price.
+        asset : `str`
+            The asset symbol to obtain the price for.
+
+        Returns
+        -------
+        `float`
+            The lowest price, or NaN if there is no new price at the timestamp.
+        """
+        return float(self._get_bar_range_prices(dt, [asset], 0)[0])
+
+    def get_bar_high(self, dt, asset):
+        """
+        Obtain the highest price of an asset traded since its previous
+        bid/ask timestamp, at exactly the provided timestamp.
+
+        Parameters
+        ----------
+        dt : `pd.Timestamp`
+            The timestamp of the price.
+        asset : `str`
+            The asset symbol to obtain the price for.
+
+        Returns
+        -------
+        `float`
+            The highest price, or NaN if there is no new price at the timestamp.
+        """
+        return float(self._get_bar_range_prices(dt, [asset], 1)[0])
+
+    def get_bar_lows(self, dt, assets):
+        """
+        Obtain the lowest prices of multiple assets traded since
+        their previous bid/ask timestamp, at exactly the provided
+        timestamp.
+
+        Parameters
+        ----------
+        dt : `pd.Timestamp`
+            The timestamp of the prices.
+        assets : `list[str]`
+            The asset symbols to obtain the prices for.
+
+        Returns
+        -------
+        `np.ndarray`
+            The lowest prices aligned to the assets, with NaN for any
+            asset without a new price at the timestamp.
+        """
+        return self._get_bar_range_prices(dt, assets, 0)
+
+    def get_bar_highs(self, dt, assets):
+        """
+        Obtain the highest prices of multiple assets traded since
+        their previous bid/ask timestamp, at exactly the provided
+        timestamp.
+
+        Parameters
+        ----------
+        dt : `pd.Timestamp`
+            The timestamp of the prices.
+        assets : `list[str]`
+            The asset symbols to obtain the prices for.
+
+        Returns
+        -------
+        `np.ndarray`
+            The highest prices aligned to the assets, with NaN for any
+            asset without a new price at the timestamp.
+        """
+        return self._get_bar_range_prices(dt, assets, 1)
+
+    def get_assets_coverage(self):
+        """
+        Obtain the assets within the data source along with the first
+        and last timestamps of their bid/ask prices.
+
+        Returns
+        -------
+        `dict{str: tuple(pd.Timestamp, pd.Timestamp)}`
+            The asset-symbol keyed coverage, with (None, None) for any
+            asset lacking prices.
+        """
+        coverage = {}
+        for asset_symbol, cursor in self.asset_price_cursors.items():
+            if cursor.num_timestamps == 0:
+                coverage[asset_symbol] = (None, None)
+            else:
+                coverage[asset_symbol] = (
+                    pd.Timestamp(cursor.timestamps[0], tz=pytz.UTC),
+                    pd.Timestamp(cursor.timestamps[-1], tz=pytz.UTC)
+                )
+        return coverage
+
+    def get_update_timestamps(self):
+        """
+        Obtain the timestamps at which any asset within the data source
+        has a new bid/ask price, such that a simulation clock can skip
+        those instants at which no prices change.
+
+        Returns
+        -------
+        `np.ndarray`
+            The sorted, unique int64 nanosecond timestamps.
+        """
+        return self.bid_panel.timestamps
+
     def get_bid(self, dt, asset):
         """
         Obtain the bid price of an asset at the provided timestamp.
@@ -212,17 +985,10 @@ class CSVDailyBarDataSource(object):
         Returns
         -------
         `float`
-            The bid price.
+            The bid price, or NaN if prior to the first available price.
         """
-        bid_ask_df = self.asset_bid_ask_frames[asset]
-        bid_series = bid_ask_df.iloc[bid_ask_df.index.get_indexer([dt], method='pad')]['Bid']
-        try:
-            bid = bid_series.iloc[0]
-        except KeyError:  # Before start date
-            return np.nan
-        return bid
+        return self.asset_price_cursors[asset].bid(timestamp_to_ns(dt))
 
-    @functools.lru_cache(maxsize=1024 * 1024)
     def get_ask(self, dt, asset):
         """
         Obtain the ask price of an asset at the provided timestamp.
@@ -237,21 +1003,99 @@ class CSVDailyBarDataSource(object):
         Returns
         -------
         `float`
-            The ask price.
+            The ask price, or NaN if prior to the first available price.
+        """
+        return self.asset_price_cursors[asset].ask(timestamp_to_ns(dt))
+
+    def get_bids(self, dt, assets):
+        """
+        Obtain the bid prices of multiple assets at the provided timestamp.
+
+        Parameters
+        ----------
+        dt : `pd.Timestamp`
+            When to obtain the bid prices for.
+        assets : `list[str]`
+            The asset symbols to obtain the bid prices for.
+
+        Returns
+        -------
+        `np.ndarray`
+            The bid prices aligned to the assets, with NaN for any asset
+            not in the data source or prior to its first available price.
+        """
+        return self.bid_panel.gather(timestamp_to_ns(dt), assets)
+
+    def get_asks(self, dt, assets):
         """
-        bid_ask_df = self.asset_bid_ask_frames[asset]
-        ask_series = bid_ask_df.iloc[bid_ask_df.index.get_indexer([dt], method='pad')]['Ask']
-        try:
-            ask = ask_series.iloc[0]
-        except KeyError:  # Before start date
-            return np.nan
-        return ask
+        Obtain the ask prices of multiple assets at the provided timestamp.
+
+        Parameters
+        ----------
+        dt : `pd.Timestamp`
+            When to obtain the ask prices for.
+        assets : `list[str]`
+            The asset symbols to obtain the ask prices for.
 
-    def get_assets_historical_closes(self, start_dt, end_dt, assets):
+        Returns
+        -------
+        `np.ndarray`
+            The ask prices aligned to the assets, with NaN for any asset
+            not in the data source or prior to its first available price.
+        """
+        return self.ask_panel.gather(timestamp_to_ns(dt), assets)
+
+    def get_bids_at(self, timestamps, assets):
+        """
+        Obtain the bid prices of multiple assets at each of the provided
+        timestamps.
+
+        Parameters
+        ----------
+        timestamps : `np.ndarray`
+            The int64 nanosecond timestamps to obtain the bid prices for.
+        assets : `list[str]`
+            The asset symbols to obtain the bid prices for.
+
+        Returns
+        -------
+        `np.ndarray`
+            The bid prices with a row per timestamp and a column per
+            asset, with NaN for any asset not in the data source or
+            prior to its first available price.
+        """
+        return self.bid_panel.gather_rows(timestamps, assets)
+
+    def get_asks_at(self, timestamps, assets):
+        """
+        Obtain the ask prices of multiple assets at each of the provided
+        timestamps.
+
+        Parameters
+        ----------
+        timestamps : `np.ndarray`
+            The int64 nanosecond timestamps to obtain the ask prices for.
+        assets : `list[str]`
+            The asset symbols to obtain the ask prices for.
+
+        Returns
+        -------
+        `np.ndarray`
+            The ask prices with a row per timestamp and a column per
+            asset, with NaN for any asset not in the data source or
+            prior to its first available price.
+        """
+        return self.ask_panel.gather_rows(timestamps, assets)
+
+    def get_assets_historical_closes(self, start_dt, end_dt, assets, adjusted=False):
         """
         Obtain a multi-asset historical range of closing prices as a DataFrame,
         indexed by timestamp with asset symbols as columns.
 
+        The range is sliced from the pre-aligned closing price panel, so
+        the cost is proportional to the size of the range. Where possible
+        the returned DataFrame is a read-only view onto the panel.
+
         Parameters
         ----------
         start_dt : `pd.Timestamp`
@@ -260,19 +1104,35 @@ class CSVDailyBarDataSource(object):
             The ending datetime of the range to obtain.
         assets : `list[str]`
             The list of asset symbols to obtain closing prices for.
+        adjusted : `Boolean`, optional
+            Whether to obtain the adjusted closing prices.
 
         Returns
         -------
         `pd.DataFrame`
             The multi-asset closing prices DataFrame.
         """
-        close_series = []
-        for asset in assets:
-            if asset in self.asset_bar_frames.keys():
-                asset_close_prices = self.asset_bar_frames[asset][['Close']]
-                asset_close_prices.columns = [asset]
-                close_series.append(asset_close_prices)
+        column = 'Adj Close' if adjusted else 'Close'
+        if column not in self.close_panels:
+            raise ValueError(
+                "Unable to locate '%s' pricing column in CSV data files. "
+                "Cannot obtain historical closing prices." % column
+            )
+        timestamps, values, present_assets = self.close_panels[column].window(
+            timestamp_to_ns(start_dt), timestamp_to_ns(end_dt), assets
+        )
+
+        # Remove any timestamps where none of the assets are listed
+        all_nan = np.isnan(values).all(axis=1)
+        if all_nan.any():
+            timestamps = timestamps[~all_nan]
+            values = values[~all_nan]
 
-        prices_df = pd.concat(close_series, axis=1).dropna(how='all')
-        prices_df = prices_df.loc[start_dt:end_dt]
-        return prices_df
+        return pd.DataFrame(
+            values,
+            index=pd.DatetimeIndex(
+                pd.to_datetime(timestamps, unit='ns', utc=True), name='Date'
+            ),
+            columns=present_assets,
+            copy=False
+        )
@@ -0,0 +1,55 @@
+import numpy as np
+
+from qstrader.data.panel_source import PanelPriceDataSource
+from qstrader.data.price_panel import PricePanel
+
+
+class InMemoryPriceDataSource(PanelPriceDataSource):
+    """
+    Encapsulates querying of a timestamp by asset array of prices held
+    in memory, such as a synthetically generated price path, without
+    reading or writing any files.
+
+    The prices are queried identically to those of a wide CSV file, via
+    the shared PanelPriceDataSource base class, with leading NaN prices
+    preserved and later gaps forward-filled for the
+    bid/ask prices, which are both equal to the single price.
+
+    Parameters
+    ----------
+    timestamps : `np.ndarray` or `pd.DatetimeIndex`
+        The sorted, unique (UTC) timestamps of the price rows.
+    assets : `list[str]`
+        The asset symbols of the price columns.
+    prices : `np.ndarray`
+        The float64 prices of shape (len(timestamps), len(assets)).
+    asset_type : `str`, optional
+        The asset type that the price data is for.
+        TODO: Unused at this stage.
+    timestamp_offset : `pd.Timedelta`, optional
+        An optional offset added to each timestamp of the prices,
+        representing when the price becomes available.
+    """
+
+    def __init__(
+        self,
+        timestamps,
+        assets,
+        prices,
+        asset_type=None,
+        timestamp_offset=None
+    ):
+        timestamps = np.asarray(timestamps, dtype='datetime64[ns]').astype(np.int64)
+        prices = np.asarray(prices, dtype=np.float64)
+        if prices.shape != (len(timestamps), len(assets)):
+            raise ValueError(
+                "In-memory prices of shape %s do not match the %s timestamps "
+                "and %s assets provided." % (prices.shape, len(timestamps), len(assets))
+            )
+        values = np.full((len(timestamps), len(assets) + 1), np.nan)
+        values[:, :-1] = prices
+        super().__init__(
+            PricePanel(timestamps, assets, values),
+            asset_type=asset_type,
+            timestamp_offset=timestamp_offset
+        )
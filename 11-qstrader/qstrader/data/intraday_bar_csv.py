@@ -0,0 +1,590 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import csv
+import os
+import weakref
+
+import numpy as np
+import pandas as pd
+from qstrader import settings
+from qstrader.data.bar_conversion import interleave_open_close
+from qstrader.data.price_cursor import AssetPriceCursor, timestamp_to_ns
+from qstrader.data.price_panel import PricePanel
+
+
+# Default number of bars read from a CSV file per chunk
+DEFAULT_CHUNK_SIZE = 100000
+
+# Default number of most recent chunks retained in memory per asset
+DEFAULT_MAX_CHUNKS = 2
+
+# Number of bytes read from the end of a CSV file to locate its final bar
+TAIL_BYTES = 4096
+
+
+class IntradayBarStream(object):
+    """
+    Streams the bars of a single asset's CSV file in fixed-size chunks,
+    retaining only a sliding window of the most recent chunks in memory.
+
+    The next chunk is always read and converted on a background thread
+    while the current chunks are being queried. Each chunk is converted
+    into individually-timestamped prices, where the opening price of a
+    bar is available at the bar timestamp and the closing price at the
+    bar timestamp plus the bar frequency.
+
+    The bars within the CSV file must be sorted by timestamp. Queries
+    are expected to move forward in time, as with a simulation. Queries
+    prior to the retained window raise a ValueError.
+
+    Parameters
+    ----------
+    csv_path : `str`
+        The full path to the CSV file.
+    frequency : `int`
+        The bar frequency in nanoseconds.
+    executor : `concurrent.futures.Executor`
+        The executor used to read chunks in the background.
+    chunk_size : `int`, optional
+        The number of bars per chunk.
+    max_chunks : `int`, optional
+        The number of most recent chunks to retain in memory.
+    date_column : `str`, optional
+        The name of the bar timestamp column.
+    open_column : `str`, optional
+        The name of the opening price column.
+    close_column : `str`, optional
+        The name of the closing price column.
+    timestamp_unit : `str`, optional
+        The unit of numeric epoch bar timestamps, e.g. 'ms'. Defaults
+        to parsing the timestamps as (UTC) datetime strings.
+    """
+
+    def __init__(
+        self,
+        csv_path,
+        frequency,
+        executor,
+        chunk_size=DEFAULT_CHUNK_SIZE,
+        max_chunks=DEFAULT_MAX_CHUNKS,
+        date_column='Date',
+        open_column='Open',
+        close_column='Close',
+        timestamp_unit=None
+    ):
+        if max_chunks < 1:
+            raise ValueError(
+                "Number of retained chunks must be at least one, "
+                "but %s was provided." % max_chunks
+            )
+        self.csv_path = csv_path
+        self.frequency = frequency
+        self.executor = executor
+        self.chunk_size = chunk_size
+        self.max_chunks = max_chunks
+        self.date_column = date_column
+        self.open_column = open_column
+        self.close_column = close_column
+        self.timestamp_unit = timestamp_unit
+
+        self.chunks = deque()
+        self.chunks_read = 0
+        self.exhausted = False
+        self.evicted = False
+        self.first_ts = None
+        self._last_bar_ts = None
+        self._last_price = np.nan
+        self._reader = pd.read_csv(
+            csv_path,
+            usecols=[date_column, open_column, close_column],
+            chunksize=chunk_size
+        )
+        self._pending = self.executor.submit(self._read_chunk)
+
+    def close(self):
+        """
+        Close the CSV file, once any chunk being read in the background
+        has been read.
+        """
+        if self._pending is not None and not self._pending.cancel():
+            self._pending.exception()
+        self._reader.close()
+
+    def _parse_timestamps(self, values):
+        """
+        Parse bar timestamps into int64 nanoseconds since the UTC epoch.
+
+        Parameters
+        ----------
+        values : `array-like`
+            The raw bar timestamps.
+
+        Returns
+        -------
+        `np.ndarray`
+            The int64 nanosecond timestamps.
+        """
+        if self.timestamp_unit is not None:
+            timestamps = pd.to_datetime(values, unit=self.timestamp_unit, utc=True)
+        else:
+            timestamps = pd.to_datetime(values, utc=True)
+        return pd.DatetimeIndex(timestamps).as_unit('ns').asi8
+
+    def _read_chunk(self):
+        """
+        Read and convert the next chunk of bars. Executed on the
+        background thread, with at most one chunk read at a time.
+
+        Returns
+        -------
+        `dict` or None
+            The chunk's bar timestamps, closing prices and price cursor,
+            or None if the CSV file has been entirely read.
+        """
+        try:
+            bar_df = next(self._reader)
+        except StopIteration:
+            self._reader.close()
+            return None
+
+        bar_ts = self._parse_timestamps(bar_df[self.date_column])
+        if np.any(bar_ts[1:] < bar_ts[:-1]) or (
+            self._last_bar_ts is not None and bar_ts[0] < self._last_bar_ts
+        ):
+            raise ValueError(
+                "Bars within CSV file '%s' are not sorted by timestamp. "
+                "Unable to stream the file." % self.csv_path
+            )
+        closes = bar_df[self.close_column].to_numpy(dtype=np.float64)
+        timestamps, prices = interleave_open_close(
+            bar_ts, bar_df[self.open_column].to_numpy(dtype=np.float64), closes,
+            open_offset=0, close_offset=self.frequency
+        )
+
+        # Carry the final price of the previous chunk across any
+        # missing prices at the start of this chunk
+        missing = np.isnan(prices)
+        if missing[0]:
+            num_leading = len(prices) if missing.all() else np.argmin(missing)
+            prices[:num_leading] = self._last_price
+
+        return {
+            'bar_ts': bar_ts,
+            'closes': closes,
+            'cursor': AssetPriceCursor(timestamps, prices, prices)
+        }
+
+    def _advance(self):
+        """
+        Append the prefetched chunk to the retained window, evicting the
+        oldest chunk if necessary, and begin prefetching the next chunk.
+
+        Returns
+        -------
+        `Boolean`
+            Whether a further chunk was available.
+        """
+        chunk = self._pending.result()
+        self._pending = None
+        if chunk is None:
+            self.exhausted = True
+            return False
+
+        self.chunks.append(chunk)
+        self.chunks_read += 1
+        if self.first_ts is None:
+            self.first_ts = chunk['cursor'].timestamps[0]
+        if len(self.chunks) > self.max_chunks:
+            self.chunks.popleft()
+            self.evicted = True
+
+        self._last_bar_ts = chunk['bar_ts'][-1]
+        self._last_price = chunk['cursor'].bids[-1]
+        self._pending = self.executor.submit(self._read_chunk)
+        return True
+
+    def _ensure(self, ts):
+        """
+        Read chunks until the retained window contains all of the
+        prices at or before the provided time.
+
+        Parameters
+        ----------
+        ts : `int`
+            The time in nanoseconds since the UTC epoch.
+        """
+        while not self.exhausted and (
+            len(self.chunks) == 0 or self.chunks[-1]['cursor'].timestamps[-1] <= ts
+        ):
+            self._advance()
+
+    def price(self, ts):
+        """
+        Obtain the latest price at or before the provided time.
+
+        Parameters
+        ----------
+        ts : `int`
+            The query time in nanoseconds since the UTC epoch.
+
+        Returns
+        -------
+        `float`
+            The price, or NaN prior to the first price of the file.
+        """
+        self._ensure(ts)
+        for chunk in reversed(self.chunks):
+            cursor = chunk['cursor']
+            if cursor.timestamps[0] <= ts:
+                return cursor.bid(ts)
+        if self.evicted:
+            raise ValueError(
+                "Unable to obtain price at '%s' for CSV file '%s' as it is "
+                "prior to the retained window of chunks. Increase max_chunks." % (
+                    pd.Timestamp(ts, tz='UTC'), self.csv_path
+                )
+            )
+        return np.nan
+
+    def closes(self, start_ts, end_ts):
+        """
+        Obtain the closing prices of the bars with timestamps at or
+        after the starting time, whose closing prices are available
+        (at the bar timestamp plus the bar frequency) at or before the
+        ending time.
+
+        Parameters
+        ----------
+        start_ts : `int`
+            The starting time in nanoseconds since the UTC epoch.
+        end_ts : `int`
+            The ending time in nanoseconds since the UTC epoch.
+
+        Returns
+        -------
+        `tuple(np.ndarray, np.ndarray)`
+            The bar timestamps and closing prices.
+        """
+        self._ensure(end_ts)
+        if self.evicted and start_ts < self.chunks[0]['bar_ts'][0]:
+            raise ValueError(
+                "Unable to obtain closing prices from '%s' for CSV file '%s' as "
+                "it is prior to the retained window of chunks. Increase "
+                "max_chunks." % (pd.Timestamp(start_ts, tz='UTC'), self.csv_path)
+            )
+        if len(self.chunks) == 0:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.float64)
+
+        bar_ts = np.concatenate([chunk['bar_ts'] for chunk in self.chunks])
+        closes = np.concatenate([chunk['closes'] for chunk in self.chunks])
+        start = np.searchsorted(bar_ts, start_ts, side='left')
+        end = np.searchsorted(bar_ts, end_ts - self.frequency, side='right')
+        return bar_ts[start:end], closes[start:end]
+
+    def _read_last_bar_timestamp(self):
+        """
+        Obtain the final bar timestamp of the CSV file by reading only
+        its header and final line, each parsed as a CSV row such that
+        quoted fields and CRLF line endings are supported.
+
+        Returns
+        -------
+        `int` or None
+            The nanosecond timestamp, or None if the file has no bars.
+        """
+        with open(self.csv_path, 'rb') as csv_file:
+            header_line = csv_file.readline()
+            csv_file.seek(0, os.SEEK_END)
+            size = csv_file.tell()
+            csv_file.seek(max(len(header_line), size - TAIL_BYTES))
+            lines = [line for line in csv_file.read().decode().splitlines() if line.strip()]
+        if len(lines) == 0:
+            return None
+        header = next(csv.reader([header_line.decode().strip()]))
+        row = next(csv.reader([lines[-1]]))
+        value = row[header.index(self.date_column)].strip()
+        if self.timestamp_unit is not None:
+            value = float(value)
+        return self._parse_timestamps([value])[0]
+
+    def coverage(self):
+        """
+        Obtain the first and last price timestamps of the CSV file,
+        without reading the whole file.
+
+        Returns
+        -------
+        `tuple(int, int)` or None
+            The nanosecond timestamps, or None if the file has no bars.
+        """
+        if self.chunks_read == 0:
+            self._ensure(np.iinfo(np.int64).min)
+        if self.first_ts is None:
+            return None
+        return self.first_ts, self._read_last_bar_timestamp() + self.frequency
+
+
+def _close_streams(executor, asset_streams):
+    """
+    Stop the background prefetching thread of a data source and close
+    the CSV files of its bar streams.
+
+    Parameters
+    ----------
+    executor : `concurrent.futures.Executor`
+        The executor reading chunks in the background.
+    asset_streams : `list[IntradayBarStream]`
+        The bar streams.
+    """
+    for stream in asset_streams:
+        stream.close()
+    executor.shutdown(wait=True)
+
+
+class CSVIntradayBarDataSource(object):
+    """
+    Encapsulates streaming and querying of CSV files of intraday 'bar'
+    OHLCV data at an arbitrary frequency, such as one minute or one hour
+    cryptocurrency bars, in bounded memory.
+
+    Each asset's CSV file is read in fixed-size chunks, retaining only a
+    sliding window of the most recent chunks in memory, while the next
+    chunk of each file is read on a background thread.
+
+    Parameters
+    ----------
+    csv_dir : `str`
+        The full path to the directory where the CSV files are located.
+    asset_type : `str`
+        The asset type that the price/volume data is for.
+        TODO: Unused at this stage.
+    frequency : `str` or `pd.Timedelta`
+        The bar frequency, e.g. '1min' or '1h'.
+    csv_symbols : `list`, optional
+        An optional list of CSV symbols to restrict the data source to.
+        The alternative is to stream all CSVs found within the
+        provided directory.
+    chunk_size : `int`, optional
+        The number of bars per chunk.
+    max_chunks : `int`, optional
+        The number of most recent chunks to retain in memory per asset,
+        which must cover the longest historical range queried.
+    symbol_format : `str`, optional
+        The format string used to map each CSV symbol into the
+        QSTrader symbology of the asset, e.g. 'CRYPTO:%s'.
+    date_column : `str`, optional
+        The name of the bar timestamp column.
+    open_column : `str`, optional
+        The name of the opening price column.
+    close_column : `str`, optional
+        The name of the closing price column.
+    timestamp_unit : `str`, optional
+        The unit of numeric epoch bar timestamps, e.g. 'ms'. Defaults
+        to parsing the timestamps as (UTC) datetime strings.
+    """
+
+    def __init__(
+        self,
+        csv_dir,
+        asset_type,
+        frequency,
+        csv_symbols=None,
+        chunk_size=DEFAULT_CHUNK_SIZE,
+        max_chunks=DEFAULT_MAX_CHUNKS,
+        symbol_format='%s',
+        date_column='Date',
+        open_column='Open',
+        close_column='Close',
+        timestamp_unit=None
+    ):
+        self.csv_dir = csv_dir
+        self.asset_type = asset_type
+        self.frequency = pd.Timedelta(frequency).value
+        self.csv_symbols = csv_symbols
+        self.chunk_size = chunk_size
+        self.max_chunks = max_chunks
+        self.symbol_format = symbol_format
+        self.date_column = date_column
+        self.open_column = open_column
+        self.close_column = close_column
+        self.timestamp_unit = timestamp_unit
+
+        self.executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix='qstrader-csv-prefetch'
+        )
+        self.asset_streams = self._create_asset_streams()
+
+        # Releases the prefetching thread and the open CSV files when
+        # the data source is closed or garbage collected
+        self._finalizer = weakref.finalize(
+            self, _close_streams, self.executor, list(self.asset_streams.values())
+        )
+
+    def _obtain_csv_files_to_load(self):
+        """
+        Obtain the list of CSV filenames to stream, either from the
+        restricted list of CSV symbols or the full CSV directory.
+
+        Returns
+        -------
+        `list[str]`
+            The list of CSV filenames to stream.
+        """
+        if self.csv_symbols is not None:
+            return ['%s.csv' % symbol for symbol in self.csv_symbols]
+        return sorted(
+            file for file in os.listdir(self.csv_dir)
+            if file.endswith('.csv')
+        )
+
+    def _create_asset_streams(self):
+        """
+        Create a chunked bar stream for each CSV file, which begins
+        reading its first chunk in the background.
+
+        Returns
+        -------
+        `dict{str: IntradayBarStream}`
+            The asset-symbol keyed dictionary of bar streams.
+        """
+        asset_streams = {}
+        for csv_file in self._obtain_csv_files_to_load():
+            asset_symbol = self.symbol_format % csv_file.replace('.csv', '')
+            if settings.PRINT_EVENTS:
+                print("Streaming CSV file for symbol '%s'..." % asset_symbol)
+            asset_streams[asset_symbol] = IntradayBarStream(
+                os.path.join(self.csv_dir, csv_file),
+                self.frequency,
+                self.executor,
+                chunk_size=self.chunk_size,
+                max_chunks=self.max_chunks,
+                date_column=self.date_column,
+                open_column=self.open_column,
+                close_column=self.close_column,
+                timestamp_unit=self.timestamp_unit
+            )
+        return asset_streams
+
+    def close(self):
+        """
+        Stop the background prefetching thread and close the CSV files.
+        Also carried out when the data source is garbage collected.
+        """
+        self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def get_assets_coverage(self):
+        """
+        Obtain the assets within the data source along with the first
+        and last timestamps of their prices.
+
+        Returns
+        -------
+        `dict{str: tuple(pd.Timestamp, pd.Timestamp)}`
+            The asset-symbol keyed coverage, with (None, None) for any
+            asset lacking prices.
+        """
+        coverage = {}
+        for asset_symbol, stream in self.asset_streams.items():
+            asset_coverage = stream.coverage()
+            if asset_coverage is None:
+                coverage[asset_symbol] = (None, None)
+            else:
+                coverage[asset_symbol] = (
+                    pd.Timestamp(asset_coverage[0], tz='UTC'),
+                    pd.Timestamp(asset_coverage[1], tz='UTC')
+                )
+        return coverage
+
+    def get_bid(self, dt, asset):
+        """
+        Obtain the bid price of an asset at the provided timestamp.
+
+        Parameters
+        ----------
+        dt : `pd.Timestamp`
+            When to obtain the bid price for.
+        asset : `str`
+            The asset symbol to obtain the bid price for.
+
+        Returns
+        -------
+        `float`
+            The bid price, or NaN if prior to the first available price.
+        """
+        return self.asset_streams[asset].price(timestamp_to_ns(dt))
+
+    def get_ask(self, dt, asset):
+        """
+        Obtain the ask price of an asset at the provided timestamp.
+
+        Parameters
+        ----------
+        dt : `pd.Timestamp`
+            When to obtain the ask price for.
+        asset : `str`
+            The asset symbol to obtain the ask price for.
+
+        Returns
+        -------
+        `float`
+            The ask price, or NaN if prior to the first available price.
+        """
+        return self.asset_streams[asset].price(timestamp_to_ns(dt))
+
+    def get_assets_historical_closes(self, start_dt, end_dt, assets, adjusted=False):
+        """
+        Obtain a multi-asset historical range of closing prices as a DataFrame,
+        indexed by bar timestamp with asset symbols as columns.
+
+        Only those bars that have closed by the ending datetime are
+        included, such that the closing price of the bar opening at the
+        ending datetime is not yet available, as with the bid/ask prices.
+        The range must lie within the retained window of chunks.
+
+        Parameters
+        ----------
+        start_dt : `pd.Timestamp`
+            The starting datetime of the range to obtain.
+        end_dt : `pd.Timestamp`
+            The ending datetime of the range to obtain.
+        assets : `list[str]`
+            The list of asset symbols to obtain closing prices for.
+        adjusted : `Boolean`, optional
+            Unused, as intraday bars are not adjusted.
+
+        Returns
+        -------
+        `pd.DataFrame`
+            The multi-asset closing prices DataFrame.
+        """
+        start_ts = timestamp_to_ns(start_dt)
+        end_ts = timestamp_to_ns(end_dt)
+        panel = PricePanel.from_series(
+            {
+                asset: self.asset_streams[asset].closes(start_ts, end_ts)
+                for asset in assets if asset in self.asset_streams
+            }
+        )
+        timestamps = panel.timestamps
+        values = panel.values[:, :-1]
+
+        # Remove any timestamps where none of the assets have a price
+        all_nan = np.isnan(values).all(axis=1)
+        if all_nan.any():
+            timestamps = timestamps[~all_nan]
+            values = values[~all_nan]
+
+        return pd.DataFrame(
+            values,
+            index=pd.DatetimeIndex(
+                pd.to_datetime(timestamps, unit='ns', utc=True), name='Date'
+            ),
+            columns=panel.assets,
+            copy=False
+        )
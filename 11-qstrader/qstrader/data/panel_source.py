@@ -0,0 +1,312 @@
+import numpy as np
+import pandas as pd
+from qstrader.data.price_cursor import timestamp_to_ns
+from qstrader.data.price_panel import PricePanel
+
+
+class PanelPriceDataSource(object):
+    """
+    Base class of data sources serving a single price per asset and
+    timestamp from a timestamp by asset panel of closing prices, such
+    as those read from a wide CSV file or held in memory.
+
+    Assets listed part way through the panel have leading NaN prices,
+    which are preserved such that no price is available prior to
+    listing, while any later gaps are forward-filled for the bid/ask
+    prices. As only a single price is available per timestamp both the
+    bid and ask are equal to it.
+
+    Parameters
+    ----------
+    close_panel : `PricePanel`
+        The unfilled closing price panel.
+    asset_type : `str`, optional
+        The asset type that the price data is for.
+        TODO: Unused at this stage.
+    timestamp_offset : `pd.Timedelta`, optional
+        An optional offset added to each timestamp of the prices, for
+        both the bid/ask and historical closing prices, representing
+        when the price becomes available.
+    """
+
+    def __init__(self, close_panel, asset_type=None, timestamp_offset=None):
+        self.asset_type = asset_type
+        self.timestamp_offset = timestamp_offset
+        self.close_panel = self._offset_panel(close_panel)
+        self.price_panel = self._create_price_panel()
+
+    def _offset_panel(self, panel):
+        """
+        Add any timestamp offset to the timestamps of a panel of prices,
+        such that each price is timestamped when it becomes available.
+
+        Parameters
+        ----------
+        panel : `PricePanel`
+            The panel of prices.
+
+        Returns
+        -------
+        `PricePanel`
+            The time-offset panel of prices.
+        """
+        if self.timestamp_offset is None:
+            return panel
+        return PricePanel(
+            panel.timestamps + pd.Timedelta(self.timestamp_offset).value,
+            panel.assets, panel.values
+        )
+
+    def _create_price_panel(self):
+        """
+        Create the forward-filled panel of prices used for the latest
+        bid/ask queries. Prices prior to each asset's first listed
+        price remain NaN.
+
+        Returns
+        -------
+        `PricePanel`
+            The bid/ask price panel.
+        """
+        return self.close_panel.forward_filled()
+
+    @property
+    def assets(self):
+        """
+        The asset symbols available within the data source.
+
+        Returns
+        -------
+        `list[str]`
+            The asset symbols.
+        """
+        return self.close_panel.assets
+
+    def get_assets_coverage(self):
+        """
+        Obtain the assets within the data source along with the first
+        and last timestamps of their bid/ask prices.
+
+        Returns
+        -------
+        `dict{str: tuple(pd.Timestamp, pd.Timestamp)}`
+            The asset-symbol keyed coverage, with (None, None) for any
+            asset lacking prices.
+        """
+        timestamps = self.price_panel.timestamps
+        if len(timestamps) == 0:
+            return {asset_symbol: (None, None) for asset_symbol in self.assets}
+        valid = ~np.isnan(self.close_panel.values[:, :-1])
+        listed = valid.any(axis=0)
+        first = valid.argmax(axis=0)
+        last = len(timestamps) - 1 - valid[::-1].argmax(axis=0)
+
+        coverage = {}
+        for col, asset_symbol in enumerate(self.assets):
+            if listed[col]:
+                coverage[asset_symbol] = (
+                    pd.Timestamp(timestamps[first[col]], tz='UTC'),
+                    pd.Timestamp(timestamps[last[col]], tz='UTC')
+                )
+            else:
+                coverage[asset_symbol] = (None, None)
+        return coverage
+
+    def get_update_timestamps(self):
+        """
+        Obtain the timestamps at which any asset within the data source
+        has a new price, such that a simulation clock can skip those
+        instants at which no prices change.
+
+        Returns
+        -------
+        `np.ndarray`
+            The sorted, unique int64 nanosecond timestamps.
+        """
+        valid = ~np.isnan(self.close_panel.values[:, :-1])
+        return self.price_panel.timestamps[valid.any(axis=1)]
+
+    def _get_price(self, dt, asset):
+        """
+        Obtain the latest price of an asset at or before the provided
+        timestamp.
+
+        Parameters
+        ----------
+        dt : `pd.Timestamp`
+            When to obtain the price for.
+        asset : `str`
+            The asset symbol to obtain the price for.
+
+        Returns
+        -------
+        `float`
+            The price, or NaN if prior to the first available price.
+        """
+        col = self.price_panel.asset_index[asset]
+        pos = self.price_panel.row_position(timestamp_to_ns(dt))
+        if pos < 0:
+            return np.nan
+        return self.price_panel.values[pos, col]
+
+    def get_bid(self, dt, asset):
+        """
+        Obtain the bid price of an asset at the provided timestamp.
+
+        Parameters
+        ----------
+        dt : `pd.Timestamp`
+            When to obtain the bid price for.
+        asset : `str`
+            The asset symbol to obtain the bid price for.
+
+        Returns
+        -------
+        `float`
+            The bid price, or NaN if prior to the first available price.
+        """
+        return self._get_price(dt, asset)
+
+    def get_ask(self, dt, asset):
+        """
+        Obtain the ask price of an asset at the provided timestamp.
+
+        Parameters
+        ----------
+        dt : `pd.Timestamp`
+            When to obtain the ask price for.
+        asset : `str`
+            The asset symbol to obtain the ask price for.
+
+        Returns
+        -------
+        `float`
+            The ask price, or NaN if prior to the first available price.
+        """
+        return self._get_price(dt, asset)
+
+    def get_bids(self, dt, assets):
+        """
+        Obtain the bid prices of multiple assets at the provided timestamp.
+
+        Parameters
+        ----------
+        dt : `pd.Timestamp`
+            When to obtain the bid prices for.
+        assets : `list[str]`
+            The asset symbols to obtain the bid prices for.
+
+        Returns
+        -------
+        `np.ndarray`
+            The bid prices aligned to the assets, with NaN for any asset
+            not in the data source or prior to its first available price.
+        """
+        return self.price_panel.gather(timestamp_to_ns(dt), assets)
+
+    def get_asks(self, dt, assets):
+        """
+        Obtain the ask prices of multiple assets at the provided timestamp.
+
+        Parameters
+        ----------
+        dt : `pd.Timestamp`
+            When to obtain the ask prices for.
+        assets : `list[str]`
+            The asset symbols to obtain the ask prices for.
+
+        Returns
+        -------
+        `np.ndarray`
+            The ask prices aligned to the assets, with NaN for any asset
+            not in the data source or prior to its first available price.
+        """
+        return self.price_panel.gather(timestamp_to_ns(dt), assets)
+
+    def get_bids_at(self, timestamps, assets):
+        """
+        Obtain the bid prices of multiple assets at each of the provided
+        timestamps.
+
+        Parameters
+        ----------
+        timestamps : `np.ndarray`
+            The int64 nanosecond timestamps to obtain the bid prices for.
+        assets : `list[str]`
+            The asset symbols to obtain the bid prices for.
+
+        Returns
+        -------
+        `np.ndarray`
+            The bid prices with a row per timestamp and a column per
+            asset, with NaN for any asset not in the data source or
+            prior to its first available price.
+        """
+        return self.price_panel.gather_rows(timestamps, assets)
+
+    def get_asks_at(self, timestamps, assets):
+        """
+        Obtain the ask prices of multiple assets at each of the provided
+        timestamps.
+
+        Parameters
+        ----------
+        timestamps : `np.ndarray`
+            The int64 nanosecond timestamps to obtain the ask prices for.
+        assets : `list[str]`
+            The asset symbols to obtain the ask prices for.
+
+        Returns
+        -------
+        `np.ndarray`
+            The ask prices with a row per timestamp and a column per
+            asset, with NaN for any asset not in the data source or
+            prior to its first available price.
+        """
+        return self.price_panel.gather_rows(timestamps, assets)
+
+    def get_assets_historical_closes(self, start_dt, end_dt, assets, adjusted=False):
+        """
+        Obtain a multi-asset historical range of closing prices as a DataFrame,
+        indexed by timestamp with asset symbols as columns.
+
+        The range is sliced directly from the closing price panel,
+        timestamped identically to the bid/ask prices including any
+        timestamp offset. Rows where none of the requested assets have
+        a price are removed.
+
+        Parameters
+        ----------
+        start_dt : `pd.Timestamp`
+            The starting datetime of the range to obtain.
+        end_dt : `pd.Timestamp`
+            The ending datetime of the range to obtain.
+        assets : `list[str]`
+            The list of asset symbols to obtain closing prices for.
+        adjusted : `Boolean`, optional
+            Unused, as the panel provides a single price per
+            asset, which is assumed to be adjusted if required.
+
+        Returns
+        -------
+        `pd.DataFrame`
+            The multi-asset closing prices DataFrame.
+        """
+        timestamps, values, present_assets = self.close_panel.window(
+            timestamp_to_ns(start_dt), timestamp_to_ns(end_dt), assets
+        )
+
+        # Remove any timestamps where none of the assets are listed
+        all_nan = np.isnan(values).all(axis=1)
+        if all_nan.any():
+            timestamps = timestamps[~all_nan]
+            values = values[~all_nan]
+
+        return pd.DataFrame(
+            values,
+            index=pd.DatetimeIndex(
+                pd.to_datetime(timestamps, unit='ns', utc=True), name='Date'
+            ),
+            columns=present_assets,
+            copy=False
+        )
@@ -0,0 +1,226 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+
+CACHE_FORMAT_VERSION = 1
+
+
+class BinaryPriceCache(object):
+    """
+    A directory of compiled, memory-mappable binary price arrays
+    used to avoid re-parsing CSV files of pricing data on every
+    backtest start.
+
+    Each cache entry is keyed by a string (e.g. a symbol) and is
+    associated with a single source file. An entry consists of a
+    set of NumPy '.npy' arrays (int64 nanosecond timestamps and
+    float64 price/volume columns) along with a JSON metadata file
+    that records the source file modification time, size and
+    content hash, as well as arbitrary column information.
+
+    An entry is considered valid if the source file modification
+    time and size are unchanged. If the modification time has
+    changed the content hash is recomputed and the entry is still
+    reused if the contents are identical. Otherwise the entry is
+    treated as a miss and must be rebuilt.
+
+    Parameters
+    ----------
+    cache_dir : `str`
+        The full path to the directory where the cache is stored.
+        It is created if it does not yet exist.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def _hash_file(path, block_size=1024 * 1024):
+        """
+        Calculate the content hash of a file.
+
+        Parameters
+        ----------
+        path : `str`
+            The full path to the file.
+        block_size : `int`, optional
+            The number of bytes to read per block.
+
+        Returns
+        -------
+        `str`
+            The hexadecimal digest of the file contents.
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(block_size), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def _meta_path(self, key):
+        return os.path.join(self.cache_dir, '%s.json' % key)
+
+    def _array_path(self, key, name):
+        return os.path.join(self.cache_dir, '%s.%s.npy' % (key, name))
+
+    def _read_meta(self, key):
+        """
+        Read the metadata of a cache entry if it exists.
+
+        Parameters
+        ----------
+        key : `str`
+            The cache entry key.
+
+        Returns
+        -------
+        `dict` or None
+            The metadata dictionary, or None if unavailable.
+        """
+        try:
+            with open(self._meta_path(key), 'r') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if meta.get('version') != CACHE_FORMAT_VERSION:
+            return None
+        return meta
+
+    def _write_meta(self, key, meta):
+        """
+        Atomically write the metadata of a cache entry.
+
+        Parameters
+        ----------
+        key : `str`
+            The cache entry key.
+        meta : `dict`
+            The metadata dictionary.
+        """
+        meta_path = self._meta_path(key)
+        tmp_path = '%s.tmp' % meta_path
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+
+    def _is_valid(self, key, meta, source_path):
+        """
+        Determine whether a cache entry is still valid for
+        the current state of its source file, refreshing the
+        stored modification time if only the mtime has changed.
+
+        Parameters
+        ----------
+        key : `str`
+            The cache entry key.
+        meta : `dict`
+            The metadata dictionary of the cache entry.
+        source_path : `str`
+            The full path to the source file.
+
+        Returns
+        -------
+        `Boolean`
+            Whether the cache entry can be reused.
+        """
+        try:
+            stat = os.stat(source_path)
+        except OSError:
+            return False
+        if (
+            meta['source_mtime_ns'] == stat.st_mtime_ns and
+            meta['source_size'] == stat.st_size
+        ):
+            return True
+        if meta['source_size'] != stat.st_size:
+            return False
+
+        # Modification time has changed, e.g. due to a fresh
+        # checkout, so fall back to comparing the contents
+        if self._hash_file(source_path) != meta['source_hash']:
+            return False
+        meta['source_mtime_ns'] = stat.st_mtime_ns
+        self._write_meta(key, meta)
+        return True
+
+    def get(self, key, source_path):
+        """
+        Obtain a cache entry as read-only memory-mapped arrays.
+
+        Parameters
+        ----------
+        key : `str`
+            The cache entry key.
+        source_path : `str`
+            The full path to the source file of the entry.
+
+        Returns
+        -------
+        `tuple(dict{str: np.memmap}, dict)` or None
+            The memory-mapped arrays keyed by name and the
+            entry's stored information, or None on a miss.
+        """
+        meta = self._read_meta(key)
+        if meta is None or not self._is_valid(key, meta, source_path):
+            self.misses += 1
+            return None
+        try:
+            arrays = {
+                name: np.load(self._array_path(key, name), mmap_mode='r')
+                for name in meta['arrays']
+            }
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return arrays, meta['info']
+
+    def put(self, key, source_path, arrays, info=None):
+        """
+        Write a cache entry for the provided source file.
+
+        The arrays are written before the metadata so that an
+        interrupted write never produces a valid-looking entry.
+
+        Parameters
+        ----------
+        key : `str`
+            The cache entry key.
+        source_path : `str`
+            The full path to the source file of the entry.
+        arrays : `dict{str: np.ndarray}`
+            The arrays to store keyed by name.
+        info : `dict`, optional
+            Any JSON-serialisable information to store alongside
+            the arrays, such as column names.
+        """
+        stat = os.stat(source_path)
+        for name, arr in arrays.items():
+            array_path = self._array_path(key, name)
+            tmp_path = '%s.tmp.npy' % array_path[:-len('.npy')]
+            np.save(tmp_path, np.ascontiguousarray(arr))
+            os.replace(tmp_path, array_path)
+
+        self._write_meta(
+            key, {
+                'version': CACHE_FORMAT_VERSION,
+                'source_mtime_ns': stat.st_mtime_ns,
+                'source_size': stat.st_size,
+                'source_hash': self._hash_file(source_path),
+                'arrays': sorted(arrays.keys()),
+                'info': info if info is not None else {}
+            }
+        )
+
+    def clear_counts(self):
+        """
+        Reset the cache hit and miss counts.
+        """
+        self.hits = 0
+        self.misses = 0
@@ -0,0 +1,134 @@
+import numpy as np
+import pandas as pd
+
+
+# Number of timestamps to step through linearly before
+# falling back to a binary search of the remaining timestamps
+MAX_LINEAR_STEPS = 8
+
+
+def timestamp_to_ns(dt):
+    """
+    Convert a timestamp into integer nanoseconds since the UTC epoch.
+
+    Parameters
+    ----------
+    dt : `pd.Timestamp` or `datetime.datetime` or `np.datetime64`
+        The timestamp to convert.
+
+    Returns
+    -------
+    `int`
+        The nanoseconds since the UTC epoch.
+    """
+    if isinstance(dt, pd.Timestamp):
+        return dt.value
+    return pd.Timestamp(dt).value
+
+
+class AssetPriceCursor(object):
+    """
+    A forward-moving cursor over the sorted timestamps of a single
+    asset's bid/ask time series, used to obtain the latest available
+    price at or before a particular time.
+
+    As simulation time only moves forward successive lookups
+    usually either remain at the current position or step forward
+    by a small number of timestamps, making each lookup amortised
+    O(1) without any allocation. Larger jumps and out-of-order
+    (backwards) queries fall back to a binary search.
+
+    Parameters
+    ----------
+    timestamps : `np.ndarray`
+        The sorted int64 nanosecond timestamps of the series.
+    bids : `np.ndarray`
+        The float64 bid prices, aligned to the timestamps.
+    asks : `np.ndarray`
+        The float64 ask prices, aligned to the timestamps.
+    """
+
+    def __init__(self, timestamps, bids, asks):
+        self.timestamps = timestamps
+        self.bids = bids
+        self.asks = asks
+        self.num_timestamps = len(timestamps)
+        self.pos = -1
+
+    def locate(self, ts):
+        """
+        Move the cursor to the latest timestamp at or before
+        the provided time and return its position.
+
+        Parameters
+        ----------
+        ts : `int`
+            The query time in nanoseconds since the UTC epoch.
+
+        Returns
+        -------
+        `int`
+            The position of the latest timestamp, or -1 if the
+            query time is prior to the first timestamp.
+        """
+        timestamps = self.timestamps
+        pos = self.pos
+
+        # Out-of-order query prior to the current position
+        if pos >= 0 and ts < timestamps[pos]:
+            self.pos = int(np.searchsorted(timestamps, ts, side='right')) - 1
+            return self.pos
+
+        # Step forward a small number of timestamps, which covers
+        # the vast majority of sequential simulation lookups
+        last = self.num_timestamps - 1
+        steps = 0
+        while pos < last and timestamps[pos + 1] <= ts:
+            pos += 1
+            steps += 1
+            if steps == MAX_LINEAR_STEPS:
+                pos = pos + int(
+                    np.searchsorted(timestamps[pos + 1:], ts, side='right')
+                )
+                break
+
+        self.pos = pos
+        return pos
+
+    def bid(self, ts):
+        """
+        Obtain the latest bid price at or before the provided time.
+
+        Parameters
+        ----------
+        ts : `int`
+            The query time in nanoseconds since the UTC epoch.
+
+        Returns
+        -------
+        `float`
+            The bid price, or NaN prior to the first timestamp.
+        """
+        pos = self.locate(ts)
+        if pos < 0:
+            return np.nan
+        return self.bids[pos]
+
+    def ask(self, ts):
+        """
+        Obtain the latest ask price at or before the provided time.
+
+        Parameters
+        ----------
+        ts : `int`
+            The query time in nanoseconds since the UTC epoch.
+
+        Returns
+        -------
+        `float`
+            The ask price, or NaN prior to the first timestamp.
+        """
+        pos = self.locate(ts)
+        if pos < 0:
+            return np.nan
+        return self.asks[pos]
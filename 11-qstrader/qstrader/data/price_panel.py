@@ -0,0 +1,223 @@
+import numpy as np
+
+from qstrader.data.bar_conversion import ffill_columns
+
+
+# Maximum number of distinct asset lists whose column
+# positions are memoised by a PricePanel
+MAX_CACHED_COLUMN_LISTS = 64
+
+
+class PricePanel(object):
+    """
+    A dense, pre-aligned timestamp by asset panel of float64 values
+    (such as bid, ask or closing prices) used to answer multi-asset
+    queries with a single gather per timestamp.
+
+    The values array carries one additional trailing column of NaN
+    values. Assets that are not part of the panel are mapped to this
+    column so that a gather never needs to special-case them.
+
+    Parameters
+    ----------
+    timestamps : `np.ndarray`
+        The sorted, unique int64 nanosecond timestamps of the rows.
+    assets : `list[str]`
+        The asset symbols of the columns.
+    values : `np.ndarray`
+        The float64 values of shape (len(timestamps), len(assets) + 1),
+        where the final column is entirely NaN.
+    """
+
+    def __init__(self, timestamps, assets, values):
+        self.timestamps = timestamps
+        self.assets = list(assets)
+        self.values = values
+        self.asset_index = {asset: col for col, asset in enumerate(self.assets)}
+        self.missing_column = len(self.assets)
+        self._column_cache = {}
+
+    @classmethod
+    def from_series(cls, series_arrays, ffill=False):
+        """
+        Construct a panel from individually-timestamped per-asset
+        series, aligning them on the union of their timestamps.
+
+        Parameters
+        ----------
+        series_arrays : `dict{str: tuple(np.ndarray, np.ndarray)}`
+            Asset symbol keyed pairs of sorted int64 nanosecond
+            timestamps and aligned float64 values.
+        ffill : `Boolean`, optional
+            Whether to forward-fill each asset's values across the
+            timestamps of the other assets, such that each row
+            contains the latest value at or before its timestamp.
+            Values prior to an asset's first timestamp remain NaN.
+
+        Returns
+        -------
+        `PricePanel`
+            The aligned price panel.
+        """
+        assets = list(series_arrays.keys())
+        if len(assets) > 0:
+            timestamps = np.unique(
+                np.concatenate([ts for ts, _ in series_arrays.values()])
+            ).astype(np.int64)
+        else:
+            timestamps = np.array([], dtype=np.int64)
+
+        values = np.full((len(timestamps), len(assets) + 1), np.nan)
+        for col, asset in enumerate(assets):
+            asset_ts, asset_values = series_arrays[asset]
+            values[np.searchsorted(timestamps, asset_ts), col] = asset_values
+
+        if ffill and len(timestamps) > 0:
+            values = ffill_columns(values)
+        return cls(timestamps, assets, values)
+
+    def forward_filled(self):
+        """
+        Obtain a copy of the panel with each asset's values forward-filled
+        across the timestamps. Values prior to an asset's first value
+        remain NaN.
+
+        Returns
+        -------
+        `PricePanel`
+            The forward-filled price panel.
+        """
+        return PricePanel(self.timestamps, self.assets, ffill_columns(self.values))
+
+    def columns(self, assets):
+        """
+        Obtain the column positions of the provided assets, mapping
+        any asset not in the panel to the trailing NaN column.
+
+        Parameters
+        ----------
+        assets : `list[str]`
+            The asset symbols.
+
+        Returns
+        -------
+        `np.ndarray`
+            The integer column positions.
+        """
+        key = tuple(assets)
+        try:
+            return self._column_cache[key]
+        except KeyError:
+            pass
+        cols = np.fromiter(
+            (self.asset_index.get(asset, self.missing_column) for asset in key),
+            dtype=np.intp, count=len(key)
+        )
+        if len(self._column_cache) >= MAX_CACHED_COLUMN_LISTS:
+            self._column_cache.clear()
+        self._column_cache[key] = cols
+        return cols
+
+    def row_position(self, ts):
+        """
+        Obtain the row position of the latest timestamp at or
+        before the provided time.
+
+        Parameters
+        ----------
+        ts : `int`
+            The query time in nanoseconds since the UTC epoch.
+
+        Returns
+        -------
+        `int`
+            The row position, or -1 if prior to the first timestamp.
+        """
+        return int(np.searchsorted(self.timestamps, ts, side='right')) - 1
+
+    def gather(self, ts, assets):
+        """
+        Obtain the latest row of values at or before the provided
+        time for each of the provided assets.
+
+        Parameters
+        ----------
+        ts : `int`
+            The query time in nanoseconds since the UTC epoch.
+        assets : `list[str]`
+            The asset symbols.
+
+        Returns
+        -------
+        `np.ndarray`
+            The values aligned to the assets, with NaN for assets
+            not in the panel or prior to the first timestamp.
+        """
+        pos = self.row_position(ts)
+        if pos < 0:
+            return np.full(len(assets), np.nan)
+        return self.values[pos, self.columns(assets)]
+
+    def gather_rows(self, timestamps, assets):
+        """
+        Obtain the latest row of values at or before each of the
+        provided times for each of the provided assets, as a single
+        gather over all of the times.
+
+        Parameters
+        ----------
+        timestamps : `np.ndarray`
+            The int64 query times in nanoseconds since the UTC epoch.
+        assets : `list[str]`
+            The asset symbols.
+
+        Returns
+        -------
+        `np.ndarray`
+            The values of shape (len(timestamps), len(assets)), with NaN
+            for assets not in the panel or prior to the first timestamp.
+        """
+        pos = np.searchsorted(self.timestamps, timestamps, side='right') - 1
+        values = self.values[np.maximum(pos, 0)][:, self.columns(assets)]
+        values[pos < 0] = np.nan
+        return values
+
+    def window(self, start_ts, end_ts, assets):
+        """
+        Obtain the rows of values between two times (inclusive) for
+        those of the provided assets that are in the panel.
+
+        The rows are selected via a binary search of the timestamps,
+        so the cost is proportional to the size of the window rather
+        than the full history. If the selected asset columns are
+        contiguous in the panel, as is the case when requesting all
+        panel assets in panel order, the values returned are a
+        read-only view of the panel without any copying. Otherwise
+        only the window itself is copied.
+
+        Parameters
+        ----------
+        start_ts : `int`
+            The starting time in nanoseconds since the UTC epoch.
+        end_ts : `int`
+            The ending time in nanoseconds since the UTC epoch.
+        assets : `list[str]`
+            The asset symbols.
+
+        Returns
+        -------
+        `tuple(np.ndarray, np.ndarray, list[str])`
+            The window timestamps, the window values and the
+            asset symbols of the value columns.
+        """
+        start = int(np.searchsorted(self.timestamps, start_ts, side='left'))
+        end = int(np.searchsorted(self.timestamps, end_ts, side='right'))
+        present = [asset for asset in assets if asset in self.asset_index]
+        cols = self.columns(present)
+
+        if len(cols) > 0 and np.all(np.diff(cols) == 1):
+            values = self.values[start:end, cols[0]:cols[-1] + 1]
+            values.flags.writeable = False
+        else:
+            values = self.values[start:end, cols]
+        return self.timestamps[start:end], values, present
@@ -0,0 +1,127 @@
+import numpy as np
+
+
+def _validate_prices(prices):
+    """
+    Obtain the historical prices used to calibrate synthetic price
+    paths as an array, checking that every price is present and positive.
+
+    Parameters
+    ----------
+    prices : `pd.DataFrame`
+        The timestamp-indexed historical prices, with a column per asset.
+
+    Returns
+    -------
+    `np.ndarray`
+        The prices of shape (timestamps, assets).
+    """
+    values = prices.to_numpy(dtype=np.float64)
+    if len(values) < 2:
+        raise ValueError(
+            "At least two historical prices are required to calibrate "
+            "synthetic price paths, but %s were provided." % len(values)
+        )
+    if np.isnan(values).any() or (values <= 0.0).any():
+        raise ValueError(
+            "Historical prices used to calibrate synthetic price paths "
+            "must be present and positive for every asset and timestamp."
+        )
+    return values
+
+
+def _paths_from_log_returns(initial_prices, log_returns):
+    """
+    Compound synthetic log returns into price paths starting from
+    the initial historical prices.
+
+    Parameters
+    ----------
+    initial_prices : `np.ndarray`
+        The initial price of each asset.
+    log_returns : `np.ndarray`
+        The log returns of shape (paths, timestamps - 1, assets).
+
+    Returns
+    -------
+    `np.ndarray`
+        The price paths of shape (paths, timestamps, assets).
+    """
+    num_paths, num_returns, num_assets = log_returns.shape
+    cum_log_returns = np.zeros((num_paths, num_returns + 1, num_assets))
+    np.cumsum(log_returns, axis=1, out=cum_log_returns[:, 1:])
+    return initial_prices * np.exp(cum_log_returns)
+
+
+def block_bootstrap_paths(prices, num_paths, block_size=20, rng=None):
+    """
+    Generate synthetic price paths by resampling blocks of consecutive
+    historical log returns with replacement (a moving block bootstrap).
+
+    The same rows of returns are sampled for every asset, preserving
+    the cross-sectional correlation between assets, while blocks of
+    consecutive returns preserve any short-range autocorrelation and
+    volatility clustering.
+
+    Parameters
+    ----------
+    prices : `pd.DataFrame`
+        The timestamp-indexed historical prices, with a column per asset.
+    num_paths : `int`
+        The number of price paths to generate.
+    block_size : `int`, optional
+        The number of consecutive returns within each block.
+    rng : `np.random.Generator`, optional
+        The random number generator.
+
+    Returns
+    -------
+    `np.ndarray`
+        The price paths of shape (paths, timestamps, assets), each
+        starting from the initial historical prices.
+    """
+    values = _validate_prices(prices)
+    log_returns = np.diff(np.log(values), axis=0)
+    num_returns = len(log_returns)
+    if block_size < 1 or block_size > num_returns:
+        raise ValueError(
+            "Bootstrap block size must be between one and the %s historical "
+            "returns, but %s was provided." % (num_returns, block_size)
+        )
+    rng = np.random.default_rng() if rng is None else rng
+
+    num_blocks = -(-num_returns // block_size)
+    starts = rng.integers(0, num_returns - block_size + 1, size=(num_paths, num_blocks))
+    rows = (starts[:, :, np.newaxis] + np.arange(block_size)).reshape(num_paths, -1)
+    return _paths_from_log_returns(values[0], log_returns[rows[:, :num_returns]])
+
+
+def gbm_paths(prices, num_paths, rng=None):
+    """
+    Generate synthetic price paths via geometric Brownian motion, with
+    the drift and volatility of each asset calibrated to the mean and
+    standard deviation of its historical returns per period.
+
+    Parameters
+    ----------
+    prices : `pd.DataFrame`
+        The timestamp-indexed historical prices, with a column per asset.
+    num_paths : `int`
+        The number of price paths to generate.
+    rng : `np.random.Generator`, optional
+        The random number generator.
+
+    Returns
+    -------
+    `np.ndarray`
+        The price paths of shape (paths, timestamps, assets), each
+        starting from the initial historical prices.
+    """
+    values = _validate_prices(prices)
+    returns = values[1:] / values[:-1] - 1.0
+    mu = returns.mean(axis=0)
+    sigma = returns.std(axis=0, ddof=1) if len(returns) > 1 else np.zeros(values.shape[1])
+    rng = np.random.default_rng() if rng is None else rng
+
+    shocks = rng.standard_normal((num_paths, len(returns), values.shape[1]))
+    return _paths_from_log_returns(values[0], (mu - 0.5 * sigma ** 2) + sigma * shocks)
@@ -0,0 +1,149 @@
+import numpy as np
+import pandas as pd
+from qstrader import settings
+from qstrader.data.panel_source import PanelPriceDataSource
+from qstrader.data.price_cursor import timestamp_to_ns
+from qstrader.data.price_panel import PricePanel
+
+
+class WideCSVPriceDataSource(PanelPriceDataSource):
+    """
+    Encapsulates loading and querying of a single 'wide' CSV file of
+    prices for many assets, with one timestamp column and one price
+    column per asset, such as a panel of daily cryptocurrency prices.
+
+    The file is read in a single vectorised pass into a timestamp by
+    asset array, which directly serves the bid/ask and historical
+    closing price queries. Assets listed part way through the file have
+    leading NaN prices, which are preserved such that no price is
+    available prior to listing, while any later gaps are forward-filled
+    for the bid/ask prices.
+
+    As only a single price is available per timestamp both the bid
+    and ask are equal to it.
+
+    Parameters
+    ----------
+    csv_path : `str`
+        The full path to the wide CSV file.
+    asset_type : `str`
+        The asset type that the price data is for.
+        TODO: Unused at this stage.
+    date_column : `str`, optional
+        The name of the timestamp column. Defaults to the first column.
+    symbol_format : `str`, optional
+        The format string used to map each price column name into the
+        QSTrader symbology of the asset, e.g. 'CRYPTO:%s'. Defaults to
+        the column name itself.
+    column_symbols : `dict{str: str}`, optional
+        An optional explicit mapping of price column names to asset
+        symbols, restricting the data source to those columns.
+    timestamp_offset : `pd.Timedelta`, optional
+        An optional offset added to each timestamp of the prices, for
+        both the bid/ask and historical closing prices, representing
+        when the price becomes available. Defaults to no offset, such
+        that the timestamps must already be those at which the prices
+        are known. Prices timestamped prior to then, such as daily
+        closing prices timestamped at the start of the day, require an
+        offset (e.g. of one day) to avoid look-ahead bias.
+    start_dt : `pd.Timestamp`, optional
+        The optional starting datetime (UTC) of the rows to load.
+    end_dt : `pd.Timestamp`, optional
+        The optional ending datetime (UTC) of the rows to load.
+    """
+
+    def __init__(
+        self,
+        csv_path,
+        asset_type,
+        date_column=None,
+        symbol_format='%s',
+        column_symbols=None,
+        timestamp_offset=None,
+        start_dt=None,
+        end_dt=None
+    ):
+        self.csv_path = csv_path
+        self.date_column = date_column
+        self.symbol_format = symbol_format
+        self.column_symbols = column_symbols
+        self.start_dt = start_dt
+        self.end_dt = end_dt
+
+        super().__init__(
+            self._load_csv_into_panel(),
+            asset_type=asset_type,
+            timestamp_offset=timestamp_offset
+        )
+
+    def _read_csv_file(self):
+        """
+        Read the wide CSV file into a Pandas DataFrame indexed by
+        UTC timestamp, with one float64 column per price column.
+
+        Returns
+        -------
+        `pd.DataFrame`
+            The wide DataFrame of prices.
+        """
+        index_col = 0 if self.date_column is None else self.date_column
+        usecols = None
+        if self.column_symbols is not None:
+            date_column = self.date_column
+            if date_column is None:
+                date_column = pd.read_csv(self.csv_path, nrows=0).columns[0]
+            index_col = date_column
+            usecols = [date_column] + list(self.column_symbols.keys())
+
+        csv_df = pd.read_csv(self.csv_path, index_col=index_col, usecols=usecols)
+        csv_df.index = pd.DatetimeIndex(pd.to_datetime(csv_df.index, utc=True), name='Date')
+        csv_df = csv_df.sort_index(kind='stable')
+
+        # Retain only the final row of any duplicated timestamp
+        csv_df = csv_df[~csv_df.index.duplicated(keep='last')]
+        return csv_df
+
+    def _obtain_asset_symbol_from_column(self, column):
+        """
+        Return the QSTrader symbology for the asset of a price column.
+
+        Parameters
+        ----------
+        column : `str`
+            The name of the price column.
+
+        Returns
+        -------
+        `str`
+            The QSTrader symbology of the asset.
+        """
+        if self.column_symbols is not None:
+            return self.column_symbols[column]
+        return self.symbol_format % column
+
+    def _load_csv_into_panel(self):
+        """
+        Load the wide CSV file into a timestamp by asset panel of the
+        unfilled closing prices, restricted to any load window.
+
+        Returns
+        -------
+        `PricePanel`
+            The closing price panel.
+        """
+        if settings.PRINT_EVENTS:
+            print("Loading wide CSV file '%s'..." % self.csv_path)
+        csv_df = self._read_csv_file()
+        timestamps = csv_df.index.as_unit('ns').asi8
+
+        start = 0
+        end = len(timestamps)
+        if self.start_dt is not None:
+            start = np.searchsorted(timestamps, timestamp_to_ns(self.start_dt), side='left')
+        if self.end_dt is not None:
+            end = np.searchsorted(timestamps, timestamp_to_ns(self.end_dt), side='right')
+
+        assets = [self._obtain_asset_symbol_from_column(column) for column in csv_df.columns]
+        values = np.full((end - start, len(assets) + 1), np.nan)
+        values[:, :-1] = csv_df.iloc[start:end].to_numpy(dtype=np.float64)
+        return PricePanel(timestamps[start:end], assets, values)
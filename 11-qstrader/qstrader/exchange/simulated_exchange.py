@@ -16,10 +16,15 @@ class SimulatedExchange(Exchange):
     ----------
     start_dt : `pd.Timestamp`
         The starting time of the simulated exchange.
+    calendar : `TradingCalendar`, optional
+        The optional compiled trading calendar of the venue, including
+        its holidays. If not provided the exchange is open between
+        NYSE market hours on every weekday.
     """
 
-    def __init__(self, start_dt):
+    def __init__(self, start_dt, calendar=None):
         self.start_dt = start_dt
+        self.calendar = calendar
 
         # TODO: Eliminate hardcoding of NYSE
         # TODO: Make these timezone-aware
@@ -31,10 +36,10 @@ class SimulatedExchange(Exchange):
         Check if the SimulatedExchange is open at a particular
         provided pandas Timestamp.
 
-        This logic is simplistic in that it only checks whether
-        the provided time is between market hours on a weekday.
-
-        There is no historical calendar handling or concept of
+        If a compiled trading calendar is provided the check is a
+        binary search of its trading sessions. Otherwise the logic is
+        simplistic in that it only checks whether the provided time is
+        between market hours on a weekday, without any concept of
         exchange holidays.
 
         Parameters
@@ -47,6 +52,8 @@ class SimulatedExchange(Exchange):
         `Boolean`
             Whether the exchange is open at this timestamp.
         """
+        if self.calendar is not None:
+            return self.calendar.is_open_at_datetime(dt)
         if dt.weekday() > 4:
             return False
         return self.open_dt <= dt.time() and dt.time() < self.close_dt
@@ -0,0 +1,290 @@
+import os
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.holiday import (
+    AbstractHolidayCalendar, GoodFriday, Holiday, USLaborDay,
+    USMartinLutherKingJr, USMemorialDay, USPresidentsDay,
+    USThanksgivingDay, nearest_workday, sunday_to_monday
+)
+
+
+# Version of the compiled calendar format and trading session rules,
+# included within cache file names such that rule changes invalidate them
+CALENDAR_FORMAT_VERSION = 1
+
+# Trading session hours of the NYSE as offsets from midnight UTC,
+# matching the fixed UTC market times used throughout the simulation
+NYSE_OPEN_OFFSET = pd.Timedelta(hours=14, minutes=30)
+NYSE_CLOSE_OFFSET = pd.Timedelta(hours=21)
+
+# FX trading week, opening on Sunday and closing on Friday at 22:00 UTC
+FX_WEEK_OPEN_OFFSET = pd.Timedelta(hours=22)
+FX_WEEK_LENGTH = pd.Timedelta(days=5)
+
+# Compiled calendars shared across trading sessions within the process
+_COMPILED_CALENDARS = {}
+
+
+class NYSEHolidayCalendar(AbstractHolidayCalendar):
+    """
+    The full-day market holidays of the New York Stock Exchange.
+
+    Early closes and unscheduled closures are not included.
+    """
+
+    rules = [
+        Holiday('New Years Day', month=1, day=1, observance=sunday_to_monday),
+        USMartinLutherKingJr,
+        USPresidentsDay,
+        GoodFriday,
+        USMemorialDay,
+        Holiday(
+            'Juneteenth', month=6, day=19,
+            start_date='2022-06-19', observance=nearest_workday
+        ),
+        Holiday('Independence Day', month=7, day=4, observance=nearest_workday),
+        USLaborDay,
+        USThanksgivingDay,
+        Holiday('Christmas Day', month=12, day=25, observance=nearest_workday)
+    ]
+
+
+def _compile_nyse_sessions(start_date, end_date):
+    """
+    Compile the NYSE trading sessions of all business days that
+    are not NYSE holidays.
+
+    Parameters
+    ----------
+    start_date : `pd.Timestamp`
+        The first (midnight UTC) day of the calendar.
+    end_date : `pd.Timestamp`
+        The last (midnight UTC) day of the calendar.
+
+    Returns
+    -------
+    `np.ndarray`
+        The interleaved int64 nanosecond session open and close timestamps.
+    """
+    days = pd.bdate_range(start_date, end_date, tz='UTC')
+    holidays = NYSEHolidayCalendar().holidays(
+        start_date.tz_localize(None), end_date.tz_localize(None)
+    ).tz_localize('UTC')
+    days = days.difference(holidays).as_unit('ns').asi8
+    bounds = np.empty(2 * len(days), dtype=np.int64)
+    bounds[0::2] = days + NYSE_OPEN_OFFSET.value
+    bounds[1::2] = days + NYSE_CLOSE_OFFSET.value
+    return bounds
+
+
+def _compile_crypto_sessions(start_date, end_date):
+    """
+    Compile a single continuous (24/7) trading session.
+
+    Parameters
+    ----------
+    start_date : `pd.Timestamp`
+        The first (midnight UTC) day of the calendar.
+    end_date : `pd.Timestamp`
+        The last (midnight UTC) day of the calendar.
+
+    Returns
+    -------
+    `np.ndarray`
+        The int64 nanosecond session open and close timestamps.
+    """
+    return np.array(
+        [start_date.value, (end_date + pd.Timedelta(days=1)).value],
+        dtype=np.int64
+    )
+
+
+def _compile_fx_sessions(start_date, end_date):
+    """
+    Compile the weekly FX trading sessions, running from Sunday to
+    Friday at 22:00 UTC.
+
+    Parameters
+    ----------
+    start_date : `pd.Timestamp`
+        The first (midnight UTC) day of the calendar.
+    end_date : `pd.Timestamp`
+        The last (midnight UTC) day of the calendar.
+
+    Returns
+    -------
+    `np.ndarray`
+        The interleaved int64 nanosecond session open and close timestamps.
+    """
+    sundays = pd.date_range(
+        start_date - pd.Timedelta(days=7), end_date, freq='W-SUN', tz='UTC'
+    ).as_unit('ns').asi8
+    bounds = np.empty(2 * len(sundays), dtype=np.int64)
+    bounds[0::2] = sundays + FX_WEEK_OPEN_OFFSET.value
+    bounds[1::2] = bounds[0::2] + FX_WEEK_LENGTH.value
+    return bounds
+
+
+# Trading session compilers of the supported venues
+VENUE_SESSIONS = {
+    'NYSE': _compile_nyse_sessions,
+    'CRYPTO': _compile_crypto_sessions,
+    'FX': _compile_fx_sessions
+}
+
+
+class TradingCalendar(object):
+    """
+    A compiled trading calendar of a venue, storing its trading
+    sessions as a sorted int64 nanosecond array of interleaved session
+    open and close timestamps.
+
+    A timestamp lies within a session if the number of bounds at or
+    before it is odd, so checking whether the venue is open is a
+    single O(log n) binary search.
+
+    The calendar covers whole calendar years, and the venue is treated
+    as closed outside of these.
+
+    Parameters
+    ----------
+    venue : `str`
+        The name of the venue.
+    session_bounds : `np.ndarray`
+        The sorted, interleaved int64 nanosecond session open and
+        close timestamps.
+    """
+
+    def __init__(self, venue, session_bounds):
+        self.venue = venue
+        self.session_bounds = session_bounds
+
+    @property
+    def num_sessions(self):
+        """
+        The number of trading sessions within the calendar.
+
+        Returns
+        -------
+        `int`
+            The number of trading sessions.
+        """
+        return len(self.session_bounds) // 2
+
+    def is_open(self, ts):
+        """
+        Check whether the venue is open at the provided timestamp.
+
+        Parameters
+        ----------
+        ts : `int`
+            The nanoseconds since the UTC epoch.
+
+        Returns
+        -------
+        `Boolean`
+            Whether the venue is open.
+        """
+        return int(np.searchsorted(self.session_bounds, ts, side='right')) % 2 == 1
+
+    def is_open_at_datetime(self, dt):
+        """
+        Check whether the venue is open at the provided pandas Timestamp.
+
+        Parameters
+        ----------
+        dt : `pd.Timestamp`
+            The timestamp (UTC) to check for open market hours.
+
+        Returns
+        -------
+        `Boolean`
+            Whether the venue is open.
+        """
+        return self.is_open(pd.Timestamp(dt).value)
+
+    def is_open_array(self, timestamps):
+        """
+        Check whether the venue is open at each of the provided timestamps.
+
+        Parameters
+        ----------
+        timestamps : `np.ndarray`
+            The int64 nanosecond timestamps.
+
+        Returns
+        -------
+        `np.ndarray`
+            The boolean open mask.
+        """
+        return np.searchsorted(self.session_bounds, timestamps, side='right') % 2 == 1
+
+
+def _calendar_cache_path(cache_dir, venue, start_year, end_year):
+    return os.path.join(
+        cache_dir, '%s_%s_%s_v%s.npy' % (
+            venue, start_year, end_year, CALENDAR_FORMAT_VERSION
+        )
+    )
+
+
+def load_trading_calendar(venue, start_dt, end_dt, cache_dir=None):
+    """
+    Obtain the compiled trading calendar of a venue covering the
+    calendar years of the provided range.
+
+    Compiled calendars are shared across all trading sessions within
+    the process and, if a cache directory is provided, stored on disk
+    as '.npy' files that are memory-mapped by subsequent processes.
+
+    Parameters
+    ----------
+    venue : `str`
+        The name of the venue, one of 'NYSE', 'CRYPTO' or 'FX'.
+    start_dt : `pd.Timestamp`
+        The starting datetime (UTC) the calendar must cover.
+    end_dt : `pd.Timestamp`
+        The ending datetime (UTC) the calendar must cover.
+    cache_dir : `str`, optional
+        The full path to the directory where compiled calendars are cached.
+
+    Returns
+    -------
+    `TradingCalendar`
+        The compiled trading calendar.
+    """
+    venue = venue.upper()
+    if venue not in VENUE_SESSIONS:
+        raise ValueError(
+            "Unknown trading venue '%s'. Supported venues are "
+            "%s." % (venue, ", ".join(sorted(VENUE_SESSIONS.keys())))
+        )
+    start_year = pd.Timestamp(start_dt).year
+    end_year = pd.Timestamp(end_dt).year
+    key = (venue, start_year, end_year)
+    if key in _COMPILED_CALENDARS:
+        return _COMPILED_CALENDARS[key]
+
+    session_bounds = None
+    if cache_dir is not None:
+        cache_path = _calendar_cache_path(cache_dir, venue, start_year, end_year)
+        try:
+            session_bounds = np.load(cache_path, mmap_mode='r')
+        except (OSError, ValueError):
+            session_bounds = None
+
+    if session_bounds is None:
+        session_bounds = VENUE_SESSIONS[venue](
+            pd.Timestamp('%s-01-01' % start_year, tz='UTC'),
+            pd.Timestamp('%s-12-31' % end_year, tz='UTC')
+        )
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp_path = '%s.tmp.npy' % cache_path[:-len('.npy')]
+            np.save(tmp_path, session_bounds)
+            os.replace(tmp_path, cache_path)
+
+    calendar = TradingCalendar(venue, session_bounds)
+    _COMPILED_CALENDARS[key] = calendar
+    return calendar
@@ -3,6 +3,14 @@ import uuid
 import numpy as np
 
 
+# Types of order, executed either immediately at the market
+# price or once the market price reaches a trigger price
+MARKET = 'market'
+LIMIT = 'limit'
+STOP = 'stop'
+ORDER_TYPES = (MARKET, LIMIT, STOP)
+
+
 class Order(object):
     """
     Represents sending an order from a trading algo entity
@@ -12,6 +20,17 @@ class Order(object):
     model, if known. An order_id can be added if required,
     otherwise it will be randomly assigned.
 
+    Market orders are executed at the next available market price.
+    Limit orders are executed once the market price reaches the limit
+    price or better, while stop orders are executed at the market
+    price once it reaches the stop price.
+
+    Any order may also carry a stop loss and/or take profit price, in
+    which case it is the entry of a bracket order. Once it is executed
+    the exit orders returned by create_exit_orders are placed, which
+    close the position at either price, with the execution of one
+    exit order cancelling the other.
+
     Parameters
     ----------
     dt : `pd.Timestamp`
@@ -25,6 +44,19 @@ class Order(object):
         If commission is known it can be added.
     order_id : `str`, optional
         The order ID of the order, if known.
+    order_type : `str`, optional
+        One of 'market', 'limit' or 'stop'.
+    limit_price : `float`, optional
+        The limit price of a limit order.
+    stop_price : `float`, optional
+        The stop price of a stop order.
+    stop_loss : `float`, optional
+        The stop loss price of a bracket order.
+    take_profit : `float`, optional
+        The take profit price of a bracket order.
+    oco_id : `str`, optional
+        The ID shared by a group of one-cancels-other orders, such as
+        the exit orders of a bracket order.
     """
 
     def __init__(
@@ -33,7 +65,13 @@ class Order(object):
         asset,
         quantity,
         commission=0.0,
-        order_id=None
+        order_id=None,
+        order_type=MARKET,
+        limit_price=None,
+        stop_price=None,
+        stop_loss=None,
+        take_profit=None,
+        oco_id=None
     ):
         self.created_dt = dt
         self.cur_dt = dt
@@ -42,6 +80,106 @@ class Order(object):
         self.commission = commission
         self.direction = np.copysign(1, self.quantity)
         self.order_id = self._set_or_generate_order_id(order_id)
+        self.order_type = order_type
+        self.limit_price = limit_price
+        self.stop_price = stop_price
+        self.stop_loss = stop_loss
+        self.take_profit = take_profit
+        self.oco_id = oco_id
+        self._check_prices()
+
+    def _check_prices(self):
+        """
+        Check that the order type is supported and that the order
+        has exactly the prices required by its type, along with
+        bracket prices on the appropriate sides of each other.
+        """
+        if self.order_type not in ORDER_TYPES:
+            raise ValueError(
+                "Order type '%s' of order with ID '%s' is not one of "
+                "%s." % (self.order_type, self.order_id, ", ".join(ORDER_TYPES))
+            )
+        for price_type, price in (
+            (LIMIT, self.limit_price), (STOP, self.stop_price)
+        ):
+            if (self.order_type == price_type) != (price is not None):
+                raise ValueError(
+                    "A %s price must be provided for exactly the %s orders, "
+                    "but order with ID '%s' is a %s order with %s price "
+                    "%s." % (
+                        price_type, price_type, self.order_id,
+                        self.order_type, price_type, price
+                    )
+                )
+        for price in (self.limit_price, self.stop_price, self.stop_loss, self.take_profit):
+            if price is not None and not price > 0.0:
+                raise ValueError(
+                    "Prices of order with ID '%s' must be positive, "
+                    "but %s was provided." % (self.order_id, price)
+                )
+        if (
+            self.stop_loss is not None and self.take_profit is not None and
+            (self.take_profit - self.stop_loss) * self.direction <= 0.0
+        ):
+            raise ValueError(
+                "Stop loss %s of order with ID '%s' must be on the losing "
+                "side of its take profit %s." % (
+                    self.stop_loss, self.order_id, self.take_profit
+                )
+            )
+
+    @property
+    def trigger_price(self):
+        """
+        The price at which a limit or stop order is triggered,
+        or None for a market order.
+        """
+        if self.order_type == LIMIT:
+            return self.limit_price
+        if self.order_type == STOP:
+            return self.stop_price
+        return None
+
+    @property
+    def is_bracket(self):
+        """
+        Whether the order is the entry of a bracket order.
+        """
+        return self.stop_loss is not None or self.take_profit is not None
+
+    def create_exit_orders(self, dt):
+        """
+        Create the exit orders of a bracket order, closing the entered
+        quantity with a stop order at the stop loss price and a limit
+        order at the take profit price. The exit orders share a
+        one-cancels-other ID, that of the entry order.
+
+        Parameters
+        ----------
+        dt : `pd.Timestamp`
+            The date-time that the entry order was executed.
+
+        Returns
+        -------
+        `list[Order]`
+            The exit orders, with the stop loss first.
+        """
+        exit_orders = []
+        if self.stop_loss is not None:
+            exit_orders.append(
+                Order(
+                    dt, self.asset, -self.quantity, order_type=STOP,
+                    stop_price=self.stop_loss, oco_id=self.order_id
+                )
+            )
+        if self.take_profit is not None:
+            exit_orders.append(
+                Order(
+                    dt, self.asset, -self.quantity, order_type=LIMIT,
+                    limit_price=self.take_profit, oco_id=self.order_id
+                )
+            )
+        return exit_orders
 
     def _order_attribs_equal(self, other):
         """
@@ -72,6 +210,16 @@ class Order(object):
             return False
         if self.direction != other.direction:
             return False
+        if self.order_type != other.order_type:
+            return False
+        if self.limit_price != other.limit_price:
+            return False
+        if self.stop_price != other.stop_price:
+            return False
+        if self.stop_loss != other.stop_loss:
+            return False
+        if self.take_profit != other.take_profit:
+            return False
         return True
 
     def __repr__(self):
@@ -83,11 +231,20 @@ class Order(object):
         `str`
             String representation of the Order instance.
         """
+        prices = ""
+        if self.order_type != MARKET:
+            prices += ", order_type=%s, trigger_price=%s" % (
+                self.order_type, self.trigger_price
+            )
+        if self.is_bracket:
+            prices += ", stop_loss=%s, take_profit=%s" % (
+                self.stop_loss, self.take_profit
+            )
         return (
             "Order(dt='%s', asset='%s', quantity=%s, "
-            "commission=%s, direction=%s, order_id=%s)" % (
+            "commission=%s, direction=%s, order_id=%s%s)" % (
                 self.created_dt, self.asset, self.quantity,
-                self.commission, self.direction, self.order_id
+                self.commission, self.direction, self.order_id, prices
             )
         )
 
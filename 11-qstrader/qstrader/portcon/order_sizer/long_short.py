@@ -102,10 +102,12 @@ class LongShortLeveragedOrderSizer(OrderSizer):
             for asset, weight in weights.items()
         }
 
-    def __call__(self, dt, weights):
+    def size_target_portfolio(self, dt, weights, total_equity):
         """
-        Creates a long short leveraged target portfolio from the
-        provided target weights at a particular timestamp.
+        Sizes the long short leveraged target portfolio of the
+        provided target weights and total equity at a particular
+        timestamp, as used by the order sizer and by the vectorised
+        backtest, which tracks its own total equity.
 
         Parameters
         ----------
@@ -113,14 +115,14 @@ class LongShortLeveragedOrderSizer(OrderSizer):
             The current date-time timestamp.
         weights : `dict{Asset: float}`
             The (potentially unnormalised) target weights.
+        total_equity : `float`
+            The total equity of the portfolio.
 
         Returns
         -------
         `dict{Asset: dict}`
             The long short target portfolio dictionary with quantities.
         """
-        total_equity = self._obtain_broker_portfolio_total_equity()
-
         # Pre-cost dollar weight
         N = len(weights)
         if N == 0:
@@ -131,8 +133,14 @@ class LongShortLeveragedOrderSizer(OrderSizer):
         # Scale weights to take into account gross exposure and leverage
         normalised_weights = self._normalise_weights(weights)
 
+        # Obtain the latest prices of all weighted assets at once
+        sorted_weights = sorted(normalised_weights.items())
+        asset_prices = self.data_handler.get_assets_latest_ask_prices(
+            dt, [asset for asset, _ in sorted_weights]
+        )
+
         target_portfolio = {}
-        for asset, weight in sorted(normalised_weights.items()):
+        for (asset, weight), asset_price in zip(sorted_weights, asset_prices):
             pre_cost_dollar_weight = total_equity * weight
 
             # Estimate broker fees for this asset
@@ -143,9 +151,6 @@ class LongShortLeveragedOrderSizer(OrderSizer):
 
             # Calculate integral target asset quantity assuming broker costs
             after_cost_dollar_weight = pre_cost_dollar_weight - est_costs
-            asset_price = self.data_handler.get_asset_latest_ask_price(
-                dt, asset
-            )
 
             if np.isnan(asset_price):
                 raise ValueError(
@@ -170,3 +175,24 @@ class LongShortLeveragedOrderSizer(OrderSizer):
             target_portfolio[asset] = {"quantity": asset_quantity}
 
         return target_portfolio
+
+    def __call__(self, dt, weights):
+        """
+        Creates a long short leveraged target portfolio from the
+        provided target weights at a particular timestamp.
+
+        Parameters
+        ----------
+        dt : `pd.Timestamp`
+            The current date-time timestamp.
+        weights : `dict{Asset: float}`
+            The (potentially unnormalised) target weights.
+
+        Returns
+        -------
+        `dict{Asset: dict}`
+            The long short target portfolio dictionary with quantities.
+        """
+        return self.size_target_portfolio(
+            dt, weights, self._obtain_broker_portfolio_total_equity()
+        )
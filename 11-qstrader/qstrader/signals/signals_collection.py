@@ -53,10 +53,17 @@ class SignalsCollection(object):
         for name, signal in self.signals.items():
             self.signals[name].update_assets(dt)
 
+        # Obtain the prices for the union of all signal assets at once
+        assets = list(dict.fromkeys(
+            asset for signal in self.signals.values() for asset in signal.assets
+        ))
+        if len(assets) > 0:
+            prices = dict(
+                zip(assets, self.data_handler.get_assets_latest_mid_prices(dt, assets))
+            )
+
         # Update all of the signals with new prices
         for name, signal in self.signals.items():
-            assets = signal.assets
-            for asset in assets:
-                price = self.data_handler.get_asset_latest_mid_price(dt, asset)
-                self.signals[name].append(asset, price)
+            for asset in signal.assets:
+                self.signals[name].append(asset, prices[asset])
         self.warmup += 1
@@ -0,0 +1,171 @@
+import numpy as np
+import pandas as pd
+
+from qstrader.simulation.sim_engine import SimulationEngine
+from qstrader.simulation.event import SimulationEvent
+
+
+# Number of bar periods whose timestamps are generated at once
+DEFAULT_BLOCK_SIZE = 10000
+
+# Smallest and largest supported bar frequencies
+MIN_FREQUENCY = pd.Timedelta('1min')
+MAX_FREQUENCY = pd.Timedelta('1D')
+
+
+class ContinuousSimulationEngine(SimulationEngine):
+    """
+    A SimulationEngine subclass that generates events for markets
+    trading continuously, 24 hours a day and seven days a week (such as
+    cryptocurrency markets), at a configurable bar frequency between one
+    minute and one day.
+
+    Every bar period produces a market open event at the start of the
+    bar and a market close event at the end of the bar, which coincides
+    with the start of the following bar. Optional pre-market and
+    post-market events share the timestamps of the market open and
+    market close events respectively.
+
+    Bar periods begin at multiples of the frequency (since the UTC
+    epoch) from the starting datetime onwards, with the final bar
+    period beginning at or before the ending datetime.
+
+    Timestamps are generated lazily as blocks of int64 nanoseconds
+    (datetime64[ns]), only being converted into timestamps and wrapped
+    into SimulationEvents as they are yielded.
+
+    Parameters
+    ----------
+    starting_dt : `pd.Timestamp`
+        The starting datetime (UTC) of the simulation.
+    ending_dt : `pd.Timestamp`
+        The ending datetime (UTC) of the simulation.
+    freq : `str` or `pd.Timedelta`, optional
+        The bar frequency, from '1min' to '1D'. Defaults to '1D'.
+    pre_market : `Boolean`, optional
+        Whether to include a pre-market event
+    post_market : `Boolean`, optional
+        Whether to include a post-market event
+    block_size : `int`, optional
+        The number of bar periods whose timestamps are generated at once.
+    """
+
+    def __init__(
+        self,
+        starting_dt,
+        ending_dt,
+        freq='1D',
+        pre_market=False,
+        post_market=False,
+        block_size=DEFAULT_BLOCK_SIZE
+    ):
+        if ending_dt < starting_dt:
+            raise ValueError(
+                "Ending date time %s is earlier than starting date time %s. "
+                "Cannot create ContinuousSimulationEngine "
+                "instance." % (ending_dt, starting_dt)
+            )
+        freq = pd.Timedelta(freq)
+        if freq < MIN_FREQUENCY or freq > MAX_FREQUENCY:
+            raise ValueError(
+                "Frequency %s is outside of the supported range from %s "
+                "to %s. Cannot create ContinuousSimulationEngine "
+                "instance." % (freq, MIN_FREQUENCY, MAX_FREQUENCY)
+            )
+
+        self.starting_dt = starting_dt
+        self.ending_dt = ending_dt
+        self.freq = freq
+        self.pre_market = pre_market
+        self.post_market = post_market
+        self.block_size = block_size
+
+        self.freq_ns = freq.value
+        self.first_bar_ns = self._ceil_ns(pd.Timestamp(starting_dt).value)
+        self.num_bars = max(
+            0, (pd.Timestamp(ending_dt).value - self.first_bar_ns) // self.freq_ns + 1
+        )
+        self.event_types = self._event_types()
+
+    def _ceil_ns(self, ns):
+        """
+        Round a nanosecond timestamp up to a multiple of the frequency.
+
+        Parameters
+        ----------
+        ns : `int`
+            The nanoseconds since the UTC epoch.
+
+        Returns
+        -------
+        `int`
+            The rounded nanoseconds since the UTC epoch.
+        """
+        return -(-ns // self.freq_ns) * self.freq_ns
+
+    def _event_types(self):
+        """
+        Determine the event types produced for each bar period, along
+        with their offsets (in bar periods) from the start of the bar.
+
+        Returns
+        -------
+        `list[tuple(str, int)]`
+            The ordered event types and their bar offsets.
+        """
+        event_types = []
+        if self.pre_market:
+            event_types.append(('pre_market', 0))
+        event_types.append(('market_open', 0))
+        event_types.append(('market_close', 1))
+        if self.post_market:
+            event_types.append(('post_market', 1))
+        return event_types
+
+    def __len__(self):
+        """
+        The total number of events, without generating them.
+
+        Returns
+        -------
+        `int`
+            The number of events.
+        """
+        return self.num_bars * len(self.event_types)
+
+    def timestamp_blocks(self):
+        """
+        Lazily generate the event timestamps in blocks of bar periods.
+
+        Yields
+        ------
+        `np.ndarray`
+            The datetime64[ns] timestamps of a block of bar periods, of
+            shape (bars, event types), in event order when flattened.
+        """
+        offsets = np.array(
+            [offset for _, offset in self.event_types], dtype=np.int64
+        ) * self.freq_ns
+        for block_start in range(0, self.num_bars, self.block_size):
+            block_end = min(block_start + self.block_size, self.num_bars)
+            bar_ns = self.first_bar_ns + self.freq_ns * np.arange(
+                block_start, block_end, dtype=np.int64
+            )
+            yield (bar_ns[:, np.newaxis] + offsets).view('datetime64[ns]')
+
+    def __iter__(self):
+        """
+        Generate the timestamps and event information for each bar
+        period, for pre-market, market open, market close and post-market.
+
+        Yields
+        ------
+        `SimulationEvent`
+            Market time simulation event to yield
+        """
+        event_types = [event_type for event_type, _ in self.event_types]
+        num_event_types = len(event_types)
+        for block in self.timestamp_blocks():
+            timestamps = pd.DatetimeIndex(block.ravel()).tz_localize('UTC')
+            for i, ts in enumerate(timestamps):
+                yield SimulationEvent(ts, event_types[i % num_event_types])
@@ -0,0 +1,167 @@
+import heapq
+
+import numpy as np
+import pandas as pd
+
+from qstrader.simulation.sim_engine import SimulationEngine
+
+
+class SparseClockSimulationEngine(SimulationEngine):
+    """
+    A SimulationEngine subclass that wraps another simulation engine,
+    only emitting those of its events at which something can happen,
+    namely when any data source has new prices or when a scheduled
+    action (such as a rebalance or signal update) is due.
+
+    The sorted timestamp streams of the data sources and schedules are
+    merged via a heap keyed on the next timestamp of each stream. For
+    every candidate event of the wrapped engine, all streams whose next
+    timestamp has passed are popped and advanced beyond the event via a
+    binary search, so each event costs O(k log n) for k due streams of
+    n, rather than visiting every timestamp of every stream.
+
+    Since orders generated at a scheduled event are only executed by the
+    broker at a subsequent market open, the first event of the execution
+    event type following any scheduled event is always emitted.
+
+    Signals are updated by every event of their update event type (such
+    as each market close), including those without new prices, such that
+    their lookback windows match those of the wrapped engine. Every
+    event of the signal update event type is therefore also emitted.
+
+    Parameters
+    ----------
+    sim_engine : `SimulationEngine`
+        The simulation engine generating the candidate events.
+    data_timestamps : `list[np.ndarray]`
+        The sorted int64 nanosecond timestamps at which each data
+        source has new prices.
+    schedule_timestamps : `list[list[pd.Timestamp]]`, optional
+        The sorted timestamps of each schedule of actions, such as the
+        rebalance schedule or signal update times.
+    execution_event_type : `str`, optional
+        The event type at which pending orders are executed.
+    signal_event_type : `str`, optional
+        The event type at which signals are updated, if any.
+    """
+
+    def __init__(
+        self,
+        sim_engine,
+        data_timestamps,
+        schedule_timestamps=None,
+        execution_event_type='market_open',
+        signal_event_type=None
+    ):
+        self.sim_engine = sim_engine
+        self.data_timestamps = [
+            self._timestamps_to_ns(timestamps) for timestamps in data_timestamps
+        ]
+        self.schedule_timestamps = [
+            self._timestamps_to_ns(timestamps)
+            for timestamps in (schedule_timestamps or [])
+        ]
+        self.execution_event_type = execution_event_type
+        self.signal_event_type = signal_event_type
+        self.emitted_events = 0
+        self.skipped_events = 0
+
+    @staticmethod
+    def _timestamps_to_ns(timestamps):
+        """
+        Convert a sequence of timestamps into sorted, unique int64
+        nanoseconds since the UTC epoch.
+
+        Parameters
+        ----------
+        timestamps : `np.ndarray` or `list[pd.Timestamp]`
+            The int64 nanosecond timestamps or UTC timestamps.
+
+        Returns
+        -------
+        `np.ndarray`
+            The sorted, unique int64 nanosecond timestamps.
+        """
+        if isinstance(timestamps, np.ndarray) and timestamps.dtype == np.int64:
+            return np.unique(timestamps)
+        if len(timestamps) == 0:
+            return np.array([], dtype=np.int64)
+        return np.unique(pd.DatetimeIndex(timestamps).as_unit('ns').asi8)
+
+    def _create_heap(self, streams):
+        """
+        Create the heap of the first timestamp of each non-empty stream.
+
+        Parameters
+        ----------
+        streams : `list[np.ndarray]`
+            The sorted int64 nanosecond timestamp streams.
+
+        Returns
+        -------
+        `list[tuple(int, int)]`
+            The heap of (next timestamp, stream index) entries.
+        """
+        heap = [
+            (int(stream[0]), i) for i, stream in enumerate(streams) if len(stream) > 0
+        ]
+        heapq.heapify(heap)
+        return heap
+
+    @property
+    def total_events(self):
+        """
+        The number of candidate events of the wrapped engine visited
+        during the most recent iteration.
+
+        Returns
+        -------
+        `int`
+            The number of emitted and skipped events.
+        """
+        return self.emitted_events + self.skipped_events
+
+    def __iter__(self):
+        """
+        Generate the events of the wrapped simulation engine at which
+        new prices are available, actions are scheduled, signals are
+        updated or pending orders may be executed.
+
+        Yields
+        ------
+        `SimulationEvent`
+            Market time simulation event to yield
+        """
+        streams = self.data_timestamps + self.schedule_timestamps
+        num_data_streams = len(self.data_timestamps)
+        heap = self._create_heap(streams)
+        pending_execution = False
+        self.emitted_events = 0
+        self.skipped_events = 0
+
+        for event in self.sim_engine:
+            ts = event.ts.value
+            due_data = False
+            due_schedule = False
+            while heap and heap[0][0] <= ts:
+                _, i = heapq.heappop(heap)
+                if i < num_data_streams:
+                    due_data = True
+                else:
+                    due_schedule = True
+                stream = streams[i]
+                pos = int(np.searchsorted(stream, ts, side='right'))
+                if pos < len(stream):
+                    heapq.heappush(heap, (int(stream[pos]), i))
+
+            execution = pending_execution and event.event_type == self.execution_event_type
+            signal_update = event.event_type == self.signal_event_type
+            if due_data or due_schedule or execution or signal_update:
+                if execution:
+                    pending_execution = False
+                if due_schedule:
+                    pending_execution = True
+                self.emitted_events += 1
+                yield event
+            else:
+                self.skipped_events += 1
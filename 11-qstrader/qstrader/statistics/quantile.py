@@ -0,0 +1,208 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+
+# Quantiles of each distribution estimated by default
+DEFAULT_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+class P2Quantile(object):
+    """
+    Estimates a single quantile of a stream of observations with the
+    P-squared algorithm of Jain and Chlamtac (1985), which tracks the
+    heights and positions of five markers rather than storing the
+    observations, such that memory is constant in their number.
+
+    The estimate is exact for up to five observations.
+
+    Parameters
+    ----------
+    p : `float`
+        The quantile to estimate, between zero and one.
+    """
+
+    def __init__(self, p):
+        if not 0.0 < p < 1.0:
+            raise ValueError(
+                "Quantile must be between zero and one, "
+                "but %s was provided." % p
+            )
+        self.p = p
+        self.count = 0
+        self.heights = []
+        self.positions = [1, 2, 3, 4, 5]
+        self.desired = [1.0, 1.0 + 2.0 * p, 1.0 + 4.0 * p, 3.0 + 2.0 * p, 5.0]
+        self.increments = [0.0, p / 2.0, p, (1.0 + p) / 2.0, 1.0]
+
+    def _parabolic(self, i, d):
+        q = self.heights
+        n = self.positions
+        return q[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i]) +
+            (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def _linear(self, i, d):
+        q = self.heights
+        n = self.positions
+        return q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+
+    def update(self, x):
+        """
+        Add an observation to the estimate.
+
+        Parameters
+        ----------
+        x : `float`
+            The observation.
+        """
+        self.count += 1
+        q = self.heights
+        if self.count <= 5:
+            q.append(x)
+            q.sort()
+            return
+
+        # Find the cell of the observation, extending the extreme markers
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+
+        n = self.positions
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+
+        # Adjust the heights of the middle markers if they are
+        # more than one position from their desired positions
+        for i in range(1, 4):
+            offset = self.desired[i] - n[i]
+            if (
+                (offset >= 1.0 and n[i + 1] - n[i] > 1) or
+                (offset <= -1.0 and n[i - 1] - n[i] < -1)
+            ):
+                d = 1 if offset > 0.0 else -1
+                height = self._parabolic(i, d)
+                if not q[i - 1] < height < q[i + 1]:
+                    height = self._linear(i, d)
+                q[i] = height
+                n[i] += d
+
+    @property
+    def value(self):
+        """
+        The current estimate of the quantile, or NaN
+        prior to any observations.
+        """
+        if self.count == 0:
+            return np.nan
+        if self.count <= 5:
+            return float(np.quantile(self.heights, self.p))
+        return self.heights[2]
+
+
+class StreamingDistribution(object):
+    """
+    Summarises the distribution of a stream of observations, via their
+    count, mean, standard deviation (Welford's algorithm), extremes and
+    P-squared quantile estimates, without storing the observations.
+
+    Non-finite observations (such as the Sharpe ratio of a constant
+    equity curve) are counted separately and otherwise ignored.
+
+    Parameters
+    ----------
+    quantiles : `tuple[float]`, optional
+        The quantiles of the distribution to estimate.
+    """
+
+    def __init__(self, quantiles=DEFAULT_QUANTILES):
+        self.estimators = [P2Quantile(p) for p in quantiles]
+        self.count = 0
+        self.non_finite = 0
+        self.mean = 0.0
+        self._sum_sq_dev = 0.0
+        self.min = np.nan
+        self.max = np.nan
+
+    def update(self, x):
+        """
+        Add an observation to the distribution.
+
+        Parameters
+        ----------
+        x : `float`
+            The observation.
+        """
+        if not math.isfinite(x):
+            self.non_finite += 1
+            return
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self._sum_sq_dev += delta * (x - self.mean)
+        self.min = x if self.count == 1 else min(self.min, x)
+        self.max = x if self.count == 1 else max(self.max, x)
+        for estimator in self.estimators:
+            estimator.update(x)
+
+    @property
+    def std(self):
+        """
+        The sample standard deviation of the observations.
+        """
+        if self.count < 2:
+            return np.nan
+        return math.sqrt(self._sum_sq_dev / (self.count - 1))
+
+    def to_dict(self):
+        """
+        Summarise the distribution.
+
+        Returns
+        -------
+        `dict{str: float}`
+            The count, non-finite count, mean, standard deviation,
+            minimum, quantile estimates (keyed as e.g. 'q50') and maximum.
+        """
+        summary = {
+            'count': self.count,
+            'non_finite': self.non_finite,
+            'mean': self.mean if self.count > 0 else np.nan,
+            'std': self.std,
+            'min': self.min
+        }
+        for estimator in self.estimators:
+            summary['q%g' % (100.0 * estimator.p)] = estimator.value
+        summary['max'] = self.max
+        return summary
+
+    @staticmethod
+    def summaries_to_df(distributions):
+        """
+        Collect the summaries of several distributions into a single
+        DataFrame, with one row per distribution.
+
+        Parameters
+        ----------
+        distributions : `dict{str: StreamingDistribution}`
+            The distributions keyed by name.
+
+        Returns
+        -------
+        `pd.DataFrame`
+            The name-indexed distribution summaries.
+        """
+        return pd.DataFrame(
+            {name: dist.to_dict() for name, dist in distributions.items()}
+        ).T
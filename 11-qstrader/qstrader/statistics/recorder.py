@@ -0,0 +1,301 @@
+import os
+import uuid
+
+import numpy as np
+import pandas as pd
+
+
+# Default number of samples held by each chunk of the recorder
+DEFAULT_CHUNK_SIZE = 4096
+
+# Initial number of asset columns allocated for each chunk
+INITIAL_ASSET_CAPACITY = 16
+
+
+class PortfolioRecorder(object):
+    """
+    Records the equity, cash and the quantity and market value of
+    every asset held by a portfolio over time, into columnar NumPy
+    arrays rather than a list of records per sample.
+
+    Samples are written into preallocated chunks of a fixed number of
+    rows. Each asset is assigned an integer asset ID, the column of its
+    quantities and market values, when first held. Once a chunk is full
+    it is completed and a new chunk is allocated, such that recording
+    never copies previously recorded samples. Completed chunks are
+    either kept in memory or, if a spill directory is provided, written
+    to disk as '.npz' files and released, bounding the memory used by
+    long intraday backtests.
+
+    Parameters
+    ----------
+    chunk_size : `int`, optional
+        The number of samples held by each chunk.
+    sample_interval : `str` or `pd.Timedelta`, optional
+        The minimum interval between consecutive samples, such that
+        samples offered more frequently are dropped. Defaults to
+        recording every sample.
+    spill_dir : `str`, optional
+        The directory in which completed chunks are written.
+        Defaults to holding completed chunks in memory.
+    """
+
+    def __init__(
+        self,
+        chunk_size=DEFAULT_CHUNK_SIZE,
+        sample_interval=None,
+        spill_dir=None
+    ):
+        if chunk_size < 1:
+            raise ValueError(
+                "Recorder chunk size must be at least one, "
+                "but %s was provided." % chunk_size
+            )
+        self.chunk_size = chunk_size
+        self.sample_interval = (
+            pd.Timedelta(sample_interval).value if sample_interval is not None else None
+        )
+        self.spill_dir = spill_dir
+        if spill_dir is not None:
+            os.makedirs(spill_dir, exist_ok=True)
+
+        self.assets = []
+        self.asset_ids = {}
+        self.chunks = []
+        self.num_samples = 0
+        self.last_sample_ts = None
+        self._allocate_chunk(INITIAL_ASSET_CAPACITY)
+
+    def __len__(self):
+        return self.num_samples
+
+    def _allocate_chunk(self, asset_capacity):
+        """
+        Allocate the arrays of a new, empty chunk.
+
+        Parameters
+        ----------
+        asset_capacity : `int`
+            The number of asset columns to allocate.
+        """
+        self._timestamps = np.empty(self.chunk_size, dtype=np.int64)
+        self._equity = np.empty(self.chunk_size)
+        self._cash = np.empty(self.chunk_size)
+        self._quantities = np.zeros((self.chunk_size, asset_capacity))
+        self._market_values = np.zeros((self.chunk_size, asset_capacity))
+        self._chunk_samples = 0
+
+    def _add_asset(self, asset):
+        """
+        Assign the next asset ID to a newly held asset, growing the
+        asset columns of the current chunk if required.
+
+        Parameters
+        ----------
+        asset : `str`
+            The asset symbol.
+
+        Returns
+        -------
+        `int`
+            The asset ID.
+        """
+        asset_id = len(self.assets)
+        self.assets.append(asset)
+        self.asset_ids[asset] = asset_id
+        capacity = self._quantities.shape[1]
+        if asset_id >= capacity:
+            padding = np.zeros((self.chunk_size, capacity))
+            self._quantities = np.hstack([self._quantities, padding])
+            self._market_values = np.hstack([self._market_values, padding])
+        return asset_id
+
+    def _current_chunk(self):
+        """
+        Obtain the arrays of the samples recorded in the current chunk.
+
+        Returns
+        -------
+        `dict{str: np.ndarray}`
+            The timestamp, equity, cash, quantity and market value arrays.
+        """
+        size = self._chunk_samples
+        num_assets = len(self.assets)
+        return {
+            'timestamps': self._timestamps[:size],
+            'equity': self._equity[:size],
+            'cash': self._cash[:size],
+            'quantity': self._quantities[:size, :num_assets],
+            'market_value': self._market_values[:size, :num_assets]
+        }
+
+    def _complete_chunk(self):
+        """
+        Store the full current chunk, spilling it to disk if a spill
+        directory was provided, and allocate a new chunk.
+        """
+        chunk = self._current_chunk()
+        if self.spill_dir is not None:
+            path = os.path.join(self.spill_dir, 'chunk_%s.npz' % uuid.uuid4().hex)
+            np.savez(path, **chunk)
+            self.chunks.append(path)
+        else:
+            self.chunks.append({name: values.copy() for name, values in chunk.items()})
+        self._allocate_chunk(self._quantities.shape[1])
+
+    @staticmethod
+    def _load_chunk(chunk):
+        """
+        Obtain the arrays of a completed chunk, reading spilled
+        chunks from disk.
+
+        Parameters
+        ----------
+        chunk : `dict` or `str`
+            The chunk arrays or the path of the spilled chunk.
+
+        Returns
+        -------
+        `dict{str: np.ndarray}`
+            The timestamp, equity, cash, quantity and market value arrays.
+        """
+        if isinstance(chunk, str):
+            with np.load(chunk) as data:
+                return {name: data[name] for name in data.files}
+        return chunk
+
+    def record(self, dt, equity, cash, positions):
+        """
+        Record a sample of the portfolio, unless it falls within the
+        sample interval of the previously recorded sample.
+
+        Parameters
+        ----------
+        dt : `pd.Timestamp`
+            The time of the sample.
+        equity : `float`
+            The total equity of the portfolio.
+        cash : `float`
+            The cash of the portfolio.
+        positions : `dict{str: Position}`
+            The positions of the portfolio keyed by asset symbol.
+
+        Returns
+        -------
+        `Boolean`
+            Whether the sample was recorded.
+        """
+        ts = dt.value
+        if (
+            self.sample_interval is not None and self.last_sample_ts is not None and
+            ts < self.last_sample_ts + self.sample_interval
+        ):
+            return False
+
+        if self._chunk_samples == self.chunk_size:
+            self._complete_chunk()
+
+        row = self._chunk_samples
+        self._timestamps[row] = ts
+        self._equity[row] = equity
+        self._cash[row] = cash
+        for asset, position in positions.items():
+            asset_id = self.asset_ids.get(asset)
+            if asset_id is None:
+                asset_id = self._add_asset(asset)
+            self._quantities[row, asset_id] = position.net_quantity
+            self._market_values[row, asset_id] = position.market_value
+
+        self._chunk_samples += 1
+        self.num_samples += 1
+        self.last_sample_ts = ts
+        return True
+
+    def to_arrays(self):
+        """
+        Concatenate all of the recorded samples into single arrays,
+        with a quantity and market value column per asset ID.
+
+        Returns
+        -------
+        `dict{str: np.ndarray}`
+            The timestamp, equity, cash, quantity and market value arrays.
+        """
+        num_assets = len(self.assets)
+        chunks = [self._load_chunk(chunk) for chunk in self.chunks]
+        chunks.append(self._current_chunk())
+
+        arrays = {
+            name: np.concatenate([chunk[name] for chunk in chunks])
+            for name in ('timestamps', 'equity', 'cash')
+        }
+        for name in ('quantity', 'market_value'):
+            values = np.zeros((self.num_samples, num_assets))
+            row = 0
+            for chunk in chunks:
+                chunk_values = chunk[name]
+                values[row:row + len(chunk_values), :chunk_values.shape[1]] = chunk_values
+                row += len(chunk_values)
+            arrays[name] = values
+        return arrays
+
+    def _index(self, timestamps):
+        return pd.DatetimeIndex(timestamps).tz_localize('UTC').rename('Date')
+
+    def get_equity_curve(self):
+        """
+        Returns the recorded equity and cash.
+
+        Returns
+        -------
+        `pd.DataFrame`
+            The datetime-indexed equity and cash.
+        """
+        arrays = self.to_arrays()
+        return pd.DataFrame(
+            {'Equity': arrays['equity'], 'Cash': arrays['cash']},
+            index=self._index(arrays['timestamps'])
+        )
+
+    def get_holdings(self, field='quantity'):
+        """
+        Returns the recorded quantity or market value of every asset
+        held at any time.
+
+        Parameters
+        ----------
+        field : `str`, optional
+            Either 'quantity' or 'market_value'.
+
+        Returns
+        -------
+        `pd.DataFrame`
+            The datetime-indexed quantities or market values, with a
+            column per asset.
+        """
+        if field not in ('quantity', 'market_value'):
+            raise ValueError(
+                "Recorded holdings field '%s' is not one of 'quantity' "
+                "or 'market_value'." % field
+            )
+        arrays = self.to_arrays()
+        return pd.DataFrame(
+            arrays[field], index=self._index(arrays['timestamps']),
+            columns=list(self.assets)
+        )
+
+    def get_weights(self):
+        """
+        Returns the recorded market value of every asset as a
+        proportion of the total equity.
+
+        Returns
+        -------
+        `pd.DataFrame`
+            The datetime-indexed asset weights.
+        """
+        arrays = self.to_arrays()
+        return pd.DataFrame(
+            arrays['market_value'] / arrays['equity'][:, np.newaxis],
+            index=self._index(arrays['timestamps']), columns=list(self.assets)
+        )
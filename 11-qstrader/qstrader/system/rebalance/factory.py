@@ -0,0 +1,38 @@
+from qstrader.system.rebalance.buy_and_hold import BuyAndHoldRebalance
+from qstrader.system.rebalance.daily import DailyRebalance
+from qstrader.system.rebalance.end_of_month import EndOfMonthRebalance
+from qstrader.system.rebalance.weekly import WeeklyRebalance
+
+
+def create_rebalance(rebalance, start_dt, end_dt, rebalance_weekday=None):
+    """
+    Create the Rebalance instance of a named rebalance frequency.
+
+    Parameters
+    ----------
+    rebalance : `str`
+        The rebalance frequency, one of 'buy_and_hold', 'daily',
+        'weekly' or 'end_of_month'.
+    start_dt : `pd.Timestamp`
+        The starting datetime (UTC) of the rebalances.
+    end_dt : `pd.Timestamp`
+        The ending datetime (UTC) of the rebalances.
+    rebalance_weekday : `str`, optional
+        The weekday of weekly rebalances, e.g. 'WED'.
+
+    Returns
+    -------
+    `Rebalance`
+        The rebalance instance.
+    """
+    if rebalance == 'buy_and_hold':
+        return BuyAndHoldRebalance(start_dt)
+    elif rebalance == 'daily':
+        return DailyRebalance(start_dt, end_dt)
+    elif rebalance == 'weekly':
+        return WeeklyRebalance(start_dt, end_dt, rebalance_weekday)
+    elif rebalance == 'end_of_month':
+        return EndOfMonthRebalance(start_dt, end_dt)
+    raise ValueError(
+        'Unknown rebalance frequency "%s" provided.' % rebalance
+    )
@@ -1,5 +1,7 @@
 from abc import ABCMeta, abstractmethod
 
+from qstrader.system.rebalance.schedule import RebalanceSchedule
+
 
 class Rebalance(object):
     """
@@ -14,3 +16,15 @@ class Rebalance(object):
         raise NotImplementedError(
             "Should implement output_rebalances()"
         )
+
+    def compile(self):
+        """
+        Compile the rebalance timestamps into a schedule supporting
+        O(log n) membership checks.
+
+        Returns
+        -------
+        `RebalanceSchedule`
+            The compiled rebalance schedule.
+        """
+        return RebalanceSchedule(self.rebalances)
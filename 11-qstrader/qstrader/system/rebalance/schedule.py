@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+
+
+class RebalanceSchedule(object):
+    """
+    A compiled rebalance schedule, storing the rebalance timestamps
+    as a sorted array of unique int64 nanoseconds since the UTC epoch.
+
+    Membership checks are carried out via a binary search, which is
+    O(log n) per check, rather than a linear scan through a list of
+    timestamps.
+
+    Parameters
+    ----------
+    rebalances : `list[pd.Timestamp]` or `np.ndarray`
+        The rebalance timestamps (UTC) or int64 nanoseconds.
+    """
+
+    def __init__(self, rebalances):
+        self.timestamps = self._compile_rebalances(rebalances)
+
+    @staticmethod
+    def _compile_rebalances(rebalances):
+        """
+        Convert the rebalance timestamps into sorted, unique int64
+        nanoseconds since the UTC epoch.
+
+        Parameters
+        ----------
+        rebalances : `list[pd.Timestamp]` or `np.ndarray`
+            The rebalance timestamps (UTC) or int64 nanoseconds.
+
+        Returns
+        -------
+        `np.ndarray`
+            The sorted, unique int64 nanosecond timestamps.
+        """
+        if isinstance(rebalances, np.ndarray) and rebalances.dtype == np.int64:
+            return np.unique(rebalances)
+        if len(rebalances) == 0:
+            return np.array([], dtype=np.int64)
+        return np.unique(pd.DatetimeIndex(rebalances).as_unit('ns').asi8)
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def __contains__(self, dt):
+        """
+        Check whether a timestamp is part of the rebalance schedule.
+
+        Parameters
+        ----------
+        dt : `pd.Timestamp`
+            The timestamp to check.
+
+        Returns
+        -------
+        `Boolean`
+            Whether the timestamp is a rebalance timestamp.
+        """
+        ts = pd.Timestamp(dt).value
+        pos = int(np.searchsorted(self.timestamps, ts, side='left'))
+        return pos < len(self.timestamps) and self.timestamps[pos] == ts
+
+    def __iter__(self):
+        """
+        Generate the rebalance timestamps.
+
+        Yields
+        ------
+        `pd.Timestamp`
+            The rebalance timestamps (UTC), in order.
+        """
+        for ts in pd.DatetimeIndex(self.timestamps).tz_localize('UTC'):
+            yield ts
@@ -8,19 +8,32 @@ from qstrader.broker.fee_model.zero_fee_model import ZeroFeeModel
 from qstrader.data.backtest_data_handler import BacktestDataHandler
 from qstrader.data.daily_bar_csv import CSVDailyBarDataSource
 from qstrader.exchange.simulated_exchange import SimulatedExchange
+from qstrader.exchange.trading_calendar import load_trading_calendar
+from qstrader.simulation.continuous import ContinuousSimulationEngine
 from qstrader.simulation.daily_bday import DailyBusinessDaySimulationEngine
+from qstrader.simulation.sparse import SparseClockSimulationEngine
 from qstrader.system.qts import QuantTradingSystem
-from qstrader.system.rebalance.buy_and_hold import BuyAndHoldRebalance
-from qstrader.system.rebalance.daily import DailyRebalance
-from qstrader.system.rebalance.end_of_month import EndOfMonthRebalance
-from qstrader.system.rebalance.weekly import WeeklyRebalance
+from qstrader.system.rebalance.factory import create_rebalance
+from qstrader.system.rebalance.schedule import RebalanceSchedule
+from qstrader.trading.snapshot import (
+    dumps_state, loads_state, read_snapshot, write_snapshot
+)
 from qstrader.trading.trading_session import TradingSession
+from qstrader.trading.vectorised import VectorisedBacktest
 from qstrader import settings
 
 DEFAULT_ACCOUNT_NAME = 'Backtest Simulated Broker Account'
 DEFAULT_PORTFOLIO_ID = '000001'
 DEFAULT_PORTFOLIO_NAME = 'Backtest Simulated Broker Portfolio'
 
+# Session attributes recreated by the restoring session rather than
+# stored within snapshots, such that a snapshot can be resumed with a
+# later ending datetime and newly arrived pricing data
+SNAPSHOT_EXCLUDED_ATTRIBUTES = (
+    'data_handler', 'end_dt', 'exchange', 'sim_engine', 'sparse_clock',
+    'rebalance_schedule', 'rebalance_index'
+)
+
 
 class BacktestTradingSession(TradingSession):
     """
@@ -59,9 +72,47 @@ class BacktestTradingSession(TradingSession):
         long/short leveraged portfolios. Defaults to long/short leveraged.
     fee_model : `FeeModel` class instance, optional
         The optional FeeModel derived subclass to use for transaction cost estimates.
+    slippage_model : `SlippageModel` class instance, optional
+        The optional SlippageModel derived subclass used to simulate trade slippage.
+    market_impact_model : `SlippageModel` class instance, optional
+        The optional SlippageModel derived subclass used to simulate market impact.
     burn_in_dt : `pd.Timestamp`, optional
         The optional date provided to begin tracking strategy statistics,
         which is used for strategies requiring a period of data 'burn in'
+    data_warmup : `pd.Timedelta` or `pd.DateOffset`, optional
+        The optional period of pricing data required prior to the start
+        of the backtest, such as the longest lookback of the strategy.
+        If provided, the default CSV data source only loads daily bars
+        between (start_dt - data_warmup) and end_dt, rather than the
+        full history of every CSV file.
+    sparse_clock : `Boolean`, optional
+        Whether to skip those simulation events at which no data source
+        has new prices and no rebalance is due. Requires every data
+        source to provide its update timestamps. With signals, every
+        market close is still visited such that the signals are updated
+        as without the sparse clock. Defaults to False.
+    exchange_calendar : `str`, optional
+        The optional trading venue ('NYSE', 'CRYPTO' or 'FX') whose
+        compiled trading calendar, including holidays, determines when
+        the simulated exchange is open. Compiled calendars are cached
+        within the QSTRADER_CALENDAR_CACHE_DIR directory if set.
+        Defaults to NYSE market hours on every weekday, or to the
+        continuous 'CRYPTO' calendar if a frequency is provided.
+    frequency : `str` or `pd.Timedelta`, optional
+        The optional bar frequency (from '1min' to '1D') of a continuous
+        simulation of a market trading 24/7, such as cryptocurrencies,
+        whose events are generated by a ContinuousSimulationEngine.
+        Defaults to None, generating market open and close events on
+        every business day.
+    recorder : `PortfolioRecorder`, optional
+        The optional recorder of the equity, cash and per-asset
+        quantities and market values of the portfolio, sampled at the
+        same times as the equity curve.
+    journal : `Boolean`, optional
+        Whether the portfolio records its history of subscriptions,
+        withdrawals and transactions. May be disabled for backtests
+        whose history is never read, such as parameter sweeps.
+        Defaults to True.
     """
 
     def __init__(
@@ -79,8 +130,16 @@ class BacktestTradingSession(TradingSession):
         portfolio_name=DEFAULT_PORTFOLIO_NAME,
         long_only=False,
         fee_model=ZeroFeeModel(),
+        slippage_model=None,
+        market_impact_model=None,
         burn_in_dt=None,
         data_handler=None,
+        data_warmup=None,
+        sparse_clock=False,
+        exchange_calendar=None,
+        frequency=None,
+        recorder=None,
+        journal=True,
         **kwargs
     ):
         self.start_dt = start_dt
@@ -96,12 +155,19 @@ class BacktestTradingSession(TradingSession):
         self.portfolio_name = portfolio_name
         self.long_only = long_only
         self.fee_model = fee_model
+        self.slippage_model = slippage_model
+        self.market_impact_model = market_impact_model
         self.burn_in_dt = burn_in_dt
+        self.data_warmup = data_warmup
+        self.sparse_clock = sparse_clock
+        self.exchange_calendar = exchange_calendar
+        self.frequency = frequency
+        self.recorder = recorder
+        self.journal = journal
 
         self.exchange = self._create_exchange()
         self.data_handler = self._create_data_handler(data_handler)
         self.broker = self._create_broker()
-        self.sim_engine = self._create_simulation_engine()
 
         if rebalance == 'weekly':
             if 'rebalance_weekday' in kwargs:
@@ -113,16 +179,34 @@ class BacktestTradingSession(TradingSession):
                     "keyword argument to the instantiation of "
                     "BacktestTradingSession, e.g. with 'WED'."
                 )
-        self.rebalance_schedule = self._create_rebalance_event_times()
+        self._create_event_schedule()
 
         self.qts = self._create_quant_trading_system(**kwargs)
         self.equity_curve = []
         self.target_allocations = []
+        self.events_processed = 0
+        self.last_event_ts = None
+
+    def _create_event_schedule(self):
+        """
+        Create the simulation engine and the rebalance schedule between
+        the starting and ending datetimes of the backtest.
+        """
+        self.sim_engine = self._create_simulation_engine()
+        self.rebalance_schedule = self._create_rebalance_event_times()
+        self.rebalance_index = RebalanceSchedule(self.rebalance_schedule)
+        if self.sparse_clock:
+            self.sim_engine = self._create_sparse_clock(self.sim_engine)
 
     def _is_rebalance_event(self, dt):
         """
         Checks if the provided timestamp is part of the rebalance
-        schedule of the backtest.
+        schedule of the backtest, via a binary search of the compiled
+        rebalance schedule.
+
+        Only the first event at a timestamp is a rebalance event, such
+        that the coinciding bar close and following bar open events of
+        a continuous simulation only rebalance once.
 
         Parameters
         ----------
@@ -134,7 +218,7 @@ class BacktestTradingSession(TradingSession):
         `Boolean`
             Whether the timestamp is part of the rebalance schedule.
         """
-        return dt in self.rebalance_schedule
+        return dt != self.last_event_ts and dt in self.rebalance_index
 
     def _create_exchange(self):
         """
@@ -146,7 +230,17 @@ class BacktestTradingSession(TradingSession):
         `SimulatedExchanage`
             The simulated exchange instance.
         """
-        return SimulatedExchange(self.start_dt)
+        exchange_calendar = self.exchange_calendar
+        if exchange_calendar is None and self.frequency is not None:
+            exchange_calendar = 'CRYPTO'
+
+        calendar = None
+        if exchange_calendar is not None:
+            calendar = load_trading_calendar(
+                exchange_calendar, self.start_dt, self.end_dt,
+                cache_dir=os.environ.get('QSTRADER_CALENDAR_CACHE_DIR')
+            )
+        return SimulatedExchange(self.start_dt, calendar=calendar)
 
     def _create_data_handler(self, data_handler):
         """
@@ -184,8 +278,27 @@ class BacktestTradingSession(TradingSession):
         else:
             csv_dir = os.environ.get('QSTRADER_CSV_DATA_DIR')
 
+        # An optional directory for compiled binary copies of the CSV
+        # files, avoiding re-parsing them on every backtest start
+        cache_dir = os.environ.get('QSTRADER_CSV_CACHE_DIR')
+
+        # An optional number of worker processes used to load the CSV files
+        workers = int(os.environ.get('QSTRADER_CSV_WORKERS', 1))
+
+        # Only load the pricing data required by the backtest when
+        # the strategy's data warmup period is known
+        if self.data_warmup is not None:
+            load_start_dt = self.start_dt - self.data_warmup
+            load_end_dt = self.end_dt
+        else:
+            load_start_dt = None
+            load_end_dt = None
+
         # TODO: Only equities are supported by QSTrader for now.
-        data_source = CSVDailyBarDataSource(csv_dir, Equity)
+        data_source = CSVDailyBarDataSource(
+            csv_dir, Equity, cache_dir=cache_dir, workers=workers,
+            start_dt=load_start_dt, end_dt=load_end_dt
+        )
 
         data_handler = BacktestDataHandler(
             self.universe, data_sources=[data_source]
@@ -208,28 +321,68 @@ class BacktestTradingSession(TradingSession):
             self.data_handler,
             account_id=self.account_name,
             initial_funds=self.initial_cash,
-            fee_model=self.fee_model
+            fee_model=self.fee_model,
+            slippage_model=self.slippage_model,
+            market_impact_model=self.market_impact_model
+        )
+        broker.create_portfolio(
+            self.portfolio_id, self.portfolio_name, journal=self.journal
         )
-        broker.create_portfolio(self.portfolio_id, self.portfolio_name)
         broker.subscribe_funds_to_portfolio(self.portfolio_id, self.initial_cash)
         return broker
 
     def _create_simulation_engine(self):
         """
         Create a simulation engine instance to generate the events
-        used for the quant trading algorithm to act upon.
-
-        TODO: Currently hardcoded to daily events
+        used for the quant trading algorithm to act upon, which is
+        continuous at the bar frequency if provided and otherwise daily
+        on business days.
 
         Returns
         -------
         `SimulationEngine`
             The simulation engine generating simulation timestamps.
         """
+        if self.frequency is not None:
+            return ContinuousSimulationEngine(
+                self.start_dt, self.end_dt, freq=self.frequency,
+                pre_market=False, post_market=False
+            )
         return DailyBusinessDaySimulationEngine(
             self.start_dt, self.end_dt, pre_market=False, post_market=False
         )
 
+    def _create_sparse_clock(self, sim_engine):
+        """
+        Wrap the simulation engine such that only those events at which
+        any data source has new prices, a rebalance is due or (with
+        signals) the signals are updated at a market close, are emitted.
+
+        Parameters
+        ----------
+        sim_engine : `SimulationEngine`
+            The simulation engine generating the candidate events.
+
+        Returns
+        -------
+        `SparseClockSimulationEngine`
+            The sparse clock simulation engine.
+        """
+        data_timestamps = []
+        for data_source in self.data_handler.data_sources:
+            if not hasattr(data_source, 'get_update_timestamps'):
+                raise ValueError(
+                    "Data source %s does not provide its update timestamps. "
+                    "Cannot use a sparse clock for the "
+                    "backtest." % data_source.__class__.__name__
+                )
+            data_timestamps.append(data_source.get_update_timestamps())
+        return SparseClockSimulationEngine(
+            sim_engine, data_timestamps,
+            schedule_timestamps=[self.rebalance_index.timestamps],
+            signal_event_type='market_close' if self.signals is not None else None
+        )
+
     def _create_rebalance_event_times(self):
         """
         Creates the list of rebalance timestamps used to determine when
@@ -240,22 +393,10 @@ class BacktestTradingSession(TradingSession):
         `List[pd.Timestamp]`
             The list of rebalance timestamps.
         """
-        if self.rebalance == 'buy_and_hold':
-            rebalancer = BuyAndHoldRebalance(self.start_dt)
-        elif self.rebalance == 'daily':
-            rebalancer = DailyRebalance(
-                self.start_dt, self.end_dt
-            )
-        elif self.rebalance == 'weekly':
-            rebalancer = WeeklyRebalance(
-                self.start_dt, self.end_dt, self.rebalance_weekday
-            )
-        elif self.rebalance == 'end_of_month':
-            rebalancer = EndOfMonthRebalance(self.start_dt, self.end_dt)
-        else:
-            raise ValueError(
-                'Unknown rebalance frequency "%s" provided.' % self.rebalance
-            )
+        rebalancer = create_rebalance(
+            self.rebalance, self.start_dt, self.end_dt,
+            rebalance_weekday=getattr(self, 'rebalance_weekday', None)
+        )
         return rebalancer.rebalances
 
     def _create_quant_trading_system(self, **kwargs):
@@ -314,7 +455,8 @@ class BacktestTradingSession(TradingSession):
 
     def _update_equity_curve(self, dt):
         """
-        Update the equity curve values.
+        Update the equity curve values, recording the portfolio
+        if a recorder is provided.
 
         Parameters
         ----------
@@ -324,6 +466,12 @@ class BacktestTradingSession(TradingSession):
         self.equity_curve.append(
             (dt, self.broker.get_account_total_equity()["master"])
         )
+        if self.recorder is not None:
+            portfolio = self.broker.portfolios[self.portfolio_id]
+            self.recorder.record(
+                dt, portfolio.total_equity, portfolio.cash,
+                portfolio.pos_handler.positions
+            )
 
     def output_holdings(self):
         """
@@ -365,25 +513,44 @@ class BacktestTradingSession(TradingSession):
             alloc_df = alloc_df[self.burn_in_dt.date():]
         return alloc_df
 
-    def run(self, results=False):
+    def run(self, results=False, snapshot_path=None, snapshot_frequency=None):
         """
         Execute the simulation engine by iterating over all
         simulation events, rebalancing the quant trading
         system at the appropriate schedule.
 
+        Events processed prior to a restored snapshot, or by a previous
+        run of a since extended backtest, are skipped, such that the
+        simulation continues from where it left off.
+
         Parameters
         ----------
         results : `Boolean`, optional
             Whether to output the current portfolio holdings
+        snapshot_path : `str`, optional
+            The full path of the snapshot file written at the end of
+            the run and, if a snapshot frequency is provided, periodically
+            throughout the run.
+        snapshot_frequency : `int`, optional
+            The number of processed events between periodic snapshots.
         """
         if settings.PRINT_EVENTS:
             print("Beginning backtest simulation...")
 
-        stats = {'target_allocations': []}
+        stats = {'target_allocations': self.target_allocations}
 
-        for event in self.sim_engine:
-            # Output the system event and timestamp
+        for event_index, event in enumerate(self.sim_engine):
             dt = event.ts
+            if event_index < self.events_processed:
+                if event_index == self.events_processed - 1 and dt != self.last_event_ts:
+                    raise ValueError(
+                        "Simulation event %s at %s does not match the last "
+                        "processed event at %s. Cannot resume the "
+                        "backtest." % (event_index, dt, self.last_event_ts)
+                    )
+                continue
+
+            # Output the system event and timestamp
             if settings.PRINT_EVENTS:
                 print("(%s) - %s" % (event.ts, event.event_type))
 
@@ -424,7 +591,23 @@ class BacktestTradingSession(TradingSession):
                 else:
                     self._update_equity_curve(dt)
 
-        self.target_allocations = stats['target_allocations']
+            self.events_processed += 1
+            self.last_event_ts = dt
+            if (
+                snapshot_path is not None and snapshot_frequency is not None and
+                self.events_processed % snapshot_frequency == 0
+            ):
+                self.snapshot(snapshot_path)
+
+        if snapshot_path is not None:
+            self.snapshot(snapshot_path)
+
+        if settings.PRINT_EVENTS and self.sparse_clock:
+            print(
+                "Sparse clock skipped %s of %s simulation events" % (
+                    self.sim_engine.skipped_events, self.sim_engine.total_events
+                )
+            )
 
         # At the end of the simulation output the
         # portfolio holdings if desired
@@ -433,3 +616,137 @@ class BacktestTradingSession(TradingSession):
 
         if settings.PRINT_EVENTS:
             print("Ending backtest simulation.")
+
+    def run_vectorised(self):
+        """
+        Carry out the backtest via the vectorised fast path, rather than
+        iterating over all simulation events, for target-weight
+        rebalancing strategies.
+
+        The equity curve and target allocations are identical to those
+        of the event-driven simulation, but the simulated broker is not
+        updated, such that the portfolio holdings are instead obtained
+        from the returned backtest.
+
+        Returns
+        -------
+        `VectorisedBacktest`
+            The completed vectorised backtest, holding the quantities
+            held and transactions executed.
+        """
+        backtest = VectorisedBacktest(self).run()
+        self.equity_curve.extend(backtest.equity_curve)
+        self.target_allocations.extend(backtest.target_allocations)
+        return backtest
+
+    def _snapshot_externals(self):
+        """
+        Obtain the exchange, whose trading calendar covers the ending
+        datetime of the session, and the objects holding pricing data,
+        which are stored by reference within snapshots rather than
+        serialised.
+
+        Returns
+        -------
+        `dict{str: object}`
+            The exchange, data handler and data sources keyed by name.
+        """
+        externals = {'exchange': self.exchange, 'data_handler': self.data_handler}
+        for i, data_source in enumerate(self.data_handler.data_sources):
+            externals['data_source_%s' % i] = data_source
+        return externals
+
+    def snapshot(self, path):
+        """
+        Write the state of the backtest to a compressed binary snapshot
+        file, including the broker cash, portfolios, positions and open
+        orders, the quant trading system, signal buffers, equity curve
+        and the number of simulation events processed so far.
+
+        The exchange, data handler and data sources are not stored, but
+        are provided by the session restoring the snapshot.
+
+        Parameters
+        ----------
+        path : `str`
+            The full path to the snapshot file.
+        """
+        state = {
+            name: value for name, value in self.__dict__.items()
+            if name not in SNAPSHOT_EXCLUDED_ATTRIBUTES
+        }
+        write_snapshot(path, state, self._snapshot_externals())
+
+    def restore(self, path):
+        """
+        Restore the state of the backtest from a snapshot file, such
+        that a subsequent run continues from the snapshot.
+
+        The session must be constructed with the same starting datetime
+        and strategy as the snapshotted session. Its ending datetime may
+        be later, and its data handler may contain newly arrived bars,
+        in order to extend a finished backtest ('nightly append').
+
+        Note that the strategy components (such as the alpha model and
+        signals) are replaced by those restored from the snapshot.
+
+        Parameters
+        ----------
+        path : `str`
+            The full path to the snapshot file.
+        """
+        state = read_snapshot(path, self._snapshot_externals())
+        if state['start_dt'] != self.start_dt:
+            raise ValueError(
+                "Snapshot starting datetime %s does not match the backtest "
+                "starting datetime %s. Cannot restore the "
+                "snapshot." % (state['start_dt'], self.start_dt)
+            )
+        self.__dict__.update(state)
+
+    def fork(self):
+        """
+        Clone the in-memory state of the backtest, such that several
+        continuations (e.g. 'what-if' scenarios) can be run from the
+        same point without replaying the history.
+
+        The clone shares the data handler, data sources and simulation
+        engine with this session, while all other state is copied.
+
+        Returns
+        -------
+        `BacktestTradingSession`
+            The cloned backtest.
+        """
+        externals = self._snapshot_externals()
+        externals['sim_engine'] = self.sim_engine
+        externals['rebalance_index'] = self.rebalance_index
+        state = loads_state(dumps_state(self.__dict__, externals), externals)
+        forked = self.__class__.__new__(self.__class__)
+        forked.__dict__.update(state)
+        return forked
+
+    def extend(self, end_dt):
+        """
+        Extend the ending datetime of the backtest, such that a
+        subsequent run only processes the newly added simulation events.
+        Any newly arrived bars must already be available to the data
+        handler, e.g. via BacktestDataHandler.register_data_source.
+
+        The exchange is recreated, such that its trading calendar covers
+        the new ending datetime.
+
+        Parameters
+        ----------
+        end_dt : `pd.Timestamp`
+            The new ending datetime (UTC) of the backtest.
+        """
+        if end_dt < self.end_dt:
+            raise ValueError(
+                "New ending datetime %s is earlier than the current ending "
+                "datetime %s. Cannot extend the backtest." % (end_dt, self.end_dt)
+            )
+        self.end_dt = end_dt
+        self.exchange = self._create_exchange()
+        self.broker.exchange = self.exchange
+        self._create_event_schedule()
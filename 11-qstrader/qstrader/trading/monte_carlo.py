@@ -0,0 +1,291 @@
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from qstrader import settings
+from qstrader.data.in_memory import InMemoryPriceDataSource
+from qstrader.data.synthetic import block_bootstrap_paths, gbm_paths
+from qstrader.statistics.quantile import DEFAULT_QUANTILES, StreamingDistribution
+from qstrader.trading.sweep import summary_statistics
+
+
+# Number of synthetic price paths generated at once
+DEFAULT_BATCH_SIZE = 32
+
+# Summary statistics whose distributions are estimated by default
+DEFAULT_STATISTICS = ('sharpe', 'max_drawdown', 'cagr')
+
+
+def _init_worker(print_events):
+    settings.PRINT_EVENTS = print_events
+
+
+def _run_path(
+    session_factory, path_id, timestamps, assets, prices,
+    asset_type, timestamp_offset, periods
+):
+    """
+    Create and run the backtest of a single synthetic price path.
+
+    Parameters
+    ----------
+    session_factory : `callable`
+        The callable creating the backtest from the data sources.
+    path_id : `int`
+        The index of the price path.
+    timestamps : `np.ndarray`
+        The int64 nanosecond timestamps of the prices.
+    assets : `list[str]`
+        The asset symbols of the prices.
+    prices : `np.ndarray`
+        The synthetic prices of shape (timestamps, assets).
+    asset_type : `str`
+        The asset type that the price data is for.
+    timestamp_offset : `pd.Timedelta`
+        The optional offset added to each timestamp of the prices.
+    periods : `int`
+        The number of periods per year used to annualise statistics.
+
+    Returns
+    -------
+    `dict`
+        The path index and summary statistics.
+    """
+    data_source = InMemoryPriceDataSource(
+        timestamps, assets, prices, asset_type=asset_type,
+        timestamp_offset=timestamp_offset
+    )
+    backtest = session_factory([data_source])
+    backtest.run(results=False)
+    result = {'path': path_id}
+    result.update(
+        summary_statistics(backtest.get_equity_curve()['Equity'], periods=periods)
+    )
+    return result
+
+
+class MonteCarloRobustness(object):
+    """
+    Runs a strategy over many synthetic price paths, generated from
+    historical prices by a block bootstrap of their returns or by
+    calibrated geometric Brownian motion, in order to determine how
+    fragile its performance is under alternative histories.
+
+    Paths are generated in vectorised batches and each is backtested
+    via an in-memory data source, optionally across a pool of worker
+    processes. The distributions of the summary statistics are
+    estimated with streaming (P-squared) quantile estimators, such that
+    neither the paths nor the per-path results are retained and memory
+    does not grow with the number of paths.
+
+    Parameters
+    ----------
+    session_factory : `callable`
+        A picklable callable taking the list of data sources and
+        returning a (not yet run) BacktestTradingSession.
+    prices : `pd.DataFrame`
+        The timestamp-indexed historical prices, with a column per
+        asset symbol, used to calibrate the synthetic paths. Every path
+        shares these timestamps and starts from the initial prices.
+    num_paths : `int`
+        The number of synthetic price paths to backtest.
+    method : `str`, optional
+        Either 'bootstrap' (moving block bootstrap) or 'gbm'.
+    block_size : `int`, optional
+        The number of consecutive returns within each bootstrap block.
+    seed : `int`, optional
+        The seed of the random number generator.
+    workers : `int`, optional
+        The number of worker processes. Defaults to running the
+        backtests serially within the current process.
+    batch_size : `int`, optional
+        The number of paths generated at once.
+    statistics : `tuple[str]`, optional
+        The summary statistics whose distributions are estimated.
+    quantiles : `tuple[float]`, optional
+        The quantiles of each distribution to estimate.
+    asset_type : `str`, optional
+        The asset type that the price data is for.
+    timestamp_offset : `pd.Timedelta`, optional
+        An optional offset added to each timestamp of the prices,
+        representing when the price becomes available.
+    periods : `int`, optional
+        The number of periods per year used to annualise statistics.
+    """
+
+    def __init__(
+        self,
+        session_factory,
+        prices,
+        num_paths,
+        method='bootstrap',
+        block_size=20,
+        seed=None,
+        workers=1,
+        batch_size=DEFAULT_BATCH_SIZE,
+        statistics=DEFAULT_STATISTICS,
+        quantiles=DEFAULT_QUANTILES,
+        asset_type=None,
+        timestamp_offset=None,
+        periods=252
+    ):
+        if method not in ('bootstrap', 'gbm'):
+            raise ValueError(
+                "Synthetic price path method '%s' is not one of "
+                "'bootstrap' or 'gbm'." % method
+            )
+        if workers < 1:
+            raise ValueError(
+                "Number of Monte Carlo workers must be at least one, "
+                "but %s was provided." % workers
+            )
+        self.session_factory = session_factory
+        self.prices = prices
+        self.num_paths = num_paths
+        self.method = method
+        self.block_size = block_size
+        self.seed = seed
+        self.workers = workers
+        self.batch_size = batch_size
+        self.statistics = statistics
+        self.quantiles = quantiles
+        self.asset_type = asset_type
+        self.timestamp_offset = timestamp_offset
+        self.periods = periods
+
+        self.timestamps = prices.index.as_unit('ns').asi8
+        self.assets = list(prices.columns)
+        self.distributions = {}
+
+    def generate_paths(self, num_paths, rng):
+        """
+        Generate a batch of synthetic price paths.
+
+        Parameters
+        ----------
+        num_paths : `int`
+            The number of price paths to generate.
+        rng : `np.random.Generator`
+            The random number generator.
+
+        Returns
+        -------
+        `np.ndarray`
+            The price paths of shape (paths, timestamps, assets).
+        """
+        if self.method == 'bootstrap':
+            return block_bootstrap_paths(
+                self.prices, num_paths, block_size=self.block_size, rng=rng
+            )
+        return gbm_paths(self.prices, num_paths, rng=rng)
+
+    def _iter_paths(self):
+        """
+        Generate the synthetic price paths in batches.
+
+        Yields
+        ------
+        `tuple(int, np.ndarray)`
+            The index and prices of each path.
+        """
+        rng = np.random.default_rng(self.seed)
+        for start in range(0, self.num_paths, self.batch_size):
+            paths = self.generate_paths(
+                min(self.batch_size, self.num_paths - start), rng
+            )
+            for i, path in enumerate(paths):
+                yield start + i, path
+
+    def _path_args(self, path_id, path):
+        return (
+            self.session_factory, path_id, self.timestamps, self.assets, path,
+            self.asset_type, self.timestamp_offset, self.periods
+        )
+
+    def _iter_serial_results(self):
+        """
+        Backtest the paths one after another in the current process.
+
+        Yields
+        ------
+        `dict`
+            The result of each path, in order.
+        """
+        for path_id, path in self._iter_paths():
+            yield _run_path(*self._path_args(path_id, path))
+
+    def _iter_parallel_results(self):
+        """
+        Backtest the paths across the pool of worker processes, keeping
+        at most two paths per worker submitted at any time.
+
+        Yields
+        ------
+        `dict`
+            The result of each path, in order of completion.
+        """
+        paths = self._iter_paths()
+        max_pending = 2 * self.workers
+        pending = set()
+        executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(settings.PRINT_EVENTS,)
+        )
+        try:
+            while True:
+                while len(pending) < max_pending:
+                    path = next(paths, None)
+                    if path is None:
+                        break
+                    pending.add(executor.submit(_run_path, *self._path_args(*path)))
+                if not pending:
+                    return
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def iter_results(self):
+        """
+        Backtest every synthetic price path, streaming the summary
+        statistics of each path as it completes.
+
+        Yields
+        ------
+        `dict`
+            The path index and summary statistics of each path.
+        """
+        if self.workers == 1:
+            return self._iter_serial_results()
+        return self._iter_parallel_results()
+
+    def run(self, callback=None):
+        """
+        Backtest every synthetic price path, estimating the
+        distributions of the summary statistics.
+
+        Parameters
+        ----------
+        callback : `callable`, optional
+            Called with each path result dictionary as it completes.
+
+        Returns
+        -------
+        `pd.DataFrame`
+            The statistic-indexed distribution summaries, with the count,
+            mean, standard deviation, minimum, quantiles and maximum.
+        """
+        self.distributions = {
+            statistic: StreamingDistribution(self.quantiles)
+            for statistic in self.statistics
+        }
+        for result in self.iter_results():
+            for statistic, distribution in self.distributions.items():
+                distribution.update(result[statistic])
+            if callback is not None:
+                callback(result)
+        return StreamingDistribution.summaries_to_df(self.distributions)
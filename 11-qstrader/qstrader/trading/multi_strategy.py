@@ -0,0 +1,485 @@
+import os
+
+import pandas as pd
+
+from qstrader.asset.equity import Equity
+from qstrader.broker.simulated_broker import SimulatedBroker
+from qstrader.broker.fee_model.zero_fee_model import ZeroFeeModel
+from qstrader.data.backtest_data_handler import BacktestDataHandler
+from qstrader.data.daily_bar_csv import CSVDailyBarDataSource
+from qstrader.exchange.simulated_exchange import SimulatedExchange
+from qstrader.exchange.trading_calendar import load_trading_calendar
+from qstrader.simulation.daily_bday import DailyBusinessDaySimulationEngine
+from qstrader.simulation.sparse import SparseClockSimulationEngine
+from qstrader.system.qts import QuantTradingSystem
+from qstrader.system.rebalance.factory import create_rebalance
+from qstrader.system.rebalance.schedule import RebalanceSchedule
+from qstrader.trading.trading_session import TradingSession
+from qstrader import settings
+
+DEFAULT_ACCOUNT_NAME = 'Multi-Strategy Backtest Simulated Broker Account'
+
+
+class BacktestStrategy(object):
+    """
+    Specifies a single strategy of a multi-strategy backtest, trading
+    its own portfolio of the shared simulated broker.
+
+    Parameters
+    ----------
+    portfolio_id : `str`
+        The ID of the portfolio traded by the strategy.
+    universe : `Universe`
+        The Asset Universe of the strategy.
+    alpha_model : `AlphaModel`
+        The signal/forecast alpha model of the strategy.
+    risk_model : `RiskModel`, optional
+        The optional risk model of the strategy.
+    rebalance : `str`, optional
+        The rebalance frequency of the strategy, defaulting to 'weekly'.
+    rebalance_weekday : `str`, optional
+        The weekday of weekly rebalances, e.g. 'WED'.
+    long_only : `Boolean`, optional
+        Whether to invoke the long only order sizer or allow
+        long/short leveraged portfolios. Defaults to long/short leveraged.
+    initial_cash : `float`, optional
+        The initial portfolio equity (defaults to $1MM)
+    portfolio_name : `str`, optional
+        The name of the portfolio traded by the strategy.
+    burn_in_dt : `pd.Timestamp`, optional
+        The optional date provided to begin tracking strategy statistics.
+    **kwargs
+        The 'cash_buffer_percentage' (long only) or 'gross_leverage'
+        (long/short) of the order sizer.
+    """
+
+    def __init__(
+        self,
+        portfolio_id,
+        universe,
+        alpha_model,
+        risk_model=None,
+        rebalance='weekly',
+        rebalance_weekday=None,
+        long_only=False,
+        initial_cash=1e6,
+        portfolio_name=None,
+        burn_in_dt=None,
+        **kwargs
+    ):
+        if rebalance == 'weekly' and rebalance_weekday is None:
+            raise ValueError(
+                "Rebalance frequency of strategy '%s' was set to 'weekly' "
+                "but no specific weekday was provided." % portfolio_id
+            )
+        if long_only and 'cash_buffer_percentage' not in kwargs:
+            raise ValueError(
+                "Long only strategy '%s' specified but no cash buffer "
+                "percentage supplied." % portfolio_id
+            )
+        if not long_only and 'gross_leverage' not in kwargs:
+            raise ValueError(
+                "Long/short leveraged strategy '%s' specified but no gross "
+                "leverage percentage supplied." % portfolio_id
+            )
+        self.portfolio_id = portfolio_id
+        self.universe = universe
+        self.alpha_model = alpha_model
+        self.risk_model = risk_model
+        self.rebalance = rebalance
+        self.rebalance_weekday = rebalance_weekday
+        self.long_only = long_only
+        self.initial_cash = initial_cash
+        self.portfolio_name = portfolio_name
+        self.burn_in_dt = burn_in_dt
+        self.sizer_kwargs = kwargs
+
+        self.qts = None
+        self.rebalance_index = None
+        self.equity_curve = []
+        self.target_allocations = []
+
+    def is_active(self, dt):
+        """
+        Whether the strategy is past its 'burn in' period.
+
+        Parameters
+        ----------
+        dt : `pd.Timestamp`
+            The current timestamp.
+
+        Returns
+        -------
+        `Boolean`
+            Whether the strategy is active at the timestamp.
+        """
+        return self.burn_in_dt is None or dt >= self.burn_in_dt
+
+
+class MultiStrategyBacktestTradingSession(TradingSession):
+    """
+    Backtests several strategies, each trading its own portfolio with
+    its own alpha model, order sizer and rebalance schedule, within a
+    single SimulatedBroker account.
+
+    All strategies are driven by a single simulation engine and share
+    a single data handler, such that each simulation event, and the
+    mark-to-market prices of the assets held by every portfolio, are
+    only obtained once per event rather than once per strategy.
+
+    Parameters
+    ----------
+    start_dt : `pd.Timestamp`
+        The starting datetime (UTC) of the backtest.
+    end_dt : `pd.Timestamp`
+        The ending datetime (UTC) of the backtest.
+    strategies : `list[BacktestStrategy]`
+        The strategies to backtest, with unique portfolio IDs.
+    data_handler : `BacktestDataHandler`, optional
+        The data handler shared by all strategies. Defaults to the CSV
+        daily bars within the QSTRADER_CSV_DATA_DIR directory.
+    signals : `SignalsCollection`, optional
+        An optional collection of signals used in the trading models.
+    account_name : `str`, optional
+        The name of the simulated broker account.
+    fee_model : `FeeModel` class instance, optional
+        The optional FeeModel derived subclass to use for transaction cost estimates.
+    slippage_model : `SlippageModel` class instance, optional
+        The optional SlippageModel derived subclass used to simulate trade slippage.
+    market_impact_model : `SlippageModel` class instance, optional
+        The optional SlippageModel derived subclass used to simulate market impact.
+    exchange_calendar : `str`, optional
+        The optional trading venue ('NYSE', 'CRYPTO' or 'FX') whose
+        compiled trading calendar determines when the simulated
+        exchange is open.
+    sparse_clock : `Boolean`, optional
+        Whether to skip those simulation events at which no data source
+        has new prices and no strategy rebalance is due. Defaults to False.
+    """
+
+    def __init__(
+        self,
+        start_dt,
+        end_dt,
+        strategies,
+        data_handler=None,
+        signals=None,
+        account_name=DEFAULT_ACCOUNT_NAME,
+        fee_model=ZeroFeeModel(),
+        slippage_model=None,
+        market_impact_model=None,
+        exchange_calendar=None,
+        sparse_clock=False
+    ):
+        portfolio_ids = [strategy.portfolio_id for strategy in strategies]
+        if len(strategies) == 0:
+            raise ValueError(
+                'No strategies provided to the multi-strategy backtest.'
+            )
+        if len(set(portfolio_ids)) != len(portfolio_ids):
+            raise ValueError(
+                "Strategy portfolio IDs %s are not unique." % portfolio_ids
+            )
+        self.start_dt = start_dt
+        self.end_dt = end_dt
+        self.strategies = strategies
+        self.signals = signals
+        self.account_name = account_name
+        self.fee_model = fee_model
+        self.slippage_model = slippage_model
+        self.market_impact_model = market_impact_model
+        self.exchange_calendar = exchange_calendar
+        self.sparse_clock = sparse_clock
+
+        self.exchange = self._create_exchange()
+        self.data_handler = self._create_data_handler(data_handler)
+        self.broker = self._create_broker()
+        self.sim_engine = self._create_simulation_engine()
+        for strategy in self.strategies:
+            self._create_strategy(strategy)
+        if self.sparse_clock:
+            self.sim_engine = self._create_sparse_clock(self.sim_engine)
+
+    def _create_exchange(self):
+        """
+        Generates a simulated exchange instance used for
+        market hours and holiday calendar checks.
+
+        Returns
+        -------
+        `SimulatedExchanage`
+            The simulated exchange instance.
+        """
+        calendar = None
+        if self.exchange_calendar is not None:
+            calendar = load_trading_calendar(
+                self.exchange_calendar, self.start_dt, self.end_dt,
+                cache_dir=os.environ.get('QSTRADER_CALENDAR_CACHE_DIR')
+            )
+        return SimulatedExchange(self.start_dt, calendar=calendar)
+
+    def _create_data_handler(self, data_handler):
+        """
+        Creates the DataHandler instance shared by all strategies,
+        defaulting to the CSV daily bars within the
+        QSTRADER_CSV_DATA_DIR directory.
+
+        Parameters
+        ----------
+        `BacktestDataHandler` or None
+            The (potential) backtesting data handler instance.
+
+        Returns
+        -------
+        `BacktestDataHandler`
+            The backtesting data handler instance.
+        """
+        if data_handler is not None:
+            return data_handler
+
+        data_source = CSVDailyBarDataSource(
+            os.environ.get('QSTRADER_CSV_DATA_DIR', '.'), Equity,
+            cache_dir=os.environ.get('QSTRADER_CSV_CACHE_DIR'),
+            workers=int(os.environ.get('QSTRADER_CSV_WORKERS', 1))
+        )
+        return BacktestDataHandler(None, data_sources=[data_source])
+
+    def _create_broker(self):
+        """
+        Create the SimulatedBroker, funded with the total initial cash
+        of the strategies, and a portfolio for each strategy.
+
+        Returns
+        -------
+        `SimulatedBroker`
+            The simulated broker instance.
+        """
+        broker = SimulatedBroker(
+            self.start_dt,
+            self.exchange,
+            self.data_handler,
+            account_id=self.account_name,
+            initial_funds=sum(strategy.initial_cash for strategy in self.strategies),
+            fee_model=self.fee_model,
+            slippage_model=self.slippage_model,
+            market_impact_model=self.market_impact_model
+        )
+        for strategy in self.strategies:
+            broker.create_portfolio(strategy.portfolio_id, strategy.portfolio_name)
+            broker.subscribe_funds_to_portfolio(
+                strategy.portfolio_id, strategy.initial_cash
+            )
+        return broker
+
+    def _create_simulation_engine(self):
+        """
+        Create a simulation engine instance to generate the events
+        shared by all strategies.
+
+        Returns
+        -------
+        `SimulationEngine`
+            The simulation engine generating simulation timestamps.
+        """
+        return DailyBusinessDaySimulationEngine(
+            self.start_dt, self.end_dt, pre_market=False, post_market=False
+        )
+
+    def _create_sparse_clock(self, sim_engine):
+        """
+        Wrap the simulation engine such that only those events at which
+        any data source has new prices, or any strategy rebalance is
+        due, are emitted.
+
+        Parameters
+        ----------
+        sim_engine : `SimulationEngine`
+            The simulation engine generating the candidate events.
+
+        Returns
+        -------
+        `SparseClockSimulationEngine`
+            The sparse clock simulation engine.
+        """
+        data_timestamps = []
+        for data_source in self.data_handler.data_sources:
+            if not hasattr(data_source, 'get_update_timestamps'):
+                raise ValueError(
+                    "Data source %s does not provide its update timestamps. "
+                    "Cannot use a sparse clock for the "
+                    "backtest." % data_source.__class__.__name__
+                )
+            data_timestamps.append(data_source.get_update_timestamps())
+        return SparseClockSimulationEngine(
+            sim_engine, data_timestamps,
+            schedule_timestamps=[
+                strategy.rebalance_index.timestamps for strategy in self.strategies
+            ]
+        )
+
+    def _create_strategy(self, strategy):
+        """
+        Create the rebalance schedule and the quantitative trading
+        system of a strategy.
+
+        Parameters
+        ----------
+        strategy : `BacktestStrategy`
+            The strategy.
+        """
+        rebalancer = create_rebalance(
+            strategy.rebalance, self.start_dt, self.end_dt,
+            rebalance_weekday=strategy.rebalance_weekday
+        )
+        strategy.rebalance_index = RebalanceSchedule(rebalancer.rebalances)
+        strategy.qts = QuantTradingSystem(
+            strategy.universe,
+            self.broker,
+            strategy.portfolio_id,
+            self.data_handler,
+            strategy.alpha_model,
+            risk_model=strategy.risk_model,
+            long_only=strategy.long_only,
+            submit_orders=True,
+            **strategy.sizer_kwargs
+        )
+
+    def _get_strategy(self, portfolio_id):
+        """
+        Obtain the strategy trading the provided portfolio.
+
+        Parameters
+        ----------
+        portfolio_id : `str`
+            The portfolio ID of the strategy.
+
+        Returns
+        -------
+        `BacktestStrategy`
+            The strategy.
+        """
+        for strategy in self.strategies:
+            if strategy.portfolio_id == portfolio_id:
+                return strategy
+        raise KeyError(
+            "Portfolio with ID '%s' is not traded by any strategy of the "
+            "backtest." % portfolio_id
+        )
+
+    def get_equity_curve(self, portfolio_id):
+        """
+        Returns the equity curve of a strategy as a Pandas DataFrame.
+
+        Parameters
+        ----------
+        portfolio_id : `str`
+            The portfolio ID of the strategy.
+
+        Returns
+        -------
+        `pd.DataFrame`
+            The datetime-indexed equity curve of the strategy.
+        """
+        equity_df = pd.DataFrame(
+            self._get_strategy(portfolio_id).equity_curve, columns=['Date', 'Equity']
+        ).set_index('Date')
+        equity_df.index = equity_df.index.date
+        return equity_df
+
+    def get_target_allocations(self, portfolio_id):
+        """
+        Returns the target allocations of a strategy as a Pandas
+        DataFrame utilising the same index as its equity curve with
+        forward-filled dates.
+
+        Parameters
+        ----------
+        portfolio_id : `str`
+            The portfolio ID of the strategy.
+
+        Returns
+        -------
+        `pd.DataFrame`
+            The datetime-indexed target allocations of the strategy.
+        """
+        strategy = self._get_strategy(portfolio_id)
+        equity_curve = self.get_equity_curve(portfolio_id)
+        alloc_df = pd.DataFrame(strategy.target_allocations).set_index('Date')
+        alloc_df.index = alloc_df.index.date
+        alloc_df = alloc_df.reindex(index=equity_curve.index, method='ffill')
+        if strategy.burn_in_dt is not None:
+            alloc_df = alloc_df[strategy.burn_in_dt.date():]
+        return alloc_df
+
+    def output_holdings(self):
+        """
+        Output the holdings of every strategy portfolio to the console.
+        """
+        for strategy in self.strategies:
+            self.broker.portfolios[strategy.portfolio_id].holdings_to_console()
+
+    def run(self, results=False):
+        """
+        Execute the simulation engine by iterating over all simulation
+        events, updating the shared broker once per event and
+        rebalancing each strategy at its own schedule.
+
+        Parameters
+        ----------
+        results : `Boolean`, optional
+            Whether to output the current portfolio holdings
+        """
+        if settings.PRINT_EVENTS:
+            print("Beginning multi-strategy backtest simulation...")
+
+        for event in self.sim_engine:
+            dt = event.ts
+
+            # Output the system event and timestamp
+            if settings.PRINT_EVENTS:
+                print("(%s) - %s" % (event.ts, event.event_type))
+
+            # Update the simulated broker, marking every
+            # portfolio to market at once
+            self.broker.update(dt)
+
+            # Update any signals on a daily basis
+            if self.signals is not None and event.event_type == "market_close":
+                self.signals.update(dt)
+
+            # Carry out a full run of the quant trading system
+            # of each strategy at its own rebalance times
+            for strategy in self.strategies:
+                if strategy.is_active(dt) and dt in strategy.rebalance_index:
+                    if settings.PRINT_EVENTS:
+                        print(
+                            "(%s) - trading logic and rebalance "
+                            "of %s" % (event.ts, strategy.portfolio_id)
+                        )
+                    strategy.qts(
+                        dt, stats={'target_allocations': strategy.target_allocations}
+                    )
+
+            # Record the daily performance of each
+            # strategy past its 'burn in' period
+            if event.event_type == "market_close":
+                for strategy in self.strategies:
+                    if strategy.is_active(dt):
+                        strategy.equity_curve.append(
+                            (dt, self.broker.portfolios[strategy.portfolio_id].total_equity)
+                        )
+
+        if settings.PRINT_EVENTS and self.sparse_clock:
+            print(
+                "Sparse clock skipped %s of %s simulation events" % (
+                    self.sim_engine.skipped_events, self.sim_engine.total_events
+                )
+            )
+
+        # At the end of the simulation output the
+        # portfolio holdings if desired
+        if results:
+            self.output_holdings()
+
+        if settings.PRINT_EVENTS:
+            print("Ending multi-strategy backtest simulation.")
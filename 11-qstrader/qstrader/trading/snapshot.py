@@ -0,0 +1,151 @@
+import io
+import os
+import pickle
+import zlib
+
+
+# Leading bytes and format version of snapshot files
+SNAPSHOT_MAGIC = b'QSTRADER-SNAPSHOT'
+SNAPSHOT_FORMAT_VERSION = 1
+
+
+class StatePickler(pickle.Pickler):
+    """
+    Pickles the state of a trading session, storing references to
+    the provided external objects (such as the data handler and data
+    sources, holding the pricing data) rather than the objects
+    themselves.
+
+    Parameters
+    ----------
+    file : `file`
+        The binary file to write the pickled state to.
+    externals : `dict{str: object}`
+        The external objects keyed by a name unique within the session.
+    """
+
+    def __init__(self, file, externals):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.external_names = {id(obj): name for name, obj in externals.items()}
+
+    def persistent_id(self, obj):
+        return self.external_names.get(id(obj))
+
+
+class StateUnpickler(pickle.Unpickler):
+    """
+    Unpickles the state of a trading session, resolving references
+    to external objects to those provided.
+
+    Parameters
+    ----------
+    file : `file`
+        The binary file to read the pickled state from.
+    externals : `dict{str: object}`
+        The external objects keyed by a name unique within the session.
+    """
+
+    def __init__(self, file, externals):
+        super().__init__(file)
+        self.externals = externals
+
+    def persistent_load(self, pid):
+        if pid not in self.externals:
+            raise KeyError(
+                "External object '%s' referenced by the session state "
+                "was not provided." % pid
+            )
+        return self.externals[pid]
+
+
+def dumps_state(state, externals):
+    """
+    Pickle the state of a trading session into bytes.
+
+    Parameters
+    ----------
+    state : `dict`
+        The session state.
+    externals : `dict{str: object}`
+        The external objects stored by reference.
+
+    Returns
+    -------
+    `bytes`
+        The pickled state.
+    """
+    buffer = io.BytesIO()
+    StatePickler(buffer, externals).dump(state)
+    return buffer.getvalue()
+
+
+def loads_state(data, externals):
+    """
+    Unpickle the state of a trading session from bytes.
+
+    Parameters
+    ----------
+    data : `bytes`
+        The pickled state.
+    externals : `dict{str: object}`
+        The external objects the stored references resolve to.
+
+    Returns
+    -------
+    `dict`
+        The session state.
+    """
+    return StateUnpickler(io.BytesIO(data), externals).load()
+
+
+def write_snapshot(path, state, externals):
+    """
+    Write the state of a trading session to a compressed binary
+    snapshot file. The file is written atomically, such that an
+    interrupted write never replaces a previous snapshot.
+
+    Parameters
+    ----------
+    path : `str`
+        The full path to the snapshot file.
+    state : `dict`
+        The session state.
+    externals : `dict{str: object}`
+        The external objects stored by reference.
+    """
+    tmp_path = '%s.tmp' % path
+    with open(tmp_path, 'wb') as f:
+        f.write(SNAPSHOT_MAGIC)
+        f.write(SNAPSHOT_FORMAT_VERSION.to_bytes(4, 'little'))
+        f.write(zlib.compress(dumps_state(state, externals)))
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path, externals):
+    """
+    Read the state of a trading session from a snapshot file.
+
+    Parameters
+    ----------
+    path : `str`
+        The full path to the snapshot file.
+    externals : `dict{str: object}`
+        The external objects the stored references resolve to.
+
+    Returns
+    -------
+    `dict`
+        The session state.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    header_size = len(SNAPSHOT_MAGIC) + 4
+    if not data.startswith(SNAPSHOT_MAGIC):
+        raise ValueError("File '%s' is not a QSTrader snapshot." % path)
+    version = int.from_bytes(data[len(SNAPSHOT_MAGIC):header_size], 'little')
+    if version != SNAPSHOT_FORMAT_VERSION:
+        raise ValueError(
+            "Snapshot '%s' has format version %s, but only version %s "
+            "is supported." % (path, version, SNAPSHOT_FORMAT_VERSION)
+        )
+    return loads_state(zlib.decompress(data[header_size:]), externals)
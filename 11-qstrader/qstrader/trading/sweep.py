@@ -0,0 +1,317 @@
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import itertools
+import threading
+
+import numpy as np
+import pandas as pd
+
+from qstrader import settings
+import qstrader.statistics.performance as perf
+
+
+# Data sources loaded once per worker process and
+# shared by every backtest the worker carries out
+_WORKER_DATA_SOURCES = None
+
+
+def _init_worker(data_source_factory, print_events):
+    """
+    Load the data sources of a sweep worker process.
+
+    Parameters
+    ----------
+    data_source_factory : `callable` or None
+        The callable returning the list of data sources.
+    print_events : `Boolean`
+        Whether to print simulation events within the worker.
+    """
+    global _WORKER_DATA_SOURCES
+    settings.PRINT_EVENTS = print_events
+    if data_source_factory is not None:
+        _WORKER_DATA_SOURCES = data_source_factory()
+
+
+def _run_backtest(session_factory, data_sources, run_id, params, periods):
+    """
+    Create and run a single backtest of the sweep.
+
+    Parameters
+    ----------
+    session_factory : `callable`
+        The callable creating the backtest from the data sources and
+        the parameters.
+    data_sources : `list` or None
+        The loaded data sources.
+    run_id : `int`
+        The index of the parameter combination.
+    params : `dict`
+        The parameters of the backtest.
+    periods : `int`
+        The number of periods per year used to annualise statistics.
+
+    Returns
+    -------
+    `dict`
+        The run index, parameters, summary statistics and equity curve.
+    """
+    backtest = session_factory(data_sources, **params)
+    backtest.run(results=False)
+    equity_curve = backtest.get_equity_curve()['Equity']
+    result = {'run': run_id}
+    result.update(params)
+    result.update(summary_statistics(equity_curve, periods=periods))
+    result['equity_curve'] = equity_curve
+    return result
+
+
+def _run_worker_backtest(session_factory, run_id, params, periods):
+    return _run_backtest(session_factory, _WORKER_DATA_SOURCES, run_id, params, periods)
+
+
+def summary_statistics(equity_curve, periods=252):
+    """
+    Calculate the summary statistics of an equity curve, as used
+    for the JSON statistics of a backtest.
+
+    Parameters
+    ----------
+    equity_curve : `pd.Series`
+        The date-indexed equity curve.
+    periods : `int`, optional
+        The number of periods per year used to annualise statistics.
+
+    Returns
+    -------
+    `dict{str: float}`
+        The summary statistics.
+    """
+    returns = equity_curve.pct_change().fillna(0.0)
+    cum_returns = np.exp(np.log(1 + returns).cumsum())
+    _, max_dd, dd_dur = perf.create_drawdowns(cum_returns)
+    return {
+        'total_return': cum_returns.iloc[-1] - 1.0,
+        'cagr': perf.create_cagr(cum_returns, periods),
+        'annualised_vol': np.std(returns) * np.sqrt(periods),
+        'sharpe': perf.create_sharpe_ratio(returns, periods),
+        'sortino': perf.create_sortino_ratio(returns, periods),
+        'max_drawdown': max_dd,
+        'max_drawdown_duration': dd_dur
+    }
+
+
+class ParameterSweep(object):
+    """
+    Runs a backtest for every combination of a grid of strategy
+    parameters, optionally across a pool of worker processes.
+
+    The pricing data is loaded once per worker process, via the data
+    source factory, and shared read-only by all of the backtests the
+    worker carries out rather than being reloaded for every run. If the
+    data source factory has a cache_dir attribute, indicating that its
+    data sources use a binary price cache (e.g. the cache_dir of
+    CSVDailyBarDataSource), the cache is compiled once in the parent
+    process and the workers memory-map the same files, such that the
+    operating system shares a single copy of the raw cached prices
+    across workers. The price panels derived from them (such as the
+    bid/ask and closing price panels) are still built by each worker.
+
+    Results are streamed as each backtest completes via iter_results,
+    which stops submitting and cancels any pending backtests if cancel
+    is called or the iteration is abandoned.
+
+    Parameters
+    ----------
+    session_factory : `callable`
+        A picklable callable taking the list of loaded data sources and
+        the parameters as keyword arguments, returning a (not yet run)
+        BacktestTradingSession.
+    param_grid : `dict{str: list}` or `list[dict]`
+        The values of each parameter, whose cartesian product is swept,
+        or an explicit list of parameter combinations.
+    data_source_factory : `callable`, optional
+        A picklable callable returning the list of data sources,
+        optionally with the cache_dir of their binary price cache.
+    workers : `int`, optional
+        The number of worker processes. Defaults to running the
+        backtests serially within the current process.
+    periods : `int`, optional
+        The number of periods per year used to annualise statistics.
+    """
+
+    def __init__(
+        self,
+        session_factory,
+        param_grid,
+        data_source_factory=None,
+        workers=1,
+        periods=252
+    ):
+        if workers < 1:
+            raise ValueError(
+                "Number of sweep workers must be at least one, "
+                "but %s was provided." % workers
+            )
+        self.session_factory = session_factory
+        self.runs = self._expand_param_grid(param_grid)
+        self.data_source_factory = data_source_factory
+        self.workers = workers
+        self.periods = periods
+        self._cancelled = threading.Event()
+
+    @staticmethod
+    def _expand_param_grid(param_grid):
+        """
+        Expand the parameter grid into the list of parameter combinations.
+
+        Parameters
+        ----------
+        param_grid : `dict{str: list}` or `list[dict]`
+            The values of each parameter or the parameter combinations.
+
+        Returns
+        -------
+        `list[dict]`
+            The parameter combinations.
+        """
+        if isinstance(param_grid, dict):
+            names = list(param_grid.keys())
+            return [
+                dict(zip(names, values))
+                for values in itertools.product(*param_grid.values())
+            ]
+        return [dict(params) for params in param_grid]
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """
+        Cancel the sweep, such that no further backtests are started.
+        This may be called from another thread or a result callback.
+        """
+        self._cancelled.set()
+
+    def _iter_serial_results(self):
+        """
+        Run the backtests one after another in the current process.
+
+        Yields
+        ------
+        `dict`
+            The result of each backtest, in parameter grid order.
+        """
+        data_sources = None
+        if self.data_source_factory is not None:
+            data_sources = self.data_source_factory()
+        for run_id, params in enumerate(self.runs):
+            if self.cancelled:
+                return
+            yield _run_backtest(
+                self.session_factory, data_sources, run_id, params, self.periods
+            )
+
+    def _iter_parallel_results(self):
+        """
+        Run the backtests across the pool of worker processes, keeping
+        at most two backtests per worker submitted at any time.
+
+        Yields
+        ------
+        `dict`
+            The result of each backtest, in order of completion.
+        """
+        # Loading the data sources once prior to starting the workers
+        # compiles any price cache once, rather than in every worker
+        if getattr(self.data_source_factory, 'cache_dir', None) is not None:
+            self.data_source_factory()
+
+        runs = iter(enumerate(self.runs))
+        max_pending = 2 * self.workers
+        pending = set()
+        executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(self.data_source_factory, settings.PRINT_EVENTS)
+        )
+        try:
+            while True:
+                while not self.cancelled and len(pending) < max_pending:
+                    run = next(runs, None)
+                    if run is None:
+                        break
+                    run_id, params = run
+                    pending.add(
+                        executor.submit(
+                            _run_worker_backtest, self.session_factory,
+                            run_id, params, self.periods
+                        )
+                    )
+                if not pending or self.cancelled:
+                    return
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def iter_results(self):
+        """
+        Run the sweep, streaming the result of each backtest as
+        it completes.
+
+        Yields
+        ------
+        `dict`
+            The run index, parameters, summary statistics and equity
+            curve (as a date-indexed Series) of each backtest.
+        """
+        self._cancelled.clear()
+        if self.workers == 1:
+            return self._iter_serial_results()
+        return self._iter_parallel_results()
+
+    def run(self, callback=None):
+        """
+        Run the sweep, collecting the results of all backtests.
+
+        Parameters
+        ----------
+        callback : `callable`, optional
+            Called with each result dictionary as it completes.
+
+        Returns
+        -------
+        `pd.DataFrame`
+            The run-indexed parameters, summary statistics and equity
+            curves of the completed backtests.
+        """
+        results = []
+        for result in self.iter_results():
+            results.append(result)
+            if callback is not None:
+                callback(result)
+        return self.results_to_df(results)
+
+    @staticmethod
+    def results_to_df(results):
+        """
+        Collect sweep results into a single DataFrame, with one row per
+        backtest. The equity curves are held in the 'equity_curve'
+        column as date-indexed Series.
+
+        Parameters
+        ----------
+        results : `list[dict]`
+            The backtest results.
+
+        Returns
+        -------
+        `pd.DataFrame`
+            The run-indexed backtest results.
+        """
+        if len(results) == 0:
+            return pd.DataFrame(columns=['equity_curve']).rename_axis('run')
+        return pd.DataFrame(results).set_index('run').sort_index()
@@ -0,0 +1,537 @@
+import numpy as np
+import pandas as pd
+
+from qstrader.execution.execution_algo.market_order import (
+    MarketOrderExecutionAlgorithm
+)
+from qstrader.portcon.order_sizer.dollar_weighted import (
+    DollarWeightedCashBufferedOrderSizer
+)
+from qstrader.portcon.order_sizer.long_short import (
+    LongShortLeveragedOrderSizer
+)
+
+
+class VectorisedBacktest(object):
+    """
+    A fast path for backtests of target-weight rebalancing strategies,
+    producing the same integer share quantities, fees, target
+    allocations and equity curve as the event-driven simulation of
+    the provided (not yet run) BacktestTradingSession.
+
+    The bid and ask prices of all traded assets are loaded once into
+    event-by-asset matrices. The simulation then only visits the events
+    at which the holdings can change, namely rebalances and the
+    subsequent order executions, carrying out the portfolio construction
+    and order sizing there. The equity between these events, during
+    which the holdings are constant, is valued with matrix operations
+    over the price matrices, accumulating the position market values in
+    the same order as the broker such that the equity is identical.
+
+    Only the default market order execution algorithm and the
+    dollar-weighted cash-buffered (long only) and long/short leveraged
+    order sizers are supported.
+
+    Parameters
+    ----------
+    session : `BacktestTradingSession`
+        The backtest to carry out.
+    """
+
+    def __init__(self, session):
+        self.session = session
+        self.pcm = session.qts.portfolio_construction_model
+        self.execution_handler = session.qts.execution_handler
+        self._check_session()
+
+        self.data_handler = session.data_handler
+        self.fee_model = session.broker.fee_model
+        self.events = list(session.sim_engine)
+        self.event_dts = [event.ts for event in self.events]
+        self.assets = []
+        self.asset_columns = {}
+        self.bids = np.empty((len(self.events), 0))
+        self.asks = np.empty((len(self.events), 0))
+
+        self.equity_curve = []
+        self.target_allocations = []
+        self.transactions = []
+        self.holdings = []
+        self.cash = None
+
+    def _check_session(self):
+        """
+        Ensure the session has not already been run and that all of
+        its components are supported by the vectorised backtest.
+        """
+        if self.session.events_processed > 0:
+            raise ValueError(
+                "Backtest has already processed %s simulation events. "
+                "Cannot carry out a vectorised backtest of a session that "
+                "has been run." % self.session.events_processed
+            )
+        if self.session.recorder is not None:
+            raise ValueError(
+                "Portfolio recorders are not supported by the vectorised "
+                "backtest, whose holdings are obtained via get_holdings."
+            )
+        order_sizer = self.pcm.order_sizer
+        if type(order_sizer) not in (
+            DollarWeightedCashBufferedOrderSizer, LongShortLeveragedOrderSizer
+        ):
+            raise ValueError(
+                "Order sizer '%s' is not supported by the vectorised "
+                "backtest." % order_sizer.__class__.__name__
+            )
+        execution_algo = self.execution_handler.execution_algo
+        if type(execution_algo) is not MarketOrderExecutionAlgorithm:
+            raise ValueError(
+                "Execution algorithm '%s' is not supported by the "
+                "vectorised backtest." % execution_algo.__class__.__name__
+            )
+
+    def _is_exchange_open(self, event_ts):
+        """
+        Determine whether the exchange is open at each event, via the
+        compiled trading calendar of the exchange if provided.
+
+        Parameters
+        ----------
+        event_ts : `np.ndarray`
+            The int64 nanosecond event timestamps.
+
+        Returns
+        -------
+        `np.ndarray`
+            The boolean open mask.
+        """
+        calendar = getattr(self.session.exchange, 'calendar', None)
+        if calendar is not None:
+            return calendar.is_open_array(event_ts)
+        return np.array(
+            [self.session.exchange.is_open_at_datetime(dt) for dt in self.event_dts],
+            dtype=bool
+        )
+
+    def _load_assets(self, assets):
+        """
+        Append the bid and ask prices at every event of those provided
+        assets not yet loaded as further columns of the price matrices.
+
+        Parameters
+        ----------
+        assets : `iterable[str]`
+            The asset symbols.
+        """
+        new_assets = sorted(set(assets).difference(self.asset_columns))
+        if len(new_assets) == 0:
+            return
+        if hasattr(self.data_handler, 'get_assets_bid_ask_prices_at'):
+            bids, asks = self.data_handler.get_assets_bid_ask_prices_at(
+                self.event_dts, new_assets
+            )
+        else:
+            bids = np.empty((len(self.events), len(new_assets)))
+            asks = np.empty((len(self.events), len(new_assets)))
+            for i, dt in enumerate(self.event_dts):
+                bids[i], asks[i] = self.data_handler.get_assets_latest_bid_ask_prices(
+                    dt, new_assets
+                )
+        for asset in new_assets:
+            self.asset_columns[asset] = len(self.assets)
+            self.assets.append(asset)
+        self.bids = np.hstack([self.bids, bids])
+        self.asks = np.hstack([self.asks, asks])
+
+    def _mid_prices(self, rows, assets):
+        """
+        Obtain the mid prices of the provided assets at the provided
+        events, checking that they can value a position.
+
+        Parameters
+        ----------
+        rows : `np.ndarray` or `int`
+            The event positions.
+        assets : `list[str]`
+            The asset symbols.
+
+        Returns
+        -------
+        `np.ndarray`
+            The mid prices, with a column per asset.
+        """
+        cols = [self.asset_columns[asset] for asset in assets]
+        mids = (self.bids[rows][..., cols] + self.asks[rows][..., cols]) / 2.0
+        if np.any(mids <= 0.0):
+            raise ValueError(
+                'Non-positive mid price of held assets %s within the '
+                'vectorised backtest. Cannot update positions.' % assets
+            )
+        return mids
+
+    def _check_mid_prices(self, rows, assets):
+        """
+        Check that the mid prices of the provided assets at the provided
+        events can value a position, as the broker checks when it marks
+        the portfolio to market at every event.
+
+        Parameters
+        ----------
+        rows : `np.ndarray` or `int`
+            The event positions.
+        assets : `list[str]`
+            The asset symbols.
+        """
+        self._mid_prices(rows, assets)
+
+    def _portfolio_market_value(self, row, positions, prices):
+        """
+        Calculate the market value of the positions at an event, summed
+        in the order in which the positions were opened.
+
+        Parameters
+        ----------
+        row : `int`
+            The event position.
+        positions : `dict{str: int}`
+            The net quantity of each held asset.
+        prices : `dict{str: float}`
+            The transaction prices of those assets transacted since the
+            positions were last valued at mid prices.
+
+        Returns
+        -------
+        `float`
+            The market value of the positions.
+        """
+        assets = list(positions)
+        if len(assets) == 0:
+            return 0
+        mids = self._mid_prices(row, assets)
+        market_value = 0
+        for asset, mid in zip(assets, mids):
+            market_value += prices.get(asset, mid) * positions[asset]
+        return market_value
+
+    def _target_weights(self, dt, positions):
+        """
+        Carry out the portfolio construction of a rebalance, obtaining
+        the target weights of all assets in the universe or held.
+
+        Parameters
+        ----------
+        dt : `pd.Timestamp`
+            The rebalance time.
+        positions : `dict{str: int}`
+            The net quantity of each held asset.
+
+        Returns
+        -------
+        `dict{str: float}`
+            The full target weight vector.
+        """
+        if self.pcm.alpha_model:
+            weights = self.pcm.alpha_model(dt)
+        else:
+            weights = self.pcm._create_zero_target_weights_vector(dt)
+        if self.pcm.risk_model:
+            weights = self.pcm.risk_model(dt, weights)
+        optimised_weights = self.pcm.optimiser(dt, initial_weights=weights)
+
+        full_assets = sorted(
+            set(positions).union(set(self.pcm.universe.get_assets(dt)))
+        )
+        full_weights = {asset: 0.0 for asset in full_assets}
+        full_weights.update(optimised_weights)
+        return full_weights
+
+    def _target_quantities(self, dt, weights, total_equity):
+        """
+        Size the target portfolio from the target weights via the
+        order sizer of the session.
+
+        Parameters
+        ----------
+        dt : `pd.Timestamp`
+            The rebalance time.
+        weights : `dict{str: float}`
+            The full target weight vector.
+        total_equity : `float`
+            The total equity of the portfolio.
+
+        Returns
+        -------
+        `dict{str: int}`
+            The target quantity of each weighted asset.
+        """
+        target_portfolio = self.pcm.order_sizer.size_target_portfolio(
+            dt, weights, total_equity
+        )
+        return {
+            asset: target['quantity'] for asset, target in target_portfolio.items()
+        }
+
+    def _execute_orders(self, row, orders, positions, prices):
+        """
+        Execute orders at the bid (sells) or ask (buys) price, adjusted
+        by any slippage and market impact models of the broker, with
+        sells executed prior to buys, updating the positions and cash.
+
+        Parameters
+        ----------
+        row : `int`
+            The event position.
+        orders : `list[tuple(str, int)]`
+            The asset and quantity of each order, in submission order.
+        positions : `dict{str: int}`
+            The net quantity of each held asset, updated in place.
+        prices : `dict{str: float}`
+            The transaction prices of the transacted assets, updated
+            in place.
+        """
+        dt = self.event_dts[row]
+        quantities = np.array([quantity for _, quantity in orders])
+        order_index = np.argsort(np.copysign(1, quantities), kind='stable')
+        assets = [orders[i][0] for i in order_index]
+        quantities = quantities[order_index]
+        cols = [self.asset_columns[asset] for asset in assets]
+        bids = self.bids[row, cols]
+        asks = self.asks[row, cols]
+        missing = np.isnan(bids) & np.isnan(asks)
+        if np.any(missing):
+            raise ValueError(
+                "Could not obtain a latest market price for Asset with "
+                "ticker symbol '%s'. Order was not executed." % assets[int(np.argmax(missing))]
+            )
+
+        bids, asks = self.session.broker.calc_execution_bid_ask(
+            dt, assets, quantities, bids, asks
+        )
+        txn_prices = np.where(quantities > 0, asks, bids)
+        share_costs = txn_prices * quantities
+        considerations = np.round(share_costs).astype(np.int64).tolist()
+        commissions = np.array([
+            self.fee_model.calc_total_cost(
+                asset, quantity, consideration, self.session.broker
+            )
+            for asset, (_, quantity), consideration in zip(
+                assets, [orders[i] for i in order_index], considerations
+            )
+        ], dtype=np.float64)
+
+        # Cash is reduced by each transaction in turn, as by the broker
+        self.cash = float(
+            np.subtract.accumulate(
+                np.concatenate([[self.cash], share_costs + commissions])
+            )[-1]
+        )
+        for i, asset in enumerate(assets):
+            quantity = orders[order_index[i]][1]
+            self.transactions.append(
+                (dt, asset, quantity, txn_prices[i], commissions[i])
+            )
+            net_quantity = positions.get(asset, 0) + quantity
+            if net_quantity == 0:
+                del positions[asset]
+            else:
+                positions[asset] = net_quantity
+            prices[asset] = txn_prices[i]
+
+    def _rebalance(self, row, positions, prices):
+        """
+        Carry out a full run of the quant trading system at a rebalance,
+        returning the orders generated.
+
+        Parameters
+        ----------
+        row : `int`
+            The event position.
+        positions : `dict{str: int}`
+            The net quantity of each held asset.
+        prices : `dict{str: float}`
+            The transaction prices of those assets transacted at the event.
+
+        Returns
+        -------
+        `list[tuple(str, int)]`
+            The asset and quantity of each order, sorted by asset.
+        """
+        dt = self.event_dts[row]
+        full_weights = self._target_weights(dt, positions)
+        alloc_dict = {'Date': dt}
+        alloc_dict.update(full_weights)
+        self.target_allocations.append(alloc_dict)
+
+        self._load_assets(full_weights)
+        total_equity = self._portfolio_market_value(row, positions, prices) + self.cash
+        target_quantities = self._target_quantities(dt, full_weights, total_equity)
+        orders = [
+            (asset, target_quantity - positions.get(asset, 0))
+            for asset, target_quantity in sorted(target_quantities.items())
+        ]
+        return [(asset, quantity) for asset, quantity in orders if quantity != 0]
+
+    def _value_holdings(self, rows, positions):
+        """
+        Value constant holdings at mid prices across multiple events.
+
+        Parameters
+        ----------
+        rows : `np.ndarray`
+            The event positions.
+        positions : `dict{str: int}`
+            The net quantity of each held asset.
+
+        Returns
+        -------
+        `np.ndarray`
+            The total equity at each event.
+        """
+        market_values = np.zeros(len(rows))
+        assets = list(positions)
+        if len(assets) > 0:
+            mids = self._mid_prices(rows, assets)
+            for i, asset in enumerate(assets):
+                market_values = market_values + mids[:, i] * positions[asset]
+        return market_values + self.cash
+
+    def _record_holdings(self, rows, positions):
+        """
+        Record the equity and the holdings across multiple events.
+
+        Parameters
+        ----------
+        rows : `np.ndarray`
+            The event positions at which the equity is recorded.
+        positions : `dict{str: int}`
+            The net quantity of each held asset.
+        """
+        if len(rows) == 0:
+            return
+        equity = self._value_holdings(rows, positions)
+        for row, row_equity in zip(rows.tolist(), equity.tolist()):
+            self.equity_curve.append((self.event_dts[row], row_equity))
+            self.holdings.append(dict(positions))
+
+    def run(self):
+        """
+        Carry out the vectorised backtest.
+
+        Returns
+        -------
+        `VectorisedBacktest`
+            The completed backtest.
+        """
+        num_events = len(self.events)
+        event_ts = np.array([dt.value for dt in self.event_dts], dtype=np.int64)
+        is_close = np.array(
+            [event.event_type == 'market_close' for event in self.events], dtype=bool
+        )
+        is_rebalance = np.isin(event_ts, self.session.rebalance_index.timestamps)
+
+        # Only the first event at a timestamp is a rebalance event
+        is_rebalance[1:] &= event_ts[1:] != event_ts[:-1]
+        is_recorded = is_close.copy()
+        if self.session.burn_in_dt is not None:
+            is_rebalance &= event_ts >= self.session.burn_in_dt.value
+            is_recorded &= event_ts >= self.session.burn_in_dt.value
+        is_open = self._is_exchange_open(event_ts)
+        open_rows = np.flatnonzero(is_open)
+        close_rows = np.flatnonzero(is_close)
+        recorded_rows = np.flatnonzero(is_recorded)
+        rebalance_rows = np.flatnonzero(is_rebalance).tolist()
+        submit_orders = self.execution_handler.submit_orders
+        signals = self.session.signals
+
+        self._load_assets(
+            set().union(*[
+                self.pcm.universe.get_assets(self.event_dts[row]) for row in rebalance_rows
+            ])
+        )
+        self.cash = 0.0 + self.session.initial_cash
+        positions = {}
+        pending_orders = []
+        next_rebalance = 0
+        last_row = -1
+        while True:
+            candidates = []
+            if next_rebalance < len(rebalance_rows):
+                candidates.append(rebalance_rows[next_rebalance])
+            if len(pending_orders) > 0:
+                pos = int(np.searchsorted(open_rows, last_row, side='right'))
+                if pos < len(open_rows):
+                    candidates.append(int(open_rows[pos]))
+            row = min(candidates) if len(candidates) > 0 else num_events
+
+            # Value the constant holdings prior to the next event
+            # at which they may change
+            self._record_holdings(
+                recorded_rows[(recorded_rows > last_row) & (recorded_rows < row)],
+                positions
+            )
+            if row == num_events:
+                break
+
+            # Signals are updated at every market close up to and
+            # including the current event, prior to the rebalance
+            if signals is not None:
+                for close_row in close_rows[(close_rows > last_row) & (close_rows <= row)]:
+                    signals.update(self.event_dts[close_row])
+
+            prices = {}
+            self._check_mid_prices(row, list(positions))
+            if is_open[row] and len(pending_orders) > 0:
+                self._execute_orders(row, pending_orders, positions, prices)
+                pending_orders = []
+
+            if next_rebalance < len(rebalance_rows) and rebalance_rows[next_rebalance] == row:
+                next_rebalance += 1
+                orders = self._rebalance(row, positions, prices)
+                # The broker is updated after each order is submitted, such
+                # that each order is executed immediately if the exchange
+                # is open, and the positions are revalued at mid prices
+                if submit_orders and len(orders) > 0:
+                    prices = {}
+                    if is_open[row]:
+                        for order in orders:
+                            prices = {}
+                            self._execute_orders(row, [order], positions, prices)
+                    else:
+                        pending_orders.extend(orders)
+
+            if is_recorded[row]:
+                equity = self._portfolio_market_value(row, positions, prices) + self.cash
+                self.equity_curve.append((self.event_dts[row], equity))
+                self.holdings.append(dict(positions))
+            last_row = row
+        return self
+
+    def get_holdings(self):
+        """
+        Returns the quantity of each asset held at each recorded
+        equity curve datetime.
+
+        Returns
+        -------
+        `pd.DataFrame`
+            The datetime-indexed asset quantities.
+        """
+        holdings_df = pd.DataFrame(
+            self.holdings, index=[dt for dt, _ in self.equity_curve],
+            columns=self.assets
+        ).fillna(0)
+        return holdings_df.loc[:, (holdings_df != 0).any(axis=0)]
+
+    def get_transactions(self):
+        """
+        Returns the executed transactions, including their commission.
+
+        Returns
+        -------
+        `pd.DataFrame`
+            The asset, quantity, price and commission of each transaction.
+        """
+        return pd.DataFrame(
+            self.transactions,
+            columns=['Date', 'Asset', 'Quantity', 'Price', 'Commission']
+        )
@@ -0,0 +1,341 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from qstrader import settings
+from qstrader.trading.sweep import ParameterSweep, summary_statistics
+
+
+# Offset subtracted from the start of the following window to obtain
+# the (inclusive) ending datetime of a training or testing window
+WINDOW_END_OFFSET = pd.Timedelta(1, unit='ns')
+
+
+class WindowSessionFactory(object):
+    """
+    A picklable session factory restricting the backtests created by
+    a walk-forward session factory to a single window.
+
+    Parameters
+    ----------
+    session_factory : `callable`
+        The callable taking the data sources, the starting and ending
+        datetimes and the parameters as keyword arguments, returning
+        a BacktestTradingSession.
+    start_dt : `pd.Timestamp`
+        The starting datetime (UTC) of the window.
+    end_dt : `pd.Timestamp`
+        The ending datetime (UTC) of the window.
+    """
+
+    def __init__(self, session_factory, start_dt, end_dt):
+        self.session_factory = session_factory
+        self.start_dt = start_dt
+        self.end_dt = end_dt
+
+    def __call__(self, data_sources, **params):
+        return self.session_factory(data_sources, self.start_dt, self.end_dt, **params)
+
+
+class WindowDataSourceFactory(object):
+    """
+    A picklable data source factory loading the data sources of a
+    walk-forward data source factory for a single window.
+
+    Parameters
+    ----------
+    data_source_factory : `callable`
+        The callable taking the starting and ending datetimes of the
+        window, returning the list of data sources.
+    start_dt : `pd.Timestamp`
+        The starting datetime (UTC) of the window.
+    end_dt : `pd.Timestamp`
+        The ending datetime (UTC) of the window.
+    """
+
+    def __init__(self, data_source_factory, start_dt, end_dt):
+        self.data_source_factory = data_source_factory
+        self.start_dt = start_dt
+        self.end_dt = end_dt
+
+    @property
+    def cache_dir(self):
+        return getattr(self.data_source_factory, 'cache_dir', None)
+
+    def __call__(self):
+        return self.data_source_factory(self.start_dt, self.end_dt)
+
+
+def _run_fold(
+    fold,
+    session_factory,
+    param_grid,
+    data_source_factory,
+    objective,
+    periods,
+    print_events
+):
+    """
+    Carry out the in-sample parameter search of a single fold and
+    evaluate the best parameters out of sample.
+
+    The training window data sources are loaded once and reused by the
+    backtests of every parameter candidate.
+
+    Parameters
+    ----------
+    fold : `dict`
+        The fold index and the training and testing window datetimes.
+    session_factory : `callable`
+        The walk-forward session factory.
+    param_grid : `dict{str: list}` or `list[dict]`
+        The parameter candidates.
+    data_source_factory : `callable` or None
+        The walk-forward data source factory.
+    objective : `str`
+        The summary statistic maximised in sample.
+    periods : `int`
+        The number of periods per year used to annualise statistics.
+    print_events : `Boolean`
+        Whether to print simulation events.
+
+    Returns
+    -------
+    `dict`
+        The fold windows, the best parameters, the in-sample objective,
+        the out-of-sample statistics, initial equity and equity curve.
+    """
+    settings.PRINT_EVENTS = print_events
+
+    def window_data_source_factory(start_dt, end_dt):
+        if data_source_factory is None:
+            return None
+        return WindowDataSourceFactory(data_source_factory, start_dt, end_dt)
+
+    train_sweep = ParameterSweep(
+        WindowSessionFactory(session_factory, fold['train_start'], fold['train_end']),
+        param_grid,
+        data_source_factory=window_data_source_factory(fold['train_start'], fold['train_end']),
+        periods=periods
+    )
+    train_results = train_sweep.run()
+    objectives = train_results[objective].astype(float)
+    if objectives.isna().all():
+        raise ValueError(
+            "In-sample objective '%s' is undefined for every parameter "
+            "candidate of fold %s, training between %s and %s. Cannot "
+            "select the fold parameters." % (
+                objective, fold['fold'], fold['train_start'], fold['train_end']
+            )
+        )
+    best_run = objectives.idxmax()
+    params = train_sweep.runs[best_run]
+
+    test_data_sources = None
+    if data_source_factory is not None:
+        test_data_sources = data_source_factory(fold['test_start'], fold['test_end'])
+    backtest = session_factory(
+        test_data_sources, fold['test_start'], fold['test_end'], **params
+    )
+    backtest.run(results=False)
+    equity_curve = backtest.get_equity_curve()['Equity']
+
+    result = dict(fold)
+    result['params'] = params
+    result['in_sample_%s' % objective] = train_results.loc[best_run, objective]
+    result.update(summary_statistics(equity_curve, periods=periods))
+    result['initial_equity'] = backtest.initial_cash
+    result['equity_curve'] = equity_curve
+    return result
+
+
+class WalkForwardOptimisation(object):
+    """
+    Walk-forward optimisation of strategy parameters, re-optimising
+    the parameters on a rolling (or anchored) in-sample training window
+    and evaluating them on the subsequent out-of-sample testing window.
+
+    The range between the starting and ending datetimes is split into
+    consecutive, non-overlapping testing windows, each preceded by its
+    training window. The in-sample parameter searches of the folds are
+    carried out in parallel across worker processes. Each fold loads
+    its training window data sources once and reuses them across all
+    parameter candidates.
+
+    The out-of-sample equity curves are stitched into one continuous
+    equity curve, with each fold continuing from the final equity of
+    the previous fold, such that the returns of each fold relative to
+    its initial cash (including those of its first day) are retained.
+
+    Parameters
+    ----------
+    session_factory : `callable`
+        A picklable callable taking the list of data sources, the
+        starting and ending datetimes of the window and the parameters
+        as keyword arguments, returning a (not yet run)
+        BacktestTradingSession.
+    param_grid : `dict{str: list}` or `list[dict]`
+        The values of each parameter, whose cartesian product is
+        searched, or an explicit list of parameter combinations.
+    start_dt : `pd.Timestamp`
+        The starting datetime (UTC) of the first training window.
+    end_dt : `pd.Timestamp`
+        The ending datetime (UTC) of the final testing window.
+    train_period : `pd.Timedelta` or `pd.DateOffset`
+        The length of each training window.
+    test_period : `pd.Timedelta` or `pd.DateOffset`
+        The length of each testing window, by which the folds roll forward.
+    data_source_factory : `callable`, optional
+        A picklable callable taking the starting and ending datetimes
+        of a window, returning the list of data sources covering it
+        (including any data warmup period prior to the window).
+    objective : `str`, optional
+        The summary statistic maximised in sample, defaulting to 'sharpe'.
+    anchored : `Boolean`, optional
+        Whether every training window begins at the starting datetime,
+        rather than rolling forward.
+    workers : `int`, optional
+        The number of worker processes. Defaults to carrying out the
+        folds serially within the current process.
+    periods : `int`, optional
+        The number of periods per year used to annualise statistics.
+    """
+
+    def __init__(
+        self,
+        session_factory,
+        param_grid,
+        start_dt,
+        end_dt,
+        train_period,
+        test_period,
+        data_source_factory=None,
+        objective='sharpe',
+        anchored=False,
+        workers=1,
+        periods=252
+    ):
+        if workers < 1:
+            raise ValueError(
+                "Number of walk-forward workers must be at least one, "
+                "but %s was provided." % workers
+            )
+        self.session_factory = session_factory
+        self.param_grid = param_grid
+        self.start_dt = start_dt
+        self.end_dt = end_dt
+        self.train_period = train_period
+        self.test_period = test_period
+        self.data_source_factory = data_source_factory
+        self.objective = objective
+        self.anchored = anchored
+        self.workers = workers
+        self.periods = periods
+        self.folds = self._create_folds()
+        self.equity_curve = None
+
+    def _create_folds(self):
+        """
+        Split the range into the training and testing windows of each fold.
+
+        Returns
+        -------
+        `list[dict]`
+            The fold index and the training and testing window datetimes.
+        """
+        folds = []
+        train_start = self.start_dt
+        test_start = self.start_dt + self.train_period
+        while test_start <= self.end_dt:
+            test_end = min(test_start + self.test_period - WINDOW_END_OFFSET, self.end_dt)
+            folds.append(
+                {
+                    'fold': len(folds),
+                    'train_start': train_start,
+                    'train_end': test_start - WINDOW_END_OFFSET,
+                    'test_start': test_start,
+                    'test_end': test_end
+                }
+            )
+            if not self.anchored:
+                train_start = train_start + self.test_period
+            test_start = test_start + self.test_period
+
+        if len(folds) == 0:
+            raise ValueError(
+                "Training period %s does not leave a testing window between "
+                "%s and %s. Cannot create WalkForwardOptimisation "
+                "instance." % (self.train_period, self.start_dt, self.end_dt)
+            )
+        return folds
+
+    @staticmethod
+    def stitch_equity_curves(equity_curves, initial_equities=None):
+        """
+        Stitch consecutive equity curves into one continuous curve, by
+        rescaling the initial equity of each curve to the final equity
+        of the previous curve.
+
+        Parameters
+        ----------
+        equity_curves : `list[pd.Series]`
+            The date-indexed equity curves, in order.
+        initial_equities : `list[float]`, optional
+            The initial equity (e.g. the initial cash) of each curve,
+            prior to its first value. Defaults to the first value of
+            each curve, disregarding the returns up to it.
+
+        Returns
+        -------
+        `pd.Series`
+            The stitched equity curve.
+        """
+        if initial_equities is None:
+            initial_equities = [
+                equity_curve.iloc[0] if len(equity_curve) > 0 else None
+                for equity_curve in equity_curves
+            ]
+        stitched = []
+        for equity_curve, initial_equity in zip(equity_curves, initial_equities):
+            if len(equity_curve) == 0:
+                continue
+            if len(stitched) > 0:
+                equity_curve = equity_curve * (
+                    stitched[-1].iloc[-1] / initial_equity
+                )
+            stitched.append(equity_curve)
+        if len(stitched) == 0:
+            return pd.Series(dtype=float, name='Equity')
+        return pd.concat(stitched)
+
+    def run(self):
+        """
+        Carry out the in-sample parameter search and out-of-sample
+        evaluation of every fold, stitching the out-of-sample equity
+        curves into the equity_curve attribute.
+
+        Returns
+        -------
+        `pd.DataFrame`
+            The fold-indexed windows, best parameters, in-sample objective,
+            out-of-sample statistics and equity curves.
+        """
+        fold_args = (
+            self.session_factory, self.param_grid, self.data_source_factory,
+            self.objective, self.periods, settings.PRINT_EVENTS
+        )
+        if self.workers == 1:
+            results = [_run_fold(fold, *fold_args) for fold in self.folds]
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                futures = [
+                    executor.submit(_run_fold, fold, *fold_args)
+                    for fold in self.folds
+                ]
+                results = [future.result() for future in futures]
+
+        self.equity_curve = self.stitch_equity_curves(
+            [result['equity_curve'] for result in results],
+            [result['initial_equity'] for result in results]
+        )
+        return pd.DataFrame(results).set_index('fold')
@@ -13,7 +13,9 @@ from qstrader.data.backtest_data_handler import BacktestDataHandler
 from qstrader.data.daily_bar_csv import CSVDailyBarDataSource
 from qstrader.statistics.json_statistics import JSONStatistics
 from qstrader.statistics.tearsheet import TearsheetStatistics
-from qstrader.trading.backtest import BacktestTradingSession
+from qstrader.trading.multi_strategy import (
+    BacktestStrategy, MultiStrategyBacktestTradingSession
+)
 
 
 def obtain_allocations(allocations):
@@ -68,68 +70,56 @@ def cli(start_date, end_date, allocations, strat_title, strat_id, tearsheet):
 
     alloc_dict = obtain_allocations(allocations)
 
-    # Assets and Data Handling
+    # Assets and Data Handling, shared by the strategy and the benchmark
     strategy_assets = list(alloc_dict.keys())
-    strategy_symbols = [symbol.replace('EQ:', '') for symbol in strategy_assets]
-    strategy_universe = StaticUniverse(strategy_assets)
-    strategy_data_source = CSVDailyBarDataSource(csv_dir, Equity, csv_symbols=strategy_symbols)
-
-    strategy_data_handler = BacktestDataHandler(
-        strategy_universe, data_sources=[strategy_data_source]
-    )
-
-    strategy_assets = alloc_dict.keys()
-    strategy_alpha_model = FixedSignalsAlphaModel(alloc_dict)
-    strategy_backtest = BacktestTradingSession(
-        start_dt,
-        end_dt,
-        strategy_universe,
-        strategy_alpha_model,
+    benchmark_assets = ['EQ:SPY', 'EQ:AGG']
+    symbols = [
+        symbol.replace('EQ:', '')
+        for symbol in dict.fromkeys(strategy_assets + benchmark_assets)
+    ]
+    data_source = CSVDailyBarDataSource(csv_dir, Equity, csv_symbols=symbols)
+    data_handler = BacktestDataHandler(None, data_sources=[data_source])
+
+    strategy = BacktestStrategy(
+        'STATIC001',
+        StaticUniverse(strategy_assets),
+        FixedSignalsAlphaModel(alloc_dict),
         rebalance='end_of_month',
-        account_name=strat_title,
-        portfolio_id='STATIC001',
         portfolio_name=strat_title,
         long_only=True,
-        cash_buffer_percentage=0.01,
-        data_handler=strategy_data_handler
+        cash_buffer_percentage=0.01
     )
-    strategy_backtest.run()
 
     # Benchmark: 60/40 US Equities/Bonds
-    benchmark_symbols = ['SPY', 'AGG']
-    benchmark_assets = ['EQ:SPY', 'EQ:AGG']
-    benchmark_universe = StaticUniverse(benchmark_assets)
-
-    benchmark_data_source = CSVDailyBarDataSource(csv_dir, Equity, csv_symbols=benchmark_symbols)
-    benchmark_data_handler = BacktestDataHandler(
-        benchmark_universe, data_sources=[benchmark_data_source]
-    )
-
     benchmark_signal_weights = {'EQ:SPY': 0.6, 'EQ:AGG': 0.4}
     benchmark_title = '60/40 US Equities/Bonds'
-    benchmark_alpha_model = FixedSignalsAlphaModel(benchmark_signal_weights)
-    benchmark_backtest = BacktestTradingSession(
-        start_dt,
-        end_dt,
-        benchmark_universe,
-        benchmark_alpha_model,
+    benchmark = BacktestStrategy(
+        '6040EQBD',
+        StaticUniverse(benchmark_assets),
+        FixedSignalsAlphaModel(benchmark_signal_weights),
         rebalance='end_of_month',
-        account_name='60/40 US Equities/Bonds',
-        portfolio_id='6040EQBD',
         portfolio_name=benchmark_title,
         long_only=True,
-        cash_buffer_percentage=0.01,
-        data_handler=benchmark_data_handler
+        cash_buffer_percentage=0.01
+    )
+
+    # Backtest the strategy and benchmark within a single event loop
+    backtest = MultiStrategyBacktestTradingSession(
+        start_dt,
+        end_dt,
+        [strategy, benchmark],
+        data_handler=data_handler,
+        account_name=strat_title
     )
-    benchmark_backtest.run()
+    backtest.run()
 
     output_filename = ('%s_monthly.json' % strat_id).replace('-', '_')
     stats = JSONStatistics(
-        equity_curve=strategy_backtest.get_equity_curve(),
-        target_allocations=strategy_backtest.get_target_allocations(),
+        equity_curve=backtest.get_equity_curve('STATIC001'),
+        target_allocations=backtest.get_target_allocations('STATIC001'),
         strategy_id=strat_id,
         strategy_name=strat_title,
-        benchmark_curve=benchmark_backtest.get_equity_curve(),
+        benchmark_curve=backtest.get_equity_curve('6040EQBD'),
         benchmark_id='6040-us-equitiesbonds',
         benchmark_name=benchmark_title,
         output_filename=output_filename
@@ -138,8 +128,8 @@ def cli(start_date, end_date, allocations, strat_title, strat_id, tearsheet):
 
     if tearsheet:
         tearsheet = TearsheetStatistics(
-            strategy_equity=strategy_backtest.get_equity_curve(),
-            benchmark_equity=benchmark_backtest.get_equity_curve(),
+            strategy_equity=backtest.get_equity_curve('STATIC001'),
+            benchmark_equity=backtest.get_equity_curve('6040EQBD'),
             title=strat_title
         )
         tearsheet.plot_results()
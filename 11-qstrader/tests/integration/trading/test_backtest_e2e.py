@@ -1,11 +1,19 @@
 import os
 
+import numpy as np
 import pandas as pd
 import pytz
 import pytest
 
 from qstrader.alpha_model.fixed_signals import FixedSignalsAlphaModel
+from qstrader.asset.equity import Equity
 from qstrader.asset.universe.static import StaticUniverse
+from qstrader.data.backtest_data_handler import BacktestDataHandler
+from qstrader.data.daily_bar_csv import CSVDailyBarDataSource
+from qstrader.data.in_memory import InMemoryPriceDataSource
+from qstrader.signals.momentum import MomentumSignal
+from qstrader.signals.signals_collection import SignalsCollection
+from qstrader.statistics.recorder import PortfolioRecorder
 from qstrader.trading.backtest import BacktestTradingSession
 
 from qstrader import settings
@@ -195,3 +203,275 @@ def test_backtest_target_allocations(etf_filepath,):
     expected_ta = pd.DataFrame(data={'EQ:ABC': 0.6, 'EQ:DEF': 0.4}, index=pd.date_range("20190125", periods=5, freq='B'))
     actual_ta = target_allocations.tail()
     assert expected_ta.equals(actual_ta)
+
+
+def test_backtest_data_warmup_load_window(etf_filepath):
+    """
+    Ensures that restricting the loaded pricing data to the backtest
+    period plus a data warmup produces the same portfolio history as
+    loading the full history of every CSV file.
+    """
+    os.environ['QSTRADER_CSV_DATA_DIR'] = etf_filepath
+
+    assets = ['EQ:ABC', 'EQ:DEF']
+    universe = StaticUniverse(assets)
+    signal_weights = {'EQ:ABC': 0.6, 'EQ:DEF': 0.4}
+
+    start_dt = pd.Timestamp('2019-01-01 00:00:00', tz=pytz.UTC)
+    end_dt = pd.Timestamp('2019-01-31 23:59:00', tz=pytz.UTC)
+
+    histories = []
+    for data_warmup in (None, pd.Timedelta(days=30)):
+        backtest = BacktestTradingSession(
+            start_dt,
+            end_dt,
+            universe,
+            FixedSignalsAlphaModel(signal_weights),
+            portfolio_id='000001',
+            rebalance='weekly',
+            rebalance_weekday='WED',
+            long_only=True,
+            cash_buffer_percentage=0.05,
+            data_warmup=data_warmup
+        )
+        backtest.run(results=False)
+        histories.append(backtest.broker.portfolios['000001'].history_to_df())
+
+    data_source = backtest.data_handler.data_sources[0]
+    for bar_df in data_source.asset_bar_frames.values():
+        if len(bar_df) == 0:
+            continue
+        assert bar_df.index[0] >= pd.Timestamp('2018-12-02', tz=pytz.UTC)
+        assert bar_df.index[-1] <= end_dt
+    pd.testing.assert_frame_equal(histories[0], histories[1])
+
+
+def test_backtest_sparse_clock(etf_filepath, tmp_path):
+    """
+    Ensures that a backtest driven by the sparse clock skips those
+    events without new prices or rebalances, while producing the same
+    portfolio and equity curve (excluding the skipped days) as the
+    backtest visiting every business day event.
+    """
+    skipped_days = ['2019-01-14', '2019-01-15']
+    for symbol in ('ABC', 'DEF'):
+        bar_df = pd.read_csv(os.path.join(etf_filepath, '%s.csv' % symbol))
+        bar_df[~bar_df['Date'].isin(skipped_days)].to_csv(
+            os.path.join(tmp_path, '%s.csv' % symbol), index=False
+        )
+    os.environ['QSTRADER_CSV_DATA_DIR'] = str(tmp_path)
+
+    assets = ['EQ:ABC', 'EQ:DEF']
+    signal_weights = {'EQ:ABC': 0.6, 'EQ:DEF': 0.4}
+    start_dt = pd.Timestamp('2019-01-01 00:00:00', tz=pytz.UTC)
+    end_dt = pd.Timestamp('2019-01-31 23:59:00', tz=pytz.UTC)
+
+    backtests = {}
+    for sparse_clock in (False, True):
+        backtests[sparse_clock] = BacktestTradingSession(
+            start_dt,
+            end_dt,
+            StaticUniverse(assets),
+            FixedSignalsAlphaModel(signal_weights),
+            portfolio_id='000001',
+            rebalance='weekly',
+            rebalance_weekday='WED',
+            long_only=True,
+            cash_buffer_percentage=0.05,
+            sparse_clock=sparse_clock
+        )
+        backtests[sparse_clock].run(results=False)
+
+    dense, sparse = backtests[False], backtests[True]
+    # The weekend bars of the fixtures are new data at the Monday open
+    assert sparse.sim_engine.skipped_events == 3
+    assert sparse.sim_engine.total_events == len(list(dense.sim_engine))
+
+    pd.testing.assert_frame_equal(
+        sparse.broker.portfolios['000001'].history_to_df(),
+        dense.broker.portfolios['000001'].history_to_df()
+    )
+    dense_curve = dense.get_equity_curve()
+    sparse_curve = sparse.get_equity_curve()
+    assert list(dense_curve.index.difference(sparse_curve.index)) == [
+        pd.Timestamp(day).date() for day in skipped_days
+    ]
+    pd.testing.assert_frame_equal(sparse_curve, dense_curve.loc[sparse_curve.index])
+
+
+def test_backtest_sparse_clock_signals(etf_filepath, tmp_path):
+    """
+    Ensures that signals are updated at every market close when driven
+    by the sparse clock, including those without new prices, such that
+    their lookback windows match those of the backtest visiting every
+    business day event.
+    """
+    skipped_days = ['2019-01-14', '2019-01-15']
+    for symbol in ('ABC', 'DEF'):
+        bar_df = pd.read_csv(os.path.join(etf_filepath, '%s.csv' % symbol))
+        bar_df[~bar_df['Date'].isin(skipped_days)].to_csv(
+            os.path.join(tmp_path, '%s.csv' % symbol), index=False
+        )
+
+    assets = ['EQ:ABC', 'EQ:DEF']
+    start_dt = pd.Timestamp('2019-01-01 00:00:00', tz=pytz.UTC)
+    end_dt = pd.Timestamp('2019-01-31 23:59:00', tz=pytz.UTC)
+
+    backtests = {}
+    for sparse_clock in (False, True):
+        universe = StaticUniverse(assets)
+        data_handler = BacktestDataHandler(
+            universe, data_sources=[
+                CSVDailyBarDataSource(str(tmp_path), Equity, csv_symbols=['ABC', 'DEF'])
+            ]
+        )
+        signals = SignalsCollection(
+            {'momentum': MomentumSignal(start_dt, universe, lookbacks=[5])}, data_handler
+        )
+        backtests[sparse_clock] = BacktestTradingSession(
+            start_dt,
+            end_dt,
+            universe,
+            FixedSignalsAlphaModel({'EQ:ABC': 0.6, 'EQ:DEF': 0.4}),
+            signals=signals,
+            rebalance='weekly',
+            rebalance_weekday='WED',
+            long_only=True,
+            cash_buffer_percentage=0.05,
+            data_handler=data_handler,
+            sparse_clock=sparse_clock
+        )
+        backtests[sparse_clock].run(results=False)
+
+    dense, sparse = backtests[False], backtests[True]
+    assert sparse.sim_engine.skipped_events > 0
+    assert sparse.signals.warmup == dense.signals.warmup
+    for asset in assets:
+        assert sparse.signals['momentum'](asset, 5) == dense.signals['momentum'](asset, 5)
+    pd.testing.assert_frame_equal(
+        sparse.broker.portfolios[sparse.portfolio_id].history_to_df(),
+        dense.broker.portfolios[dense.portfolio_id].history_to_df()
+    )
+
+
+def test_backtest_recorder(etf_filepath, tmp_path):
+    """
+    Checks that a recorder passed to a backtest samples the equity,
+    cash and holdings of the portfolio at each equity curve update.
+    """
+    os.environ['QSTRADER_CSV_DATA_DIR'] = etf_filepath
+    assets = ['EQ:ABC', 'EQ:DEF']
+    universe = StaticUniverse(assets)
+    alpha_model = FixedSignalsAlphaModel({'EQ:ABC': 1.0, 'EQ:DEF': -0.7})
+    recorder = PortfolioRecorder(chunk_size=8, spill_dir=str(tmp_path))
+
+    backtest = BacktestTradingSession(
+        pd.Timestamp('2019-01-01 00:00:00', tz=pytz.UTC),
+        pd.Timestamp('2019-01-31 23:59:00', tz=pytz.UTC),
+        universe,
+        alpha_model,
+        rebalance='daily',
+        long_only=False,
+        gross_leverage=2.0,
+        recorder=recorder
+    )
+    backtest.run(results=False)
+
+    equity_df = recorder.get_equity_curve()
+    assert list(equity_df.index) == [dt for dt, _ in backtest.equity_curve]
+    assert list(equity_df['Equity']) == [equity for _, equity in backtest.equity_curve]
+
+    portfolio = backtest.broker.portfolios[backtest.portfolio_id]
+    assert equity_df['Cash'].iloc[-1] == portfolio.cash
+    final_holdings = recorder.get_holdings().iloc[-1]
+    for asset, position in portfolio.pos_handler.positions.items():
+        assert final_holdings[asset] == position.net_quantity
+    assert recorder.get_weights().iloc[-1]['EQ:DEF'] < 0.0
+
+
+def test_backtest_without_journal(etf_filepath):
+    """
+    Checks that a backtest without a portfolio journal records no
+    history, while its equity curve is unchanged.
+    """
+    os.environ['QSTRADER_CSV_DATA_DIR'] = etf_filepath
+    backtests = []
+    for journal in [True, False]:
+        universe = StaticUniverse(['EQ:ABC', 'EQ:DEF'])
+        backtest = BacktestTradingSession(
+            pd.Timestamp('2019-01-01 00:00:00', tz=pytz.UTC),
+            pd.Timestamp('2019-01-31 23:59:00', tz=pytz.UTC),
+            universe,
+            FixedSignalsAlphaModel({'EQ:ABC': 0.6, 'EQ:DEF': 0.4}),
+            rebalance='daily',
+            long_only=True,
+            cash_buffer_percentage=0.05,
+            journal=journal
+        )
+        backtest.run(results=False)
+        backtests.append(backtest)
+
+    assert backtests[1].equity_curve == backtests[0].equity_curve
+    assert len(backtests[0].broker.portfolios['000001'].history_to_df()) > 0
+    assert backtests[1].broker.portfolios['000001'].history == []
+    assert backtests[1].broker.portfolios['000001'].history_to_df().empty
+
+
+def test_backtest_continuous():
+    """
+    Checks that a backtest with a bar frequency is simulated
+    continuously (24/7) on an always open exchange, executing the
+    orders of each rebalance at the same bar close rather than the
+    following weekday open, and that the vectorised backtest agrees.
+    """
+    settings.PRINT_EVENTS = False
+    timestamps = pd.date_range('2020-01-03', '2020-01-07', freq='1h', tz=pytz.UTC)
+    prices = np.linspace(7000.0, 5000.0, len(timestamps))[:, np.newaxis]
+    start_dt = pd.Timestamp('2020-01-03 00:00:00', tz=pytz.UTC)
+    end_dt = pd.Timestamp('2020-01-06 23:00:00', tz=pytz.UTC)
+
+    backtests = []
+    for _ in range(2):
+        universe = StaticUniverse(['CRYPTO:BTC'])
+        data_handler = BacktestDataHandler(
+            universe, data_sources=[
+                InMemoryPriceDataSource(timestamps, ['CRYPTO:BTC'], prices)
+            ]
+        )
+        backtests.append(
+            BacktestTradingSession(
+                start_dt,
+                end_dt,
+                universe,
+                FixedSignalsAlphaModel({'CRYPTO:BTC': 1.0}),
+                rebalance='daily',
+                long_only=True,
+                cash_buffer_percentage=0.05,
+                data_handler=data_handler,
+                frequency='1h'
+            )
+        )
+    backtest, vectorised = backtests
+    assert backtest.exchange.calendar.venue == 'CRYPTO'
+    backtest.run(results=False)
+    vectorised.run_vectorised()
+
+    # Hourly equity is recorded over the weekend
+    curve_dts = [dt for dt, _ in backtest.equity_curve]
+    assert curve_dts == list(pd.date_range(
+        '2020-01-03 01:00:00', '2020-01-07 00:00:00', freq='1h', tz=pytz.UTC
+    ))
+    np.testing.assert_allclose(
+        [equity for _, equity in backtest.equity_curve],
+        [equity for _, equity in vectorised.equity_curve], rtol=1e-12
+    )
+
+    # Both (Friday and Monday) rebalances execute at their bar close
+    portfolio = backtest.broker.portfolios['000001']
+    transaction_dts = [
+        pe.dt for pe in portfolio.history if pe.type == 'asset_transaction'
+    ]
+    assert transaction_dts == [
+        pd.Timestamp('2020-01-03 21:00:00', tz=pytz.UTC),
+        pd.Timestamp('2020-01-06 21:00:00', tz=pytz.UTC)
+    ]
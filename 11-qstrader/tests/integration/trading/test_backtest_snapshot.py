@@ -0,0 +1,250 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+import pytz
+
+from qstrader.alpha_model.fixed_signals import FixedSignalsAlphaModel
+from qstrader.asset.universe.static import StaticUniverse
+from qstrader.execution.order import Order
+from qstrader.trading.backtest import BacktestTradingSession
+from qstrader import settings
+
+
+START_DT = pd.Timestamp('2019-01-01 00:00:00', tz=pytz.UTC)
+MID_DT = pd.Timestamp('2019-01-15 23:59:00', tz=pytz.UTC)
+END_DT = pd.Timestamp('2019-01-31 23:59:00', tz=pytz.UTC)
+
+# Timestamp at which the crashing alpha model raises an exception
+CRASH_DT = None
+
+
+class CrashingAlphaModel(FixedSignalsAlphaModel):
+
+    def __call__(self, dt):
+        if CRASH_DT is not None and dt >= CRASH_DT:
+            raise RuntimeError('Simulated crash at %s' % dt)
+        return super().__call__(dt)
+
+
+def create_backtest(end_dt, weights=None):
+    if weights is None:
+        weights = {'EQ:ABC': 0.6, 'EQ:DEF': 0.4}
+    return BacktestTradingSession(
+        START_DT,
+        end_dt,
+        StaticUniverse(['EQ:ABC', 'EQ:DEF']),
+        CrashingAlphaModel(weights),
+        portfolio_id='000001',
+        rebalance='daily',
+        long_only=True,
+        cash_buffer_percentage=0.05
+    )
+
+
+def assert_backtests_equal(backtest, expected):
+    pd.testing.assert_frame_equal(
+        backtest.broker.portfolios['000001'].history_to_df(),
+        expected.broker.portfolios['000001'].history_to_df()
+    )
+    assert backtest.broker.portfolios['000001'].portfolio_to_dict() == \
+        expected.broker.portfolios['000001'].portfolio_to_dict()
+    pd.testing.assert_frame_equal(backtest.get_equity_curve(), expected.get_equity_curve())
+    pd.testing.assert_frame_equal(backtest.get_target_allocations(), expected.get_target_allocations())
+
+
+@pytest.fixture
+def expected(etf_filepath):
+    global CRASH_DT
+    CRASH_DT = None
+    settings.PRINT_EVENTS = False
+    os.environ['QSTRADER_CSV_DATA_DIR'] = etf_filepath
+    backtest = create_backtest(END_DT)
+    backtest.run(results=False)
+    return backtest
+
+
+def test_snapshot_restore_with_later_end_dt(expected, tmp_path):
+    """
+    Ensures that a snapshot of a finished backtest restored into a
+    backtest with a later ending datetime continues with only the new
+    events, matching a single uninterrupted backtest.
+    """
+    path = str(tmp_path / 'backtest.snapshot')
+    backtest = create_backtest(MID_DT)
+    backtest.run(results=False, snapshot_path=path)
+
+    resumed = create_backtest(END_DT)
+    resumed.restore(path)
+    assert resumed.events_processed == backtest.events_processed
+    resumed.run(results=False)
+    assert_backtests_equal(resumed, expected)
+
+
+def test_resume_after_crash(expected, tmp_path):
+    """
+    Ensures that a backtest crashing part way through can be resumed
+    from its most recent periodic snapshot.
+    """
+    global CRASH_DT
+    path = str(tmp_path / 'backtest.snapshot')
+    CRASH_DT = pd.Timestamp('2019-01-22 21:00:00', tz=pytz.UTC)
+    crashed = create_backtest(END_DT)
+    with pytest.raises(RuntimeError):
+        crashed.run(results=False, snapshot_path=path, snapshot_frequency=5)
+
+    CRASH_DT = None
+    resumed = create_backtest(END_DT)
+    resumed.restore(path)
+    assert 0 < resumed.events_processed <= crashed.events_processed
+    assert resumed.events_processed % 5 == 0
+    resumed.run(results=False)
+    assert_backtests_equal(resumed, expected)
+
+
+def test_fork_and_extend(expected):
+    """
+    Ensures that forked backtests continue independently of each other
+    from the same state, and that extended backtests only process the
+    newly added events.
+    """
+    backtest = create_backtest(MID_DT)
+    backtest.run(results=False)
+    forked = backtest.fork()
+    assert forked.data_handler is backtest.data_handler
+    assert forked.broker is not backtest.broker
+
+    # What-if scenario with different weights for the remaining period
+    forked.qts.alpha_model.signal_weights = {'EQ:ABC': 0.2, 'EQ:DEF': 0.8}
+    for session in (backtest, forked):
+        session.extend(END_DT)
+        session.run(results=False)
+
+    assert_backtests_equal(backtest, expected)
+    assert forked.events_processed == backtest.events_processed
+    assert forked.broker.portfolios['000001'].portfolio_to_dict() != \
+        backtest.broker.portfolios['000001'].portfolio_to_dict()
+    pd.testing.assert_frame_equal(
+        forked.get_equity_curve().loc[:MID_DT.date()],
+        backtest.get_equity_curve().loc[:MID_DT.date()]
+    )
+    with pytest.raises(ValueError):
+        backtest.extend(MID_DT)
+
+
+def test_snapshot_restores_resting_orders(tmp_path):
+    """
+    Ensures that resting limit orders on the order book and orders
+    awaiting execution are restored from a snapshot, such that they
+    can still be cancelled and continue to rest.
+    """
+    settings.PRINT_EVENTS = False
+    path = str(tmp_path / 'backtest.snapshot')
+    backtest = create_backtest(MID_DT)
+    backtest.run(results=False)
+    broker = backtest.broker
+    resting = Order(MID_DT, 'EQ:ABC', 100, order_type='limit', limit_price=1.0)
+    cancelled = Order(MID_DT, 'EQ:ABC', 100, order_type='limit', limit_price=2.0)
+    pending = Order(MID_DT, 'EQ:DEF', 100, order_type='limit', limit_price=1.0)
+    broker.order_book.add('000001', resting)
+    broker.order_book.add('000001', cancelled)
+    broker.submit_order('000001', pending)
+    open_order_ids = [order.order_id for order in broker.open_orders['000001']]
+    assert open_order_ids[-1] == pending.order_id
+    backtest.snapshot(path)
+
+    restored = create_backtest(END_DT)
+    restored.restore(path)
+    assert [
+        order.order_id for order in restored.broker.get_resting_orders('000001')
+    ] == [resting.order_id, cancelled.order_id]
+    assert [
+        order.order_id for order in restored.broker.open_orders['000001']
+    ] == open_order_ids
+
+    restored.broker.cancel_order('000001', cancelled.order_id)
+    restored.run(results=False)
+    assert [
+        order.order_id for order in restored.broker.get_resting_orders('000001')
+    ] == [resting.order_id, pending.order_id]
+
+
+def test_restore_mismatched_start_dt(expected, tmp_path):
+    """
+    Ensures that restoring a snapshot into a backtest with a different
+    starting datetime raises a ValueError.
+    """
+    path = str(tmp_path / 'backtest.snapshot')
+    expected.snapshot(path)
+    backtest = BacktestTradingSession(
+        START_DT + pd.Timedelta(days=1),
+        END_DT,
+        StaticUniverse(['EQ:ABC', 'EQ:DEF']),
+        FixedSignalsAlphaModel({'EQ:ABC': 1.0}),
+        rebalance='daily',
+        long_only=True,
+        cash_buffer_percentage=0.05
+    )
+    with pytest.raises(ValueError):
+        backtest.restore(path)
+
+
+@pytest.mark.parametrize('resume', ['extend', 'restore'])
+def test_extend_across_calendar_year(tmp_path, resume):
+    """
+    Ensures that a backtest with a compiled trading calendar, extended
+    or restored into the following calendar year, continues trading
+    in the new year, matching a single uninterrupted backtest.
+    """
+    global CRASH_DT
+    CRASH_DT = None
+    settings.PRINT_EVENTS = False
+    csv_dir = tmp_path / 'csv'
+    csv_dir.mkdir()
+    dates = pd.bdate_range('2019-12-02', '2020-02-28')
+    for i, symbol in enumerate(('ABC', 'DEF')):
+        closes = 100.0 + np.sin(np.arange(len(dates)) / (3.0 + i)) * 10.0
+        pd.DataFrame(
+            {
+                'Date': dates.strftime('%Y-%m-%d'), 'Open': closes - 0.5,
+                'Close': closes, 'Adj Close': closes
+            }
+        ).to_csv(csv_dir / ('%s.csv' % symbol), index=False)
+    os.environ['QSTRADER_CSV_DATA_DIR'] = str(csv_dir)
+
+    def create_calendar_backtest(end_dt):
+        return BacktestTradingSession(
+            pd.Timestamp('2019-12-02 00:00:00', tz=pytz.UTC),
+            end_dt,
+            StaticUniverse(['EQ:ABC', 'EQ:DEF']),
+            CrashingAlphaModel({'EQ:ABC': 0.6, 'EQ:DEF': 0.4}),
+            portfolio_id='000001',
+            rebalance='daily',
+            long_only=True,
+            cash_buffer_percentage=0.05,
+            exchange_calendar='NYSE'
+        )
+
+    year_end_dt = pd.Timestamp('2019-12-31 23:59:00', tz=pytz.UTC)
+    end_dt = pd.Timestamp('2020-02-28 23:59:00', tz=pytz.UTC)
+    expected = create_calendar_backtest(end_dt)
+    expected.run(results=False)
+
+    backtest = create_calendar_backtest(year_end_dt)
+    path = str(tmp_path / 'backtest.snapshot')
+    backtest.run(results=False, snapshot_path=path)
+    if resume == 'extend':
+        backtest.extend(end_dt)
+    else:
+        backtest = create_calendar_backtest(end_dt)
+        backtest.restore(path)
+    assert backtest.broker.exchange is backtest.exchange
+    backtest.run(results=False)
+
+    transaction_dts = [
+        pe.dt for pe in backtest.broker.portfolios['000001'].history
+        if pe.type == 'asset_transaction'
+    ]
+    assert transaction_dts[-1].date() == pd.Timestamp('2020-02-28').date()
+    assert_backtests_equal(backtest, expected)
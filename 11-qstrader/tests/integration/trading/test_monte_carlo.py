@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+import pytest
+import pytz
+
+from qstrader.alpha_model.fixed_signals import FixedSignalsAlphaModel
+from qstrader.asset.universe.static import StaticUniverse
+from qstrader.data.backtest_data_handler import BacktestDataHandler
+from qstrader.data.in_memory import InMemoryPriceDataSource
+from qstrader.trading.backtest import BacktestTradingSession
+from qstrader.trading.monte_carlo import MonteCarloRobustness
+from qstrader.trading.sweep import summary_statistics
+from qstrader import settings
+
+
+ASSETS = ['EQ:ABC', 'EQ:DEF']
+START_DT = pd.Timestamp('2019-01-02 00:00:00', tz=pytz.UTC)
+END_DT = pd.Timestamp('2019-06-28 23:59:00', tz=pytz.UTC)
+
+
+def create_prices():
+    """
+    Random walk closing prices, timestamped at the market close.
+    """
+    rng = np.random.default_rng(42)
+    index = pd.bdate_range('2018-12-31', '2019-06-28', tz=pytz.UTC) + pd.Timedelta(hours=21)
+    log_returns = rng.normal(0.0003, 0.012, size=(len(index), len(ASSETS)))
+    return pd.DataFrame(
+        np.array([50.0, 80.0]) * np.exp(np.cumsum(log_returns, axis=0)),
+        index=index, columns=ASSETS
+    )
+
+
+def create_backtest(data_sources):
+    universe = StaticUniverse(ASSETS)
+    return BacktestTradingSession(
+        START_DT,
+        END_DT,
+        universe,
+        FixedSignalsAlphaModel({'EQ:ABC': 0.6, 'EQ:DEF': 0.4}),
+        rebalance='end_of_month',
+        long_only=True,
+        cash_buffer_percentage=0.01,
+        data_handler=BacktestDataHandler(universe, data_sources=data_sources)
+    )
+
+
+@pytest.mark.parametrize('method', ['bootstrap', 'gbm'])
+def test_monte_carlo_matches_individual_backtests(method):
+    """
+    Checks that the statistics of each synthetic path match those of
+    backtesting the path individually, and that the distributions
+    summarise every path.
+    """
+    settings.PRINT_EVENTS = False
+    prices = create_prices()
+    monte_carlo = MonteCarloRobustness(
+        create_backtest, prices, 5, method=method, block_size=10, seed=1, batch_size=2
+    )
+    streamed = []
+    summary = monte_carlo.run(callback=streamed.append)
+
+    assert [result['path'] for result in streamed] == list(range(5))
+    rng = np.random.default_rng(1)
+    paths = np.concatenate(
+        [monte_carlo.generate_paths(n, rng) for n in (2, 2, 1)]
+    )
+    for result, path in zip(streamed, paths):
+        backtest = create_backtest([InMemoryPriceDataSource(prices.index, ASSETS, path)])
+        backtest.run()
+        expected = summary_statistics(backtest.get_equity_curve()['Equity'])
+        for statistic in ('sharpe', 'max_drawdown', 'cagr'):
+            assert result[statistic] == expected[statistic]
+
+    assert list(summary.index) == ['sharpe', 'max_drawdown', 'cagr']
+    for statistic in summary.index:
+        values = [result[statistic] for result in streamed]
+        assert summary.loc[statistic, 'count'] == 5
+        assert summary.loc[statistic, 'min'] == min(values)
+        assert summary.loc[statistic, 'max'] == max(values)
+        assert summary.loc[statistic, 'q50'] == np.median(values)
+    assert len(set(result['cagr'] for result in streamed)) == 5
+
+
+def test_monte_carlo_parallel():
+    """
+    Checks that backtesting the paths across worker processes
+    estimates the same distributions as backtesting them serially.
+    """
+    settings.PRINT_EVENTS = False
+    prices = create_prices()
+    serial = MonteCarloRobustness(create_backtest, prices, 5, seed=3, block_size=10).run()
+    parallel = MonteCarloRobustness(
+        create_backtest, prices, 5, seed=3, block_size=10, workers=2
+    ).run()
+    for column in ('count', 'min', 'max', 'q50'):
+        pd.testing.assert_series_equal(parallel[column], serial[column])
+    pd.testing.assert_series_equal(parallel['mean'], serial['mean'], rtol=1e-12)
+
+
+def test_monte_carlo_rejects_invalid_method():
+    with pytest.raises(ValueError):
+        MonteCarloRobustness(create_backtest, create_prices(), 2, method='garch')
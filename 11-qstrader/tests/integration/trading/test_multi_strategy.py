@@ -0,0 +1,131 @@
+
+import pandas as pd
+import pytest
+import pytz
+
+from qstrader.alpha_model.fixed_signals import FixedSignalsAlphaModel
+from qstrader.asset.equity import Equity
+from qstrader.asset.universe.static import StaticUniverse
+from qstrader.broker.fee_model.percent_fee_model import PercentFeeModel
+from qstrader.data.backtest_data_handler import BacktestDataHandler
+from qstrader.data.daily_bar_csv import CSVDailyBarDataSource
+from qstrader.trading.backtest import BacktestTradingSession
+from qstrader.trading.multi_strategy import (
+    BacktestStrategy, MultiStrategyBacktestTradingSession
+)
+
+
+START_DT = pd.Timestamp('2019-01-01 00:00:00', tz=pytz.UTC)
+END_DT = pd.Timestamp('2019-01-31 23:59:00', tz=pytz.UTC)
+
+# Keyword arguments of each strategy, shared by the separate
+# and the multi-strategy backtests
+STRATEGY_KWARGS = {
+    'SIXTYFORTY': {
+        'assets': ['EQ:ABC', 'EQ:DEF'],
+        'signal_weights': {'EQ:ABC': 0.6, 'EQ:DEF': 0.4},
+        'rebalance': 'weekly',
+        'rebalance_weekday': 'WED',
+        'long_only': True,
+        'initial_cash': 1e6,
+        'cash_buffer_percentage': 0.05
+    },
+    'LONGSHORT': {
+        'assets': ['EQ:ABC', 'EQ:DEF', 'EQ:GHI'],
+        'signal_weights': {'EQ:ABC': 1.0, 'EQ:DEF': -0.7, 'EQ:GHI': 0.3},
+        'rebalance': 'daily',
+        'long_only': False,
+        'initial_cash': 5e5,
+        'gross_leverage': 2.0,
+        'burn_in_dt': pd.Timestamp('2019-01-10 00:00:00', tz=pytz.UTC)
+    }
+}
+
+
+def create_data_handler(etf_filepath):
+    data_source = CSVDailyBarDataSource(etf_filepath, Equity)
+    return BacktestDataHandler(None, data_sources=[data_source])
+
+
+def create_strategy_kwargs(portfolio_id):
+    kwargs = dict(STRATEGY_KWARGS[portfolio_id])
+    universe = StaticUniverse(kwargs.pop('assets'))
+    alpha_model = FixedSignalsAlphaModel(kwargs.pop('signal_weights'))
+    return universe, alpha_model, kwargs
+
+
+@pytest.mark.parametrize(
+    'fee_model',
+    [None, PercentFeeModel(commission_pct=0.001, tax_pct=0.0005)],
+    ids=['zero_fees', 'percent_fees']
+)
+def test_multi_strategy_matches_separate_backtests(etf_filepath, fee_model):
+    """
+    Checks that strategies backtested within a single multi-strategy
+    session have identical equity curves and target allocations to
+    separately backtested strategies.
+    """
+    fee_kwargs = {} if fee_model is None else {'fee_model': fee_model}
+
+    strategies = []
+    for portfolio_id in STRATEGY_KWARGS:
+        universe, alpha_model, kwargs = create_strategy_kwargs(portfolio_id)
+        strategies.append(
+            BacktestStrategy(portfolio_id, universe, alpha_model, **kwargs)
+        )
+    multi_backtest = MultiStrategyBacktestTradingSession(
+        START_DT, END_DT, strategies,
+        data_handler=create_data_handler(etf_filepath), **fee_kwargs
+    )
+    multi_backtest.run()
+
+    for portfolio_id in STRATEGY_KWARGS:
+        universe, alpha_model, kwargs = create_strategy_kwargs(portfolio_id)
+        backtest = BacktestTradingSession(
+            START_DT, END_DT, universe, alpha_model,
+            portfolio_id=portfolio_id,
+            data_handler=create_data_handler(etf_filepath),
+            **kwargs, **fee_kwargs
+        )
+        backtest.run()
+
+        pd.testing.assert_frame_equal(
+            multi_backtest.get_equity_curve(portfolio_id),
+            backtest.get_equity_curve()
+        )
+        pd.testing.assert_frame_equal(
+            multi_backtest.get_target_allocations(portfolio_id),
+            backtest.get_target_allocations()
+        )
+        multi_portfolio = multi_backtest.broker.portfolios[portfolio_id]
+        portfolio = backtest.broker.portfolios[portfolio_id]
+        assert multi_portfolio.cash == portfolio.cash
+        assert {
+            asset: position.net_quantity
+            for asset, position in multi_portfolio.pos_handler.positions.items()
+        } == {
+            asset: position.net_quantity
+            for asset, position in portfolio.pos_handler.positions.items()
+        }
+
+
+def test_multi_strategy_validation(etf_filepath):
+    """
+    Checks that invalid strategies and duplicate portfolio
+    IDs are rejected.
+    """
+    universe, alpha_model, kwargs = create_strategy_kwargs('SIXTYFORTY')
+    with pytest.raises(ValueError):
+        BacktestStrategy('A', universe, alpha_model, rebalance='weekly', long_only=True)
+    with pytest.raises(ValueError):
+        BacktestStrategy('A', universe, alpha_model, rebalance='daily', long_only=False)
+
+    strategies = [
+        BacktestStrategy('A', universe, alpha_model, **kwargs),
+        BacktestStrategy('A', universe, alpha_model, **kwargs)
+    ]
+    with pytest.raises(ValueError):
+        MultiStrategyBacktestTradingSession(
+            START_DT, END_DT, strategies,
+            data_handler=create_data_handler(etf_filepath)
+        )
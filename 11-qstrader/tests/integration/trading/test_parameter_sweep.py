@@ -0,0 +1,137 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+import pytz
+
+from qstrader.alpha_model.fixed_signals import FixedSignalsAlphaModel
+from qstrader.asset.equity import Equity
+from qstrader.asset.universe.static import StaticUniverse
+from qstrader.data.backtest_data_handler import BacktestDataHandler
+from qstrader.data.daily_bar_csv import CSVDailyBarDataSource
+from qstrader.trading.backtest import BacktestTradingSession
+from qstrader.trading.sweep import ParameterSweep
+from qstrader import settings
+
+
+ASSETS = ['EQ:ABC', 'EQ:DEF']
+START_DT = pd.Timestamp('2019-01-01 00:00:00', tz=pytz.UTC)
+END_DT = pd.Timestamp('2019-01-31 23:59:00', tz=pytz.UTC)
+
+
+class CSVDataSourceFactory(object):
+
+    def __init__(self, csv_dir, cache_dir):
+        self.csv_dir = csv_dir
+        self.cache_dir = cache_dir
+
+    def __call__(self):
+        return [
+            CSVDailyBarDataSource(
+                self.csv_dir, Equity, csv_symbols=['ABC', 'DEF'], cache_dir=self.cache_dir
+            )
+        ]
+
+
+class CountingDataSourceFactory(CSVDataSourceFactory):
+
+    # Number of calls within the current process
+    calls = 0
+
+    def __call__(self):
+        CountingDataSourceFactory.calls += 1
+        return super().__call__()
+
+
+def create_backtest(data_sources, abc_weight, rebalance_weekday):
+    universe = StaticUniverse(ASSETS)
+    alpha_model = FixedSignalsAlphaModel(
+        {'EQ:ABC': abc_weight, 'EQ:DEF': 1.0 - abc_weight}
+    )
+    data_handler = None
+    if data_sources is not None:
+        data_handler = BacktestDataHandler(universe, data_sources=data_sources)
+    return BacktestTradingSession(
+        START_DT,
+        END_DT,
+        universe,
+        alpha_model,
+        rebalance='weekly',
+        rebalance_weekday=rebalance_weekday,
+        long_only=True,
+        cash_buffer_percentage=0.05,
+        data_handler=data_handler
+    )
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_parameter_sweep(etf_filepath, tmp_path, workers):
+    """
+    Ensures that the sweep produces the same equity curves as running
+    each backtest individually, for every parameter combination.
+    """
+    settings.PRINT_EVENTS = False
+    os.environ['QSTRADER_CSV_DATA_DIR'] = etf_filepath
+    param_grid = {'abc_weight': [0.4, 0.6], 'rebalance_weekday': ['MON', 'WED', 'FRI']}
+    sweep = ParameterSweep(
+        create_backtest,
+        param_grid,
+        data_source_factory=CSVDataSourceFactory(etf_filepath, str(tmp_path)),
+        workers=workers
+    )
+    streamed = []
+    results = sweep.run(callback=streamed.append)
+
+    assert len(streamed) == 6
+    assert list(results.index) == list(range(6))
+    assert list(results[['abc_weight', 'rebalance_weekday']].itertuples(index=False, name=None)) == [
+        (0.4, 'MON'), (0.4, 'WED'), (0.4, 'FRI'), (0.6, 'MON'), (0.6, 'WED'), (0.6, 'FRI')
+    ]
+    for column in ('total_return', 'cagr', 'sharpe', 'max_drawdown'):
+        assert np.isfinite(results[column].astype(float)).all()
+
+    backtest = create_backtest(None, 0.6, 'WED')
+    backtest.run(results=False)
+    expected = backtest.get_equity_curve()['Equity']
+    pd.testing.assert_series_equal(results.loc[4, 'equity_curve'], expected)
+    assert results.loc[4, 'total_return'] == pytest.approx(expected.iloc[-1] / expected.iloc[0] - 1.0)
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_parameter_sweep_cancel(etf_filepath, workers):
+    """
+    Ensures that cancelling the sweep from a result callback stops
+    any further backtests from being started.
+    """
+    settings.PRINT_EVENTS = False
+    os.environ['QSTRADER_CSV_DATA_DIR'] = etf_filepath
+    sweep = ParameterSweep(
+        create_backtest,
+        [{'abc_weight': weight, 'rebalance_weekday': 'WED'} for weight in np.linspace(0.0, 1.0, 20)],
+        workers=workers
+    )
+    results = sweep.run(callback=lambda result: sweep.cancel())
+    assert sweep.cancelled
+    assert 1 <= len(results) <= 2 * workers
+
+
+@pytest.mark.parametrize('cached', [False, True])
+def test_parameter_sweep_precompiles_cache_only(etf_filepath, tmp_path, cached):
+    """
+    Ensures that the parent process only loads the data sources, to
+    compile the price cache prior to starting the workers, when the
+    data source factory has a price cache.
+    """
+    settings.PRINT_EVENTS = False
+    CountingDataSourceFactory.calls = 0
+    cache_dir = str(tmp_path) if cached else None
+    sweep = ParameterSweep(
+        create_backtest,
+        [{'abc_weight': 0.5, 'rebalance_weekday': 'WED'}],
+        data_source_factory=CountingDataSourceFactory(etf_filepath, cache_dir),
+        workers=2
+    )
+    results = sweep.run()
+    assert len(results) == 1
+    assert CountingDataSourceFactory.calls == (1 if cached else 0)
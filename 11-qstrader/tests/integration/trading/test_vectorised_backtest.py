@@ -0,0 +1,249 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+import pytz
+
+from qstrader.alpha_model.alpha_model import AlphaModel
+from qstrader.alpha_model.fixed_signals import FixedSignalsAlphaModel
+from qstrader.asset.equity import Equity
+from qstrader.asset.universe.dynamic import DynamicUniverse
+from qstrader.asset.universe.static import StaticUniverse
+from qstrader.broker.fee_model.percent_fee_model import PercentFeeModel
+from qstrader.broker.slippage_model.half_spread_slippage_model import HalfSpreadSlippageModel
+from qstrader.broker.slippage_model.square_root_impact_model import SquareRootImpactModel
+from qstrader.data.backtest_data_handler import BacktestDataHandler
+from qstrader.data.daily_bar_csv import CSVDailyBarDataSource
+from qstrader.trading.backtest import BacktestTradingSession
+
+
+ETF_START_DT = pd.Timestamp('2019-01-01 00:00:00', tz=pytz.UTC)
+ETF_END_DT = pd.Timestamp('2019-01-31 23:59:00', tz=pytz.UTC)
+SYNTHETIC_START_DT = pd.Timestamp('2015-01-01 00:00:00', tz=pytz.UTC)
+SYNTHETIC_END_DT = pd.Timestamp('2016-12-31 23:59:00', tz=pytz.UTC)
+
+
+class RotatingAlphaModel(AlphaModel):
+    """
+    Alternates between two weight vectors (restricted to the current
+    universe) at each call, such that positions are closed, reopened
+    and (if shorted) flipped.
+    """
+
+    def __init__(self, universe, weights_a, weights_b):
+        self.universe = universe
+        self.weights = [weights_a, weights_b]
+        self.calls = 0
+
+    def __call__(self, dt):
+        weights = self.weights[self.calls % 2]
+        self.calls += 1
+        assets = self.universe.get_assets(dt)
+        return {
+            asset: weight for asset, weight in weights.items() if asset in assets
+        }
+
+
+def write_synthetic_csvs(csv_dir):
+    """
+    Write random walk daily bars for four assets, one of which
+    only begins trading partway through the backtest.
+    """
+    rng = np.random.default_rng(42)
+    dates = pd.bdate_range('2014-12-01', '2016-12-31')
+    for i, symbol in enumerate(['ABC', 'DEF', 'GHI', 'JKL']):
+        symbol_dates = dates if symbol != 'JKL' else dates[dates >= '2015-06-01']
+        closes = (50.0 + 25.0 * i) * np.exp(
+            np.cumsum(rng.normal(0.0002, 0.015, len(symbol_dates)))
+        )
+        opens = closes * np.exp(rng.normal(0.0, 0.005, len(symbol_dates)))
+        volumes = 100000.0 * (i + 1) * (1 + np.arange(len(symbol_dates)) % 5)
+        pd.DataFrame(
+            {
+                'Date': symbol_dates.strftime('%Y-%m-%d'),
+                'Open': opens,
+                'Close': closes,
+                'Adj Close': closes,
+                'Volume': volumes
+            }
+        ).to_csv(os.path.join(csv_dir, '%s.csv' % symbol), index=False)
+
+
+def create_etf_backtest(etf_filepath, **kwargs):
+    os.environ['QSTRADER_CSV_DATA_DIR'] = etf_filepath
+    universe = StaticUniverse(['EQ:ABC', 'EQ:DEF'])
+    alpha_model = kwargs.pop('alpha_model')
+    return BacktestTradingSession(
+        ETF_START_DT, ETF_END_DT, universe, alpha_model, **kwargs
+    )
+
+
+def create_synthetic_backtest(csv_dir, weights_a, weights_b, **kwargs):
+    universe = DynamicUniverse(
+        {
+            'EQ:ABC': SYNTHETIC_START_DT,
+            'EQ:DEF': SYNTHETIC_START_DT,
+            'EQ:GHI': SYNTHETIC_START_DT,
+            'EQ:JKL': pd.Timestamp('2015-07-01 00:00:00', tz=pytz.UTC)
+        }
+    )
+    alpha_model = RotatingAlphaModel(universe, weights_a, weights_b)
+    data_source = CSVDailyBarDataSource(csv_dir, Equity)
+    data_handler = BacktestDataHandler(universe, data_sources=[data_source])
+    return BacktestTradingSession(
+        SYNTHETIC_START_DT, SYNTHETIC_END_DT, universe, alpha_model,
+        data_handler=data_handler, **kwargs
+    )
+
+
+def assert_equity_curves_equal(equity_curve, expected):
+    """
+    Assert that two equity curves have identical timestamps, with
+    equities equal to within floating point rounding.
+    """
+    assert [dt for dt, _ in equity_curve] == [dt for dt, _ in expected]
+    np.testing.assert_allclose(
+        [equity for _, equity in equity_curve],
+        [equity for _, equity in expected], rtol=1e-12
+    )
+
+
+def assert_backtests_identical(event_backtest, vectorised_backtest):
+    """
+    Run the backtests via the event-driven and vectorised paths,
+    asserting that the results are identical, other than the floating
+    point rounding of the running portfolio totals within the equity.
+    """
+    event_backtest.run(results=False)
+    result = vectorised_backtest.run_vectorised()
+
+    assert_equity_curves_equal(vectorised_backtest.equity_curve, event_backtest.equity_curve)
+    pd.testing.assert_frame_equal(
+        vectorised_backtest.get_target_allocations(),
+        event_backtest.get_target_allocations()
+    )
+
+    portfolio = event_backtest.broker.portfolios[event_backtest.portfolio_id]
+    final_holdings = result.holdings[-1]
+    assert final_holdings == {
+        asset: position.net_quantity
+        for asset, position in portfolio.pos_handler.positions.items()
+    }
+    assert list(final_holdings) == list(portfolio.pos_handler.positions)
+    assert result.cash == portfolio.cash
+
+    transactions = result.get_transactions()
+    history = portfolio.history_to_df()
+    assert len(transactions) == (history['type'] == 'asset_transaction').sum()
+    return result
+
+
+@pytest.mark.parametrize(
+    'kwargs',
+    [
+        {
+            'alpha_model': FixedSignalsAlphaModel({'EQ:ABC': 0.6, 'EQ:DEF': 0.4}),
+            'rebalance': 'weekly',
+            'rebalance_weekday': 'WED',
+            'long_only': True,
+            'cash_buffer_percentage': 0.05
+        },
+        {
+            'alpha_model': FixedSignalsAlphaModel({'EQ:ABC': 1.0, 'EQ:DEF': -0.7}),
+            'rebalance': 'daily',
+            'long_only': False,
+            'gross_leverage': 2.0
+        },
+        {
+            'alpha_model': FixedSignalsAlphaModel({'EQ:ABC': 0.5, 'EQ:DEF': 0.5}),
+            'rebalance': 'daily',
+            'long_only': True,
+            'cash_buffer_percentage': 0.01,
+            'fee_model': PercentFeeModel(commission_pct=0.001, tax_pct=0.0005),
+            'burn_in_dt': pd.Timestamp('2019-01-10 00:00:00', tz=pytz.UTC)
+        }
+    ],
+    ids=['sixty_forty_weekly', 'long_short_daily', 'fees_burn_in']
+)
+def test_vectorised_backtest_etf(etf_filepath, kwargs):
+    """
+    Checks that the vectorised backtests of the ETF fixtures are
+    identical to the event-driven backtests.
+    """
+    assert_backtests_identical(
+        create_etf_backtest(etf_filepath, **kwargs),
+        create_etf_backtest(etf_filepath, **kwargs)
+    )
+
+
+@pytest.mark.parametrize(
+    'weights_a,weights_b,kwargs',
+    [
+        (
+            {'EQ:ABC': 0.4, 'EQ:DEF': 0.3, 'EQ:JKL': 0.3},
+            {'EQ:DEF': 0.5, 'EQ:GHI': 0.5},
+            {
+                'rebalance': 'end_of_month',
+                'long_only': True,
+                'cash_buffer_percentage': 0.02,
+                'fee_model': PercentFeeModel(commission_pct=0.002)
+            }
+        ),
+        (
+            {'EQ:ABC': 1.0, 'EQ:DEF': -0.5, 'EQ:GHI': 0.25},
+            {'EQ:ABC': -0.75, 'EQ:GHI': 0.5, 'EQ:JKL': 0.5},
+            {
+                'rebalance': 'weekly',
+                'rebalance_weekday': 'FRI',
+                'long_only': False,
+                'gross_leverage': 1.5,
+                'fee_model': PercentFeeModel(commission_pct=0.001)
+            }
+        ),
+        (
+            {'EQ:ABC': 1.0, 'EQ:DEF': -0.5, 'EQ:GHI': 0.25},
+            {'EQ:ABC': -0.75, 'EQ:GHI': 0.5, 'EQ:JKL': 0.5},
+            {
+                'rebalance': 'weekly',
+                'rebalance_weekday': 'FRI',
+                'long_only': False,
+                'gross_leverage': 1.5,
+                'slippage_model': HalfSpreadSlippageModel(spread_bps=10.0),
+                'market_impact_model': SquareRootImpactModel(window=10)
+            }
+        )
+    ],
+    ids=['rotating_long_only', 'rotating_long_short', 'rotating_slippage']
+)
+def test_vectorised_backtest_rotating(tmp_path, weights_a, weights_b, kwargs):
+    """
+    Checks that vectorised backtests which close, reopen and flip
+    positions within a dynamic universe are identical to the
+    event-driven backtests.
+    """
+    write_synthetic_csvs(str(tmp_path))
+    result = assert_backtests_identical(
+        create_synthetic_backtest(str(tmp_path), weights_a, weights_b, **kwargs),
+        create_synthetic_backtest(str(tmp_path), weights_a, weights_b, **kwargs)
+    )
+    holdings = result.get_holdings()
+    assert (holdings['EQ:JKL'] != 0).any()
+    assert (holdings['EQ:GHI'] == 0).any()
+
+
+def test_vectorised_backtest_rejects_run_session(etf_filepath):
+    """
+    Checks that a session which has already been run cannot be
+    backtested via the vectorised path.
+    """
+    backtest = create_etf_backtest(
+        etf_filepath,
+        alpha_model=FixedSignalsAlphaModel({'EQ:ABC': 0.6, 'EQ:DEF': 0.4}),
+        rebalance='end_of_month',
+        long_only=True,
+        cash_buffer_percentage=0.05
+    )
+    backtest.run(results=False)
+    with pytest.raises(ValueError):
+        backtest.run_vectorised()
@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+import pytest
+import pytz
+
+from qstrader.alpha_model.fixed_signals import FixedSignalsAlphaModel
+from qstrader.asset.equity import Equity
+from qstrader.asset.universe.static import StaticUniverse
+from qstrader.data.backtest_data_handler import BacktestDataHandler
+from qstrader.data.daily_bar_csv import CSVDailyBarDataSource
+from qstrader.trading.backtest import BacktestTradingSession
+from qstrader.trading.sweep import ParameterSweep
+from qstrader.trading.walk_forward import (
+    WalkForwardOptimisation, WindowDataSourceFactory, WindowSessionFactory
+)
+from qstrader import settings
+
+
+ASSETS = ['EQ:ABC', 'EQ:DEF']
+START_DT = pd.Timestamp('2019-01-01 00:00:00', tz=pytz.UTC)
+END_DT = pd.Timestamp('2019-01-31 23:59:00', tz=pytz.UTC)
+
+
+class WindowCSVDataSourceFactory(object):
+
+    def __init__(self, csv_dir):
+        self.csv_dir = csv_dir
+
+    def __call__(self, start_dt, end_dt):
+        return [
+            CSVDailyBarDataSource(
+                self.csv_dir, Equity, csv_symbols=['ABC', 'DEF'],
+                start_dt=start_dt - pd.Timedelta(days=3), end_dt=end_dt
+            )
+        ]
+
+
+def create_backtest(data_sources, start_dt, end_dt, abc_weight):
+    universe = StaticUniverse(ASSETS)
+    return BacktestTradingSession(
+        start_dt,
+        end_dt,
+        universe,
+        FixedSignalsAlphaModel({'EQ:ABC': abc_weight, 'EQ:DEF': 1.0 - abc_weight}),
+        rebalance='daily',
+        long_only=True,
+        cash_buffer_percentage=0.05,
+        data_handler=BacktestDataHandler(universe, data_sources=data_sources)
+    )
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_walk_forward(etf_filepath, workers):
+    """
+    Ensures that each fold selects the parameters with the best
+    in-sample objective, and that the out-of-sample equity curves are
+    stitched into a single continuous equity curve.
+    """
+    settings.PRINT_EVENTS = False
+    data_source_factory = WindowCSVDataSourceFactory(etf_filepath)
+    param_grid = {'abc_weight': [0.0, 0.5, 1.0]}
+    wfo = WalkForwardOptimisation(
+        create_backtest,
+        param_grid,
+        START_DT,
+        END_DT,
+        pd.Timedelta(days=10),
+        pd.Timedelta(days=7),
+        data_source_factory=data_source_factory,
+        workers=workers
+    )
+    assert [(fold['train_start'].day, fold['test_start'].day, fold['test_end'].day) for fold in wfo.folds] == [
+        (1, 11, 17), (8, 18, 24), (15, 25, 31)
+    ]
+    folds = wfo.run()
+    assert list(folds.index) == [0, 1, 2]
+
+    for fold in wfo.folds:
+        sweep_results = ParameterSweep(
+            WindowSessionFactory(create_backtest, fold['train_start'], fold['train_end']),
+            param_grid,
+            data_source_factory=WindowDataSourceFactory(
+                data_source_factory, fold['train_start'], fold['train_end']
+            )
+        ).run()
+        best_weight = sweep_results.loc[sweep_results['sharpe'].astype(float).idxmax(), 'abc_weight']
+        assert folds.loc[fold['fold'], 'params'] == {'abc_weight': best_weight}
+
+    curves = list(folds['equity_curve'])
+    assert len(wfo.equity_curve) == sum(len(curve) for curve in curves)
+    assert wfo.equity_curve.index.is_monotonic_increasing
+    assert wfo.equity_curve.iloc[0] == curves[0].iloc[0]
+    pos = 0
+    for curve, initial_equity in zip(curves, folds['initial_equity']):
+        stitched = wfo.equity_curve.iloc[pos:pos + len(curve)]
+        if pos > 0:
+            # Each fold continues from the final equity of the previous
+            # fold, retaining its returns relative to its initial cash
+            assert stitched.iloc[0] == pytest.approx(
+                wfo.equity_curve.iloc[pos - 1] * curve.iloc[0] / initial_equity
+            )
+        np.testing.assert_allclose(stitched.pct_change().to_numpy()[1:], curve.pct_change().to_numpy()[1:])
+        pos += len(curve)
+
+
+def create_flat_backtest(data_sources, start_dt, end_dt, abc_weight):
+    universe = StaticUniverse(ASSETS)
+    return BacktestTradingSession(
+        start_dt,
+        end_dt,
+        universe,
+        FixedSignalsAlphaModel({'EQ:ABC': 0.0, 'EQ:DEF': 0.0}),
+        rebalance='daily',
+        long_only=True,
+        cash_buffer_percentage=0.05,
+        data_handler=BacktestDataHandler(universe, data_sources=data_sources)
+    )
+
+
+def test_walk_forward_undefined_objective(etf_filepath):
+    """
+    Ensures that a fold whose in-sample objective is undefined for
+    every parameter candidate, such as the Sharpe ratio of a flat
+    equity curve, raises rather than selecting arbitrary parameters.
+    """
+    settings.PRINT_EVENTS = False
+    wfo = WalkForwardOptimisation(
+        create_flat_backtest,
+        {'abc_weight': [0.0, 1.0]},
+        START_DT,
+        END_DT,
+        pd.Timedelta(days=10),
+        pd.Timedelta(days=7),
+        data_source_factory=WindowCSVDataSourceFactory(etf_filepath)
+    )
+    with pytest.raises(ValueError, match="objective 'sharpe' is undefined"):
+        wfo.run()
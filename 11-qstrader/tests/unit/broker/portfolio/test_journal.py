@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytz
+
+from qstrader.broker.portfolio.journal import PortfolioJournal
+from qstrader.broker.portfolio.portfolio_event import PortfolioEvent
+
+
+def test_journal_events():
+    """
+    Checks that journal entries are formatted into portfolio events
+    with rounded amounts, preserving integral quantities and the
+    timezone of the entries.
+    """
+    dt = pd.Timestamp('2017-10-05 08:00:00', tz=pytz.timezone('Europe/London'))
+    journal = PortfolioJournal()
+    journal.record_subscription(dt, 100000.0, 100000.0)
+    journal.record_transaction(dt, 'EQ:AAA', 100, 567.0, 56715.78, 43284.22, True)
+    journal.record_transaction(dt, 'EQ:bbb', -2.5, 42.123, -105.30751, 43389.52751, False)
+    journal.record_withdrawal(dt, 1000.004, 42389.52351)
+
+    assert len(journal) == 4
+    assert journal.to_events() == [
+        PortfolioEvent(
+            dt=dt, type='subscription', description='SUBSCRIPTION',
+            debit=0.0, credit=100000.0, balance=100000.0
+        ),
+        PortfolioEvent(
+            dt=dt, type='asset_transaction', description='LONG 100 EQ:AAA 567.00 05/10/2017',
+            debit=56715.78, credit=0.0, balance=43284.22
+        ),
+        PortfolioEvent(
+            dt=dt, type='asset_transaction', description='SHORT -2.5 EQ:BBB 42.12 05/10/2017',
+            debit=0.0, credit=105.31, balance=43389.53
+        ),
+        PortfolioEvent(
+            dt=dt, type='withdrawal', description='WITHDRAWAL',
+            debit=1000.0, credit=0.0, balance=42389.52
+        )
+    ]
+    assert journal.to_events()[0].dt.tzinfo.zone == 'Europe/London'
+
+
+def test_journal_grows_and_exports_typed_columns():
+    """
+    Checks that the journal grows beyond its initial capacity and
+    exports the unformatted entries.
+    """
+    start_dt = pd.Timestamp('2017-10-05 08:00:00', tz=pytz.UTC)
+    journal = PortfolioJournal(capacity=2)
+    for i in range(5):
+        journal.record_transaction(
+            start_dt + pd.Timedelta(days=i), 'EQ:%s' % (i % 2), 10 * (i + 1),
+            100.0 + i, 1000.0 * (i + 1), 1e6 - 1000.0 * (i + 1), True
+        )
+
+    assert len(journal.columns['ts']) == 8
+    journal_df = journal.to_df()
+    assert list(journal_df.columns) == [
+        'type', 'asset', 'quantity', 'price', 'debit', 'credit', 'balance'
+    ]
+    assert list(journal_df.index) == list(pd.date_range(start_dt, periods=5, freq='D'))
+    assert list(journal_df['asset']) == ['EQ:0', 'EQ:1', 'EQ:0', 'EQ:1', 'EQ:0']
+    np.testing.assert_array_equal(journal_df['quantity'], [10, 20, 30, 40, 50])
+    assert journal.assets == ['EQ:0', 'EQ:1']
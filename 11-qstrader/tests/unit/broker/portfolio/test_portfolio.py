@@ -1,3 +1,5 @@
+import logging
+
 import pandas as pd
 import pytz
 import pytest
@@ -377,6 +379,58 @@ def test_update_market_value_of_asset_earlier_date():
         )
 
 
+def test_update_market_values():
+    """
+    Test update_market_values for all positions at once, including
+    rejecting non-positive prices and earlier dates.
+    """
+    start_dt = pd.Timestamp('2017-10-05 08:00:00', tz=pytz.UTC)
+    later_dt = pd.Timestamp('2017-10-06 08:00:00', tz=pytz.UTC)
+    latest_dt = pd.Timestamp('2017-10-07 08:00:00', tz=pytz.UTC)
+    port = Portfolio(start_dt, portfolio_id='1234')
+    port.subscribe_funds(later_dt, 100000.0)
+    for asset, quantity, price in [('EQ:AAA', 100, 567.0), ('EQ:BBB', -50, 12.5)]:
+        port.transact_asset(
+            Transaction(
+                asset=asset, quantity=quantity, dt=later_dt,
+                price=price, order_id=1, commission=0.0
+            )
+        )
+
+    port.update_market_values([570.0, 10.0], latest_dt)
+    assert port.pos_handler.positions['EQ:AAA'].market_value == 57000.0
+    assert port.pos_handler.positions['EQ:BBB'].market_value == -500.0
+    assert port.pos_handler.positions['EQ:BBB'].current_dt == latest_dt
+    assert port.total_equity == 100000.0 - 56700.0 + 625.0 + 57000.0 - 500.0
+
+    with pytest.raises(ValueError):
+        port.update_market_values([570.0, -10.0], latest_dt)
+    with pytest.raises(ValueError):
+        port.update_market_values([570.0, 10.0], start_dt)
+
+
+def test_portfolio_without_journal():
+    """
+    Test that a portfolio without a journal records no
+    history, and that the logger level is not forced.
+    """
+    start_dt = pd.Timestamp('2017-10-05 08:00:00', tz=pytz.UTC)
+    port = Portfolio(start_dt, starting_cash=1000.0, journal=False)
+    port.transact_asset(
+        Transaction(
+            asset='EQ:AAA', quantity=1, dt=start_dt,
+            price=567.0, order_id=1, commission=0.0
+        )
+    )
+    assert port.journal is None
+    assert port.history == []
+    with pytest.raises(AttributeError):
+        port.history = []
+    assert port.history_to_df().empty
+    assert port.cash == 433.0
+    assert port.logger.level == logging.NOTSET
+
+
 def test_history_to_df_empty():
     """
     Test 'history_to_df' with no events.
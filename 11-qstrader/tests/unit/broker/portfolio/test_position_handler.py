@@ -2,8 +2,11 @@ from collections import OrderedDict
 
 import numpy as np
 import pandas as pd
+import pytest
 import pytz
 
+from qstrader.broker.portfolio import position_handler
+from qstrader.broker.portfolio.position import Position
 from qstrader.broker.portfolio.position_handler import PositionHandler
 from qstrader.broker.transaction.transaction import Transaction
 
@@ -171,3 +174,196 @@ def test_total_values_for_two_separate_transactions():
     assert np.isclose(ph.total_unrealised_pnl(), -24.31999999999971)
     assert ph.total_realised_pnl() == 0.0
     assert np.isclose(ph.total_pnl(), -24.31999999999971)
+
+
+def test_positions_are_array_backed_views():
+    """
+    Tests that positions are Position instances whose state is held
+    within the handler arrays, retaining integral quantities, and
+    that assets beyond the initial capacity grow the arrays.
+    """
+    ph = PositionHandler()
+    dt = pd.Timestamp('2015-05-06 15:00:00', tz=pytz.UTC)
+    assets = ['EQ:%03d' % i for i in range(40)]
+    for i, asset in enumerate(assets):
+        ph.transact_position(
+            Transaction(
+                asset, quantity=10 + i, dt=dt, price=100.0 + i,
+                order_id=i, commission=1.0
+            )
+        )
+    ph.transact_position(
+        Transaction(
+            'EQ:001', quantity=-4, dt=dt, price=105.0,
+            order_id=99, commission=1.0
+        )
+    )
+
+    assert list(ph.positions) == assets
+    pos = ph.positions['EQ:001']
+    assert isinstance(pos, Position)
+    assert pos.asset_id == 1
+    assert ph.arrays['buy_quantity'][1] == 11
+    assert type(pos.buy_quantity) is int
+    assert type(pos.sell_quantity) is float
+    assert pos.net_quantity == 7
+    assert pos.current_price == 105.0
+    assert pos.current_dt == dt
+    assert ph.positions['EQ:039'].market_value == 49 * 139.0
+
+    np.testing.assert_array_equal(
+        ph.market_values(), [pos.market_value for pos in ph.positions.values()]
+    )
+    assert ph.total_market_value() == sum(
+        pos.current_price * pos.net_quantity for pos in ph.positions.values()
+    )
+
+
+def test_update_current_prices():
+    """
+    Tests that the current prices of all positions are updated at
+    once, rejecting non-positive prices and earlier timestamps, and
+    that closed and reopened positions are tracked correctly.
+    """
+    ph = PositionHandler()
+    dt = pd.Timestamp('2015-05-06 15:00:00', tz=pytz.UTC)
+    new_dt = pd.Timestamp('2015-05-07 15:00:00', tz=pytz.UTC)
+    for asset, quantity in [('EQ:AMZN', 100), ('EQ:MSFT', -50), ('EQ:AAPL', 20)]:
+        ph.transact_position(
+            Transaction(asset, quantity=quantity, dt=dt, price=100.0, order_id=1, commission=0.0)
+        )
+    ph.transact_position(
+        Transaction('EQ:MSFT', quantity=50, dt=dt, price=90.0, order_id=2, commission=0.0)
+    )
+    np.testing.assert_array_equal(ph.open_asset_ids, [0, 2])
+
+    ph.update_current_prices(np.array([110.0, 95.0]), new_dt)
+    assert ph.positions['EQ:AMZN'].market_value == 11000.0
+    assert ph.positions['EQ:AAPL'].market_value == 1900.0
+    assert ph.positions['EQ:AAPL'].current_dt == new_dt
+    assert ph.total_market_value() == 12900.0
+
+    with pytest.raises(ValueError):
+        ph.update_current_prices(np.array([110.0, 0.0]), new_dt)
+    with pytest.raises(ValueError):
+        ph.update_current_prices(np.array([110.0, 95.0]), dt)
+
+    ph.transact_position(
+        Transaction('EQ:MSFT', quantity=-30, dt=new_dt, price=80.0, order_id=3, commission=0.0)
+    )
+    pos = ph.positions['EQ:MSFT']
+    assert pos.asset_id == 1
+    assert pos.net_quantity == -30
+    assert pos.avg_sold == 80.0
+    assert pos.avg_bought == 0.0
+    np.testing.assert_array_equal(ph.open_asset_ids, [0, 2, 1])
+    assert ph.total_market_value() == 11000.0 + 1900.0 - 2400.0
+
+
+def test_running_totals_match_position_sums():
+    """
+    Tests that the running totals match the sequential sums of the
+    individual positions after random transactions and price updates,
+    to within floating point rounding.
+    """
+    rng = np.random.default_rng(42)
+    ph = PositionHandler()
+    assets = ['EQ:%03d' % i for i in range(25)]
+    dt = pd.Timestamp('2015-05-06 15:00:00', tz=pytz.UTC)
+
+    for step in range(200):
+        dt = dt + pd.Timedelta(hours=1)
+        if step % 3 == 0 and len(ph.positions) > 0:
+            ph.update_current_prices(
+                rng.uniform(50.0, 150.0, size=len(ph.positions)), dt
+            )
+        else:
+            ph.transact_position(
+                Transaction(
+                    assets[rng.integers(len(assets))],
+                    quantity=int(rng.integers(-100, 100)),
+                    dt=dt, price=rng.uniform(50.0, 150.0),
+                    order_id=step, commission=rng.uniform(0.0, 5.0)
+                )
+            )
+
+        positions = list(ph.positions.values())
+        for total, expected in (
+            (ph.total_market_value(), sum(pos.market_value for pos in positions)),
+            (ph.total_unrealised_pnl(), sum(pos.unrealised_pnl for pos in positions)),
+            (ph.total_realised_pnl(), sum(pos.realised_pnl for pos in positions)),
+            (ph.total_pnl(), sum(pos.total_pnl for pos in positions))
+        ):
+            assert np.isclose(total, expected, rtol=1e-12, atol=1e-6)
+
+
+def test_running_totals_updates(monkeypatch):
+    """
+    Tests that the running totals are updated by the changes in value
+    of price updates and transactions of open positions, and are only
+    re-summed once positions are opened or closed or after the
+    re-summation interval of delta updates.
+    """
+    monkeypatch.setattr(position_handler, 'TOTALS_RESUM_INTERVAL', 3)
+    ph = PositionHandler()
+    dt = pd.Timestamp('2015-05-06 15:00:00', tz=pytz.UTC)
+    ph.transact_position(
+        Transaction('EQ:AMZN', quantity=100, dt=dt, price=960.0, order_id=1, commission=0.0)
+    )
+    assert ph._totals is None
+    assert ph.total_market_value() == 96000.0
+    assert ph._num_updates == 0
+
+    ph.transact_position(
+        Transaction('EQ:AMZN', quantity=-40, dt=dt, price=980.0, order_id=2, commission=0.0)
+    )
+    assert ph._totals is not None
+    assert ph.total_market_value() == 58800.0
+    assert ph.total_realised_pnl() == 800.0
+
+    ph.update_current_prices(np.array([1000.0]), dt)
+    assert ph.total_market_value() == 60000.0
+    assert ph.total_unrealised_pnl() == 60 * (1000.0 - 960.0)
+    assert ph.total_realised_pnl() == 800.0
+
+    # The transaction, and each price update, is a single delta update
+    assert ph._num_updates == 2
+    ph.positions['EQ:AMZN'].update_current_price(990.0, dt)
+    assert ph._num_updates == 3
+
+    # The third delta update is followed by a re-summation
+    assert ph.total_market_value() == 59400.0
+    assert ph.total_unrealised_pnl() == 60 * (990.0 - 960.0)
+    assert ph._num_updates == 0
+
+    ph.transact_position(
+        Transaction('EQ:AMZN', quantity=-60, dt=dt, price=990.0, order_id=3, commission=0.0)
+    )
+    assert ph._totals is None
+    assert ph.total_market_value() == 0
+    assert ph.total_realised_pnl() == 0
+
+
+def test_running_totals_recover_from_nan_prices():
+    """
+    Tests that a NaN price invalidates the running totals, such
+    that the totals are correct once a valid price follows it.
+    """
+    ph = PositionHandler()
+    dt = pd.Timestamp('2015-05-06 15:00:00', tz=pytz.UTC)
+    ph.transact_position(
+        Transaction('EQ:AMZN', quantity=10, dt=dt, price=1000.0, order_id=1, commission=0.0)
+    )
+    assert ph.total_market_value() == 10000.0
+
+    ph.update_current_prices(np.array([np.nan]), dt)
+    assert np.isnan(ph.total_market_value())
+    ph.update_current_prices(np.array([1015.0]), dt)
+    assert ph.total_market_value() == 10150.0
+    assert ph.total_unrealised_pnl() == 150.0
+
+    ph.positions['EQ:AMZN'].update_current_price(np.nan, dt)
+    assert np.isnan(ph.total_market_value())
+    ph.positions['EQ:AMZN'].update_current_price(1020.0, dt)
+    assert ph.total_market_value() == 10200.0
+    assert ph.total_pnl() == 200.0
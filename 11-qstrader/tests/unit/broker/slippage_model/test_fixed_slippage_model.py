@@ -0,0 +1,22 @@
+import numpy as np
+
+from qstrader.broker.slippage_model.fixed_slippage_model import FixedSlippageModel
+
+
+def test_fixed_slippage():
+    """
+    Tests that the slippage is the fixed proportion of the ask
+    price of buys and of the bid price of sells.
+    """
+    model = FixedSlippageModel(slippage_bps=5.0)
+    slippage = model.calc_slippage(
+        None, ['EQ:ABC', 'EQ:DEF', 'EQ:GHI'], np.array([100.0, -50.0, 0.0]),
+        np.array([99.0, 200.0, 10.0]), np.array([101.0, 202.0, 11.0])
+    )
+    np.testing.assert_allclose(slippage, [0.0505, 0.1, 0.005])
+    np.testing.assert_array_equal(
+        FixedSlippageModel().calc_slippage(
+            None, ['EQ:ABC'], np.array([100.0]), np.array([99.0]), np.array([101.0])
+        ),
+        [0.0]
+    )
@@ -0,0 +1,16 @@
+import numpy as np
+
+from qstrader.broker.slippage_model.half_spread_slippage_model import HalfSpreadSlippageModel
+
+
+def test_half_spread_slippage():
+    """
+    Tests that the slippage is half the assumed spread of the mid price
+    where no spread is quoted, reduced by half of any quoted spread.
+    """
+    model = HalfSpreadSlippageModel(spread_bps=20.0)
+    slippage = model.calc_slippage(
+        None, ['EQ:ABC', 'EQ:DEF', 'EQ:GHI'], np.array([100.0, -50.0, 10.0]),
+        np.array([100.0, 199.9, 99.0]), np.array([100.0, 200.1, 101.0])
+    )
+    np.testing.assert_allclose(slippage, [0.1, 0.1, 0.0], atol=1e-12)
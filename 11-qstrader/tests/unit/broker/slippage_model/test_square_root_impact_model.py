@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+import pytz
+
+from qstrader.broker.slippage_model.square_root_impact_model import SquareRootImpactModel
+from qstrader.data.price_panel import PricePanel
+
+
+DATES = pd.date_range('2020-01-01', periods=5, freq='D', tz=pytz.UTC)
+
+
+class BarDataSourceMock(object):
+    def __init__(self, columns):
+        self.columns = columns
+
+    def get_bar_panel(self, column):
+        series = self.columns.get(column, {})
+        return PricePanel.from_series(
+            {
+                asset: (DATES.as_unit('ns').asi8, np.array(values, dtype=np.float64))
+                for asset, values in series.items()
+            }
+        )
+
+
+class DataHandlerMock(object):
+    def __init__(self, data_sources):
+        self.data_sources = data_sources
+
+
+class BrokerMock(object):
+    def __init__(self, data_sources):
+        self.data_handler = DataHandlerMock(data_sources)
+
+
+def create_data_source():
+    return BarDataSourceMock(
+        {
+            'Close': {
+                'EQ:ABC': [100.0, 110.0, 99.0, 108.9, 100.0],
+                'EQ:DEF': [50.0, 50.0, 50.0, 50.0, 50.0]
+            },
+            'Volume': {
+                'EQ:ABC': [1000.0, 3000.0, 5000.0, 7000.0, 9000.0]
+            }
+        }
+    )
+
+
+def test_square_root_impact():
+    """
+    Tests that the impact of each order is of the volatility and ADV
+    of the bars prior to its date, and zero for assets lacking them.
+    """
+    model = SquareRootImpactModel(impact_coef=0.5, window=3)
+    broker = BrokerMock([create_data_source()])
+    dt = pd.Timestamp('2020-01-04 21:00:00', tz=pytz.UTC)
+    assets = ['EQ:ABC', 'EQ:ABC', 'EQ:DEF', 'EQ:XYZ']
+    quantities = np.array([400.0, -900.0, 100.0, 100.0])
+    prices = np.array([100.0, 100.0, 50.0, 10.0])
+    impact = model.calc_slippage(
+        dt, assets, quantities, prices - 1.0, prices, broker=broker
+    )
+
+    # Returns of the three prior bars are 10% and -10% with an ADV of 3000
+    volatility = np.std([0.1, -0.1], ddof=1)
+    np.testing.assert_allclose(
+        impact, [
+            0.5 * volatility * np.sqrt(400.0 / 3000.0) * 100.0,
+            0.5 * volatility * np.sqrt(900.0 / 3000.0) * 99.0,
+            0.0,
+            0.0
+        ]
+    )
+
+    # Prior to the bars with sufficient history there is no impact
+    np.testing.assert_array_equal(
+        model.calc_slippage(
+            DATES[1], ['EQ:ABC'], np.array([100.0]), np.array([100.0]), np.array([100.0])
+        ),
+        [0.0]
+    )
+
+
+def test_square_root_impact_invalid_window():
+    with pytest.raises(ValueError):
+        SquareRootImpactModel(window=1)
@@ -0,0 +1,109 @@
+import pandas as pd
+import pytest
+import pytz
+
+from qstrader.broker.order_book import OrderBook
+from qstrader.execution.order import Order
+
+
+DT = pd.Timestamp('2020-01-02 14:30:00', tz=pytz.UTC)
+
+
+def limit_order(quantity, price, order_id, asset='EQ:ABC', oco_id=None):
+    return Order(
+        DT, asset, quantity, order_id=order_id, order_type='limit',
+        limit_price=price, oco_id=oco_id
+    )
+
+
+def stop_order(quantity, price, order_id, asset='EQ:ABC', oco_id=None):
+    return Order(
+        DT, asset, quantity, order_id=order_id, order_type='stop',
+        stop_price=price, oco_id=oco_id
+    )
+
+
+def matched_ids(matched):
+    return [(portfolio_id, order.order_id, price) for portfolio_id, order, price in matched]
+
+
+def test_match_only_triggered_orders():
+    """
+    Checks that only orders whose trigger prices fall within the price
+    range are matched, stop orders before limit orders and each side in
+    trigger price priority, executing at the trigger price.
+    """
+    book = OrderBook()
+    book.add('1', limit_order(100, 95.0, 'buy_limit_95'))
+    book.add('1', limit_order(100, 90.0, 'buy_limit_90'))
+    book.add('2', limit_order(-100, 104.0, 'sell_limit_104'))
+    book.add('2', limit_order(-100, 110.0, 'sell_limit_110'))
+    book.add('1', stop_order(100, 103.0, 'buy_stop_103'))
+    book.add('1', stop_order(-100, 96.0, 'sell_stop_96'))
+    book.add('1', stop_order(-100, 80.0, 'sell_stop_80'))
+    book.add('1', limit_order(100, 50.0, 'other_asset', asset='EQ:DEF'))
+
+    assert matched_ids(book.match('EQ:ABC', 97.0, 102.0)) == []
+    assert matched_ids(book.match('EQ:ABC', 94.0, 105.0)) == [
+        ('1', 'sell_stop_96', 96.0),
+        ('1', 'buy_stop_103', 103.0),
+        ('1', 'buy_limit_95', 95.0),
+        ('2', 'sell_limit_104', 104.0)
+    ]
+    assert len(book) == 4
+    assert [order.order_id for order in book.get_orders('2')] == ['sell_limit_110']
+
+
+def test_match_gapped_prices():
+    """
+    Checks that orders whose trigger price is gapped through execute
+    at the nearest price of the range.
+    """
+    book = OrderBook()
+    book.add('1', stop_order(-100, 96.0, 'sell_stop'))
+    book.add('1', limit_order(100, 95.0, 'buy_limit'))
+    assert matched_ids(book.match('EQ:ABC', 90.0, 92.0)) == [
+        ('1', 'sell_stop', 92.0),
+        ('1', 'buy_limit', 92.0)
+    ]
+    assert book.assets == []
+
+
+def test_one_cancels_other():
+    """
+    Checks that matching one order of an OCO group cancels the other,
+    with the stop loss taking priority when both are triggered.
+    """
+    book = OrderBook()
+    book.add('1', stop_order(-100, 95.0, 'stop_loss', oco_id='entry'))
+    book.add('1', limit_order(-100, 105.0, 'take_profit', oco_id='entry'))
+    assert matched_ids(book.match('EQ:ABC', 94.0, 106.0)) == [('1', 'stop_loss', 95.0)]
+    assert len(book) == 0
+    assert book.oco_groups == {}
+
+
+def test_cancel():
+    """
+    Checks that cancelled orders are never matched and that
+    cancelling an order not on the book raises KeyError.
+    """
+    book = OrderBook()
+    book.add('1', limit_order(100, 95.0, 'cancelled'))
+    book.add('1', limit_order(100, 94.0, 'resting'))
+    assert book.cancel('cancelled').order_id == 'cancelled'
+    with pytest.raises(KeyError):
+        book.cancel('cancelled')
+    assert matched_ids(book.match('EQ:ABC', 93.0, 100.0)) == [('1', 'resting', 94.0)]
+
+
+def test_add_invalid_orders():
+    """
+    Checks that market orders and orders already on the
+    book cannot be added.
+    """
+    book = OrderBook()
+    with pytest.raises(ValueError):
+        book.add('1', Order(DT, 'EQ:ABC', 100))
+    book.add('1', limit_order(100, 95.0, '1'))
+    with pytest.raises(ValueError):
+        book.add('1', limit_order(100, 95.0, '1'))
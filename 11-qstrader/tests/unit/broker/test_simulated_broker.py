@@ -1,4 +1,4 @@
-import queue
+from collections import deque
 
 import numpy as np
 import pandas as pd
@@ -8,6 +8,8 @@ import pytz
 from qstrader.broker.portfolio.portfolio import Portfolio
 from qstrader.broker.simulated_broker import SimulatedBroker
 from qstrader.broker.fee_model.zero_fee_model import ZeroFeeModel
+from qstrader.broker.slippage_model.fixed_slippage_model import FixedSlippageModel
+from qstrader.execution.order import Order
 from qstrader import settings
 
 
@@ -39,6 +41,12 @@ class DataHandlerMock(object):
     def get_asset_latest_mid_price(self, dt, asset):
         return np.nan
 
+    def get_assets_latest_bid_ask_prices(self, dt, assets):
+        return (np.full(len(assets), np.nan), np.full(len(assets), np.nan))
+
+    def get_assets_latest_mid_prices(self, dt, assets):
+        return np.full(len(assets), np.nan)
+
 
 class DataHandlerMockPrice(object):
     def get_asset_latest_bid_ask_price(self, dt, asset):
@@ -47,6 +55,12 @@ class DataHandlerMockPrice(object):
     def get_asset_latest_mid_price(self, dt, asset):
         return (53.47 - 53.45) / 2.0
 
+    def get_assets_latest_bid_ask_prices(self, dt, assets):
+        return (np.full(len(assets), 53.45), np.full(len(assets), 53.47))
+
+    def get_assets_latest_mid_prices(self, dt, assets):
+        return np.full(len(assets), (53.47 - 53.45) / 2.0)
+
 
 class OrderMock(object):
     def __init__(self, asset, quantity, order_id=None):
@@ -54,6 +68,8 @@ class OrderMock(object):
         self.quantity = quantity
         self.order_id = 1 if order_id is None else order_id
         self.direction = np.copysign(1, self.quantity)
+        self.order_type = 'market'
+        self.is_bracket = False
 
 
 class AssetMock(object):
@@ -406,7 +422,7 @@ def test_create_portfolio():
     assert "1234" in sb.portfolios
     assert isinstance(sb.portfolios["1234"], Portfolio)
     assert "1234" in sb.open_orders
-    assert isinstance(sb.open_orders["1234"], queue.Queue)
+    assert isinstance(sb.open_orders["1234"], deque)
 
     # If portfolio is already in the dictionary
     # then raise ValueError
@@ -655,3 +671,178 @@ def test_update_sets_correct_time():
     sb = SimulatedBroker(start_dt, exchange, data_handler)
     sb.update(new_dt)
     assert sb.current_dt == new_dt
+
+
+def test_update_marks_all_portfolios_with_single_query():
+    """
+    Tests that the update method obtains the mid prices of the
+    assets held by every portfolio with a single data handler query,
+    marking each portfolio to market.
+    """
+    start_dt = pd.Timestamp('2017-10-05 08:00:00', tz=pytz.UTC)
+    new_dt = pd.Timestamp('2017-10-06 08:00:00', tz=pytz.UTC)
+    exchange = ExchangeMockPrice()
+    data_handler = DataHandlerMockPrice()
+
+    sb = SimulatedBroker(start_dt, exchange, data_handler)
+    sb.subscribe_funds_to_account(200000.0)
+    sb.create_portfolio(portfolio_id=1234, name="My Portfolio #1")
+    sb.create_portfolio(portfolio_id=5678, name="My Portfolio #2")
+    sb.subscribe_funds_to_portfolio("1234", 100000.0)
+    sb.subscribe_funds_to_portfolio("5678", 100000.0)
+    sb.submit_order("1234", OrderMock('EQ:RDSB', 100))
+    sb.submit_order("1234", OrderMock('EQ:AAA', 100))
+    sb.submit_order("5678", OrderMock('EQ:RDSB', -200))
+    sb.update(start_dt)
+
+    queries = []
+
+    def get_assets_latest_mid_prices(dt, assets):
+        queries.append(list(assets))
+        return np.array([50.0 if asset == 'EQ:RDSB' else 20.0 for asset in assets])
+
+    data_handler.get_assets_latest_mid_prices = get_assets_latest_mid_prices
+    sb.update(new_dt)
+
+    assert queries == [['EQ:RDSB', 'EQ:AAA']]
+    assert sb.portfolios["1234"].pos_handler.positions['EQ:RDSB'].market_value == 5000.0
+    assert sb.portfolios["1234"].pos_handler.positions['EQ:AAA'].market_value == 2000.0
+    assert sb.portfolios["5678"].pos_handler.positions['EQ:RDSB'].market_value == -10000.0
+
+
+class DataHandlerMockRange(object):
+    def __init__(self):
+        self.prices = {}
+        self.ranges = {}
+
+    def get_assets_latest_bid_ask_prices(self, dt, assets):
+        prices = np.array([self.prices[dt] for _ in assets])
+        return (prices, prices)
+
+    def get_assets_latest_mid_prices(self, dt, assets):
+        return np.array([self.prices[dt] for _ in assets])
+
+    def get_assets_bar_ranges(self, dt, assets):
+        low, high = self.ranges.get(dt, (np.nan, np.nan))
+        return (np.full(len(assets), low), np.full(len(assets), high))
+
+
+def test_resting_orders_match_bar_ranges():
+    """
+    Tests that limit orders rest on the order book until the range of
+    prices traded since the previous update reaches their limit price,
+    without being matched against the range of the timestamp at which
+    they were placed, and that resting orders can be cancelled.
+    """
+    dts = [
+        pd.Timestamp('2017-10-05 14:30:00', tz=pytz.UTC),
+        pd.Timestamp('2017-10-05 21:00:00', tz=pytz.UTC),
+        pd.Timestamp('2017-10-06 14:30:00', tz=pytz.UTC)
+    ]
+    data_handler = DataHandlerMockRange()
+    data_handler.prices = dict(zip(dts, [100.0, 101.0, 97.0]))
+    data_handler.ranges = {dts[1]: (94.0, 102.0), dts[2]: (97.0, 97.0)}
+
+    sb = SimulatedBroker(dts[0], ExchangeMock(), data_handler)
+    sb.subscribe_funds_to_account(100000.0)
+    sb.create_portfolio(portfolio_id=1234)
+    sb.subscribe_funds_to_portfolio("1234", 100000.0)
+    sb.update(dts[0])
+    sb.update(dts[1])
+
+    buy = Order(dts[1], 'EQ:ABC', 100, order_type='limit', limit_price=95.0)
+    cancelled = Order(dts[1], 'EQ:ABC', 100, order_type='limit', limit_price=98.0)
+    sb.submit_order("1234", buy)
+    sb.submit_order("1234", cancelled)
+    sb.update(dts[1])
+    assert sb.get_resting_orders("1234") == [buy, cancelled]
+    assert sb.portfolios["1234"].pos_handler.positions == {}
+
+    assert sb.cancel_order("1234", cancelled.order_id) is cancelled
+    with pytest.raises(KeyError):
+        sb.cancel_order("5678", buy.order_id)
+
+    data_handler.ranges[dts[2]] = (94.0, 97.0)
+    sb.update(dts[2])
+    position = sb.portfolios["1234"].pos_handler.positions['EQ:ABC']
+    assert position.net_quantity == 100
+    assert position.avg_price == 95.0
+    assert sb.get_resting_orders("1234") == []
+
+
+def test_bracket_order_exits():
+    """
+    Tests that the exit orders of an executed bracket order are placed
+    on the order book, with the stop loss executed once triggered and
+    the take profit cancelled.
+    """
+    dts = [
+        pd.Timestamp('2017-10-05 21:00:00', tz=pytz.UTC),
+        pd.Timestamp('2017-10-06 14:30:00', tz=pytz.UTC),
+        pd.Timestamp('2017-10-06 21:00:00', tz=pytz.UTC)
+    ]
+    data_handler = DataHandlerMockRange()
+    data_handler.prices = dict(zip(dts, [100.0, 98.0, 99.0]))
+    data_handler.ranges = {dts[1]: (98.0, 98.0), dts[2]: (93.0, 99.0)}
+
+    sb = SimulatedBroker(dts[0], ExchangeMock(), data_handler)
+    sb.subscribe_funds_to_account(100000.0)
+    sb.create_portfolio(portfolio_id=1234)
+    sb.subscribe_funds_to_portfolio("1234", 100000.0)
+    sb.submit_order(
+        "1234", Order(dts[0], 'EQ:ABC', 100, stop_loss=95.0, take_profit=110.0)
+    )
+    sb.update(dts[0])
+    assert [
+        (order.order_type, order.quantity, order.trigger_price)
+        for order in sb.get_resting_orders("1234")
+    ] == [('stop', -100, 95.0), ('limit', -100, 110.0)]
+
+    sb.update(dts[1])
+    assert len(sb.get_resting_orders("1234")) == 2
+
+    sb.update(dts[2])
+    assert sb.get_resting_orders("1234") == []
+    assert sb.portfolios["1234"].pos_handler.positions == {}
+    assert sb.portfolios["1234"].cash == 100000.0 - 500.0
+
+
+def test_slippage_models():
+    """
+    Tests that market and stop orders execute at prices adjusted by
+    both the slippage and market impact models, while limit orders
+    execute at their limit price, and that models which are not
+    SlippageModel subclasses raise TypeError.
+    """
+    start_dt = pd.Timestamp('2017-10-05 08:00:00', tz=pytz.UTC)
+    with pytest.raises(TypeError):
+        SimulatedBroker(
+            start_dt, ExchangeMock(), DataHandlerMock(), slippage_model=ZeroFeeModel()
+        )
+
+    sb = SimulatedBroker(
+        start_dt, ExchangeMockPrice(), DataHandlerMockPrice(),
+        slippage_model=FixedSlippageModel(slippage_bps=10.0),
+        market_impact_model=FixedSlippageModel(slippage_bps=5.0)
+    )
+    sb.subscribe_funds_to_account(100000.0)
+    sb.create_portfolio(portfolio_id=1234)
+    sb.subscribe_funds_to_portfolio("1234", 100000.0)
+    bids, asks = sb.calc_execution_bid_ask(
+        start_dt, ['EQ:ABC', 'EQ:DEF'], [100, -100],
+        np.array([53.45, 53.45]), np.array([53.47, 53.47])
+    )
+    np.testing.assert_allclose(asks[0], 53.47 * 1.0015)
+    np.testing.assert_allclose(bids[1], 53.45 * 0.9985)
+
+    sb.submit_order("1234", OrderMock('EQ:ABC', 100))
+    sb.submit_order("1234", OrderMock('EQ:DEF', -100))
+    sb.submit_order("1234", Order(start_dt, 'EQ:GHI', 100, order_type='limit', limit_price=54.0))
+    sb.submit_order("1234", Order(start_dt, 'EQ:JKL', 100, order_type='stop', stop_price=50.0))
+    sb.update(start_dt)
+
+    positions = sb.portfolios["1234"].pos_handler.positions
+    np.testing.assert_allclose(positions['EQ:ABC'].avg_price, asks[0])
+    np.testing.assert_allclose(positions['EQ:DEF'].avg_price, bids[1])
+    assert positions['EQ:GHI'].avg_price == 53.47
+    np.testing.assert_allclose(positions['EQ:JKL'].avg_price, 53.45 * 1.0015)
@@ -0,0 +1,217 @@
+import numpy as np
+import pandas as pd
+import pytz
+
+from qstrader.data.backtest_data_handler import BacktestDataHandler
+
+
+class BatchDataSourceMock(object):
+    def __init__(self, prices):
+        self.prices = prices
+        self.calls = 0
+
+    def get_bid(self, dt, asset):
+        return self.prices[asset]
+
+    def get_ask(self, dt, asset):
+        return self.prices[asset] + 0.1
+
+    def get_bids(self, dt, assets):
+        self.calls += 1
+        return np.array([self.prices.get(asset, np.nan) for asset in assets])
+
+    def get_asks(self, dt, assets):
+        return self.get_bids(dt, assets) + 0.1
+
+
+class SingleDataSourceMock(object):
+    def __init__(self, prices):
+        self.prices = prices
+
+    def get_bid(self, dt, asset):
+        return self.prices[asset]
+
+    def get_ask(self, dt, asset):
+        return self.prices[asset] + 0.1
+
+
+def test_get_assets_latest_prices_across_data_sources():
+    """
+    Checks that multi-asset prices are aligned to the requested
+    assets, that later data sources are only queried for assets
+    lacking a price and that single asset data sources are used
+    as a fallback.
+    """
+    dt = pd.Timestamp('2020-01-02 14:30:00', tz=pytz.UTC)
+    batch_ds = BatchDataSourceMock({'EQ:ABC': 10.0, 'EQ:DEF': np.nan})
+    second_batch_ds = BatchDataSourceMock({'EQ:GHI': 30.0})
+    single_ds = SingleDataSourceMock({'EQ:DEF': 20.0})
+    data_handler = BacktestDataHandler(
+        None, data_sources=[batch_ds, single_ds, second_batch_ds]
+    )
+    assets = ['EQ:GHI', 'EQ:ABC', 'EQ:DEF', 'EQ:XYZ']
+
+    bids = data_handler.get_assets_latest_bid_prices(dt, assets)
+    np.testing.assert_array_equal(bids, [30.0, 10.0, 20.0, np.nan])
+    assert (batch_ds.calls, second_batch_ds.calls) == (1, 1)
+
+    asks = data_handler.get_assets_latest_ask_prices(dt, assets)
+    np.testing.assert_allclose(asks, [30.1, 10.1, 20.1, np.nan])
+
+    mids = data_handler.get_assets_latest_mid_prices(dt, assets)
+    np.testing.assert_array_equal(mids, bids)
+    for asset, mid in zip(assets, mids):
+        np.testing.assert_equal(data_handler.get_asset_latest_mid_price(dt, asset), mid)
+
+
+class RangeDataSourceMock(BatchDataSourceMock):
+    def get_bar_lows(self, dt, assets):
+        return self.get_bids(dt, assets) - 1.0
+
+    def get_bar_highs(self, dt, assets):
+        return self.get_bids(dt, assets) + 1.0
+
+
+def test_get_assets_bar_ranges():
+    """
+    Checks that bar price ranges are obtained from those data sources
+    providing them, and are NaN for assets of other data sources, which
+    are not queried.
+    """
+    dt = pd.Timestamp('2020-01-02 21:00:00', tz=pytz.UTC)
+    range_ds = RangeDataSourceMock({'EQ:ABC': 10.0})
+    batch_ds = BatchDataSourceMock({'EQ:DEF': 20.0})
+    single_ds = SingleDataSourceMock({'EQ:GHI': 30.0})
+    data_handler = BacktestDataHandler(
+        None, data_sources=[range_ds, batch_ds, single_ds]
+    )
+    lows, highs = data_handler.get_assets_bar_ranges(
+        dt, ['EQ:GHI', 'EQ:ABC', 'EQ:DEF']
+    )
+    np.testing.assert_array_equal(lows, [np.nan, 9.0, np.nan])
+    np.testing.assert_array_equal(highs, [np.nan, 11.0, np.nan])
+    assert data_handler.bar_range_unrouted_sources == [range_ds]
+    assert (range_ds.calls, batch_ds.calls) == (2, 0)
+
+    second_range_ds = RangeDataSourceMock({'EQ:DEF': 40.0})
+    data_handler.register_data_source(second_range_ds)
+    lows, highs = data_handler.get_assets_bar_ranges(
+        dt, ['EQ:GHI', 'EQ:ABC', 'EQ:DEF']
+    )
+    np.testing.assert_array_equal(lows, [np.nan, 9.0, 39.0])
+    assert batch_ds.calls == 0
+
+
+class RoutedDataSourceMock(BatchDataSourceMock):
+    def __init__(self, prices, coverage):
+        super().__init__(prices)
+        self.coverage = coverage
+        self.single_calls = 0
+
+    def get_bid(self, dt, asset):
+        self.single_calls += 1
+        return self.prices[asset]
+
+    def get_assets_coverage(self):
+        return self.coverage
+
+
+def test_routing_table():
+    """
+    Checks that routed assets are requested only from the data
+    sources owning them once their coverage has started, that other
+    assets are routing misses served by the unrouted data sources,
+    and that the routes can be reloaded when a data source adds assets.
+    """
+    before = pd.Timestamp('2019-12-31', tz=pytz.UTC)
+    dt = pd.Timestamp('2020-01-02 14:30:00', tz=pytz.UTC)
+    start = pd.Timestamp('2020-01-01', tz=pytz.UTC)
+    end = pd.Timestamp('2020-12-31', tz=pytz.UTC)
+
+    routed_ds = RoutedDataSourceMock(
+        {'EQ:ABC': 10.0, 'EQ:DEF': np.nan},
+        {'EQ:ABC': (start, end), 'EQ:DEF': (start, end), 'EQ:NEW': (None, None)}
+    )
+    second_routed_ds = RoutedDataSourceMock(
+        {'EQ:DEF': 20.0}, {'EQ:DEF': (start, end)}
+    )
+    single_ds = SingleDataSourceMock({'EQ:GHI': 30.0})
+    data_handler = BacktestDataHandler(
+        None, data_sources=[routed_ds, single_ds, second_routed_ds]
+    )
+    assert [ds for ds, _, _ in data_handler.routes['EQ:DEF']] == [routed_ds, second_routed_ds]
+
+    assert data_handler.get_asset_latest_bid_price(dt, 'EQ:ABC') == 10.0
+    assert data_handler.get_asset_latest_bid_price(dt, 'EQ:DEF') == 20.0
+    assert np.isnan(data_handler.get_asset_latest_bid_price(before, 'EQ:ABC'))
+    assert np.isnan(data_handler.get_asset_latest_bid_price(dt, 'EQ:NEW'))
+    assert routed_ds.single_calls == 2
+    assert data_handler.routing_misses == 0
+
+    assert data_handler.get_asset_latest_bid_price(dt, 'EQ:GHI') == 30.0
+    assert np.isnan(data_handler.get_asset_latest_bid_price(dt, 'EQ:XYZ'))
+    assert data_handler.routing_misses == 2
+
+    assets = ['EQ:GHI', 'EQ:DEF', 'EQ:ABC', 'EQ:NEW', 'EQ:XYZ']
+    bids = data_handler.get_assets_latest_bid_prices(dt, assets)
+    np.testing.assert_array_equal(bids, [30.0, 20.0, 10.0, np.nan, np.nan])
+    assert (routed_ds.calls, second_routed_ds.calls) == (1, 1)
+    assert data_handler.routing_misses == 4
+
+    routed_ds.prices['EQ:NEW'] = 40.0
+    routed_ds.coverage['EQ:NEW'] = (start, end)
+    data_handler.reload_routes()
+    np.testing.assert_array_equal(
+        data_handler.get_assets_latest_bid_prices(dt, ['EQ:NEW']), [40.0]
+    )
+
+    data_handler.register_data_source(RoutedDataSourceMock({'EQ:JKL': 50.0}, {'EQ:JKL': (start, end)}))
+    assert data_handler.get_asset_latest_bid_price(dt, 'EQ:JKL') == 50.0
+    assert data_handler.routing_misses == 4
+
+
+def test_get_assets_prices_at_matches_latest_prices():
+    """
+    Checks that the prices of multiple assets at multiple times match
+    the latest prices obtained at each time in turn, across routed
+    data sources (with and without a multi-time method) whose coverage
+    starts partway through the times, and unrouted data sources.
+    """
+    dts = pd.DatetimeIndex(
+        ['2019-12-31', '2020-01-02 14:30:00', '2020-06-01', '2021-01-05'], tz=pytz.UTC
+    )
+    start = pd.Timestamp('2020-01-01', tz=pytz.UTC)
+    later_start = pd.Timestamp('2020-03-01', tz=pytz.UTC)
+    end = pd.Timestamp('2020-12-31', tz=pytz.UTC)
+
+    class MatrixDataSourceMock(RoutedDataSourceMock):
+        def get_bids_at(self, timestamps, assets):
+            self.matrix_calls += 1
+            prices = [self.prices.get(asset, np.nan) for asset in assets]
+            return np.tile(prices, (len(timestamps), 1))
+
+    routed_ds = MatrixDataSourceMock(
+        {'EQ:ABC': 10.0, 'EQ:DEF': np.nan},
+        {'EQ:ABC': (start, end), 'EQ:DEF': (start, end)}
+    )
+    routed_ds.matrix_calls = 0
+    second_routed_ds = RoutedDataSourceMock(
+        {'EQ:DEF': 20.0, 'EQ:ABC': 11.0},
+        {'EQ:DEF': (later_start, end), 'EQ:ABC': (start, end)}
+    )
+    single_ds = SingleDataSourceMock({'EQ:GHI': 30.0})
+    data_handler = BacktestDataHandler(
+        None, data_sources=[routed_ds, single_ds, second_routed_ds]
+    )
+    assets = ['EQ:GHI', 'EQ:DEF', 'EQ:ABC', 'EQ:XYZ']
+
+    bids = data_handler.get_assets_bid_prices_at(dts, assets)
+    assert (routed_ds.matrix_calls, routed_ds.calls) == (1, 0)
+    expected = np.array([data_handler.get_assets_latest_bid_prices(dt, assets) for dt in dts])
+    np.testing.assert_array_equal(bids, expected)
+    np.testing.assert_array_equal(
+        bids[:, 1], [np.nan, np.nan, 20.0, 20.0]
+    )
+
+    bids, asks = data_handler.get_assets_bid_ask_prices_at(dts, assets)
+    np.testing.assert_array_equal(asks, expected)
@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+import pytest
+import pytz
+
+from qstrader.data.bar_conversion import ffill_columns, interleave_open_close
+from qstrader.data.daily_bar_csv import CSVDailyBarDataSource
+
+
+def legacy_convert_bar_frame_into_bid_ask_df(bar_df, adjust_prices):
+    """
+    The previous Pandas implementation of the bar to bid/ask conversion.
+    """
+    bar_df = bar_df.sort_index()
+    if adjust_prices:
+        oc_df = bar_df.loc[:, ['Open', 'Close', 'Adj Close']]
+        oc_df['Adj Open'] = (oc_df['Adj Close'] / oc_df['Close']) * oc_df['Open']
+        oc_df = oc_df.loc[:, ['Adj Open', 'Adj Close']]
+        oc_df.columns = ['Open', 'Close']
+    else:
+        oc_df = bar_df.loc[:, ['Open', 'Close']]
+
+    seq_oc_df = oc_df.T.unstack(level=0).reset_index()
+    seq_oc_df.columns = ['Date', 'Market', 'Price']
+    seq_oc_df.loc[seq_oc_df['Market'] == 'Open', 'Date'] += pd.Timedelta(hours=14, minutes=30)
+    seq_oc_df.loc[seq_oc_df['Market'] == 'Close', 'Date'] += pd.Timedelta(hours=21, minutes=00)
+
+    dp_df = seq_oc_df[['Date', 'Price']].copy()
+    dp_df['Bid'] = dp_df['Price']
+    dp_df['Ask'] = dp_df['Price']
+    dp_df = dp_df.loc[:, ['Date', 'Bid', 'Ask']].ffill().set_index('Date').sort_index()
+    return dp_df
+
+
+def random_bar_frame(num_bars, seed, nan_fraction=0.0):
+    """
+    Create a random-walk daily bar DataFrame, optionally with missing prices.
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2000-01-03', periods=num_bars, tz=pytz.UTC, name='Date')
+    close = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.01, num_bars)))
+    bar_df = pd.DataFrame(
+        {
+            'Open': close * (1.0 + rng.normal(0.0, 0.001, num_bars)),
+            'Close': close,
+            'Adj Close': close * rng.uniform(0.5, 1.0, num_bars)
+        },
+        index=dates
+    )
+    if nan_fraction > 0.0:
+        for column in ('Open', 'Close', 'Adj Close'):
+            bar_df.loc[rng.uniform(size=num_bars) < nan_fraction, column] = np.nan
+    return bar_df
+
+
+@pytest.mark.parametrize('adjust_prices', [False, True])
+@pytest.mark.parametrize(
+    'num_bars,seed,nan_fraction',
+    [(0, 0, 0.0), (1, 1, 0.0), (500, 2, 0.0), (500, 3, 0.1), (50, 4, 0.9)]
+)
+def test_conversion_matches_legacy_output(adjust_prices, num_bars, seed, nan_fraction):
+    """
+    Checks that the vectorised bar to bid/ask conversion produces
+    exactly the same timestamps and prices as the previous Pandas
+    implementation, including forward-filling of missing prices.
+    """
+    bar_df = random_bar_frame(num_bars, seed, nan_fraction)
+    # Shuffle the rows to check that the bars are sorted prior to conversion
+    bar_df = bar_df.sample(frac=1.0, random_state=seed)
+
+    actual = CSVDailyBarDataSource._convert_open_close_into_bid_ask_df(
+        *CSVDailyBarDataSource._adjust_bar_frame(bar_df.sort_index(), adjust_prices)
+    )
+    expected = legacy_convert_bar_frame_into_bid_ask_df(bar_df, adjust_prices)
+
+    assert list(actual.columns) == ['Bid', 'Ask']
+    np.testing.assert_array_equal(
+        actual.index.as_unit('ns').asi8, expected.index.as_unit('ns').asi8
+    )
+    np.testing.assert_array_equal(
+        actual.to_numpy(), expected.to_numpy(dtype=np.float64)
+    )
+
+
+def test_interleave_panel_matches_single_assets():
+    """
+    Checks that converting a 2D panel of assets at once matches
+    converting each asset individually.
+    """
+    rng = np.random.default_rng(42)
+    dates = pd.bdate_range('2000-01-03', periods=100, tz=pytz.UTC).as_unit('ns').asi8
+    opens = rng.uniform(10.0, 20.0, (100, 3))
+    closes = rng.uniform(10.0, 20.0, (100, 3))
+    opens[:10, 1] = np.nan
+    closes[:10, 1] = np.nan
+    closes[50, 2] = np.nan
+
+    timestamps, prices = interleave_open_close(dates, opens, closes)
+    assert prices.shape == (200, 3)
+    for col in range(3):
+        asset_ts, asset_prices = interleave_open_close(dates, opens[:, col], closes[:, col])
+        np.testing.assert_array_equal(asset_ts, timestamps)
+        np.testing.assert_array_equal(asset_prices, prices[:, col])
+
+
+def test_ffill_columns():
+    """
+    Checks forward-filling of 1D and 2D arrays, leaving leading NaNs.
+    """
+    np.testing.assert_array_equal(
+        ffill_columns(np.array([np.nan, 1.0, np.nan, 2.0, np.nan])),
+        [np.nan, 1.0, 1.0, 2.0, 2.0]
+    )
+    np.testing.assert_array_equal(
+        ffill_columns(np.array([[1.0, np.nan], [np.nan, np.nan], [np.nan, 3.0]])),
+        [[1.0, np.nan], [1.0, np.nan], [1.0, 3.0]]
+    )
+    assert ffill_columns(np.array([])).shape == (0,)
@@ -0,0 +1,335 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+import pytz
+
+from qstrader.data.daily_bar_csv import CSVDailyBarDataSource
+from qstrader import settings
+
+
+CSV_CONTENTS = {
+    'ABC': (
+        'Date,Open,High,Low,Close,Adj Close,Volume\n'
+        '2020-01-02,100.0,102.0,99.0,101.0,50.5,1000\n'
+        '2020-01-03,101.5,103.0,100.0,102.0,51.0,1100\n'
+        '2020-01-06,102.5,104.0,101.0,103.0,51.5,1200\n'
+    ),
+    'DEF': (
+        'Date,Open,High,Low,Close,Adj Close,Volume\n'
+        '2020-01-03,20.0,21.0,19.0,20.5,20.5,500\n'
+        '2020-01-06,20.5,22.0,20.0,21.5,21.5,600\n'
+    )
+}
+
+
+@pytest.fixture
+def csv_dir(tmp_path):
+    settings.PRINT_EVENTS = False
+    for symbol, contents in CSV_CONTENTS.items():
+        with open(os.path.join(tmp_path, '%s.csv' % symbol), 'w') as f:
+            f.write(contents)
+    return str(tmp_path)
+
+
+def test_cached_data_source_matches_csv_data_source(csv_dir, tmp_path):
+    """
+    Checks that loading via the binary price cache produces the
+    same bar and bid/ask data as parsing the CSV files directly,
+    both when the cache is initially built and when it is reused.
+    """
+    cache_dir = os.path.join(tmp_path, 'cache')
+    ds = CSVDailyBarDataSource(csv_dir, None)
+    ds_miss = CSVDailyBarDataSource(csv_dir, None, cache_dir=cache_dir)
+    ds_hit = CSVDailyBarDataSource(csv_dir, None, cache_dir=cache_dir)
+
+    assert (ds_miss.cache.hits, ds_miss.cache.misses) == (0, 2)
+    assert (ds_hit.cache.hits, ds_hit.cache.misses) == (2, 0)
+
+    for cached in (ds_miss, ds_hit):
+        for asset in ('EQ:ABC', 'EQ:DEF'):
+            expected = ds.asset_bid_ask_frames[asset]
+            actual = cached.asset_bid_ask_frames[asset]
+            np.testing.assert_array_equal(actual.index.asi8, expected.index.as_unit('ns').asi8)
+            np.testing.assert_array_equal(actual.to_numpy(), expected.to_numpy())
+
+            expected_bars = ds.asset_bar_frames[asset]
+            actual_bars = cached.asset_bar_frames[asset]
+            assert list(actual_bars.columns) == list(expected_bars.columns)
+            np.testing.assert_array_equal(
+                actual_bars.to_numpy(), expected_bars.to_numpy(dtype=np.float64)
+            )
+
+    dt = pd.Timestamp('2020-01-03 15:00:00', tz=pytz.UTC)
+    assert ds_hit.get_bid(dt, 'EQ:ABC') == ds.get_bid(dt, 'EQ:ABC')
+
+
+def test_cached_data_source_rebuilds_changed_csv(csv_dir, tmp_path):
+    """
+    Checks that a modified CSV file is recompiled on the next load.
+    """
+    cache_dir = os.path.join(tmp_path, 'cache')
+    CSVDailyBarDataSource(csv_dir, None, cache_dir=cache_dir)
+
+    with open(os.path.join(csv_dir, 'DEF.csv'), 'a') as f:
+        f.write('2020-01-07,21.5,23.0,21.0,22.5,22.5,700\n')
+
+    ds = CSVDailyBarDataSource(csv_dir, None, cache_dir=cache_dir)
+    assert (ds.cache.hits, ds.cache.misses) == (1, 1)
+    assert len(ds.asset_bar_frames['EQ:DEF']) == 3
+
+
+def test_cached_data_source_keys_on_csv_path(csv_dir, tmp_path):
+    """
+    Checks that same-named CSV files of another directory, with
+    matching sizes and modification times, do not share the cache
+    entries of the first directory.
+    """
+    cache_dir = os.path.join(tmp_path, 'cache')
+    CSVDailyBarDataSource(csv_dir, None, cache_dir=cache_dir)
+
+    other_dir = os.path.join(tmp_path, 'other')
+    os.makedirs(other_dir)
+    for symbol, contents in CSV_CONTENTS.items():
+        other_path = os.path.join(other_dir, '%s.csv' % symbol)
+        with open(other_path, 'w') as f:
+            f.write(contents.replace('50.5', '60.5'))
+        stat = os.stat(os.path.join(csv_dir, '%s.csv' % symbol))
+        os.utime(other_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    ds = CSVDailyBarDataSource(other_dir, None, cache_dir=cache_dir)
+    assert (ds.cache.hits, ds.cache.misses) == (0, 2)
+    dt = pd.Timestamp('2020-01-02 21:00:00', tz=pytz.UTC)
+    assert ds.get_bid(dt, 'EQ:ABC') == 60.5
+
+
+@pytest.mark.parametrize(
+    'dt,asset,expected',
+    [
+        ('2020-01-02 14:00:00', 'EQ:ABC', np.nan),
+        ('2020-01-02 14:30:00', 'EQ:ABC', 50.0),
+        ('2020-01-02 21:00:00', 'EQ:ABC', 50.5),
+        ('2020-01-03 14:30:00', 'EQ:DEF', 20.0),
+        ('2020-01-05 12:00:00', 'EQ:DEF', 20.5),
+        ('2020-01-08 21:00:00', 'EQ:ABC', 51.5),
+    ]
+)
+def test_get_bid_ask(csv_dir, dt, asset, expected):
+    """
+    Checks that the latest adjusted open/close price at or before
+    the provided timestamp is returned, or NaN if prior to the first
+    available price.
+    """
+    ds = CSVDailyBarDataSource(csv_dir, None)
+    ts = pd.Timestamp(dt, tz=pytz.UTC)
+    np.testing.assert_equal(ds.get_bid(ts, asset), expected)
+    np.testing.assert_equal(ds.get_ask(ts, asset), expected)
+
+
+def test_get_bids_asks_match_single_asset_lookups(csv_dir):
+    """
+    Checks that the multi-asset bid/ask lookups agree with the
+    single asset lookups, including unknown assets.
+    """
+    ds = CSVDailyBarDataSource(csv_dir, None)
+    assets = ['EQ:DEF', 'EQ:ABC', 'EQ:XYZ']
+    for dt in (
+        '2020-01-01 00:00:00', '2020-01-02 14:30:00', '2020-01-03 15:00:00',
+        '2020-01-06 21:00:00', '2020-02-01 00:00:00'
+    ):
+        ts = pd.Timestamp(dt, tz=pytz.UTC)
+        expected = [ds.get_bid(ts, asset) for asset in assets[:2]] + [np.nan]
+        np.testing.assert_array_equal(ds.get_bids(ts, assets), expected)
+        np.testing.assert_array_equal(ds.get_asks(ts, assets), expected)
+
+
+def test_bid_ask_panels_shared(csv_dir):
+    """
+    Checks that a single panel is shared between the bid and ask
+    prices, as both are taken from the same open/close column.
+    """
+    ds = CSVDailyBarDataSource(csv_dir, None)
+    assert ds.ask_panel is ds.bid_panel
+
+
+@pytest.mark.parametrize('adjusted', [False, True])
+@pytest.mark.parametrize(
+    'start_dt,end_dt,assets',
+    [
+        ('2020-01-01', '2020-01-31', ['EQ:ABC', 'EQ:DEF']),
+        ('2020-01-03', '2020-01-03', ['EQ:ABC', 'EQ:DEF']),
+        ('2020-01-01', '2020-01-02', ['EQ:DEF', 'EQ:ABC']),
+        ('2020-01-01', '2020-01-02', ['EQ:DEF']),
+        ('2020-01-03', '2020-01-06', ['EQ:DEF', 'EQ:XYZ']),
+    ]
+)
+def test_get_assets_historical_closes(csv_dir, start_dt, end_dt, assets, adjusted):
+    """
+    Checks that the historical closing prices sliced from the
+    closing price panel match those from concatenating the bars.
+    """
+    ds = CSVDailyBarDataSource(csv_dir, None)
+    start_dt = pd.Timestamp(start_dt, tz=pytz.UTC)
+    end_dt = pd.Timestamp(end_dt, tz=pytz.UTC)
+    column = 'Adj Close' if adjusted else 'Close'
+
+    close_series = []
+    for asset in assets:
+        if asset in ds.asset_bar_frames:
+            close_series.append(ds.asset_bar_frames[asset][column].rename(asset))
+    expected = pd.concat(close_series, axis=1, sort=True).dropna(how='all').loc[start_dt:end_dt]
+
+    closes = ds.get_assets_historical_closes(start_dt, end_dt, assets, adjusted=adjusted)
+    assert list(closes.columns) == list(expected.columns)
+    np.testing.assert_array_equal(closes.index.asi8, expected.index.as_unit('ns').asi8)
+    np.testing.assert_array_equal(closes.to_numpy(), expected.to_numpy())
+
+
+@pytest.mark.parametrize('use_cache', [False, True])
+def test_parallel_data_source_matches_serial_data_source(csv_dir, tmp_path, use_cache):
+    """
+    Checks that loading the CSV files across multiple worker processes
+    produces the same bar and bid/ask data, in the same asset order,
+    as loading them in-process, and that each load phase is timed.
+    """
+    cache_dir = os.path.join(tmp_path, 'cache') if use_cache else None
+    ds = CSVDailyBarDataSource(csv_dir, None)
+    ds_par = CSVDailyBarDataSource(csv_dir, None, cache_dir=cache_dir, workers=2)
+
+    assert list(ds_par.asset_bar_frames.keys()) == list(ds.asset_bar_frames.keys())
+    for asset in ds.asset_bid_ask_frames.keys():
+        expected = ds.asset_bid_ask_frames[asset]
+        actual = ds_par.asset_bid_ask_frames[asset]
+        np.testing.assert_array_equal(actual.index.asi8, expected.index.as_unit('ns').asi8)
+        np.testing.assert_array_equal(actual.to_numpy(), expected.to_numpy())
+        np.testing.assert_array_equal(
+            ds_par.asset_bar_frames[asset].to_numpy(),
+            ds.asset_bar_frames[asset].to_numpy(dtype=np.float64)
+        )
+
+    for timings in (ds.load_timings, ds_par.load_timings):
+        assert set(timings.keys()) == {
+            'listing', 'parsing', 'adjusting', 'converting', 'caching', 'total'
+        }
+        assert timings['parsing'] > 0.0
+        assert timings['converting'] > 0.0
+        assert all(secs >= 0.0 for secs in timings.values())
+
+
+def test_data_source_invalid_workers(csv_dir):
+    """
+    Checks that a non-positive number of workers raises a ValueError.
+    """
+    with pytest.raises(ValueError):
+        CSVDailyBarDataSource(csv_dir, None, workers=0)
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+@pytest.mark.parametrize('use_cache', [False, True])
+@pytest.mark.parametrize(
+    'start_dt,end_dt',
+    [
+        ('2020-01-03 14:30:00', None),
+        (None, '2020-01-03 14:30:00'),
+        ('2020-01-03', '2020-01-03'),
+        ('2019-01-01', '2019-12-31'),
+    ]
+)
+def test_load_window(csv_dir, tmp_path, workers, use_cache, start_dt, end_dt):
+    """
+    Checks that restricting the data source to a load window, whether
+    parsing the CSV files or reading from the binary price cache,
+    produces the same data as slicing the full history by date.
+    """
+    cache_dir = os.path.join(tmp_path, 'cache') if use_cache else None
+    if use_cache:
+        # Ensure that the window is applied to existing cache entries
+        CSVDailyBarDataSource(csv_dir, None, cache_dir=cache_dir)
+    ds = CSVDailyBarDataSource(csv_dir, None)
+    ds_win = CSVDailyBarDataSource(
+        csv_dir, None, cache_dir=cache_dir, workers=workers,
+        start_dt=None if start_dt is None else pd.Timestamp(start_dt, tz=pytz.UTC),
+        end_dt=None if end_dt is None else pd.Timestamp(end_dt, tz=pytz.UTC)
+    )
+
+    start_date = None if start_dt is None else pd.Timestamp(start_dt[:10], tz=pytz.UTC)
+    end_date = None if end_dt is None else pd.Timestamp(end_dt[:10], tz=pytz.UTC)
+    end_bid_ask = None if end_date is None else end_date + pd.Timedelta(hours=23)
+    for asset in ds.asset_bar_frames.keys():
+        expected_bars = ds.asset_bar_frames[asset].loc[start_date:end_date]
+        actual_bars = ds_win.asset_bar_frames[asset]
+        np.testing.assert_array_equal(
+            actual_bars.index.as_unit('ns').asi8, expected_bars.index.as_unit('ns').asi8
+        )
+        np.testing.assert_array_equal(
+            actual_bars.to_numpy(dtype=np.float64), expected_bars.to_numpy(dtype=np.float64)
+        )
+
+        expected = ds.asset_bid_ask_frames[asset].loc[start_date:end_bid_ask]
+        actual = ds_win.asset_bid_ask_frames[asset]
+        np.testing.assert_array_equal(
+            actual.index.as_unit('ns').asi8, expected.index.as_unit('ns').asi8
+        )
+        np.testing.assert_array_equal(actual.to_numpy(), expected.to_numpy())
+
+
+def test_load_window_invalid(csv_dir):
+    """
+    Checks that a load window ending prior to its start raises a ValueError.
+    """
+    with pytest.raises(ValueError):
+        CSVDailyBarDataSource(
+            csv_dir, None,
+            start_dt=pd.Timestamp('2020-01-06', tz=pytz.UTC),
+            end_dt=pd.Timestamp('2020-01-03', tz=pytz.UTC)
+        )
+
+
+def test_get_assets_coverage(csv_dir):
+    """
+    Checks the first and last bid/ask timestamps of each asset.
+    """
+    ds = CSVDailyBarDataSource(csv_dir, None)
+    assert ds.get_assets_coverage() == {
+        'EQ:ABC': (
+            pd.Timestamp('2020-01-02 14:30:00', tz=pytz.UTC),
+            pd.Timestamp('2020-01-06 21:00:00', tz=pytz.UTC)
+        ),
+        'EQ:DEF': (
+            pd.Timestamp('2020-01-03 14:30:00', tz=pytz.UTC),
+            pd.Timestamp('2020-01-06 21:00:00', tz=pytz.UTC)
+        )
+    }
+
+
+@pytest.mark.parametrize('adjust_prices', [False, True])
+def test_get_bar_lows_highs(csv_dir, adjust_prices):
+    """
+    Checks that the (optionally adjusted) price range of each bar is
+    the opening price at the market open and the daily low and high
+    at the market close, and NaN for any asset without a new price at
+    exactly the provided timestamp.
+    """
+    ds = CSVDailyBarDataSource(csv_dir, None, adjust_prices=adjust_prices)
+    factor = 0.5 if adjust_prices else 1.0
+    assets = ['EQ:ABC', 'EQ:DEF', 'EQ:XYZ']
+    expected = {
+        '2020-01-02 14:00:00': ([np.nan] * 3, [np.nan] * 3),
+        '2020-01-02 14:30:00': (
+            [100.0 * factor, np.nan, np.nan], [100.0 * factor, np.nan, np.nan]
+        ),
+        '2020-01-02 21:00:00': (
+            [99.0 * factor, np.nan, np.nan], [102.0 * factor, np.nan, np.nan]
+        ),
+        '2020-01-03 15:00:00': ([np.nan] * 3, [np.nan] * 3),
+        '2020-01-03 21:00:00': (
+            [100.0 * factor, 19.0, np.nan], [103.0 * factor, 21.0, np.nan]
+        )
+    }
+    for dt, (lows, highs) in expected.items():
+        ts = pd.Timestamp(dt, tz=pytz.UTC)
+        np.testing.assert_array_equal(ds.get_bar_lows(ts, assets), lows)
+        np.testing.assert_array_equal(ds.get_bar_highs(ts, assets), highs)
+        np.testing.assert_equal(ds.get_bar_low(ts, 'EQ:ABC'), lows[0])
+        np.testing.assert_equal(ds.get_bar_high(ts, 'EQ:ABC'), highs[0])
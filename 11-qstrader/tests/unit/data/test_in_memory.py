@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytz
+
+from qstrader.data.in_memory import InMemoryPriceDataSource
+from qstrader.data.panel_source import PanelPriceDataSource
+from qstrader.data.wide_csv import WideCSVPriceDataSource
+
+
+def test_in_memory_price_data_source():
+    """
+    Checks that in-memory prices are queried as the latest forward-filled
+    price, preserving NaN prices prior to an asset's first price.
+    """
+    timestamps = pd.date_range('2020-01-01 21:00', periods=4, freq='D', tz=pytz.UTC)
+    prices = np.array([
+        [10.0, np.nan],
+        [11.0, 20.0],
+        [np.nan, 21.0],
+        [13.0, 22.0]
+    ])
+    data_source = InMemoryPriceDataSource(timestamps, ['EQ:ABC', 'EQ:DEF'], prices)
+
+    assert data_source.assets == ['EQ:ABC', 'EQ:DEF']
+    dt = pd.Timestamp('2020-01-03 22:00', tz=pytz.UTC)
+    np.testing.assert_array_equal(
+        data_source.get_bids(dt, ['EQ:DEF', 'EQ:ABC', 'EQ:XYZ']),
+        [21.0, 11.0, np.nan]
+    )
+    assert data_source.get_ask(dt, 'EQ:ABC') == 11.0
+    assert np.isnan(data_source.get_bid(pd.Timestamp('2020-01-01 21:00', tz=pytz.UTC), 'EQ:DEF'))
+
+    closes = data_source.get_assets_historical_closes(
+        timestamps[0], timestamps[-1], ['EQ:ABC', 'EQ:DEF']
+    )
+    np.testing.assert_array_equal(closes.to_numpy(), prices)
+    assert data_source.get_update_timestamps()[0] == timestamps[0].value
+    assert data_source.get_assets_coverage() == {
+        'EQ:ABC': (timestamps[0], timestamps[-1]),
+        'EQ:DEF': (timestamps[1], timestamps[-1])
+    }
+    np.testing.assert_array_equal(
+        data_source.get_asks_at(timestamps.as_unit('ns').asi8[1:3], ['EQ:ABC']), [[11.0], [11.0]]
+    )
+
+    # Only the panel-based behaviour is shared with wide CSV files
+    assert isinstance(data_source, PanelPriceDataSource)
+    assert not isinstance(data_source, WideCSVPriceDataSource)
+
+
+def test_in_memory_price_data_source_timestamp_offset():
+    timestamps = pd.date_range('2020-01-01', periods=2, freq='D', tz=pytz.UTC)
+    data_source = InMemoryPriceDataSource(
+        timestamps, ['EQ:ABC'], np.array([[1.0], [2.0]]),
+        timestamp_offset=pd.Timedelta(days=1)
+    )
+    assert np.isnan(data_source.get_bid(pd.Timestamp('2020-01-01 12:00', tz=pytz.UTC), 'EQ:ABC'))
+    assert data_source.get_bid(pd.Timestamp('2020-01-02 12:00', tz=pytz.UTC), 'EQ:ABC') == 1.0
@@ -0,0 +1,208 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+import pytz
+
+from qstrader.data.intraday_bar_csv import CSVIntradayBarDataSource
+from qstrader import settings
+
+
+NUM_BARS = 95
+
+
+@pytest.fixture
+def csv_dir(tmp_path):
+    """
+    Write one minute bars for two assets, with epoch millisecond
+    timestamps as downloaded from Binance, some missing prices and
+    a later listing for the second asset.
+    """
+    settings.PRINT_EVENTS = False
+    rng = np.random.default_rng(42)
+    start = pd.Timestamp('2024-01-01 00:00:00', tz=pytz.UTC)
+    for symbol, offset in (('BTCUSDT', 0), ('ETHUSDT', 30)):
+        times = pd.date_range(start + pd.Timedelta(minutes=offset), periods=NUM_BARS, freq='1min')
+        closes = 100.0 + np.cumsum(rng.normal(0.0, 1.0, NUM_BARS))
+        bar_df = pd.DataFrame(
+            {
+                'time': times.as_unit('ms').asi8,
+                'o': closes - 0.5,
+                'c': closes,
+                'v': rng.uniform(0.0, 10.0, NUM_BARS)
+            }
+        )
+        bar_df.loc[[10, 11, 40], 'o'] = np.nan
+        bar_df.loc[[10, 11, 19, 20], 'c'] = np.nan
+        bar_df.to_csv(os.path.join(tmp_path, '%s.csv' % symbol), index=False)
+    return str(tmp_path)
+
+
+def create_data_source(csv_dir, **kwargs):
+    return CSVIntradayBarDataSource(
+        csv_dir, None, '1min', symbol_format='CRYPTO:%s', date_column='time',
+        open_column='o', close_column='c', timestamp_unit='ms', **kwargs
+    )
+
+
+def expected_prices(csv_dir, symbol):
+    """
+    The open/close prices of the full file, with opening prices at the
+    bar timestamp and closing prices one bar later, forward-filled.
+    """
+    bar_df = pd.read_csv(os.path.join(csv_dir, '%s.csv' % symbol))
+    times = pd.to_datetime(bar_df['time'], unit='ms', utc=True)
+    prices = pd.Series(
+        np.column_stack([bar_df['o'], bar_df['c']]).ravel(),
+        index=np.column_stack([times, times + pd.Timedelta(minutes=1)]).ravel()
+    ).ffill()
+    return prices
+
+
+@pytest.mark.parametrize('chunk_size,max_chunks', [(7, 1), (10, 2), (1000, 2)])
+def test_streamed_prices_match_full_history(csv_dir, chunk_size, max_chunks):
+    """
+    Checks that prices obtained while streaming forward through the
+    files in chunks match those of the full history, including missing
+    prices spanning chunk boundaries, while retaining at most the
+    maximum number of chunks in memory.
+    """
+    ds = create_data_source(csv_dir, chunk_size=chunk_size, max_chunks=max_chunks)
+    expected = {
+        asset: expected_prices(csv_dir, asset.replace('CRYPTO:', ''))
+        for asset in ds.asset_streams.keys()
+    }
+    for dt in pd.date_range('2023-12-31 23:58:00', '2024-01-01 02:10:00', freq='30s', tz=pytz.UTC):
+        for asset, prices in expected.items():
+            available = prices[prices.index <= dt]
+            expected_price = available.iloc[-1] if len(available) > 0 else np.nan
+            np.testing.assert_equal(ds.get_bid(dt, asset), expected_price)
+            np.testing.assert_equal(ds.get_ask(dt, asset), expected_price)
+            assert len(ds.asset_streams[asset].chunks) <= max_chunks
+
+    btc = ds.asset_streams['CRYPTO:BTCUSDT']
+    assert btc.exhausted
+    assert btc.chunks_read == int(np.ceil(NUM_BARS / chunk_size))
+    ds.close()
+
+
+def test_query_prior_to_retained_window(csv_dir):
+    """
+    Checks that a price or historical range prior to the retained
+    window of chunks raises a ValueError, rather than returning NaN.
+    """
+    ds = create_data_source(csv_dir, chunk_size=10, max_chunks=2)
+    late = pd.Timestamp('2024-01-01 01:00:00', tz=pytz.UTC)
+    early = pd.Timestamp('2024-01-01 00:05:00', tz=pytz.UTC)
+    ds.get_bid(late, 'CRYPTO:BTCUSDT')
+    with pytest.raises(ValueError):
+        ds.get_bid(early, 'CRYPTO:BTCUSDT')
+    with pytest.raises(ValueError):
+        ds.get_assets_historical_closes(early, late, ['CRYPTO:BTCUSDT'])
+    ds.close()
+
+
+def test_get_assets_historical_closes(csv_dir):
+    """
+    Checks that historical closing prices are aligned across assets
+    on the bar timestamps within the retained window, excluding the
+    bar opening at the ending datetime as it has not yet closed.
+    """
+    ds = create_data_source(csv_dir, chunk_size=20, max_chunks=3)
+    start_dt = pd.Timestamp('2024-01-01 00:25:00', tz=pytz.UTC)
+    end_dt = pd.Timestamp('2024-01-01 00:45:00', tz=pytz.UTC)
+    closes = ds.get_assets_historical_closes(
+        start_dt, end_dt, ['CRYPTO:ETHUSDT', 'CRYPTO:BTCUSDT', 'CRYPTO:XYZ']
+    )
+
+    expected = []
+    for symbol in ('ETHUSDT', 'BTCUSDT'):
+        bar_df = pd.read_csv(os.path.join(csv_dir, '%s.csv' % symbol))
+        expected.append(
+            pd.Series(
+                bar_df['c'].to_numpy(),
+                index=pd.to_datetime(bar_df['time'], unit='ms', utc=True),
+                name='CRYPTO:%s' % symbol
+            )
+        )
+    expected = pd.concat(expected, axis=1, sort=True).loc[
+        start_dt:end_dt - pd.Timedelta(minutes=1)
+    ].dropna(how='all')
+    assert list(closes.columns) == ['CRYPTO:ETHUSDT', 'CRYPTO:BTCUSDT']
+    np.testing.assert_array_equal(closes.index.asi8, expected.index.as_unit('ns').asi8)
+    np.testing.assert_array_equal(closes.to_numpy(), expected.to_numpy())
+    ds.close()
+
+
+def test_historical_closes_at_bar_boundary(csv_dir):
+    """
+    Checks that the last historical close at a bar boundary is that
+    of the bar closing at the boundary, rather than that of the bar
+    opening at it, whose close is not yet available.
+    """
+    ds = create_data_source(csv_dir)
+    bar_df = pd.read_csv(os.path.join(csv_dir, 'BTCUSDT.csv'))
+    start_dt = pd.Timestamp('2024-01-01 00:00:00', tz=pytz.UTC)
+    for minutes in (3, 4, 30):
+        dt = start_dt + pd.Timedelta(minutes=minutes)
+        closes = ds.get_assets_historical_closes(start_dt, dt, ['CRYPTO:BTCUSDT'])
+        assert closes.index[-1] == dt - pd.Timedelta(minutes=1)
+        assert closes['CRYPTO:BTCUSDT'].iloc[-1] == bar_df['c'].iloc[minutes - 1]
+    ds.close()
+
+
+def test_get_assets_coverage(csv_dir):
+    """
+    Checks the coverage of each asset, from the first opening price
+    to the final closing price, without streaming the whole file.
+    """
+    ds = create_data_source(csv_dir, chunk_size=10)
+    coverage = ds.get_assets_coverage()
+    assert coverage['CRYPTO:ETHUSDT'] == (
+        pd.Timestamp('2024-01-01 00:30:00', tz=pytz.UTC),
+        pd.Timestamp('2024-01-01 02:05:00', tz=pytz.UTC)
+    )
+    assert ds.asset_streams['CRYPTO:ETHUSDT'].chunks_read == 1
+    ds.close()
+
+
+def test_get_assets_coverage_quoted_crlf(tmp_path):
+    """
+    Checks the final bar of a CSV file with quoted fields and CRLF
+    line endings.
+    """
+    settings.PRINT_EVENTS = False
+    with open(os.path.join(tmp_path, 'BTCUSDT.csv'), 'w', newline='') as csv_file:
+        csv_file.write(
+            '"Pair","Date","Open","Close"\r\n'
+            '"BTC,USDT","2024-01-01 00:00:00",100.0,100.5\r\n'
+            '"BTC,USDT","2024-01-01 00:01:00",100.5,101.0\r\n'
+        )
+    with CSVIntradayBarDataSource(str(tmp_path), None, '1min') as ds:
+        assert ds.get_assets_coverage()['BTCUSDT'] == (
+            pd.Timestamp('2024-01-01 00:00:00', tz=pytz.UTC),
+            pd.Timestamp('2024-01-01 00:02:00', tz=pytz.UTC)
+        )
+
+
+@pytest.mark.parametrize('release', ['context', 'garbage_collection'])
+def test_release_on_exit(csv_dir, release):
+    """
+    Checks that the prefetching thread and the CSV files are released
+    when leaving a with block, even on an exception, or when the data
+    source is garbage collected.
+    """
+    if release == 'context':
+        with pytest.raises(RuntimeError):
+            with create_data_source(csv_dir, chunk_size=10) as ds:
+                executor = ds.executor
+                readers = [stream._reader for stream in ds.asset_streams.values()]
+                raise RuntimeError('Simulated crash')
+    else:
+        ds = create_data_source(csv_dir, chunk_size=10)
+        executor = ds.executor
+        readers = [stream._reader for stream in ds.asset_streams.values()]
+        del ds
+    assert executor._shutdown
+    assert all(reader.handles.handle.closed for reader in readers)
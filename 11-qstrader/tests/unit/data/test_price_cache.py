@@ -0,0 +1,57 @@
+import os
+
+import numpy as np
+
+from qstrader.data.price_cache import BinaryPriceCache
+
+
+def _write_source(path, contents):
+    with open(path, 'w') as f:
+        f.write(contents)
+
+
+def test_price_cache_miss_then_hit(tmp_path):
+    """
+    Checks that an uncached source is a miss, and that once
+    written the entry is returned as memory-mapped arrays.
+    """
+    source = os.path.join(tmp_path, 'ABC.csv')
+    _write_source(source, 'Date,Close\n2020-01-02,1.0\n')
+    cache = BinaryPriceCache(os.path.join(tmp_path, 'cache'))
+
+    assert cache.get('ABC', source) is None
+    assert (cache.hits, cache.misses) == (0, 1)
+
+    ts = np.array([1577923200000000000], dtype=np.int64)
+    values = np.array([[1.0]], dtype=np.float64)
+    cache.put('ABC', source, {'ts': ts, 'values': values}, info={'columns': ['Close']})
+
+    arrays, info = cache.get('ABC', source)
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert isinstance(arrays['ts'], np.memmap)
+    assert arrays['ts'].dtype == np.int64
+    np.testing.assert_array_equal(arrays['values'], values)
+    assert info == {'columns': ['Close']}
+
+
+def test_price_cache_invalidated_by_content_change(tmp_path):
+    """
+    Checks that a change to the source contents invalidates
+    the entry, while a change solely to the modification time
+    does not.
+    """
+    source = os.path.join(tmp_path, 'ABC.csv')
+    _write_source(source, 'Date,Close\n2020-01-02,1.0\n')
+    cache = BinaryPriceCache(os.path.join(tmp_path, 'cache'))
+    cache.put('ABC', source, {'values': np.ones(2)})
+
+    # Touch the file with identical contents
+    stat = os.stat(source)
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert cache.get('ABC', source) is not None
+
+    # Same size, different contents
+    _write_source(source, 'Date,Close\n2020-01-02,2.0\n')
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2 * 10**9))
+    assert cache.get('ABC', source) is None
+    assert (cache.hits, cache.misses) == (1, 1)
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+import pytz
+
+from qstrader.data.price_cursor import AssetPriceCursor, timestamp_to_ns
+
+
+@pytest.fixture
+def cursor():
+    timestamps = np.arange(0, 100, 10, dtype=np.int64)
+    prices = np.arange(10, dtype=np.float64) + 100.0
+    return AssetPriceCursor(timestamps, prices, prices + 0.5)
+
+
+@pytest.mark.parametrize(
+    'queries,expected',
+    [
+        ([-5], [-1]),
+        ([0, 0, 5, 10, 19, 20], [0, 0, 0, 1, 1, 2]),
+        ([85, 1000], [8, 9]),
+        ([5, 95], [0, 9]),
+        ([95, 15], [9, 1]),
+        ([45, -1, 45], [4, -1, 4]),
+    ]
+)
+def test_cursor_locate(cursor, queries, expected):
+    """
+    Checks that the cursor locates the latest timestamp at or
+    before each query, for sequential, large forward jump and
+    out-of-order queries, and agrees with a binary search.
+    """
+    for query, pos in zip(queries, expected):
+        assert cursor.locate(query) == pos
+        assert pos == np.searchsorted(cursor.timestamps, query, side='right') - 1
+
+
+def test_cursor_prices(cursor):
+    """
+    Checks that bid/ask prices are NaN before the first timestamp
+    and otherwise padded from the latest timestamp.
+    """
+    assert np.isnan(cursor.bid(-1))
+    assert np.isnan(cursor.ask(-1))
+    assert cursor.bid(35) == 103.0
+    assert cursor.ask(35) == 103.5
+
+
+def test_timestamp_to_ns():
+    """
+    Checks the conversion of timestamps into nanoseconds.
+    """
+    dt = pd.Timestamp('2020-01-02 14:30:00', tz=pytz.UTC)
+    assert timestamp_to_ns(dt) == 1577975400000000000
+    assert timestamp_to_ns(dt.to_pydatetime()) == 1577975400000000000
@@ -0,0 +1,112 @@
+import numpy as np
+
+from qstrader.data.price_panel import PricePanel
+
+
+def _series():
+    return {
+        'EQ:ABC': (np.array([10, 20, 30], dtype=np.int64), np.array([1.0, 2.0, 3.0])),
+        'EQ:DEF': (np.array([20, 40], dtype=np.int64), np.array([5.0, 6.0])),
+    }
+
+
+def test_from_series_aligns_on_union_of_timestamps():
+    """
+    Checks that the panel rows are the union of all timestamps,
+    with NaN where an asset has no value at a timestamp.
+    """
+    panel = PricePanel.from_series(_series())
+    np.testing.assert_array_equal(panel.timestamps, [10, 20, 30, 40])
+    assert panel.assets == ['EQ:ABC', 'EQ:DEF']
+    np.testing.assert_array_equal(
+        panel.values,
+        [
+            [1.0, np.nan, np.nan],
+            [2.0, 5.0, np.nan],
+            [3.0, np.nan, np.nan],
+            [np.nan, 6.0, np.nan],
+        ]
+    )
+
+
+def test_from_series_ffill():
+    """
+    Checks that forward-filling pads each asset from its latest
+    value but leaves values prior to its first timestamp as NaN.
+    """
+    panel = PricePanel.from_series(_series(), ffill=True)
+    np.testing.assert_array_equal(
+        panel.values[:, :2],
+        [
+            [1.0, np.nan],
+            [2.0, 5.0],
+            [3.0, 5.0],
+            [3.0, 6.0],
+        ]
+    )
+
+
+def test_gather():
+    """
+    Checks that a gather returns the latest row at or before the
+    query time, with NaN for unknown assets or early queries.
+    """
+    panel = PricePanel.from_series(_series(), ffill=True)
+    np.testing.assert_array_equal(
+        panel.gather(35, ['EQ:DEF', 'EQ:XYZ', 'EQ:ABC']), [5.0, np.nan, 3.0]
+    )
+    np.testing.assert_array_equal(panel.gather(5, ['EQ:ABC']), [np.nan])
+    np.testing.assert_array_equal(panel.gather(100, ['EQ:DEF']), [6.0])
+
+
+def test_window_is_view_for_contiguous_assets():
+    """
+    Checks that a window over contiguous asset columns is a
+    read-only view of the panel, while other asset selections
+    only copy the window.
+    """
+    panel = PricePanel.from_series(_series())
+
+    timestamps, values, assets = panel.window(15, 30, ['EQ:ABC', 'EQ:DEF', 'EQ:XYZ'])
+    np.testing.assert_array_equal(timestamps, [20, 30])
+    np.testing.assert_array_equal(values, [[2.0, 5.0], [3.0, np.nan]])
+    assert assets == ['EQ:ABC', 'EQ:DEF']
+    assert np.shares_memory(values, panel.values)
+    assert not values.flags.writeable
+
+    timestamps, values, assets = panel.window(0, 100, ['EQ:DEF', 'EQ:ABC'])
+    np.testing.assert_array_equal(values[:, 0], [np.nan, 5.0, np.nan, 6.0])
+    assert assets == ['EQ:DEF', 'EQ:ABC']
+    assert not np.shares_memory(values, panel.values)
+
+
+def test_forward_filled():
+    """
+    Checks that forward-filling a panel leaves values prior to the
+    first value of each asset as NaN and the original panel unchanged.
+    """
+    values = np.array([
+        [np.nan, 1.0, np.nan],
+        [2.0, np.nan, np.nan],
+        [np.nan, np.nan, np.nan]
+    ])
+    panel = PricePanel(np.array([1, 2, 3], dtype=np.int64), ['A', 'B'], values)
+    filled = panel.forward_filled()
+    np.testing.assert_array_equal(
+        filled.values, [[np.nan, 1.0, np.nan], [2.0, 1.0, np.nan], [2.0, 1.0, np.nan]]
+    )
+    assert np.isnan(panel.values[1, 1])
+
+
+def test_gather_rows():
+    """
+    Checks that gathering at multiple times matches gathering at
+    each time in turn.
+    """
+    panel = PricePanel.from_series(_series(), ffill=True)
+    timestamps = np.array([5, 10, 35, 100], dtype=np.int64)
+    assets = ['EQ:DEF', 'EQ:XYZ', 'EQ:ABC']
+    np.testing.assert_array_equal(
+        panel.gather_rows(timestamps, assets),
+        [panel.gather(ts, assets) for ts in timestamps]
+    )
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from qstrader.data.synthetic import block_bootstrap_paths, gbm_paths
+
+
+def create_prices():
+    rng = np.random.default_rng(42)
+    index = pd.bdate_range('2020-01-01', periods=250, tz='UTC')
+    log_returns = rng.normal(0.0005, 0.02, size=(250, 3))
+    log_returns[0] = 0.0
+    return pd.DataFrame(
+        np.array([50.0, 100.0, 10.0]) * np.exp(np.cumsum(log_returns, axis=0)),
+        index=index, columns=['EQ:ABC', 'EQ:DEF', 'EQ:GHI']
+    )
+
+
+def test_block_bootstrap_paths():
+    """
+    Checks that bootstrapped paths start from the initial prices and
+    consist of blocks of consecutive historical returns, sampled on
+    the same rows for every asset.
+    """
+    prices = create_prices()
+    paths = block_bootstrap_paths(prices, 8, block_size=10, rng=np.random.default_rng(0))
+    assert paths.shape == (8, 250, 3)
+    np.testing.assert_array_equal(paths[:, 0], np.tile(prices.iloc[0].to_numpy(), (8, 1)))
+
+    log_returns = np.diff(np.log(prices.to_numpy()), axis=0)
+    path_returns = np.diff(np.log(paths), axis=1)
+    for path in path_returns:
+        rows = [
+            np.flatnonzero(np.isclose(log_returns[:, 0], ret))[0] for ret in path[:, 0]
+        ]
+        np.testing.assert_allclose(path, log_returns[rows])
+        assert all(rows[i + 1] == rows[i] + 1 for i in range(9))
+
+
+def test_block_bootstrap_paths_seeded():
+    prices = create_prices()
+    np.testing.assert_array_equal(
+        block_bootstrap_paths(prices, 4, rng=np.random.default_rng(7)),
+        block_bootstrap_paths(prices, 4, rng=np.random.default_rng(7))
+    )
+
+
+def test_gbm_paths_calibration():
+    """
+    Checks that GBM paths start from the initial prices with simple
+    returns matching the historical mean and volatility.
+    """
+    prices = create_prices()
+    paths = gbm_paths(prices, 400, rng=np.random.default_rng(0))
+    assert paths.shape == (400, 250, 3)
+    np.testing.assert_array_equal(paths[:, 0], np.tile(prices.iloc[0].to_numpy(), (400, 1)))
+
+    returns = prices.pct_change().dropna()
+    path_returns = (paths[:, 1:] / paths[:, :-1] - 1.0).reshape(-1, 3)
+    np.testing.assert_allclose(path_returns.mean(axis=0), returns.mean(), atol=2e-4)
+    np.testing.assert_allclose(path_returns.std(axis=0), returns.std(), rtol=0.01)
+
+
+@pytest.mark.parametrize(
+    'prices',
+    [
+        pd.DataFrame({'EQ:ABC': [1.0, np.nan, 2.0]}),
+        pd.DataFrame({'EQ:ABC': [1.0, 0.0, 2.0]}),
+        pd.DataFrame({'EQ:ABC': [1.0]})
+    ],
+    ids=['missing', 'non_positive', 'single']
+)
+def test_synthetic_paths_reject_invalid_prices(prices):
+    with pytest.raises(ValueError):
+        gbm_paths(prices, 2)
+    with pytest.raises(ValueError):
+        block_bootstrap_paths(prices, 2, block_size=1)
+
+
+def test_block_bootstrap_rejects_invalid_block_size():
+    with pytest.raises(ValueError):
+        block_bootstrap_paths(create_prices(), 2, block_size=250)
@@ -0,0 +1,158 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+import pytz
+
+from qstrader.data.wide_csv import WideCSVPriceDataSource
+from qstrader import settings
+
+
+WIDE_CSV = (
+    'Date,BTC-USD,ETH-USD,SOL-USD\n'
+    '2020-01-03 00:00:00+00:00,7344.9,134.2,\n'
+    '2020-01-01 00:00:00+00:00,7200.2,130.8,\n'
+    '2020-01-02 00:00:00+00:00,6985.5,127.4,\n'
+    '2020-01-04 00:00:00+00:00,7410.7,,1.5\n'
+    '2020-01-05 00:00:00+00:00,7411.3,136.3,1.6\n'
+)
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    settings.PRINT_EVENTS = False
+    path = os.path.join(tmp_path, 'crypto_adj_close.csv')
+    with open(path, 'w') as f:
+        f.write(WIDE_CSV)
+    return path
+
+
+@pytest.mark.parametrize(
+    'dt,asset,expected',
+    [
+        ('2019-12-31', 'CRYPTO:BTC-USD', np.nan),
+        ('2020-01-01', 'CRYPTO:BTC-USD', 7200.2),
+        ('2020-01-02 12:00:00', 'CRYPTO:BTC-USD', 6985.5),
+        ('2020-01-03', 'CRYPTO:SOL-USD', np.nan),
+        ('2020-01-04', 'CRYPTO:SOL-USD', 1.5),
+        ('2020-01-04', 'CRYPTO:ETH-USD', 134.2),
+        ('2020-02-01', 'CRYPTO:ETH-USD', 136.3),
+    ]
+)
+def test_get_bid_ask(csv_path, dt, asset, expected):
+    """
+    Checks that the latest price at or before the timestamp is returned,
+    with NaN prior to listing and forward-filled gaps after listing.
+    """
+    ds = WideCSVPriceDataSource(csv_path, None, symbol_format='CRYPTO:%s')
+    ts = pd.Timestamp(dt, tz=pytz.UTC)
+    np.testing.assert_equal(ds.get_bid(ts, asset), expected)
+    np.testing.assert_equal(ds.get_ask(ts, asset), expected)
+    np.testing.assert_equal(ds.get_bids(ts, [asset, 'CRYPTO:XYZ']), [expected, np.nan])
+    np.testing.assert_equal(ds.get_asks(ts, [asset]), [expected])
+
+
+def test_get_bid_unknown_asset(csv_path):
+    """
+    Checks that an unknown asset raises a KeyError, as with the
+    per-symbol CSV data source.
+    """
+    ds = WideCSVPriceDataSource(csv_path, None)
+    with pytest.raises(KeyError):
+        ds.get_bid(pd.Timestamp('2020-01-02', tz=pytz.UTC), 'XYZ-USD')
+
+
+def test_get_assets_historical_closes(csv_path):
+    """
+    Checks that historical closes are sliced from the unfilled prices,
+    removing rows where none of the requested assets are listed.
+    """
+    ds = WideCSVPriceDataSource(csv_path, None)
+    expected = pd.read_csv(csv_path, index_col=0)
+    expected.index = pd.to_datetime(expected.index, utc=True)
+    expected = expected.sort_index()
+
+    closes = ds.get_assets_historical_closes(
+        pd.Timestamp('2020-01-02', tz=pytz.UTC),
+        pd.Timestamp('2020-01-05', tz=pytz.UTC),
+        ['SOL-USD', 'ETH-USD', 'XYZ-USD']
+    )
+    assert list(closes.columns) == ['SOL-USD', 'ETH-USD']
+    expected = expected.loc['2020-01-02':'2020-01-05', ['SOL-USD', 'ETH-USD']].dropna(how='all')
+    np.testing.assert_array_equal(closes.index.asi8, expected.index.as_unit('ns').asi8)
+    np.testing.assert_array_equal(closes.to_numpy(), expected.to_numpy())
+
+
+def test_column_symbols_offset_and_load_window(csv_path):
+    """
+    Checks explicit column to symbol mapping, timestamp offsets of the
+    bid/ask prices and restricting the rows to a load window.
+    """
+    ds = WideCSVPriceDataSource(
+        csv_path, None,
+        date_column='Date',
+        column_symbols={'ETH-USD': 'CRYPTO:ETH'},
+        timestamp_offset=pd.Timedelta(days=1),
+        start_dt=pd.Timestamp('2020-01-02', tz=pytz.UTC),
+        end_dt=pd.Timestamp('2020-01-04', tz=pytz.UTC)
+    )
+    assert ds.assets == ['CRYPTO:ETH']
+    assert len(ds.close_panel.timestamps) == 3
+
+    assert np.isnan(ds.get_bid(pd.Timestamp('2020-01-02 12:00:00', tz=pytz.UTC), 'CRYPTO:ETH'))
+    assert ds.get_bid(pd.Timestamp('2020-01-03', tz=pytz.UTC), 'CRYPTO:ETH') == 127.4
+    assert ds.get_bid(pd.Timestamp('2020-01-10', tz=pytz.UTC), 'CRYPTO:ETH') == 134.2
+
+
+def test_offset_closes_agree_with_bid_ask(csv_path):
+    """
+    Checks that the timestamp offset is also applied to the historical
+    closes, such that a close is not available prior to its bid/ask
+    price at the offset boundary.
+    """
+    ds = WideCSVPriceDataSource(
+        csv_path, None, timestamp_offset=pd.Timedelta(days=1)
+    )
+    start_dt = pd.Timestamp('2020-01-01', tz=pytz.UTC)
+    for dt, expected in (
+        ('2020-01-02 23:59:59', 7200.2),
+        ('2020-01-03 00:00:00', 6985.5),
+    ):
+        ts = pd.Timestamp(dt, tz=pytz.UTC)
+        closes = ds.get_assets_historical_closes(start_dt, ts, ['BTC-USD'])
+        assert closes['BTC-USD'].iloc[-1] == expected
+        assert ds.get_bid(ts, 'BTC-USD') == expected
+
+
+def test_date_only_timestamps(tmp_path):
+    """
+    Checks that date-only timestamps, as in the CoinGecko panels,
+    are interpreted as midnight UTC.
+    """
+    path = os.path.join(tmp_path, 'data-crypto.csv')
+    with open(path, 'w') as f:
+        f.write('timestamp,bitcoin,ethereum\n2023-12-22,43849.7,2236.2\n2023-12-23,44003.7,2327.0\n')
+    ds = WideCSVPriceDataSource(path, None, date_column='timestamp')
+    assert ds.assets == ['bitcoin', 'ethereum']
+    np.testing.assert_array_equal(
+        ds.get_bids(pd.Timestamp('2023-12-23', tz=pytz.UTC), ['ethereum', 'bitcoin']),
+        [2327.0, 44003.7]
+    )
+
+
+def test_get_assets_coverage(csv_path):
+    """
+    Checks the first and last listed timestamps of each asset,
+    including any timestamp offset.
+    """
+    ds = WideCSVPriceDataSource(csv_path, None, timestamp_offset=pd.Timedelta(hours=1))
+    coverage = ds.get_assets_coverage()
+    assert coverage['SOL-USD'] == (
+        pd.Timestamp('2020-01-04 01:00:00', tz=pytz.UTC),
+        pd.Timestamp('2020-01-05 01:00:00', tz=pytz.UTC)
+    )
+    assert coverage['ETH-USD'] == (
+        pd.Timestamp('2020-01-01 01:00:00', tz=pytz.UTC),
+        pd.Timestamp('2020-01-05 01:00:00', tz=pytz.UTC)
+    )
@@ -0,0 +1,107 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+import pytz
+
+from qstrader.exchange import trading_calendar
+from qstrader.exchange.simulated_exchange import SimulatedExchange
+from qstrader.exchange.trading_calendar import load_trading_calendar
+
+
+@pytest.fixture(autouse=True)
+def clear_compiled_calendars():
+    trading_calendar._COMPILED_CALENDARS.clear()
+    yield
+    trading_calendar._COMPILED_CALENDARS.clear()
+
+
+def ts(value):
+    return pd.Timestamp(value, tz=pytz.UTC)
+
+
+@pytest.mark.parametrize(
+    "year,num_sessions,holidays",
+    [
+        (
+            2019, 252, [
+                '2019-01-01', '2019-01-21', '2019-02-18', '2019-04-19', '2019-05-27',
+                '2019-07-04', '2019-09-02', '2019-11-28', '2019-12-25'
+            ]
+        ),
+        (
+            2022, 251, [
+                '2022-01-17', '2022-02-21', '2022-04-15', '2022-05-30', '2022-06-20',
+                '2022-07-04', '2022-09-05', '2022-11-24', '2022-12-26'
+            ]
+        )
+    ]
+)
+def test_nyse_calendar(year, num_sessions, holidays):
+    """
+    Checks that the compiled NYSE calendar contains a session for every
+    business day other than the NYSE holidays, open during market hours.
+    """
+    calendar = load_trading_calendar('nyse', ts('%s-03-01' % year), ts('%s-03-31' % year))
+    assert calendar.num_sessions == num_sessions
+    for holiday in holidays:
+        assert not calendar.is_open_at_datetime(ts('%s 15:00:00' % holiday))
+    day = pd.bdate_range('%s-03-01' % year, periods=1)[0].strftime('%Y-%m-%d')
+    assert not calendar.is_open_at_datetime(ts('%s 14:29:59' % day))
+    assert calendar.is_open_at_datetime(ts('%s 14:30:00' % day))
+    assert calendar.is_open_at_datetime(ts('%s 20:59:59' % day))
+    assert not calendar.is_open_at_datetime(ts('%s 21:00:00' % day))
+
+
+def test_crypto_and_fx_calendars():
+    """
+    Checks that the crypto calendar is always open and that the FX
+    calendar is open from Sunday to Friday at 22:00 UTC.
+    """
+    crypto = load_trading_calendar('CRYPTO', ts('2020-01-01'), ts('2020-12-31'))
+    timestamps = pd.date_range('2020-01-01', '2020-12-31 23:59:59', freq='7h', tz=pytz.UTC)
+    assert crypto.is_open_array(timestamps.as_unit('ns').asi8).all()
+
+    fx = load_trading_calendar('FX', ts('2020-01-01'), ts('2020-12-31'))
+    assert fx.is_open_at_datetime(ts('2020-01-01 00:00:00'))
+    assert fx.is_open_at_datetime(ts('2020-01-03 21:59:59'))
+    assert not fx.is_open_at_datetime(ts('2020-01-03 22:00:00'))
+    assert not fx.is_open_at_datetime(ts('2020-01-05 21:59:59'))
+    assert fx.is_open_at_datetime(ts('2020-01-05 22:00:00'))
+
+
+def test_calendar_cache(tmp_path):
+    """
+    Checks that compiled calendars are shared within the process and
+    reloaded from the disk cache by subsequent processes.
+    """
+    cache_dir = str(tmp_path)
+    calendar = load_trading_calendar('NYSE', ts('2019-01-01'), ts('2020-06-30'), cache_dir=cache_dir)
+    assert load_trading_calendar('NYSE', ts('2019-05-01'), ts('2020-01-01')) is calendar
+    assert os.listdir(cache_dir) == ['NYSE_2019_2020_v1.npy']
+
+    trading_calendar._COMPILED_CALENDARS.clear()
+    cached = load_trading_calendar('NYSE', ts('2019-01-01'), ts('2020-06-30'), cache_dir=cache_dir)
+    assert cached is not calendar
+    assert isinstance(cached.session_bounds, np.memmap)
+    np.testing.assert_array_equal(cached.session_bounds, calendar.session_bounds)
+
+
+def test_unknown_venue():
+    """
+    Checks that an unknown venue raises a ValueError.
+    """
+    with pytest.raises(ValueError):
+        load_trading_calendar('LSE', ts('2020-01-01'), ts('2020-12-31'))
+
+
+def test_simulated_exchange_calendar():
+    """
+    Checks that the simulated exchange uses the compiled calendar when
+    provided, and weekday market hours otherwise.
+    """
+    holiday = ts('2019-12-25 15:00:00')
+    calendar = load_trading_calendar('NYSE', ts('2019-01-01'), ts('2019-12-31'))
+    assert SimulatedExchange(ts('2019-01-01')).is_open_at_datetime(holiday)
+    assert not SimulatedExchange(ts('2019-01-01'), calendar=calendar).is_open_at_datetime(holiday)
@@ -0,0 +1,84 @@
+import pandas as pd
+import pytest
+import pytz
+
+from qstrader.execution.order import Order
+
+
+DT = pd.Timestamp('2020-01-02 14:30:00', tz=pytz.UTC)
+
+
+def test_market_order_repr_unchanged():
+    """
+    Checks that a market order has no trigger price, is not a bracket
+    order and is represented without any trigger or bracket prices.
+    """
+    order = Order(DT, 'EQ:ABC', 100, order_id='1')
+    assert order.order_type == 'market'
+    assert order.trigger_price is None
+    assert not order.is_bracket
+    assert repr(order) == (
+        "Order(dt='2020-01-02 14:30:00+00:00', asset='EQ:ABC', quantity=100, "
+        "commission=0.0, direction=1.0, order_id=1)"
+    )
+
+
+@pytest.mark.parametrize(
+    'kwargs,trigger_price',
+    [
+        ({'order_type': 'limit', 'limit_price': 95.0}, 95.0),
+        ({'order_type': 'stop', 'stop_price': 105.0}, 105.0)
+    ]
+)
+def test_trigger_price(kwargs, trigger_price):
+    """
+    Checks the trigger price of limit and stop orders.
+    """
+    order = Order(DT, 'EQ:ABC', 100, **kwargs)
+    assert order.trigger_price == trigger_price
+    assert 'trigger_price=%s' % trigger_price in repr(order)
+
+
+@pytest.mark.parametrize(
+    'quantity,kwargs',
+    [
+        (100, {'order_type': 'trailing'}),
+        (100, {'order_type': 'limit'}),
+        (100, {'order_type': 'stop', 'limit_price': 95.0}),
+        (100, {'limit_price': 95.0}),
+        (100, {'order_type': 'limit', 'limit_price': -1.0}),
+        (100, {'stop_loss': 110.0, 'take_profit': 90.0}),
+        (-100, {'stop_loss': 90.0, 'take_profit': 110.0})
+    ]
+)
+def test_invalid_order_prices(quantity, kwargs):
+    """
+    Checks that unsupported order types, missing or superfluous trigger
+    prices, non-positive prices and stop losses on the winning side of
+    the take profit raise ValueError.
+    """
+    with pytest.raises(ValueError):
+        Order(DT, 'EQ:ABC', quantity, **kwargs)
+
+
+def test_create_exit_orders():
+    """
+    Checks that the exit orders of a bracket order close the entered
+    quantity via a stop order at the stop loss and a limit order at the
+    take profit, sharing the entry order ID as their OCO ID.
+    """
+    order = Order(
+        DT, 'EQ:ABC', -100, order_id='1', stop_loss=110.0, take_profit=90.0
+    )
+    assert order.is_bracket
+    stop_loss, take_profit = order.create_exit_orders(DT)
+    assert stop_loss._order_attribs_equal(
+        Order(DT, 'EQ:ABC', 100, order_type='stop', stop_price=110.0)
+    )
+    assert take_profit._order_attribs_equal(
+        Order(DT, 'EQ:ABC', 100, order_type='limit', limit_price=90.0)
+    )
+    assert stop_loss.oco_id == take_profit.oco_id == '1'
+    assert not stop_loss.is_bracket
+
+    assert len(Order(DT, 'EQ:ABC', 100, take_profit=110.0).create_exit_orders(DT)) == 1
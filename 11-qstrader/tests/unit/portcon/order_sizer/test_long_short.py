@@ -1,5 +1,6 @@
 from unittest.mock import Mock
 
+import numpy as np
 import pandas as pd
 import pytest
 import pytz
@@ -168,8 +169,9 @@ def test_normalise_weights(weights, gross_leverage, expected):
 )
 def test_call(total_equity, gross_leverage, weights, asset_prices, expected):
     """
-    Checks that the __call__ method correctly outputs the target
-    portfolio from a given set of weights and a timestamp.
+    Checks that the __call__ and size_target_portfolio methods
+    correctly output the target portfolio from a given set of
+    weights and a timestamp.
     """
     dt = pd.Timestamp('2019-01-01 15:00:00', tz=pytz.utc)
     broker_portfolio_id = "1234"
@@ -179,7 +181,8 @@ def test_call(total_equity, gross_leverage, weights, asset_prices, expected):
     broker.fee_model.calc_total_cost.return_value = 0.0
 
     data_handler = Mock()
-    data_handler.get_asset_latest_ask_price.side_effect = lambda self, x: asset_prices[x]
+    data_handler.get_assets_latest_ask_prices.side_effect = \
+        lambda dt, assets: np.array([asset_prices[asset] for asset in assets])
 
     order_sizer = LongShortLeveragedOrderSizer(
         broker, broker_portfolio_id, data_handler, gross_leverage
@@ -187,3 +190,8 @@ def test_call(total_equity, gross_leverage, weights, asset_prices, expected):
 
     result = order_sizer(dt, weights)
     assert result == expected
+
+    # Sizing for a provided total equity does not query the broker
+    broker.get_portfolio_total_equity.reset_mock()
+    assert order_sizer.size_target_portfolio(dt, weights, total_equity) == expected
+    broker.get_portfolio_total_equity.assert_not_called()
@@ -0,0 +1,106 @@
+import pandas as pd
+import pytest
+import pytz
+
+from qstrader.simulation.continuous import ContinuousSimulationEngine
+from qstrader.simulation.event import SimulationEvent
+
+
+@pytest.mark.parametrize(
+    "starting_dt,ending_dt,freq,pre_market,post_market,expected_events",
+    [
+        (
+            '2020-01-04 00:00:00', '2020-01-05 00:00:00', '1D', False, False,
+            [
+                ('2020-01-04 00:00:00', 'market_open'),
+                ('2020-01-05 00:00:00', 'market_close'),
+                ('2020-01-05 00:00:00', 'market_open'),
+                ('2020-01-06 00:00:00', 'market_close'),
+            ]
+        ),
+        (
+            '2020-01-04 23:00:30', '2020-01-05 01:00:00', '1h', True, True,
+            [
+                ('2020-01-05 00:00:00', 'pre_market'),
+                ('2020-01-05 00:00:00', 'market_open'),
+                ('2020-01-05 01:00:00', 'market_close'),
+                ('2020-01-05 01:00:00', 'post_market'),
+                ('2020-01-05 01:00:00', 'pre_market'),
+                ('2020-01-05 01:00:00', 'market_open'),
+                ('2020-01-05 02:00:00', 'market_close'),
+                ('2020-01-05 02:00:00', 'post_market'),
+            ]
+        ),
+        (
+            '2020-01-05 12:00:00', '2020-01-05 12:02:59', '1min', False, True,
+            [
+                ('2020-01-05 12:00:00', 'market_open'),
+                ('2020-01-05 12:01:00', 'market_close'),
+                ('2020-01-05 12:01:00', 'post_market'),
+                ('2020-01-05 12:01:00', 'market_open'),
+                ('2020-01-05 12:02:00', 'market_close'),
+                ('2020-01-05 12:02:00', 'post_market'),
+                ('2020-01-05 12:02:00', 'market_open'),
+                ('2020-01-05 12:03:00', 'market_close'),
+                ('2020-01-05 12:03:00', 'post_market'),
+            ]
+        ),
+        (
+            '2020-01-05 12:00:01', '2020-01-05 12:00:59', '1min', False, False, []
+        )
+    ]
+)
+def test_continuous_events(
+    starting_dt, ending_dt, freq, pre_market, post_market, expected_events
+):
+    """
+    Checks that the continuous event generation provides the correct
+    SimulationEvents, including weekends, for the given parameters.
+    """
+    sim_engine = ContinuousSimulationEngine(
+        pd.Timestamp(starting_dt, tz=pytz.UTC),
+        pd.Timestamp(ending_dt, tz=pytz.UTC),
+        freq=freq, pre_market=pre_market, post_market=post_market, block_size=2
+    )
+    sim_events = list(sim_engine)
+    assert len(sim_engine) == len(expected_events)
+    assert sim_events == [
+        SimulationEvent(pd.Timestamp(ts, tz=pytz.UTC), event_type)
+        for ts, event_type in expected_events
+    ]
+
+
+def test_timestamp_blocks():
+    """
+    Checks that the timestamps are generated lazily in blocks of
+    datetime64[ns] values, independent of the block size.
+    """
+    starting_dt = pd.Timestamp('2020-01-01', tz=pytz.UTC)
+    ending_dt = pd.Timestamp('2020-01-01 02:00:00', tz=pytz.UTC)
+    blocks = list(
+        ContinuousSimulationEngine(starting_dt, ending_dt, freq='1min', block_size=50).timestamp_blocks()
+    )
+    assert [block.shape for block in blocks] == [(50, 2), (50, 2), (21, 2)]
+    assert blocks[0].dtype == 'datetime64[ns]'
+
+    events = list(ContinuousSimulationEngine(starting_dt, ending_dt, freq='1min', block_size=7))
+    assert events == list(ContinuousSimulationEngine(starting_dt, ending_dt, freq='1min'))
+
+
+@pytest.mark.parametrize(
+    'starting_dt,ending_dt,freq',
+    [
+        ('2020-01-02', '2020-01-01', '1D'),
+        ('2020-01-01', '2020-01-02', '30s'),
+        ('2020-01-01', '2020-01-02', '2D'),
+    ]
+)
+def test_invalid_parameters(starting_dt, ending_dt, freq):
+    """
+    Checks that an ending datetime prior to the starting datetime or
+    an unsupported frequency raises a ValueError.
+    """
+    with pytest.raises(ValueError):
+        ContinuousSimulationEngine(
+            pd.Timestamp(starting_dt, tz=pytz.UTC), pd.Timestamp(ending_dt, tz=pytz.UTC), freq=freq
+        )
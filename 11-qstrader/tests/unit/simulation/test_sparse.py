@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytz
+
+from qstrader.simulation.daily_bday import DailyBusinessDaySimulationEngine
+from qstrader.simulation.sparse import SparseClockSimulationEngine
+
+
+def ts(value):
+    return pd.Timestamp(value, tz=pytz.UTC)
+
+
+def ns(*values):
+    return np.array([ts(value).value for value in values], dtype=np.int64)
+
+
+def test_sparse_clock_events():
+    """
+    Checks that only those events with new data since the prior event,
+    or with a scheduled action, are emitted, along with the first
+    market open following each scheduled action, and that the skipped
+    events are counted.
+    """
+    base_engine = DailyBusinessDaySimulationEngine(
+        ts('2020-01-06'), ts('2020-01-10'), pre_market=False, post_market=False
+    )
+    data_timestamps = [
+        ns('2020-01-06 14:30:00', '2020-01-06 21:00:00'),
+        ns('2020-01-06 21:00:00', '2020-01-08 12:00:00'),
+        np.array([], dtype=np.int64)
+    ]
+    schedule_timestamps = [[ts('2020-01-09 21:00:00')]]
+    sim_engine = SparseClockSimulationEngine(
+        base_engine, data_timestamps, schedule_timestamps=schedule_timestamps
+    )
+
+    expected_events = [
+        ('2020-01-06 14:30:00', 'market_open'),
+        ('2020-01-06 21:00:00', 'market_close'),
+        ('2020-01-08 14:30:00', 'market_open'),
+        ('2020-01-09 21:00:00', 'market_close'),
+        ('2020-01-10 14:30:00', 'market_open'),
+    ]
+    for _ in range(2):
+        events = list(sim_engine)
+        assert [(event.ts, event.event_type) for event in events] == [
+            (ts(dt), event_type) for dt, event_type in expected_events
+        ]
+        assert sim_engine.emitted_events == 5
+        assert sim_engine.skipped_events == 5
+        assert sim_engine.total_events == 10
+
+
+def test_sparse_clock_matches_dense_when_always_due():
+    """
+    Checks that data at every event timestamp reproduces the events
+    of the wrapped simulation engine without skipping any.
+    """
+    base_engine = DailyBusinessDaySimulationEngine(ts('2020-01-01'), ts('2020-01-31'))
+    dense_events = list(base_engine)
+    data_timestamps = [np.array([event.ts.value for event in dense_events], dtype=np.int64)]
+    sim_engine = SparseClockSimulationEngine(base_engine, data_timestamps)
+    assert list(sim_engine) == dense_events
+    assert sim_engine.skipped_events == 0
+
+
+def test_sparse_clock_signal_events():
+    """
+    Checks that every event of the signal update event type is
+    emitted, even without new data or a scheduled action.
+    """
+    base_engine = DailyBusinessDaySimulationEngine(
+        ts('2020-01-06'), ts('2020-01-08'), pre_market=False, post_market=False
+    )
+    sim_engine = SparseClockSimulationEngine(
+        base_engine, [ns('2020-01-06 14:30:00')], signal_event_type='market_close'
+    )
+    assert [(event.ts, event.event_type) for event in sim_engine] == [
+        (ts('2020-01-06 14:30:00'), 'market_open'),
+        (ts('2020-01-06 21:00:00'), 'market_close'),
+        (ts('2020-01-07 21:00:00'), 'market_close'),
+        (ts('2020-01-08 21:00:00'), 'market_close'),
+    ]
+    assert sim_engine.skipped_events == 2
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from qstrader.statistics.quantile import P2Quantile, StreamingDistribution
+
+
+@pytest.mark.parametrize('p', [0.05, 0.25, 0.5, 0.75, 0.95])
+def test_p2_quantile_approximates_exact_quantile(p):
+    """
+    Checks that the P-squared estimate of a quantile of a large
+    sample is close to the exact sample quantile, while holding
+    only five markers.
+    """
+    values = np.random.default_rng(42).standard_normal(20000)
+    estimator = P2Quantile(p)
+    for x in values:
+        estimator.update(x)
+
+    assert estimator.count == 20000
+    assert len(estimator.heights) == 5
+    assert estimator.value == pytest.approx(np.quantile(values, p), abs=0.03)
+
+
+def test_p2_quantile_exact_for_few_observations():
+    """
+    Checks that the estimate is exact for up to five observations
+    and NaN prior to any observations.
+    """
+    estimator = P2Quantile(0.25)
+    assert np.isnan(estimator.value)
+    for x in [5.0, 1.0, 3.0]:
+        estimator.update(x)
+    assert estimator.value == np.quantile([5.0, 1.0, 3.0], 0.25)
+
+
+def test_p2_quantile_rejects_invalid_quantile():
+    with pytest.raises(ValueError):
+        P2Quantile(1.0)
+
+
+def test_streaming_distribution():
+    """
+    Checks the streamed moments and extremes against those of the
+    full sample, with non-finite observations counted separately.
+    """
+    values = np.random.default_rng(1).exponential(size=1000)
+    distribution = StreamingDistribution(quantiles=(0.5,))
+    for x in values:
+        distribution.update(x)
+    distribution.update(np.inf)
+    distribution.update(np.nan)
+
+    summary = distribution.to_dict()
+    assert list(summary) == ['count', 'non_finite', 'mean', 'std', 'min', 'q50', 'max']
+    assert summary['count'] == 1000
+    assert summary['non_finite'] == 2
+    assert summary['mean'] == pytest.approx(values.mean())
+    assert summary['std'] == pytest.approx(values.std(ddof=1))
+    assert summary['min'] == values.min()
+    assert summary['max'] == values.max()
+    assert summary['q50'] == pytest.approx(np.median(values), rel=0.05)
@@ -0,0 +1,85 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+import pytz
+
+from qstrader.statistics.recorder import PortfolioRecorder
+
+
+class PositionMock(object):
+    def __init__(self, net_quantity, market_value):
+        self.net_quantity = net_quantity
+        self.market_value = market_value
+
+
+def _record_samples(recorder, num_samples):
+    """
+    Record samples holding an increasing number of assets, such that
+    assets are first held across several chunks.
+    """
+    dts = pd.date_range('2020-01-01', periods=num_samples, freq='h', tz=pytz.UTC)
+    for i, dt in enumerate(dts):
+        positions = {
+            'EQ:%02d' % j: PositionMock(float(i + j), 10.0 * (i + j))
+            for j in range(i // 2 + 1)
+        }
+        recorder.record(dt, 1000.0 + i, 100.0 - i, positions)
+    return dts
+
+
+@pytest.mark.parametrize('spill', [False, True])
+def test_recorder_chunks(tmp_path, spill):
+    """
+    Checks that samples recorded across multiple chunks, growing the
+    asset columns, are concatenated in order with zero quantities for
+    assets not held, whether completed chunks are held in memory or
+    spilled to disk.
+    """
+    spill_dir = str(tmp_path / 'chunks') if spill else None
+    recorder = PortfolioRecorder(chunk_size=4, spill_dir=spill_dir)
+    dts = _record_samples(recorder, 40)
+
+    assert len(recorder) == 40
+    assert len(recorder.assets) == 20
+    assert recorder.asset_ids['EQ:19'] == 19
+    assert len(recorder.chunks) == 9
+    if spill:
+        assert all(isinstance(chunk, str) for chunk in recorder.chunks)
+        assert len(os.listdir(spill_dir)) == 9
+
+    equity_df = recorder.get_equity_curve()
+    assert list(equity_df.index) == list(dts)
+    np.testing.assert_array_equal(equity_df['Equity'], 1000.0 + np.arange(40))
+    np.testing.assert_array_equal(equity_df['Cash'], 100.0 - np.arange(40))
+
+    quantities = recorder.get_holdings()
+    assert quantities.loc[dts[0], 'EQ:00'] == 0.0
+    assert quantities.loc[dts[0], 'EQ:01'] == 0.0
+    assert quantities.loc[dts[39], 'EQ:19'] == 58.0
+    assert quantities.loc[dts[37], 'EQ:19'] == 0.0
+    market_values = recorder.get_holdings('market_value')
+    np.testing.assert_array_equal(market_values.values, 10.0 * quantities.values)
+
+    weights = recorder.get_weights()
+    assert weights.loc[dts[39], 'EQ:19'] == 580.0 / 1039.0
+
+
+def test_recorder_sample_interval():
+    """
+    Checks that samples within the sample interval of the previously
+    recorded sample are dropped.
+    """
+    recorder = PortfolioRecorder(sample_interval='3h')
+    dts = pd.date_range('2020-01-01', periods=10, freq='h', tz=pytz.UTC)
+    recorded = [recorder.record(dt, 1.0, 1.0, {}) for dt in dts]
+    assert recorded == [True, False, False] * 3 + [True]
+    assert list(recorder.get_equity_curve().index) == list(dts[::3])
+
+
+def test_recorder_invalid_arguments():
+    with pytest.raises(ValueError):
+        PortfolioRecorder(chunk_size=0)
+    with pytest.raises(ValueError):
+        PortfolioRecorder().get_holdings('pnl')
@@ -0,0 +1,26 @@
+import numpy as np
+import pandas as pd
+import pytz
+
+from qstrader.system.rebalance.weekly import WeeklyRebalance
+from qstrader.system.rebalance.schedule import RebalanceSchedule
+
+
+def test_rebalance_schedule():
+    """
+    Checks that the compiled rebalance schedule contains exactly the
+    rebalance timestamps, as sorted unique int64 nanoseconds.
+    """
+    rebalance = WeeklyRebalance(
+        pd.Timestamp('2020-03-01', tz=pytz.UTC), pd.Timestamp('2020-03-31', tz=pytz.UTC), 'WED'
+    )
+    schedule = rebalance.compile()
+    assert len(schedule) == len(rebalance.rebalances) == 4
+    assert schedule.timestamps.dtype == np.int64
+    assert list(schedule) == rebalance.rebalances
+    for dt in pd.date_range('2020-02-28', '2020-04-02', freq='30min', tz=pytz.UTC):
+        assert (dt in schedule) == (dt in rebalance.rebalances)
+
+    empty = RebalanceSchedule([])
+    assert len(empty) == 0
+    assert pd.Timestamp('2020-03-04 21:00:00', tz=pytz.UTC) not in empty